@@ -0,0 +1,340 @@
+"""
+app_registry.py - 사용자별 애플리케이션 레지스트리
+- 이미 만들어진 앱은 짧은 잠금으로 바로 반환
+- 처음 요청한 사용자의 앱 생성(CSV/메타데이터/Oracle/모델 로드)은 전역 잠금 밖에서 실행
+- 같은 사용자의 동시 요청은 생성을 한 번만 하고 결과를 기다림 (사용자별 single-flight)
+- 페이지 접속 시 백그라운드 미리 생성(warm-up)
+- 최대 앱 수(LRU)와 유휴 시간 기준 제거, 제거된 앱은 정리 함수 호출, 사용자별 추정 메모리 집계
+- 요청/작업 처리 중에는 임대(acquire/release)로 사용 중 표시, 사용 중인 앱은 제거되어도 마지막 임대 반납 후 정리
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class _Pending:
+    """생성 중인 앱 (대기자에게 완료/예외 전달)"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.error = None
+
+
+class _Entry:
+    __slots__ = ('username', 'app', 'size', 'created_at', 'last_access', 'leases', 'retired')
+
+    def __init__(self, username, app, size):
+        self.username = username
+        self.app = app
+        self.size = size
+        self.created_at = time.time()
+        self.last_access = self.created_at
+        # 사용 중인 임대 수, 레지스트리에서 제거되었지만 임대가 남아 정리를 미룬 상태
+        self.leases = 0
+        self.retired = False
+
+
+class AppLease:
+    """사용자 앱 임대 (release 전까지 레지스트리에서 제거되어도 정리하지 않음)"""
+
+    def __init__(self, registry, entry):
+        self._registry = registry
+        self._entry = entry
+        self.app = entry.app
+        self.username = entry.username
+        self.released = False
+
+    def release(self):
+        """임대 반납 (여러 번 호출해도 한 번만 반납)"""
+        if self.released:
+            return
+        self.released = True
+        self._registry._release(self._entry)
+
+    def __enter__(self):
+        return self.app
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+
+class AppRegistry:
+    def __init__(self, factory, max_apps=None, idle_ttl=None, cleanup=None, sizeof=None):
+        """
+        레지스트리 초기화
+
+        Parameters:
+        - factory: 사용자명을 받아 앱을 생성하는 함수
+        - max_apps: 최대 앱 수 (초과 시 가장 오래 사용되지 않은 앱 제거, None이면 제한 없음)
+        - idle_ttl: 마지막 사용 후 보관 시간(초, None이면 제한 없음)
+        - cleanup: 제거된 앱을 받아 리소스를 정리하는 함수
+        - sizeof: 앱의 추정 메모리(바이트)를 반환하는 함수 (사용량이 바뀌므로 생성 시와 통계 조회 시 계산)
+        """
+        self.factory = factory
+        self.max_apps = max_apps
+        self.idle_ttl = idle_ttl
+        self.cleanup = cleanup
+        self.sizeof = sizeof
+        # 사용자명 → 앱, 오래 사용되지 않은 순
+        self._apps = OrderedDict()
+        self._pending = {}
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {
+            'created': 0,
+            'failed': 0,
+            'waited': 0,
+            'warmups': 0,
+            'evicted': 0,
+            'expired': 0,
+            'deferred_cleanups': 0,
+            'create_seconds': 0.0,
+        }
+
+    def get(self, username):
+        """
+        사용자 앱 반환 (없으면 생성, 다른 사용자의 생성을 기다리지 않음)
+        - 임대 없이 반환하므로 제거 후 정리될 수 있음, 요청/작업 처리에는 acquire 사용
+
+        Raises:
+        - 생성 실패 시 factory의 예외 (저장하지 않으므로 다음 요청에서 다시 시도)
+        """
+        return self._checkout(username, lease=False).app
+
+    def acquire(self, username):
+        """
+        사용자 앱 임대 (없으면 생성, 반납 전까지 제거되어도 정리를 미룸)
+
+        Returns:
+        - AppLease (사용 후 release 또는 with 문으로 반납)
+
+        Raises:
+        - 생성 실패 시 factory의 예외
+        """
+        return self._checkout(username, lease=True)
+
+    def _checkout(self, username, lease):
+        """앱 조회/생성 (lease면 임대 수 증가 후 AppLease, 아니면 _Entry 반환)"""
+        while True:
+            with self._lock:
+                removed = self._purge_expired()
+                entry = self._apps.get(username)
+                if entry is not None:
+                    entry.last_access = time.time()
+                    self._apps.move_to_end(username)
+                    if lease:
+                        entry.leases += 1
+                else:
+                    pending = self._pending.get(username)
+                    creator = pending is None
+                    if creator:
+                        pending = _Pending()
+                        self._pending[username] = pending
+                    else:
+                        self._stats['waited'] += 1
+            self._cleanup_apps(removed)
+            if entry is not None:
+                return AppLease(self, entry) if lease else entry
+            if creator:
+                return self._create(username, pending, lease)
+
+            # 다른 요청의 생성 완료를 기다린 뒤 등록된 앱을 다시 조회
+            # (그사이 제거되었으면 다시 생성)
+            pending.event.wait()
+            if pending.error is not None:
+                raise pending.error
+
+    def _create(self, username, pending, lease):
+        """앱 생성 후 등록 (잠금 밖에서 factory 실행)"""
+        start = time.perf_counter()
+        try:
+            app = self.factory(username)
+            entry = _Entry(username, app, self._estimate_size(app))
+            if lease:
+                entry.leases = 1
+            with self._lock:
+                self._apps[username] = entry
+                self._total_bytes += entry.size
+                self._stats['created'] += 1
+                self._stats['create_seconds'] += time.perf_counter() - start
+                removed = self._evict_over_limit()
+            logger.info(f"사용자 앱 생성 완료: {username} ({time.perf_counter() - start:.2f}초, "
+                        f"추정 메모리 {entry.size / (1024 * 1024):.1f}MB)")
+            self._cleanup_apps(removed)
+            return AppLease(self, entry) if lease else entry
+        except Exception as e:
+            pending.error = e
+            with self._lock:
+                self._stats['failed'] += 1
+            logger.error(f"사용자 앱 생성 실패: {username} - {e}")
+            raise
+        finally:
+            with self._lock:
+                self._pending.pop(username, None)
+            pending.event.set()
+
+    def _release(self, entry):
+        """임대 반납 (제거된 앱의 마지막 임대면 정리)"""
+        with self._lock:
+            entry.leases -= 1
+            cleanup_now = entry.retired and entry.leases == 0
+        if cleanup_now:
+            self._cleanup_apps([(entry.username, entry.app)])
+
+    def warm_up(self, username):
+        """
+        사용자 앱을 백그라운드에서 미리 생성 (이미 있거나 생성 중이면 무시)
+
+        Returns:
+        - 새로 생성을 시작했으면 True
+        """
+        with self._lock:
+            if username in self._apps or username in self._pending:
+                return False
+            self._stats['warmups'] += 1
+
+        def run():
+            try:
+                self.get(username)
+            except Exception:
+                # 실패는 get에서 기록, 다음 요청에서 다시 시도
+                pass
+
+        threading.Thread(target=run, name=f"app-warmup-{username}", daemon=True).start()
+        return True
+
+    def peek(self, username):
+        """생성된 앱만 반환 (없으면 None, 생성하지 않음, 사용 시각도 갱신하지 않음)"""
+        with self._lock:
+            entry = self._apps.get(username)
+            return entry.app if entry is not None else None
+
+    def remove(self, username):
+        """
+        사용자 앱 제거 후 정리
+
+        Returns:
+        - 제거했으면 True
+        """
+        with self._lock:
+            if username not in self._apps:
+                return False
+            removed = self._remove(username, None)
+        self._cleanup_apps(removed)
+        return True
+
+    def evict_idle(self):
+        """
+        유휴 시간이 지난 앱 제거 (요청/통계 조회 시에도 자동으로 수행)
+
+        Returns:
+        - 제거한 앱 수
+        """
+        with self._lock:
+            removed = self._purge_expired()
+        self._cleanup_apps(removed)
+        return len(removed)
+
+    def clear(self):
+        """모든 앱 제거 후 정리 (서버 종료 시)"""
+        with self._lock:
+            removed = []
+            for username in list(self._apps):
+                removed.extend(self._remove(username, None))
+        self._cleanup_apps(removed)
+
+    def _estimate_size(self, app):
+        if self.sizeof is None:
+            return 0
+        try:
+            return int(self.sizeof(app))
+        except Exception as e:
+            logger.warning(f"사용자 앱 메모리 추정 실패: {e}")
+            return 0
+
+    def _remove(self, username, reason):
+        """
+        앱 제거 (잠금 보유 상태에서 호출, 정리는 잠금 밖에서 _cleanup_apps로)
+
+        Returns:
+        - 바로 정리할 [(사용자명, 앱)] (사용 중이면 빈 목록, 마지막 임대 반납 시 정리)
+        """
+        entry = self._apps.pop(username)
+        self._total_bytes -= entry.size
+        if reason:
+            self._stats[reason] += 1
+        if entry.leases > 0:
+            entry.retired = True
+            self._stats['deferred_cleanups'] += 1
+            logger.info(f"사용 중인 사용자 앱 제거, 정리는 사용 종료 후: {username} (임대 {entry.leases}개)")
+            return []
+        return [(username, entry.app)]
+
+    def _purge_expired(self):
+        """유휴 시간이 지난 앱 제거 (잠금 보유 상태에서 호출)"""
+        if self.idle_ttl is None:
+            return []
+        deadline = time.time() - self.idle_ttl
+        removed = []
+        # 사용 중(임대 중)인 앱은 유휴 상태가 아님
+        for username in [u for u, entry in self._apps.items() if entry.last_access <= deadline and not entry.leases]:
+            removed.extend(self._remove(username, 'expired'))
+        return removed
+
+    def _evict_over_limit(self):
+        """최대 앱 수를 넘으면 가장 오래 사용되지 않은 앱부터 제거 (잠금 보유 상태에서 호출)"""
+        if self.max_apps is None:
+            return []
+        removed = []
+        while len(self._apps) > self.max_apps:
+            removed.extend(self._remove(next(iter(self._apps)), 'evicted'))
+        return removed
+
+    def _cleanup_apps(self, removed):
+        """제거된 앱 정리 (생성처럼 오래 걸릴 수 있으므로 잠금 밖에서 호출)"""
+        for username, app in removed:
+            logger.info(f"사용자 앱 제거: {username}")
+            if self.cleanup is None:
+                continue
+            try:
+                self.cleanup(app)
+            except Exception as e:
+                logger.error(f"사용자 앱 정리 오류: {username} - {e}")
+
+    def _refresh_sizes(self):
+        """등록된 앱의 추정 메모리 다시 계산 (sizeof는 잠금 밖에서 호출)"""
+        if self.sizeof is None:
+            return
+        with self._lock:
+            entries = list(self._apps.values())
+        sizes = [(entry, self._estimate_size(entry.app)) for entry in entries]
+        with self._lock:
+            for entry, size in sizes:
+                # 그사이 제거된 앱은 합계에서 이미 빠졌으므로 갱신하지 않음
+                if self._apps.get(entry.username) is entry:
+                    self._total_bytes += size - entry.size
+                    entry.size = size
+
+    def get_stats(self):
+        """레지스트리 통계 반환 (앱 수/상한, 사용자별 추정 메모리, 생성/제거 횟수)"""
+        self._refresh_sizes()
+        with self._lock:
+            removed = self._purge_expired()
+            stats = dict(self._stats)
+            stats['apps'] = len(self._apps)
+            stats['pending'] = len(self._pending)
+            stats['leases'] = {username: entry.leases for username, entry in self._apps.items() if entry.leases}
+            stats['total_bytes'] = self._total_bytes
+            stats['user_bytes'] = {username: entry.size for username, entry in self._apps.items()}
+            stats['idle_seconds'] = {username: round(time.time() - entry.last_access, 1)
+                                     for username, entry in self._apps.items()}
+        self._cleanup_apps(removed)
+        create_seconds = stats.pop('create_seconds')
+        stats['avg_create_ms'] = create_seconds * 1000 / stats['created'] if stats['created'] else 0.0
+        stats['max_apps'] = self.max_apps
+        stats['idle_ttl'] = self.idle_ttl
+        return stats
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+benchmark_chart_render.py - 차트 렌더링 처리량 벤치마크
+- 현재 프로세스(스레드) 렌더링 vs 프로세스 풀 렌더링을 작업자 1/4/8개에서 비교
+- 렌더링 캐시를 끄고 서로 다른 차트를 동시에 요청하여 초당 차트 수 측정
+
+사용 예:
+    python benchmark_chart_render.py
+    python benchmark_chart_render.py --charts 400 --workers 1 4 8
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# 현재 디렉토리를 Python 경로에 추가
+current_dir = Path(__file__).parent
+if str(current_dir) not in sys.path:
+    sys.path.append(str(current_dir))
+
+import pandas as pd
+
+from config import Config
+from chart_generator import ChartGenerator
+from render_pool import RenderPool
+
+CHART_TYPES = ['bar', 'line', 'pie', 'scatter', 'area', 'histogram', 'stacked_bar']
+
+
+def make_chart_json(i, points):
+    labels = [f"{i}-{n}" for n in range(points)]
+    return {
+        "type": CHART_TYPES[i % len(CHART_TYPES)],
+        "title": f"벤치마크 차트 {i}",
+        "data": {
+            "labels": labels,
+            "datasets": [
+                {"label": f"시리즈 {k}", "data": [(i * 7 + n * (k + 1)) % 50 + 1 for n in range(points)]}
+                for k in range(2)
+            ]
+        }
+    }
+
+
+def run(render, charts, concurrency):
+    """charts를 concurrency개 스레드로 렌더링하고 (초당 차트 수, 평균 지연 ms) 반환"""
+    latencies = []
+
+    def timed(chart):
+        start = time.perf_counter()
+        render(dict(chart))
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(timed, charts))
+    elapsed = time.perf_counter() - start
+    return len(charts) / elapsed, sum(latencies) / len(latencies) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='차트 렌더링 처리량 벤치마크')
+    parser.add_argument('--charts', type=int, default=200, help='측정할 차트 수')
+    parser.add_argument('--points', type=int, default=24, help='차트당 데이터 포인트 수')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8], help='작업자 수 목록')
+    args = parser.parse_args()
+
+    Config.CHART_CACHE_ENABLED = False
+    charts = [make_chart_json(i, args.points) for i in range(args.charts)]
+    df = pd.DataFrame()
+    generator = ChartGenerator(output_dir=tempfile.mkdtemp(prefix="chart_bench_"))
+
+    print("=" * 72)
+    print(f"📊 차트 렌더링 벤치마크 - 차트 {args.charts}개, 포인트 {args.points}개, CPU {os.cpu_count()}개")
+    print("=" * 72)
+    print(f"{'방식':>14} | {'작업자':>6} | {'차트/초':>10} | {'평균 지연':>10}")
+    print("-" * 72)
+
+    # 워밍업 (폰트 캐시 등)
+    generator._render_png(dict(charts[0]), df, {})
+
+    for workers in args.workers:
+        throughput, latency = run(lambda chart: generator._render_png(chart, df, {}), charts, workers)
+        print(f"{'inprocess':>14} | {workers:>6} | {throughput:>10.1f} | {latency:>8.1f}ms")
+
+    for workers in args.workers:
+        pool = RenderPool(processes=workers, max_renders_per_worker=Config.CHART_RENDER_MAX_PER_WORKER,
+                          timeout=Config.CHART_RENDER_TIMEOUT, dpi=Config.CHART_DPI,
+                          start_method=Config.CHART_RENDER_START_METHOD)
+        try:
+            pool.wait_ready()
+            throughput, latency = run(lambda chart: pool.render(chart, df), charts, workers)
+            print(f"{'process':>14} | {workers:>6} | {throughput:>10.1f} | {latency:>8.1f}ms")
+        finally:
+            pool.shutdown()
+
+    print("=" * 72)
+
+
+if __name__ == "__main__":
+    main()
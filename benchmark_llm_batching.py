@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+benchmark_llm_batching.py - vLLM 연속 배칭 벤치마크
+- 동시 사용자 수(1, 8, 32)별 tokens/sec 측정
+- 배칭 스케줄러 vs 기존 직렬 호출(잠금) 비교
+- GPU가 없는 환경에서는 --engine simulated 로 엔진 동작을 모사
+
+사용 예:
+    python benchmark_llm_batching.py --engine simulated
+    python benchmark_llm_batching.py --engine vllm --max-tokens 256
+"""
+
+import argparse
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+
+# 현재 디렉토리를 Python 경로에 추가
+current_dir = Path(__file__).parent
+if str(current_dir) not in sys.path:
+    sys.path.append(str(current_dir))
+
+from llm_scheduler import BatchingScheduler
+
+
+class SimulatedEngine:
+    """
+    vLLM LLMEngine 동작 모사
+    - 한 스텝마다 활성 시퀀스당 토큰 1개 생성
+    - 스텝 지연 = 고정 비용 + 시퀀스당 비용 (GPU 배치 처리 특성)
+    """
+
+    def __init__(self, step_base_ms=20.0, step_per_seq_ms=0.5):
+        self.step_base = step_base_ms / 1000.0
+        self.step_per_seq = step_per_seq_ms / 1000.0
+        self._requests = {}
+        self._lock = threading.Lock()
+
+    def add_request(self, request_id, prompt, sampling_params):
+        with self._lock:
+            self._requests[request_id] = {'max_tokens': sampling_params.max_tokens, 'tokens': []}
+
+    def abort_request(self, request_id):
+        with self._lock:
+            self._requests.pop(request_id, None)
+
+    def has_unfinished_requests(self):
+        return bool(self._requests)
+
+    def step(self):
+        with self._lock:
+            active = list(self._requests.items())
+        time.sleep(self.step_base + self.step_per_seq * len(active))
+
+        outputs = []
+        for request_id, state in active:
+            state['tokens'].append(len(state['tokens']))
+            finished = len(state['tokens']) >= state['max_tokens']
+            if finished:
+                self.abort_request(request_id)
+            completion = SimpleNamespace(text="x" * len(state['tokens']), token_ids=list(state['tokens']))
+            outputs.append(SimpleNamespace(request_id=request_id, finished=finished, outputs=[completion]))
+        return outputs
+
+
+class SerialRunner:
+    """기존 방식: 요청마다 엔진을 잠그고 단독으로 끝까지 생성"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.lock = threading.Lock()
+        self._count = 0
+
+    def generate(self, prompt, sampling_params):
+        with self.lock:
+            self._count += 1
+            request_id = f"serial-{self._count}"
+            self.engine.add_request(request_id, prompt, sampling_params)
+            while True:
+                for output in self.engine.step():
+                    if output.request_id == request_id and output.finished:
+                        return output.outputs[0].text
+
+
+def build_vllm_engine():
+    """실제 vLLM 엔진 로드"""
+    from config import LLMMode, Config
+    from llm_manager import SharedLLMBackend
+
+    Config.VLLM_ENABLE_BATCHING = False
+    backend = SharedLLMBackend.get(LLMMode.VLLM)
+    return backend.llm.llm_engine
+
+
+def make_sampling_params(engine_type, max_tokens):
+    if engine_type == 'vllm':
+        from vllm import SamplingParams
+        return SamplingParams(temperature=0.1, max_tokens=max_tokens, ignore_eos=True)
+    return SimpleNamespace(max_tokens=max_tokens)
+
+
+def run_load(generate_fn, concurrency, requests_per_user, sampling_params):
+    """동시 사용자 부하 실행 후 (총 토큰, 경과 시간) 반환"""
+    prompt = "2024년 고객별 실적을 조회하는 SQL 쿼리를 작성해주세요."
+    total_requests = concurrency * requests_per_user
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(generate_fn, prompt, sampling_params) for _ in range(total_requests)]
+        for future in futures:
+            future.result()
+    elapsed = time.perf_counter() - start
+    return total_requests * sampling_params.max_tokens, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='vLLM 연속 배칭 벤치마크')
+    parser.add_argument('--engine', choices=['simulated', 'vllm'], default='simulated', help='사용할 엔진')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32], help='동시 사용자 수 목록')
+    parser.add_argument('--requests-per-user', type=int, default=2, help='사용자당 요청 수')
+    parser.add_argument('--max-tokens', type=int, default=64, help='요청당 생성 토큰 수')
+    parser.add_argument('--max-batch-size', type=int, default=32, help='스케줄러 최대 배치 크기')
+    parser.add_argument('--max-wait-ms', type=int, default=10, help='스케줄러 최대 대기 시간(ms)')
+    args = parser.parse_args()
+
+    engine = build_vllm_engine() if args.engine == 'vllm' else SimulatedEngine()
+    sampling_params = make_sampling_params(args.engine, args.max_tokens)
+
+    print("=" * 72)
+    print(f"📊 연속 배칭 벤치마크 - 엔진: {args.engine}, 요청당 토큰: {args.max_tokens}")
+    print("=" * 72)
+    print(f"{'동시 사용자':>10} | {'직렬 tok/s':>12} | {'배칭 tok/s':>12} | {'향상':>7} | {'평균 배치':>8}")
+    print("-" * 72)
+
+    for concurrency in args.concurrency:
+        serial = SerialRunner(engine)
+        serial_tokens, serial_elapsed = run_load(
+            serial.generate, concurrency, args.requests_per_user, sampling_params
+        )
+
+        scheduler = BatchingScheduler(engine, max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms)
+        try:
+            batched_tokens, batched_elapsed = run_load(
+                scheduler.generate, concurrency, args.requests_per_user, sampling_params
+            )
+            stats = scheduler.get_stats()
+        finally:
+            scheduler.shutdown()
+
+        serial_tps = serial_tokens / serial_elapsed
+        batched_tps = batched_tokens / batched_elapsed
+        print(f"{concurrency:>10} | {serial_tps:>12.1f} | {batched_tps:>12.1f} | "
+              f"{batched_tps / serial_tps:>6.1f}x | {stats['avg_batch_size']:>8.1f}")
+
+    print("=" * 72)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+benchmark_prompt_prefix.py - 프롬프트 접두부 캐시 벤치마크
+- 기존 레이아웃(질문 → 스키마 → 지시사항) vs 고정 접두부 레이아웃(지시사항 + 스키마 → 질문) 비교
+- 요청 간 공유 접두부 길이와 프롬프트 토큰 수를 오프라인으로 계산
+- --engine vllm / api 지정 시 실제 첫 토큰까지의 시간(TTFT) 측정
+
+사용 예:
+    python benchmark_prompt_prefix.py
+    python benchmark_prompt_prefix.py --engine vllm
+    python benchmark_prompt_prefix.py --engine api --endpoint http://localhost:8000/v1/chat/completions
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# 현재 디렉토리를 Python 경로에 추가
+current_dir = Path(__file__).parent
+if str(current_dir) not in sys.path:
+    sys.path.append(str(current_dir))
+
+from config import Config
+from llm_manager import DEFAULT_SYSTEM_PROMPT, SQL_SYSTEM_TEMPLATE, LLMManager
+from schema_context import build_schema_prompt, estimate_tokens
+
+QUESTIONS = [
+    "2024년 분기별 매출액 추이를 보여줘",
+    "고객별 2024년 매출 비중을 파이 차트로 보여줘",
+    "QMS_GBW_VIEW에서 최근 불량 건수를 월별로 조회해줘",
+    "GOOGLE 고객의 분기별 레이팅 변화를 보여줘",
+    "제품군별 매출 상위 10개를 막대 차트로 보여줘",
+    "2023년과 2024년 월별 출하량을 비교해줘",
+    "코드 테이블에서 사업부 코드 목록을 보여줘",
+    "HCOB_CAL 기준 주차별 매출 합계를 보여줘",
+]
+
+
+def legacy_messages(question, metadata):
+    """기존 레이아웃: 사용자 질문이 맨 앞에 와서 요청마다 접두부가 달라짐"""
+    schema_text = build_schema_prompt(metadata, question, Config.PROMPT_SCHEMA_TOKEN_BUDGET)
+    instructions = SQL_SYSTEM_TEMPLATE.split("\n\n", 1)[1]
+    prompt = f"""사용자 질문, 메타데이터, 데이터 샘플을 바탕으로 SQL 쿼리를 생성해주세요.
+
+## 사용자 질문
+{question}
+
+## 메타데이터
+{schema_text}
+
+{instructions}
+
+SQL 쿼리:"""
+    return [
+        {"role": "system", "content": DEFAULT_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def prefix_messages(question, metadata):
+    """고정 접두부 레이아웃: 지시사항 + 전체 압축 스키마를 시스템 메시지에 고정"""
+    system_prompt = LLMManager._system_prompt(
+        SQL_SYSTEM_TEMPLATE, build_schema_prompt(metadata, None, Config.PROMPT_SCHEMA_TOKEN_BUDGET)
+    )
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": f"## 사용자 질문\n{question}\n\nSQL 쿼리:"}
+    ]
+
+
+def flatten(messages):
+    """채팅 템플릿 없이 비교하기 위한 단순 직렬화"""
+    return "".join(f"<|{m['role']}|>\n{m['content']}\n" for m in messages)
+
+
+def common_prefix(texts):
+    prefix = os.path.commonprefix(texts)
+    return estimate_tokens(prefix) if prefix else 0
+
+
+def measure_vllm(layouts, max_model_len):
+    """vLLM 엔진에서 max_tokens=1 생성으로 TTFT 측정"""
+    from vllm import LLM, SamplingParams
+    from transformers import AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(Config.VLLM_MODEL_NAME)
+    llm = LLM(
+        model=Config.VLLM_MODEL_NAME,
+        tensor_parallel_size=Config.VLLM_TENSOR_PARALLEL_SIZE,
+        gpu_memory_utilization=Config.VLLM_GPU_MEMORY_UTILIZATION,
+        max_model_len=max_model_len,
+        trust_remote_code=True,
+        enable_prefix_caching=True
+    )
+    params = SamplingParams(temperature=0.0, max_tokens=1)
+
+    results = {}
+    for name, message_sets in layouts.items():
+        # 레이아웃 간 캐시 공유를 막기 위해 초기화 (지원 버전에서만)
+        if hasattr(llm, 'reset_prefix_cache'):
+            llm.reset_prefix_cache()
+        timings = []
+        for messages in message_sets:
+            text = tokenizer.apply_chat_template(
+                messages, tokenize=False, add_generation_prompt=True, enable_thinking=False
+            )
+            start = time.perf_counter()
+            llm.generate(text, params, use_tqdm=False)
+            timings.append(time.perf_counter() - start)
+        results[name] = timings
+    return results
+
+
+def measure_api(layouts, endpoint, api_key):
+    """스트리밍 응답의 첫 청크 수신까지 시간으로 TTFT 측정"""
+    import requests
+
+    session = requests.Session()
+    session.headers.update({'Authorization': f'Bearer {api_key}', 'Content-Type': 'application/json'})
+
+    results = {}
+    for name, message_sets in layouts.items():
+        timings = []
+        for messages in message_sets:
+            payload = {
+                "model": Config.API_MODEL,
+                "messages": messages,
+                "temperature": 0.0,
+                "max_tokens": 16,
+                "stream": True
+            }
+            start = time.perf_counter()
+            with session.post(endpoint, json=payload, stream=True, timeout=(3.0, 120.0)) as response:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    if line and line.startswith(b"data:") and b'"content"' in line:
+                        break
+            timings.append(time.perf_counter() - start)
+        results[name] = timings
+    session.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='프롬프트 접두부 캐시 벤치마크')
+    parser.add_argument('--engine', choices=['offline', 'vllm', 'api'], default='offline', help='측정 대상')
+    parser.add_argument('--endpoint', default=Config.API_ENDPOINT, help='API 모드 엔드포인트')
+    parser.add_argument('--max-model-len', type=int, default=Config.VLLM_MAX_MODEL_LEN, help='vLLM 최대 길이')
+    args = parser.parse_args()
+
+    with open(Config.metadata_path, 'r', encoding='utf-8') as f:
+        metadata = json.load(f)
+
+    layouts = {
+        'legacy': [legacy_messages(q, metadata) for q in QUESTIONS],
+        'prefix': [prefix_messages(q, metadata) for q in QUESTIONS],
+    }
+
+    print("=" * 72)
+    print(f"📊 프롬프트 접두부 벤치마크 - 질문 {len(QUESTIONS)}개, 엔진: {args.engine}")
+    print("=" * 72)
+    print(f"{'레이아웃':>10} | {'평균 토큰':>10} | {'공유 접두부 토큰':>16} | {'공유 비율':>9}")
+    print("-" * 72)
+    for name, message_sets in layouts.items():
+        texts = [flatten(messages) for messages in message_sets]
+        avg_tokens = statistics.mean(estimate_tokens(text) for text in texts)
+        shared = common_prefix(texts)
+        print(f"{name:>10} | {avg_tokens:>10.0f} | {shared:>16} | {shared / avg_tokens:>8.0%}")
+
+    if args.engine != 'offline':
+        if args.engine == 'vllm':
+            results = measure_vllm(layouts, args.max_model_len)
+        else:
+            results = measure_api(layouts, args.endpoint, Config.API_KEY)
+
+        print("-" * 72)
+        print(f"{'레이아웃':>10} | {'첫 요청 TTFT':>12} | {'이후 평균 TTFT':>14} | {'p50':>8}")
+        print("-" * 72)
+        for name, timings in results.items():
+            # 첫 요청은 캐시를 채우는 비용이므로 분리해서 표시
+            rest = timings[1:] or timings
+            print(f"{name:>10} | {timings[0] * 1000:>10.1f}ms | {statistics.mean(rest) * 1000:>12.1f}ms | "
+                  f"{statistics.median(rest) * 1000:>6.1f}ms")
+
+    print("=" * 72)
+
+
+if __name__ == "__main__":
+    main()
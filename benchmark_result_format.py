@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+benchmark_result_format.py - 쿼리 결과 응답 형식 벤치마크
+- QMS_RAT_YMQT_N 형태의 결과를 records / columnar / arrow(pyarrow 설치 시)로 직렬화
+- 행 수별 인코딩 시간, 응답 크기, gzip 크기 비교
+
+사용 예:
+    python benchmark_result_format.py
+    python benchmark_result_format.py --rows 1000 10000 100000 --repeat 5
+"""
+
+import argparse
+import gzip
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# 현재 디렉토리를 Python 경로에 추가
+current_dir = Path(__file__).parent
+if str(current_dir) not in sys.path:
+    sys.path.append(str(current_dir))
+
+import numpy as np
+import pandas as pd
+
+import result_format
+from result_format import records_payload, columnar_json
+
+APP_CODES = ['Mobile', 'Auto', 'PC', 'Server', 'Consumer', 'Graphics']
+
+
+def make_rating_frame(rows, seed=0):
+    """QMS_RAT_YMQT_N 컬럼 구성의 결과 DataFrame 생성"""
+    rng = np.random.default_rng(seed)
+    quarters = [f"{year}0{q}" for year in range(2020, 2026) for q in range(1, 5)]
+    base_date = datetime(2024, 12, 4)
+    revenue = rng.uniform(1e6, 5e8, rows).round(2)
+    revenue[rng.random(rows) < 0.05] = np.nan
+    return pd.DataFrame({
+        'HIQ1_APP_CD': rng.choice(APP_CODES, rows),
+        'HIQ1_CUST_CD': [f"C{n:05d}" for n in rng.integers(0, 2000, rows)],
+        'YM_QT': rng.choice(quarters, rows),
+        'REVENUE': revenue,
+        'FORECAST': rng.uniform(0, 100, rows).round(1),
+        'ACTUAL': rng.uniform(0, 100, rows).round(1),
+        'SCORE': rng.integers(0, 101, rows),
+        'FILE_GROUP_ID': [f"FG{n:08d}" for n in rng.integers(0, 10 ** 8, rows)],
+        'FILE_UPLOAD_USER': '2012853',
+        'EXPECTED_DATE': [base_date + timedelta(days=int(d)) for d in rng.integers(-365, 365, rows)],
+    })
+
+
+def encode_records(df):
+    # 기존 응답 경로: to_dict(records) 후 JSON 직렬화
+    return json.dumps({'result_data': records_payload(df)}, ensure_ascii=False, default=str).encode('utf-8')
+
+
+def encode_columnar(df):
+    return f'{{"result_data": {columnar_json(df)}}}'.encode('utf-8')
+
+
+def encode_arrow(df):
+    return result_format.arrow_bytes(df, {})
+
+
+def measure(encode, df, repeat):
+    best = float('inf')
+    body = b''
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = encode(df)
+        best = min(best, time.perf_counter() - start)
+    start = time.perf_counter()
+    compressed = gzip.compress(body, compresslevel=5)
+    gzip_ms = (time.perf_counter() - start) * 1000
+    return best * 1000, len(body), len(compressed), gzip_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description='쿼리 결과 응답 형식 벤치마크')
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 100000], help='결과 행 수 목록')
+    parser.add_argument('--repeat', type=int, default=3, help='반복 횟수 (최소 시간 사용)')
+    args = parser.parse_args()
+
+    encoders = [('records', encode_records), ('columnar', encode_columnar)]
+    if result_format.pa is not None:
+        encoders.append(('arrow', encode_arrow))
+
+    print("=" * 84)
+    print("📦 쿼리 결과 응답 형식 벤치마크 (QMS_RAT_YMQT_N 형태)")
+    if result_format.pa is None:
+        print("   pyarrow 미설치 - arrow 형식 제외")
+    print("=" * 84)
+    print(f"{'행 수':>8} | {'형식':>9} | {'인코딩':>10} | {'크기':>10} | {'gzip 크기':>10} | {'gzip 시간':>10}")
+    print("-" * 84)
+
+    for rows in args.rows:
+        df = make_rating_frame(rows)
+        for name, encode in encoders:
+            encode_ms, size, gzip_size, gzip_ms = measure(encode, df, args.repeat)
+            print(f"{rows:>8,} | {name:>9} | {encode_ms:>8.1f}ms | {size / 1024:>8.1f}KB | "
+                  f"{gzip_size / 1024:>8.1f}KB | {gzip_ms:>8.1f}ms")
+        print("-" * 84)
+
+
+if __name__ == "__main__":
+    main()
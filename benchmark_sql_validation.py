@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+benchmark_sql_validation.py - SQL 검증 벤치마크
+- metadata.json의 테이블/컬럼으로 LLM 생성 SQL 형태의 코퍼스 생성
+  (코드 블록, 주석, 여러 문장, '--' / ';' 가 들어간 문자열 리터럴, 존재하지 않는 컬럼 포함)
+- 기존 정규식 검증과 토큰 기반 검증(sql_validator)의 문장당 처리 시간,
+  리터럴 훼손 건수, 실행 전 거부 건수(DB 왕복 절약) 비교
+
+사용 예:
+    python benchmark_sql_validation.py
+    python benchmark_sql_validation.py --statements 20000 --repeat 5
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+# 현재 디렉토리를 Python 경로에 추가
+current_dir = Path(__file__).parent
+if str(current_dir) not in sys.path:
+    sys.path.append(str(current_dir))
+
+from data_catalog import freeze
+from metadata_index import MetadataIndex
+from sql_validator import validate_sql, SqlValidationError
+
+ROW_LIMIT = 1000
+FAKE_COLUMNS = ['CUSTOMER_NAME', 'SALES_AMT', 'RATING_GRADE', 'REGION_CD']
+
+
+def legacy_validate(sql_query):
+    """기존 DataManager._validate_sql_query의 정규식 검증"""
+    code_block_match = re.search(r"```(?:sql|SQL)?\s*([\s\S]*?)```", sql_query)
+    if code_block_match:
+        sql_query = code_block_match.group(1).strip()
+    if not sql_query or "SELECT" not in sql_query.upper():
+        return "SELECT * FROM QMS_RAT_YMQT_N FETCH FIRST 100 ROWS ONLY"
+    sql_query = re.sub(r"--.*?$", "", sql_query, flags=re.MULTILINE)
+    sql_query = re.sub(r"/\*[\s\S]*?\*/", "", sql_query)
+    sql_query = re.sub(r"\s+", " ", sql_query).strip()
+    if ";" in sql_query:
+        first_statement = sql_query.split(";")[0].strip()
+        if first_statement:
+            sql_query = first_statement
+    if "FETCH FIRST" not in sql_query.upper():
+        sql_query = sql_query.rstrip(';') + f" FETCH FIRST {ROW_LIMIT} ROWS ONLY"
+    return sql_query.rstrip(';')
+
+
+def token_validate(sql_query, metadata_index):
+    """토큰 기반 검증 (DataManager._validate_sql_query와 같은 코드 블록 처리)"""
+    code_block_match = re.search(r"```(?:sql|SQL)?\s*([\s\S]*?)```", sql_query)
+    if code_block_match:
+        sql_query = code_block_match.group(1).strip()
+    return validate_sql(sql_query, metadata_index=metadata_index, row_limit=ROW_LIMIT).sql
+
+
+def make_corpus(metadata_index, count, seed=0):
+    """
+    생성 SQL 코퍼스
+
+    Returns:
+    - [(SQL, 문자열 리터럴 목록, 잘못된 컬럼 포함 여부)]
+    """
+    rng = random.Random(seed)
+    tables = [table for table in metadata_index.tables.values() if table.columns]
+    corpus = []
+    for n in range(count):
+        table = rng.choice(tables)
+        columns = list(table.columns)
+        selected = rng.sample(columns, min(len(columns), rng.randint(1, 4)))
+        invalid = rng.random() < 0.1
+        if invalid:
+            selected.append(rng.choice(FAKE_COLUMNS))
+        filter_column = rng.choice(columns)
+        literal = rng.choice([f"'{n % 97}'", "'A--B'", "'x;y'", "'2024%'", "'it''s'"])
+        alias = 't'
+        select_list = ", ".join(f"{alias}.{column}" for column in selected)
+        sql = (f"SELECT {select_list}, COUNT(*) AS cnt\n"
+               f"FROM {table.name} {alias}\n"
+               f"WHERE {alias}.{filter_column} LIKE {literal}  -- 필터\n"
+               f"GROUP BY {select_list}\n"
+               f"ORDER BY cnt DESC")
+        style = rng.random()
+        if style < 0.3:
+            sql = f"```sql\n{sql};\n```"
+        elif style < 0.5:
+            sql = f"/* 생성된 쿼리 */\n{sql};\nSELECT 1 FROM DUAL;"
+        elif style < 0.7:
+            sql = f"{sql}\nFETCH FIRST {rng.randint(10, 500)} ROWS ONLY;"
+        corpus.append((sql, [literal], invalid))
+    return corpus
+
+
+def measure(validate, corpus, repeat):
+    best = float('inf')
+    outputs = []
+    for _ in range(repeat):
+        outputs = []
+        start = time.perf_counter()
+        for sql, _, _ in corpus:
+            try:
+                outputs.append(validate(sql))
+            except SqlValidationError:
+                outputs.append(None)
+        best = min(best, time.perf_counter() - start)
+    return best, outputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SQL 검증 벤치마크')
+    parser.add_argument('--statements', type=int, default=5000, help='코퍼스 문장 수')
+    parser.add_argument('--repeat', type=int, default=3, help='반복 횟수 (최소 시간 사용)')
+    parser.add_argument('--metadata', type=str, default=str(current_dir / 'metadata.json'), help='메타데이터 경로')
+    args = parser.parse_args()
+
+    with open(args.metadata, 'r', encoding='utf-8') as f:
+        metadata_index = MetadataIndex(freeze(json.load(f)))
+    corpus = make_corpus(metadata_index, args.statements)
+    invalid_total = sum(1 for _, _, invalid in corpus if invalid)
+
+    validators = [
+        ('regex', legacy_validate),
+        ('token', lambda sql: token_validate(sql, None)),
+        ('token+meta', lambda sql: token_validate(sql, metadata_index)),
+    ]
+
+    print("=" * 84)
+    print(f"🧪 SQL 검증 벤치마크 - 문장 {len(corpus):,}개 (잘못된 컬럼 포함 {invalid_total:,}개)")
+    print("=" * 84)
+    print(f"{'방식':>10} | {'전체':>9} | {'문장당':>9} | {'리터럴 훼손':>10} | {'실행 전 거부':>11} | {'잘못된 SQL 통과':>13}")
+    print("-" * 84)
+
+    for name, validate in validators:
+        elapsed, outputs = measure(validate, corpus, args.repeat)
+        mangled = sum(1 for (sql, literals, _), output in zip(corpus, outputs)
+                      if output is not None and any(literal not in output for literal in literals))
+        rejected = sum(1 for output in outputs if output is None)
+        passed_invalid = sum(1 for (_, _, invalid), output in zip(corpus, outputs) if invalid and output is not None)
+        print(f"{name:>10} | {elapsed * 1000:>7.1f}ms | {elapsed * 1e6 / len(corpus):>7.1f}µs | "
+              f"{mangled:>10,} | {rejected:>11,} | {passed_invalid:>13,}")
+    print("-" * 84)
+    print("잘못된 SQL 통과: 메타데이터에 없는 컬럼을 참조하지만 검증을 통과해 Oracle 왕복 후에야 실패하는 문장")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+chart_downsample.py - 대용량 시계열 다운샘플링
+- 라인: LTTB(Largest-Triangle-Three-Buckets)로 모양을 보존하며 포인트 축소
+- 영역/산점도: 구간별 최소/최대값을 남겨 봉우리와 골짜기 보존
+- 목표 포인트 수는 그림 가로 픽셀 수(figsize × dpi) 기준
+"""
+
+import logging
+import math
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# 차트 유형별 다운샘플링 방식
+DOWNSAMPLE_METHODS = {
+    'line': 'lttb',
+    'area': 'minmax',
+    'scatter': 'minmax',
+}
+
+METHOD_NAMES = {
+    'lttb': 'LTTB',
+    'minmax': '구간별 최소/최대',
+}
+
+
+def _to_float_array(values):
+    """None/문자열 등 숫자가 아닌 값은 NaN으로 변환"""
+    return pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').to_numpy(dtype=float)
+
+
+def lttb_indices(y, threshold):
+    """
+    LTTB로 선택한 인덱스 반환
+
+    Parameters:
+    - y: 값 배열 (X는 0..n-1 등간격으로 가정)
+    - threshold: 남길 포인트 수 (처음/마지막 포함)
+
+    Returns:
+    - 정렬된 인덱스 배열
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # 결측값은 면적 계산에서만 전체 평균으로 대체
+    if np.isnan(y).any():
+        fill = np.nanmean(y) if not np.isnan(y).all() else 0.0
+        y = np.where(np.isnan(y), fill, y)
+
+    # 처음/마지막을 제외한 구간 경계 및 구간별 평균 (다음 구간 평균을 한 번에 계산)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    sums = np.add.reduceat(y[:n - 1], edges[:-1])
+    counts = np.diff(edges)
+    bucket_avg_y = np.append(sums / counts, y[-1])
+    bucket_avg_x = np.append((edges[:-1] + edges[1:] - 1) / 2.0, n - 1)
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        avg_x, avg_y = bucket_avg_x[i + 1], bucket_avg_y[i + 1]
+        xs = np.arange(start, end)
+        # 이전 선택점, 다음 구간 평균과 이루는 삼각형 면적이 가장 큰 점 선택
+        areas = np.abs((a - avg_x) * (y[start:end] - y[a]) - (a - xs) * (avg_y - y[a]))
+        a = start + int(np.argmax(areas))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax_indices(y, n_buckets):
+    """
+    구간별 최소/최대값 인덱스 반환 (처음/마지막 포함)
+
+    Parameters:
+    - y: 값 배열
+    - n_buckets: 구간 수 (최대 2 * n_buckets + 2개 포인트)
+
+    Returns:
+    - 정렬된 인덱스 배열
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n_buckets < 1 or 2 * n_buckets + 2 >= n:
+        return np.arange(n)
+
+    size = math.ceil(n / n_buckets)
+    rows = math.ceil(n / size)
+    pad = rows * size - n
+    nan = np.isnan(y)
+    low = np.pad(np.where(nan, np.inf, y), (0, pad), constant_values=np.inf).reshape(rows, size)
+    high = np.pad(np.where(nan, -np.inf, y), (0, pad), constant_values=-np.inf).reshape(rows, size)
+    offsets = np.arange(rows) * size
+    indices = np.concatenate([[0], offsets + low.argmin(axis=1), offsets + high.argmax(axis=1), [n - 1]])
+    return np.unique(np.minimum(indices, n - 1))
+
+
+def downsample_chart_json(chart_json, max_points):
+    """
+    라인/영역/산점도 차트 데이터를 목표 포인트 수로 축소한 렌더링용 차트 JSON 생성
+
+    Parameters:
+    - chart_json: 차트 생성 JSON (변경하지 않음)
+    - max_points: 시리즈당 목표 포인트 수 (이보다 많을 때만 축소)
+
+    Returns:
+    - (렌더링용 차트 JSON, 정보 딕셔너리) - 축소하지 않으면 (chart_json, None)
+    """
+    method = DOWNSAMPLE_METHODS.get(chart_json.get("type"))
+    data = chart_json.get("data") or {}
+    labels = list(data.get("labels") or [])
+    datasets = data.get("datasets") or []
+    if method is None or not datasets:
+        return chart_json, None
+
+    lengths = {len(dataset.get("data") or []) for dataset in datasets}
+    n = max(lengths)
+    if n <= max_points:
+        return chart_json, None
+    # 라벨/시리즈 길이가 다르면 위치를 맞출 수 없으므로 그대로 렌더링
+    if len(lengths) != 1 or (labels and len(labels) != n):
+        logger.warning(f"시리즈 길이가 달라 다운샘플링을 건너뜁니다: 라벨 {len(labels)}, 시리즈 {sorted(lengths)}")
+        return chart_json, None
+
+    # 모든 시리즈가 같은 X 위치를 쓰도록 시리즈별 선택 인덱스의 합집합 사용
+    keep = []
+    for dataset in datasets:
+        y = _to_float_array(dataset.get("data"))
+        if method == 'lttb':
+            keep.append(lttb_indices(y, max_points))
+        else:
+            keep.append(minmax_indices(y, max(1, (max_points - 2) // 2)))
+
+    # 주석이 달린 라벨은 항상 유지
+    annotated = {a.get("x") for a in (chart_json.get("options") or {}).get("annotations", []) if isinstance(a, dict)}
+    if annotated and labels:
+        keep.append(np.array([i for i, label in enumerate(labels) if label in annotated], dtype=np.int64))
+    indices = np.unique(np.concatenate(keep)).tolist()
+
+    sampled_data = dict(data)
+    sampled_data["positions"] = indices
+    if labels:
+        sampled_data["labels"] = [labels[i] for i in indices]
+    sampled_data["datasets"] = []
+    for dataset in datasets:
+        values = dataset.get("data")
+        sampled_data["datasets"].append({**dataset, "data": [values[i] for i in indices]})
+
+    render_json = dict(chart_json)
+    render_json["data"] = sampled_data
+    info = {'method': method, 'original_points': n, 'rendered_points': len(indices)}
+    return render_json, info
+
+
+def downsample_note(info):
+    """차트 설명에 덧붙일 다운샘플링 안내 문구"""
+    return (f"(데이터 {info['original_points']:,}개 중 {info['rendered_points']:,}개 포인트를 "
+            f"{METHOD_NAMES[info['method']]} 방식으로 추려 표시했습니다.)")
@@ -2,21 +2,39 @@
 chart_generator.py - 차트 생성 모듈
 - JSON 기반 차트 생성
 - 다양한 차트 유형 지원
+- pyplot 전역 상태 없이 Figure/Axes 객체로 렌더링 (여러 스레드에서 동시 생성 가능)
+- 차트당 한 번만 래스터화하여 파일과 Base64에 같은 PNG 사용
+- 같은 차트 JSON + 데이터는 렌더링 캐시에서 재사용
+- 설정 시 작업자 프로세스 풀에서 렌더링 (render_pool)
+- 라인/영역/산점도의 대용량 시리즈는 가로 픽셀 수 기준으로 다운샘플링 후 렌더링
+- 클라이언트 렌더링 모드용 차트 명세 정규화 (서버 래스터화 생략)
 """
 import matplotlib
 matplotlib.use('Agg')
 import os
 import json
 import time
-import matplotlib.pyplot as plt
+import uuid
+import threading
+from decimal import Decimal
+from concurrent.futures import ThreadPoolExecutor
+import matplotlib.style as mstyle
 import matplotlib.font_manager as fm
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 import base64
 import io
 import logging
 import numpy as np
 import pandas as pd
+from PIL import Image
 from typing import Dict, List, Any, Tuple
 
+from config import Config
+from render_cache import get_render_cache, make_render_key
+from render_pool import get_render_pool
+from chart_downsample import downsample_chart_json, downsample_note
+
 logger = logging.getLogger(__name__)
 
 # 한글 폰트 설정 시도
@@ -39,7 +57,7 @@ def setup_korean_font():
     
     if font_path:
         font_prop = fm.FontProperties(fname=font_path)
-        plt.rcParams['font.family'] = font_prop.get_name()
+        matplotlib.rcParams['font.family'] = font_prop.get_name()
         logger.info(f"한글 폰트 설정 완료: {font_path}")
         return font_prop
     else:
@@ -49,20 +67,96 @@ def setup_korean_font():
 # 폰트 초기화
 font_prop = setup_korean_font()
 
+
+class _StyleLock:
+    """
+    차트 스타일 적용용 읽기/쓰기 잠금
+    - matplotlib 스타일은 전역 rcParams를 바꾸므로 스타일 차트는 단독으로 렌더링
+    - 기본 스타일 차트끼리는 동시에 렌더링
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writer = False
+
+    def acquire_shared(self):
+        with self._condition:
+            self._condition.wait_for(lambda: not self._writer)
+            self._readers += 1
+
+    def release_shared(self):
+        with self._condition:
+            self._readers -= 1
+            if self._readers == 0:
+                self._condition.notify_all()
+
+    def acquire_exclusive(self):
+        with self._condition:
+            self._condition.wait_for(lambda: not self._writer)
+            self._writer = True
+            self._condition.wait_for(lambda: self._readers == 0)
+
+    def release_exclusive(self):
+        with self._condition:
+            self._writer = False
+            self._condition.notify_all()
+
+
+_style_lock = _StyleLock()
+
+# 다운샘플링된 차트의 최대 X축 눈금 수
+MAX_SAMPLED_XTICKS = 20
+
+# 차트 파일 쓰기 전용 스레드 (요청 스레드는 Base64 응답만 기다림)
+_file_writer = ThreadPoolExecutor(max_workers=Config.CHART_WRITER_THREADS, thread_name_prefix="chart-writer")
+
+
+def _write_file(path, data):
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def _json_safe(value):
+    """numpy 값/range 등을 JSON 직렬화 가능한 값으로 변환 (NaN/무한대는 None)"""
+    if isinstance(value, dict):
+        return {str(key): _json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, range, np.ndarray, pd.Series, pd.Index)):
+        return [_json_safe(item) for item in value]
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, (float, np.floating, Decimal)):
+        value = float(value)
+        return value if np.isfinite(value) else None
+    if isinstance(value, (pd.Timestamp, np.datetime64)):
+        return str(pd.Timestamp(value))
+    if value is None or isinstance(value, str):
+        return value
+    if pd.isna(value):
+        return None
+    return str(value)
+
 class ChartGenerator:
     def __init__(self, output_dir="./chart_outputs", llm_manager=None):
         """
         차트 생성기 초기화
         
         Parameters:
-        - output_dir: 차트 이미지 저장 디렉토리
+        - output_dir: 차트 이미지 저장 디렉토리 (None이면 렌더링만 사용)
         - llm_manager: LLM 매니저 인스턴스 (선택적)
         """
         self.output_dir = output_dir
         self.llm_manager = llm_manager
+
+        # 백그라운드 쓰기 중인 차트 파일 (경로 → Future)
+        self._pending_writes = {}
+        self._pending_writes_lock = threading.Lock()
         
         # 출력 디렉토리 생성
-        os.makedirs(output_dir, exist_ok=True)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
         
         # 차트 유형별 생성 함수 매핑
         self.chart_functions = {
@@ -77,7 +171,7 @@ class ChartGenerator:
         
         logger.info("차트 생성기 초기화 완료")
     
-    def generate_chart_json(self, query, metadata, result_df):
+    def generate_chart_json(self, query, metadata, result_df, regenerate=False):
         """
         차트 생성 JSON 생성
         
@@ -85,6 +179,7 @@ class ChartGenerator:
         - query: 사용자 쿼리
         - metadata: 메타데이터
         - result_df: 쿼리 실행 결과 DataFrame
+        - regenerate: True면 LLM 응답 캐시를 건너뛰고 새로 생성
         
         Returns:
         - chart_json: 차트 생성 JSON
@@ -100,7 +195,7 @@ class ChartGenerator:
         result_data_str = result_df.to_string()
         
         # LLM으로 차트 JSON 생성
-        chart_json = self.llm_manager.generate_chart_json(query, metadata, result_data_str)
+        chart_json = self.llm_manager.generate_chart_json(query, metadata, result_data_str, regenerate=regenerate)
         
         # JSON 검증 및 수정
         chart_json = self._validate_chart_json(chart_json, result_df)
@@ -202,70 +297,222 @@ class ChartGenerator:
         
         return chart_json
     
-    def create_chart(self, chart_json, result_df):
+    def create_chart(self, chart_json, result_df, timings=None):
         """
         차트 생성 및 저장
         
         Parameters:
         - chart_json: 차트 생성 JSON
         - result_df: 쿼리 실행 결과 DataFrame
+        - timings: dict를 넘기면 단계별 소요 시간(초)을 기록 (downsample, cache_lookup, layout, rasterize, encode,
+          write, 프로세스 풀 사용 시 queue_wait, ipc 추가)
         
         Returns:
         - chart_path: 생성된 차트 이미지 경로
         - chart_base64: Base64 인코딩된 차트 이미지
         """
         logger.info(f"차트 생성 시작: {chart_json.get('type', '알 수 없음')} 차트")
-        
-        # 차트 유형 확인
+        timings = {} if timings is None else timings
         chart_type = chart_json.get("type", "bar")
-        
-        # 그림 크기 설정
+
+        # 보이지 않는 포인트까지 그리지 않도록 가로 픽셀 수 기준으로 축소한 복사본을 렌더링
+        render_json = chart_json
+        if Config.CHART_DOWNSAMPLE_ENABLED:
+            start = time.perf_counter()
+            render_json = self._downsample_for_render(chart_json, result_df)
+            timings['downsample'] = time.perf_counter() - start
+
+        # 같은 차트 JSON + 같은 데이터면 렌더링 결과 재사용
+        cache = get_render_cache()
+        cache_key = None
+        if cache is not None:
+            start = time.perf_counter()
+            cache_key = make_render_key(render_json, result_df, Config.CHART_DPI)
+            cached = cache.get(cache_key)
+            timings['cache_lookup'] = time.perf_counter() - start
+            if cached is not None:
+                png_bytes, img_base64 = cached
+                chart_path = self._save_chart_file(chart_type, png_bytes, timings)
+                logger.info(f"차트 렌더링 캐시 적중: {chart_path}")
+                return chart_path, img_base64
+
+        pool = get_render_pool()
+        if pool is not None:
+            png_bytes = pool.render(render_json, result_df, timings)
+        else:
+            png_bytes = self._render_png(render_json, result_df, timings)
+
+        start = time.perf_counter()
+        img_base64 = base64.b64encode(png_bytes).decode("utf-8")
+        timings['encode'] = timings.get('encode', 0.0) + time.perf_counter() - start
+
+        if cache_key is not None:
+            cache.set(cache_key, png_bytes, img_base64)
+
+        chart_path = self._save_chart_file(chart_type, png_bytes, timings)
+        logger.info(f"차트 생성 완료: {chart_path} - "
+                    + ", ".join(f"{name} {seconds * 1000:.1f}ms" for name, seconds in timings.items()))
+        return chart_path, img_base64
+
+    def prepare_client_spec(self, chart_json, result_df):
+        """
+        브라우저 렌더링용 차트 명세 생성 (래스터화 없음)
+
+        Parameters:
+        - chart_json: 검증된 차트 JSON (JSON 직렬화 가능한 값으로 정규화됨)
+        - result_df: 쿼리 실행 결과 DataFrame
+
+        Returns:
+        - chart_spec: 렌더링용 차트 명세 (대용량 시리즈는 다운샘플링, data.positions에 원래 위치)
+        """
+        normalized = _json_safe(chart_json)
+        chart_json.clear()
+        chart_json.update(normalized)
+
+        chart_spec = chart_json
+        if Config.CHART_DOWNSAMPLE_ENABLED:
+            chart_spec = self._downsample_for_render(chart_json, result_df)
+        logger.info(f"클라이언트 렌더링용 차트 명세 생성: {chart_json.get('type', '알 수 없음')} 차트")
+        return chart_spec
+
+    def _downsample_for_render(self, chart_json, result_df):
+        """
+        목표 포인트 수를 넘는 시리즈를 축소한 렌더링용 차트 JSON 반환
+        축소한 경우 원본 차트 JSON의 설명에 안내 문구 추가
+        """
         figsize = chart_json.get("figsize", (12, 6))
-        plt.figure(figsize=figsize)
-        
-        # 차트 스타일 설정
+        max_points = int(figsize[0] * Config.CHART_DPI * Config.CHART_DOWNSAMPLE_POINTS_PER_PIXEL)
+        render_json, info = downsample_chart_json(chart_json, max_points)
+        if info is None:
+            return chart_json
+
+        note = downsample_note(info)
+        description = chart_json.get("description") or self.generate_description(chart_json, result_df)
+        if note not in description:
+            chart_json["description"] = f"{description} {note}"
+            render_json["description"] = chart_json["description"]
+        logger.info(f"차트 다운샘플링: {info['original_points']} → {info['rendered_points']} 포인트 ({info['method']})")
+        return render_json
+
+    def _render_png(self, chart_json, result_df, timings):
+        """현재 프로세스에서 차트 렌더링 후 PNG 바이트 반환 (차트 스타일 적용 포함)"""
+        # 차트 스타일은 전역 rcParams를 바꾸므로 해당 차트 렌더링 동안만 단독 적용
         chart_style = chart_json.get("style", "default")
-        if chart_style != "default" and chart_style in plt.style.available:
-            plt.style.use(chart_style)
-        
+        styled = chart_style != "default" and chart_style in mstyle.available
+        if styled:
+            _style_lock.acquire_exclusive()
+        else:
+            _style_lock.acquire_shared()
+        try:
+            if styled:
+                with mstyle.context(chart_style):
+                    return self._render_chart(chart_json, result_df, timings)
+            return self._render_chart(chart_json, result_df, timings)
+        finally:
+            if styled:
+                _style_lock.release_exclusive()
+            else:
+                _style_lock.release_shared()
+
+    def _render_chart(self, chart_json, result_df, timings):
+        """
+        Figure 객체에 차트를 그린 뒤 한 번만 래스터화하여 PNG 생성
+
+        Returns:
+        - PNG 바이트
+        """
+        # 차트 유형 확인
+        chart_type = chart_json.get("type", "bar")
+
+        # 그림 크기 설정 (pyplot 없이 요청별 Figure 생성)
+        figsize = chart_json.get("figsize", (12, 6))
+        fig = Figure(figsize=figsize, dpi=Config.CHART_DPI)
+        canvas = FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+
         # 차트 생성 함수 호출
         if chart_type in self.chart_functions:
-            self.chart_functions[chart_type](chart_json, result_df)
+            self.chart_functions[chart_type](ax, chart_json, result_df)
         else:
             logger.warning(f"지원하지 않는 차트 유형: {chart_type}, 기본 바차트로 대체합니다.")
-            self._create_bar_chart(chart_json, result_df)
-        
+            self._create_bar_chart(ax, chart_json, result_df)
+
         # 제목 설정
         title = chart_json.get("title", "")
         if title:
             if font_prop:
-                plt.title(title, fontproperties=font_prop, fontsize=16, pad=20)
+                ax.set_title(title, fontproperties=font_prop, fontsize=16, pad=20)
             else:
-                plt.title(title, fontsize=16, pad=20)
-        
+                ax.set_title(title, fontsize=16, pad=20)
+
         # 레이아웃 조정
-        plt.tight_layout()
-        
-        # 차트 저장
+        start = time.perf_counter()
+        fig.tight_layout()
+        timings['layout'] = time.perf_counter() - start
+
+        # 래스터화 (한 번만 그림)
+        start = time.perf_counter()
+        canvas.draw()
+        timings['rasterize'] = time.perf_counter() - start
+
+        # bbox_inches="tight"와 같은 영역을 그려진 버퍼에서 잘라 PNG 인코딩
+        start = time.perf_counter()
+        png_bytes = self._encode_tight_png(fig, canvas)
+        timings['encode'] = time.perf_counter() - start
+
+        return png_bytes
+
+    def _save_chart_file(self, chart_type, png_bytes, timings):
+        """차트 PNG 파일 저장 (설정에 따라 백그라운드 쓰기) 후 경로 반환"""
+        # 같은 초에 생성된 차트끼리 파일명이 겹치지 않도록 고유 접미사 추가
         timestamp = int(time.time())
-        chart_filename = f"{chart_type}_{timestamp}.png"
+        chart_filename = f"{chart_type}_{timestamp}_{uuid.uuid4().hex[:8]}.png"
         chart_path = os.path.join(self.output_dir, chart_filename)
-        plt.savefig(chart_path, dpi=100, bbox_inches="tight")
-        
-        # 이미지를 Base64로 인코딩
-        img_bytesio = io.BytesIO()
-        plt.savefig(img_bytesio, format="png", dpi=100, bbox_inches="tight")
-        img_bytesio.seek(0)
-        img_bytes = img_bytesio.getvalue()
-        img_base64 = base64.b64encode(img_bytes).decode("utf-8")
-        
-        # 차트 리소스 정리
-        plt.close()
-        
-        logger.info(f"차트 생성 완료: {chart_path}")
-        return chart_path, img_base64
-    
-    def _create_bar_chart(self, chart_json, df):
+        start = time.perf_counter()
+        if Config.CHART_DEFERRED_WRITE:
+            future = _file_writer.submit(_write_file, chart_path, png_bytes)
+            with self._pending_writes_lock:
+                self._pending_writes[chart_path] = future
+            future.add_done_callback(lambda _: self._forget_write(chart_path))
+        else:
+            _write_file(chart_path, png_bytes)
+        timings['write'] = time.perf_counter() - start
+        return chart_path
+
+    @staticmethod
+    def _encode_tight_png(fig, canvas):
+        """그려진 RGBA 버퍼에서 tight bbox(+여백) 영역만 잘라 PNG로 인코딩"""
+        renderer = canvas.get_renderer()
+        pad = matplotlib.rcParams['savefig.pad_inches']
+        bbox = fig.get_tightbbox(renderer).padded(pad)
+
+        buffer = np.asarray(canvas.buffer_rgba())
+        height, width = buffer.shape[:2]
+        dpi = fig.dpi
+        # bbox는 인치 단위, 원점이 왼쪽 아래이므로 픽셀 행은 위아래를 뒤집어 계산
+        x0 = max(0, int(np.floor(bbox.x0 * dpi)))
+        x1 = min(width, int(np.ceil(bbox.x1 * dpi)))
+        y0 = max(0, int(np.floor(height - bbox.y1 * dpi)))
+        y1 = min(height, int(np.ceil(height - bbox.y0 * dpi)))
+
+        output = io.BytesIO()
+        Image.fromarray(buffer[y0:y1, x0:x1]).save(output, format="png")
+        return output.getvalue()
+
+    def _forget_write(self, chart_path):
+        with self._pending_writes_lock:
+            future = self._pending_writes.pop(chart_path, None)
+        if future is not None and future.exception() is not None:
+            logger.error(f"차트 파일 저장 실패: {chart_path} - {future.exception()}")
+
+    def wait_for_file(self, chart_path, timeout=None):
+        """백그라운드 쓰기 중인 차트 파일이 디스크에 기록될 때까지 대기"""
+        with self._pending_writes_lock:
+            future = self._pending_writes.get(chart_path)
+        if future is not None:
+            future.result(timeout=timeout)
+
+    def _create_bar_chart(self, ax, chart_json, df):
         """바차트 생성"""
         data = chart_json.get("data", {})
         labels = data.get("labels", [])
@@ -286,42 +533,47 @@ class ChartGenerator:
             bar_positions = [pos + (i - len(datasets)/2 + 0.5) * bar_width for pos in x]
             
             # 바 생성
-            plt.bar(bar_positions, bar_data, width=bar_width, label=bar_label)
+            ax.bar(bar_positions, bar_data, width=bar_width, label=bar_label)
         
         # X축 레이블 설정
         if labels:
-            plt.xticks(x, labels, rotation=45 if len(labels) > 5 else 0)
+            ax.set_xticks(x)
+            ax.set_xticklabels(labels, rotation=45 if len(labels) > 5 else 0)
         
-        plt.legend()
-        plt.grid(axis="y", linestyle="--", alpha=0.7)
+        ax.legend()
+        ax.grid(axis="y", linestyle="--", alpha=0.7)
     
-    def _create_line_chart(self, chart_json, df):
+    def _create_line_chart(self, ax, chart_json, df):
         """라인차트 생성"""
         data = chart_json.get("data", {})
         labels = data.get("labels", [])
         datasets = data.get("datasets", [])
+        positions = data.get("positions")
         
-        # X축 범위 계산
-        x = range(len(labels))
+        # X축 범위 계산 (다운샘플링된 경우 원래 위치)
+        x = positions if positions is not None else range(len(labels))
         
         # 각 데이터셋에 대해 라인 생성
         for i, dataset in enumerate(datasets):
             line_data = dataset.get("data", [])
             line_label = dataset.get("label", f"데이터 {i+1}")
             
-            # 라인 속성
-            marker = "o"
+            # 라인 속성 (포인트가 많으면 마커 생략)
+            marker = "o" if positions is None else None
             linestyle = "-"
             
             # 라인 생성
-            plt.plot(x, line_data, marker=marker, linestyle=linestyle, label=line_label)
+            ax.plot(x, line_data, marker=marker, linestyle=linestyle, label=line_label)
         
         # X축 레이블 설정
-        if labels:
-            plt.xticks(x, labels, rotation=45 if len(labels) > 5 else 0)
+        if positions is not None:
+            self._set_sampled_xticks(ax, positions, labels)
+        elif labels:
+            ax.set_xticks(x)
+            ax.set_xticklabels(labels, rotation=45 if len(labels) > 5 else 0)
         
-        plt.legend()
-        plt.grid(axis="y", linestyle="--", alpha=0.7)
+        ax.legend()
+        ax.grid(axis="y", linestyle="--", alpha=0.7)
         
         # 1. Y축 범위 설정 (options.scales.y)
         options = chart_json.get("options", {})
@@ -331,7 +583,7 @@ class ChartGenerator:
             min_y = y_scales.get("min")
             max_y = y_scales.get("max")
             if min_y is not None and max_y is not None:
-                plt.ylim(min_y, max_y)
+                ax.set_ylim(min_y, max_y)
         
         # 2. 추세선 추가 (options.trendLines)
         trend_lines = options.get("trendLines", [])
@@ -344,7 +596,7 @@ class ChartGenerator:
             if len(x) > 1 and len(line_data) > 1:
                 slope = (line_data[-1] - line_data[0]) / (x[-1] - x[0])
                 trend_line = [line_data[0] + slope * xi for xi in x]
-                plt.plot(x, trend_line, color=color, linestyle="--", label=label)
+                ax.plot(x, trend_line, color=color, linestyle="--", label=label)
         
         # 3. 주석 추가 (options.annotations)
         annotations = options.get("annotations", [])
@@ -354,9 +606,9 @@ class ChartGenerator:
             content = annotation.get("content", "")
             if x_val in labels:
                 x_index = labels.index(x_val)
-                plt.annotate(
+                ax.annotate(
                     content,
-                    (x_index, y_val),
+                    (x[x_index], y_val),
                     textcoords="offset points",
                     xytext=(0, 10),
                     ha='center',
@@ -365,7 +617,7 @@ class ChartGenerator:
                     bbox=dict(boxstyle="round,pad=0.3", edgecolor="gray", facecolor="white")
                 )
     
-    def _create_pie_chart(self, chart_json, df):
+    def _create_pie_chart(self, ax, chart_json, df):
         """파이차트 생성"""
         data = chart_json.get("data", {})
         labels = data.get("labels", [])
@@ -394,45 +646,50 @@ class ChartGenerator:
             
             # 파이차트 생성
             if pie_data:  # pie_data가 비어 있지 않은지 확인
-                plt.pie(pie_data, labels=labels, autopct="%1.1f%%", startangle=90)
-                plt.axis("equal")
+                ax.pie(pie_data, labels=labels, autopct="%1.1f%%", startangle=90)
+                ax.axis("equal")
             else:
-                plt.text(0.5, 0.5, "데이터가 없습니다.", ha="center", va="center")
+                ax.text(0.5, 0.5, "데이터가 없습니다.", ha="center", va="center")
         else:
-            plt.text(0.5, 0.5, "데이터가 없습니다.", ha="center", va="center")
+            ax.text(0.5, 0.5, "데이터가 없습니다.", ha="center", va="center")
     
-    def _create_scatter_chart(self, chart_json, df):
+    def _create_scatter_chart(self, ax, chart_json, df):
         """산점도 생성"""
         data = chart_json.get("data", {})
         labels = data.get("labels", [])
         datasets = data.get("datasets", [])
+        positions = data.get("positions")
         
         # 각 데이터셋에 대해 산점도 생성
         for i, dataset in enumerate(datasets):
             scatter_data = dataset.get("data", [])
             scatter_label = dataset.get("label", f"데이터 {i+1}")
             
-            # X 좌표 (인덱스 또는 라벨 인덱스)
-            x = range(len(scatter_data))
+            # X 좌표 (인덱스 또는 라벨 인덱스, 다운샘플링된 경우 원래 위치)
+            x = positions if positions is not None else range(len(scatter_data))
             
             # 산점도 생성
-            plt.scatter(x, scatter_data, label=scatter_label, alpha=0.7)
+            ax.scatter(x, scatter_data, label=scatter_label, alpha=0.7)
         
         # X축 레이블 설정
-        if labels:
-            plt.xticks(range(len(labels)), labels, rotation=45 if len(labels) > 5 else 0)
-        
-        plt.legend()
-        plt.grid(True, linestyle="--", alpha=0.7)
+        if positions is not None:
+            self._set_sampled_xticks(ax, positions, labels)
+        elif labels:
+            ax.set_xticks(range(len(labels)))
+            ax.set_xticklabels(labels, rotation=45 if len(labels) > 5 else 0)
+        
+        ax.legend()
+        ax.grid(True, linestyle="--", alpha=0.7)
     
-    def _create_area_chart(self, chart_json, df):
+    def _create_area_chart(self, ax, chart_json, df):
         """영역 차트 생성"""
         data = chart_json.get("data", {})
         labels = data.get("labels", [])
         datasets = data.get("datasets", [])
+        positions = data.get("positions")
         
-        # X축 범위 계산
-        x = range(len(labels))
+        # X축 범위 계산 (다운샘플링된 경우 원래 위치)
+        x = positions if positions is not None else range(len(labels))
         
         # 각 데이터셋에 대해 영역 차트 생성
         for i, dataset in enumerate(datasets):
@@ -440,17 +697,29 @@ class ChartGenerator:
             area_label = dataset.get("label", f"데이터 {i+1}")
             
             # 영역 차트 생성
-            plt.fill_between(x, area_data, alpha=0.3)
-            plt.plot(x, area_data, label=area_label)
+            ax.fill_between(x, area_data, alpha=0.3)
+            ax.plot(x, area_data, label=area_label)
         
         # X축 레이블 설정
-        if labels:
-            plt.xticks(x, labels, rotation=45 if len(labels) > 5 else 0)
-        
-        plt.legend()
-        plt.grid(axis="y", linestyle="--", alpha=0.7)
+        if positions is not None:
+            self._set_sampled_xticks(ax, positions, labels)
+        elif labels:
+            ax.set_xticks(x)
+            ax.set_xticklabels(labels, rotation=45 if len(labels) > 5 else 0)
+        
+        ax.legend()
+        ax.grid(axis="y", linestyle="--", alpha=0.7)
     
-    def _create_histogram_chart(self, chart_json, df):
+    @staticmethod
+    def _set_sampled_xticks(ax, positions, labels):
+        """다운샘플링된 차트의 X축 눈금 (원래 위치 기준으로 최대 MAX_SAMPLED_XTICKS개)"""
+        if not labels:
+            return
+        step = max(1, -(-len(labels) // MAX_SAMPLED_XTICKS))
+        ax.set_xticks(positions[::step])
+        ax.set_xticklabels(labels[::step], rotation=45)
+
+    def _create_histogram_chart(self, ax, chart_json, df):
         """히스토그램 생성"""
         data = chart_json.get("data", {})
         datasets = data.get("datasets", [])
@@ -461,12 +730,12 @@ class ChartGenerator:
             hist_label = datasets[0].get("label", "데이터")
             
             # 히스토그램 생성
-            plt.hist(hist_data, bins=10, alpha=0.7, label=hist_label)
+            ax.hist(hist_data, bins=10, alpha=0.7, label=hist_label)
         
-        plt.legend()
-        plt.grid(axis="y", linestyle="--", alpha=0.7)
+        ax.legend()
+        ax.grid(axis="y", linestyle="--", alpha=0.7)
     
-    def _create_stacked_bar_chart(self, chart_json, df):
+    def _create_stacked_bar_chart(self, ax, chart_json, df):
         """누적 바차트 생성"""
         data = chart_json.get("data", {})
         labels = data.get("labels", [])
@@ -484,17 +753,18 @@ class ChartGenerator:
             bar_label = dataset.get("label", f"데이터 {i+1}")
             
             # 누적 바 생성
-            plt.bar(x, bar_data, bottom=bottom, label=bar_label)
+            ax.bar(x, bar_data, bottom=bottom, label=bar_label)
             
             # 다음 층을 위한 바닥 업데이트
             bottom += np.array(bar_data)
         
         # X축 레이블 설정
         if labels:
-            plt.xticks(x, labels, rotation=45 if len(labels) > 5 else 0)
+            ax.set_xticks(x)
+            ax.set_xticklabels(labels, rotation=45 if len(labels) > 5 else 0)
         
-        plt.legend()
-        plt.grid(axis="y", linestyle="--", alpha=0.7)
+        ax.legend()
+        ax.grid(axis="y", linestyle="--", alpha=0.7)
     
     def generate_description(self, chart_json, result_df):
         """
@@ -30,6 +30,12 @@ class Config:
     VLLM_TENSOR_PARALLEL_SIZE = 2
     VLLM_GPU_MEMORY_UTILIZATION = 0.85
     VLLM_MAX_MODEL_LEN = 16384
+    VLLM_ENABLE_PREFIX_CACHING = True   # 공통 프롬프트 접두부의 KV 캐시 재사용
+
+    # VLLM 연속 배칭 설정
+    VLLM_ENABLE_BATCHING = True
+    VLLM_MAX_BATCH_SIZE = 32         # 엔진에서 동시에 처리할 최대 요청 수
+    VLLM_BATCH_MAX_WAIT_MS = 10      # 유휴 상태에서 배치를 모으는 최대 대기 시간(ms)
     
     # API 모드 설정 (Gemini)
     # API_KEY = os.environ.get("GEMINI_API_KEY", "")
@@ -40,7 +46,107 @@ class Config:
     API_MODEL = "Qwen3-32B"  # 모델
     # API_ENDPOINT = f"http://dev.assistant.llm.skhynix.com/v1/chat/completions"
     API_ENDPOINT = f"http://localhost:8000/v1/chat/completions"
+
+    # API HTTP 클라이언트 설정 (사용자 앱 전체가 하나의 커넥션 풀 공유)
+    API_POOL_MAXSIZE = 16            # 최대 동시 커넥션 수
+    API_CONNECT_TIMEOUT = 3.0        # 연결 타임아웃(초)
+    API_READ_TIMEOUT = 120.0         # 응답 읽기 타임아웃(초)
+    API_MAX_RETRIES = 3              # 429/5xx 재시도 횟수
+    API_RETRY_BACKOFF_BASE = 0.5     # 재시도 백오프 기본 대기(초)
     
+    # LLM 응답 캐시 설정
+    LLM_CACHE_ENABLED = True
+    LLM_CACHE_MEMORY_ENTRIES = 256                      # 메모리 LRU 최대 항목 수
+    LLM_CACHE_DB_PATH = "./cache/llm_responses.sqlite3"  # 디스크 캐시 (None이면 메모리만 사용)
+    LLM_CACHE_TTL_SECONDS = 7 * 24 * 3600               # 항목 만료 시간(초)
+    LLM_CACHE_MAX_DISK_MB = 200                         # 디스크 캐시 최대 크기(MB)
+
+    # 프롬프트 스키마 컨텍스트 설정
+    PROMPT_SCHEMA_TOKEN_BUDGET = 600    # 프롬프트에 넣을 스키마의 최대 추정 토큰 수
+    # "stable": 전체 압축 스키마를 고정 접두부에 포함 (접두부 KV 캐시 재사용에 유리)
+    # "relevant": 질문과 관련된 스키마만 예산 내로 포함 (프롬프트 길이 최소화)
+    PROMPT_SCHEMA_MODE = "stable"
+
+    # 비동기 작업 큐 설정
+    JOB_BACKEND = "inprocess"        # 작업 큐 백엔드 (job_queue.JOB_BACKENDS)
+    JOB_MAX_WORKERS = 4              # 작업자 스레드 수
+    JOB_MAX_QUEUE_DEPTH = 64         # 최대 대기 작업 수 (초과 시 429)
+    JOB_MAX_RUNNING_PER_USER = 2     # 사용자별 최대 동시 실행 작업 수
+    JOB_RESULT_TTL_SECONDS = 600     # 완료된 작업 결과 보관 시간(초)
+
+    # 차트 렌더링 설정
+    CHART_DPI = 100
+    CHART_DEFERRED_WRITE = True      # 차트 파일 쓰기를 백그라운드 스레드에서 처리
+    CHART_WRITER_THREADS = 2         # 차트 파일 쓰기 스레드 수
+    CHART_RENDER_BACKEND = "inprocess"        # inprocess: 요청 스레드에서 렌더링, process: 작업자 프로세스 풀
+    CHART_RENDER_PROCESSES = 4                # 렌더링 작업자 프로세스 수
+    CHART_RENDER_MAX_PER_WORKER = 200         # 작업자 교체 전 최대 렌더링 횟수 (matplotlib 메모리 증가 억제)
+    CHART_RENDER_TIMEOUT = 30                 # 차트 1개 렌더링 제한 시간(초), 초과 시 작업자 강제 종료
+    CHART_RENDER_START_METHOD = "forkserver"  # 작업자 시작 방식 (미지원 환경에서는 spawn)
+    CHART_DOWNSAMPLE_ENABLED = True           # 라인/영역/산점도 대용량 시리즈 다운샘플링
+    CHART_DOWNSAMPLE_POINTS_PER_PIXEL = 1.0   # 시리즈당 목표 포인트 수 = 가로 픽셀 수 × 이 값 (초과 시 적용)
+    CHART_DEFAULT_RENDER_MODE = "server"      # render_mode 미지정 요청의 기본값 (server: PNG, client: 브라우저 렌더링)
+
+    # 차트 렌더링 캐시 설정
+    CHART_CACHE_ENABLED = True
+    CHART_CACHE_MEMORY_MB = 64                  # 메모리 캐시 최대 크기(MB, PNG + Base64)
+    CHART_CACHE_DIR = "./cache/charts"          # 디스크 캐시 디렉토리 (None이면 메모리만 사용)
+    CHART_CACHE_MAX_DISK_MB = 256               # 디스크 캐시 최대 크기(MB)
+
+    # 데이터 카탈로그 설정 (CSV/metadata.json을 프로세스당 한 번 로드해 사용자 간 공유)
+    DATA_CATALOG_CHECK_SECONDS = 2.0       # 파일 변경(수정 시각/크기) 확인 최소 간격(초)
+
+    # 사용자별 앱 보관 설정 (초과/유휴 앱은 정리 후 제거, 다음 요청 시 다시 생성)
+    USER_APP_MAX_APPS = 50                 # 최대 사용자 앱 수 (초과 시 가장 오래 사용되지 않은 앱 제거)
+    USER_APP_IDLE_TTL_SECONDS = 3600       # 마지막 사용 후 보관 시간(초)
+
+    # 쿼리 결과 서버 보관 설정 (결과 핸들)
+    RESULT_STORE_TTL_SECONDS = 1800        # 마지막 사용 후 보관 시간(초)
+    RESULT_STORE_MAX_MB_PER_USER = 256     # 사용자별 최대 메모리(MB)
+    RESULT_STORE_MAX_TOTAL_MB = 2048       # 전체 최대 메모리(MB)
+
+    # 쿼리 결과 응답 형식 설정
+    RESULT_DEFAULT_FORMAT = "records"      # records | columnar | arrow (요청의 result_format/Accept 헤더가 우선)
+    RESULT_GZIP_MIN_BYTES = 8192           # 이 크기 이상 결과 응답은 gzip 압축 (0이면 압축 안 함)
+    RESULT_GZIP_LEVEL = 5                  # gzip 압축 수준 (1~9)
+
+    # Oracle 접속 설정
+    ORACLE_CLIENT_LIB_DIR = os.environ.get("ORACLE_CLIENT_LIB_DIR", "/home/humandeep/oracle/instantclient_21_8")
+    ORACLE_USER = os.environ.get("ORACLE_USER", "system")
+    ORACLE_PASSWORD = os.environ.get("ORACLE_PASSWORD", "Test123")
+    ORACLE_DSN = os.environ.get("ORACLE_DSN", "localhost:1521/XE")
+
+    # Oracle 커넥션 풀 설정 (프로세스 전체에서 하나의 풀 공유)
+    DB_POOL_SIZE = 5                       # 유지하는 연결 수
+    DB_POOL_MAX_OVERFLOW = 5               # 바쁠 때 추가로 여는 최대 연결 수
+    DB_POOL_TIMEOUT = 10                   # 연결 대기 제한 시간(초), 초과 시 DatabaseBusyError
+    DB_POOL_RECYCLE = 1800                 # 연결 재사용 최대 시간(초)
+    DB_POOL_PRE_PING = True                # 대여 전 연결 확인 (끊어진 연결 자동 교체)
+
+    # SQL 조회 설정 (Oracle 드라이버 fetch 조정)
+    SQL_FETCH_ARRAYSIZE = 1000             # fetch 왕복 1회에 받는 행 수
+    SQL_FETCH_PREFETCH_ROWS = 1000         # 실행 왕복에 함께 받는 행 수
+    SQL_FETCH_CHUNK_ROWS = 10000           # 스트리밍 조회 시 DataFrame 청크당 행 수
+    SQL_PREVIEW_ROWS = 50                  # 스트리밍 SQL 수정 시 먼저 보내는 미리보기 행 수
+    SQL_VALIDATE_IDENTIFIERS = True        # 생성된 SQL의 테이블/컬럼을 메타데이터로 확인 (없으면 실행 전 거부)
+
+    # SQL 결과 캐시 설정 (정규화된 SQL 기준, 사용자 간 공유)
+    SQL_CACHE_ENABLED = True
+    SQL_CACHE_MAX_MB = 256                 # 최대 메모리(MB)
+    SQL_CACHE_DEFAULT_TTL = 300            # 테이블별 TTL이 없을 때 만료 시간(초)
+    SQL_CACHE_TABLE_TTL = {                # 테이블별 만료 시간(초), 여러 테이블 참조 시 가장 짧은 값
+        'QMS_RAT_YMQT_N': 3600,            # 분기별 Rating (분기 마감 시 적재)
+        'QMS_GBW_VIEW': 1800,
+        'QMS_RAT_CUST': 3600,
+        'HCOB_CAL': 86400,                 # 달력/공통코드는 거의 변경 없음
+        'HCOB_COMM_CD_N': 86400,
+    }
+
+    # 결과 페이지 조회 설정
+    RESULT_PAGE_SIZE = 200                 # 기본 페이지 크기(행)
+    RESULT_PAGE_MAX_LIMIT = 1000           # 한 번에 요청할 수 있는 최대 행 수
+    RESULT_BROWSE_MAX_ROWS = 100000        # 페이지 조회로 탐색할 수 있는 최대 행 수 (전체 행 수 집계 상한)
+
     # 오프라인 모드 설정
     # 영업부 매출과 순이익을 월별로 조회하는 SQL 쿼리
     DEFAULT_SQL_TEMPLATE = """
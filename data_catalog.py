@@ -0,0 +1,224 @@
+"""
+data_catalog.py - 프로세스 공용 데이터 카탈로그 (CSV / metadata.json)
+- 파일별로 프로세스당 한 번만 파싱하고 모든 사용자가 같은 객체를 공유
+- 메타데이터는 읽기 전용 dict/tuple로 고정
+- DataFrame은 복사본 제공 (Copy-on-Write가 켜져 있으면(pandas 3 이상 또는 mode.copy_on_write) 얕은 복사,
+  아니면 깊은 복사로 loc/iloc 제자리 수정이 다른 사용자의 공유 원본을 바꾸지 않게 함)
+- 파일 수정 시각/크기가 바뀌면 다시 읽어 한 번에 교체 (읽는 동안은 이전 값 제공, 실패 시 이전 값 유지)
+- 메타데이터 JSON 응답 본문도 버전별로 한 번만 직렬화
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+
+import pandas as pd
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class FrozenDict(dict):
+    """수정할 수 없는 dict (json/jsonify 직렬화는 일반 dict와 같음)"""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("공유 메타데이터는 읽기 전용입니다. 수정하려면 복사본을 사용하세요.")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return FrozenDict, (dict(self),)
+
+
+def freeze(value):
+    """JSON 객체를 읽기 전용 구조로 변환 (dict → FrozenDict, list → tuple)"""
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def _file_version(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+class _CatalogEntry:
+    __slots__ = ('value', 'version', 'checked_at', 'loaded_at', 'size', 'json_text', 'reloading')
+
+    def __init__(self, value, version, size):
+        self.value = value
+        self.version = version
+        self.size = size
+        self.checked_at = time.monotonic()
+        self.loaded_at = time.time()
+        self.json_text = None
+        self.reloading = False
+
+
+def _copy_on_write_enabled():
+    """pandas Copy-on-Write 사용 여부 (pandas 3부터 항상 사용, 2.x는 옵션을 켠 경우만)"""
+    if int(pd.__version__.split('.')[0]) >= 3:
+        return True
+    return pd.options.mode.copy_on_write is True
+
+
+def _load_csv(path):
+    df = pd.read_csv(path)
+    logger.info(f"CSV 데이터 로드 완료: {path} - {len(df)} 행, {len(df.columns)} 열")
+    return df, int(df.memory_usage(index=True, deep=True).sum())
+
+
+def _load_metadata(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        metadata = json.load(f)
+    logger.info(f"메타데이터 로드 완료: {path}")
+    return freeze(metadata), os.path.getsize(path)
+
+
+class DataCatalog:
+    def __init__(self, check_interval=2.0):
+        """
+        데이터 카탈로그 초기화
+
+        Parameters:
+        - check_interval: 파일 변경 확인 최소 간격(초, 0이면 조회할 때마다 확인)
+        """
+        self.check_interval = check_interval
+        self._entries = {}
+        self._load_locks = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            'loads': 0,
+            'reloads': 0,
+            'reload_failures': 0,
+            'hits': 0,
+        }
+
+    def get_frame(self, csv_path):
+        """
+        CSV DataFrame 반환 (공유 원본의 복사본, 수정해도 다른 사용자에게 영향 없음)
+        - Copy-on-Write가 꺼져 있으면 얕은 복사본의 제자리 수정이 원본에 반영되므로 깊은 복사
+        """
+        df = self._get(('csv', os.path.abspath(csv_path)), _load_csv)
+        return df.copy(deep=not _copy_on_write_enabled())
+
+    def get_metadata(self, metadata_path):
+        """메타데이터 반환 (공유 읽기 전용 FrozenDict)"""
+        return self._get(('metadata', os.path.abspath(metadata_path)), _load_metadata)
+
+    def get_metadata_json(self, metadata_path):
+        """메타데이터 JSON 문자열 (HTTP 응답용, 버전별로 한 번만 직렬화)"""
+        key = ('metadata', os.path.abspath(metadata_path))
+        metadata = self._get(key, _load_metadata)
+        with self._lock:
+            entry = self._entries[key]
+            if entry.value is metadata and entry.json_text is not None:
+                return entry.json_text
+        json_text = json.dumps(metadata, ensure_ascii=False)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.value is metadata:
+                entry.json_text = json_text
+        return json_text
+
+    def _get(self, key, loader):
+        """캐시된 값 반환, 없으면 로드 / 파일이 바뀌었으면 다시 로드 후 교체"""
+        path = key[1]
+        with self._lock:
+            entry = self._entries.get(key)
+            now = time.monotonic()
+            if entry is not None and (entry.reloading or now - entry.checked_at < self.check_interval):
+                self._stats['hits'] += 1
+                return entry.value
+            if entry is not None:
+                entry.checked_at = now
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        if entry is not None:
+            try:
+                if _file_version(path) == entry.version:
+                    with self._lock:
+                        self._stats['hits'] += 1
+                    return entry.value
+            except OSError as e:
+                logger.warning(f"데이터 파일 확인 실패, 이전 데이터 사용: {path} - {e}")
+                return entry.value
+            with self._lock:
+                if entry.reloading:
+                    return entry.value
+                entry.reloading = True
+            logger.info(f"데이터 파일 변경 감지, 다시 로드: {path}")
+            try:
+                return self._load(key, loader)
+            except Exception as e:
+                with self._lock:
+                    self._stats['reload_failures'] += 1
+                logger.error(f"데이터 파일 다시 로드 실패, 이전 데이터 사용: {path} - {e}")
+                return entry.value
+            finally:
+                entry.reloading = False
+
+        # 처음 로드는 같은 파일에 대해 한 번만 (다른 파일 로드는 막지 않음)
+        with load_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+            if entry is not None:
+                return entry.value
+            return self._load(key, loader)
+
+    def _load(self, key, loader):
+        """파일을 읽어 새 항목으로 교체 (읽는 동안 기존 항목은 그대로 제공)"""
+        path = key[1]
+        version = _file_version(path)
+        value, size = loader(path)
+        with self._lock:
+            previous = self._entries.get(key)
+            self._entries[key] = _CatalogEntry(value, version, size)
+            self._stats['reloads' if previous is not None else 'loads'] += 1
+        return value
+
+    def invalidate(self, path=None):
+        """다음 조회 시 파일 변경 여부를 바로 확인 (path가 없으면 전체)"""
+        path = os.path.abspath(path) if path else None
+        with self._lock:
+            for key, entry in self._entries.items():
+                if path is None or key[1] == path:
+                    entry.checked_at = float('-inf')
+
+    def get_stats(self):
+        """카탈로그 통계 반환 (파일별 크기/로드 시각, 로드/다시 로드 횟수)"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['files'] = [
+                {'kind': kind, 'path': path, 'bytes': entry.size, 'loaded_at': entry.loaded_at}
+                for (kind, path), entry in self._entries.items()
+            ]
+        stats['total_bytes'] = sum(item['bytes'] for item in stats['files'])
+        stats['check_interval'] = self.check_interval
+        return stats
+
+
+_data_catalog = None
+_data_catalog_lock = threading.Lock()
+
+
+def get_data_catalog():
+    """프로세스 공용 데이터 카탈로그 반환"""
+    global _data_catalog
+    if _data_catalog is None:
+        with _data_catalog_lock:
+            if _data_catalog is None:
+                _data_catalog = DataCatalog(check_interval=Config.DATA_CATALOG_CHECK_SECONDS)
+    return _data_catalog
@@ -4,18 +4,110 @@ data_manager.py - 데이터 관리 모듈
 - SQL 쿼리 생성 및 실행
 """
 import os
-import json
+import math
+import threading
+import time
+from collections import deque
 import pandas as pd
-import oracledb
 import logging
 from typing import Dict, List, Any, Optional, Union, Tuple
 import re
-from sqlalchemy import create_engine
+from sqlalchemy import text
+
+from config import Config
+from query_cache import get_query_cache
+from db_engine import get_engine, connect, DatabaseBusyError
+from data_catalog import get_data_catalog
+from metadata_index import get_metadata_index
+from sql_validator import validate_sql, SqlValidationError
 
 logger = logging.getLogger(__name__)
 
+# 행 제한이 없는 SQL에 자동으로 붙이는 최대 행 수 (차트/결과 데이터용)
+AUTO_ROW_LIMIT = 1000
+# SQL이 아닌 LLM 응답일 때 사용하는 기본 쿼리
+DEFAULT_SQL = "SELECT * FROM QMS_RAT_YMQT_N FETCH FIRST 100 ROWS ONLY"
+_CODE_BLOCK_PATTERN = re.compile(r"```(?:sql|SQL)?\s*([\s\S]*?)```")
+_AUTO_LIMIT_PATTERN = re.compile(rf"\s+FETCH FIRST {AUTO_ROW_LIMIT} ROWS ONLY\s*$", re.IGNORECASE)
+
+
+def is_auto_limited(sql_query, row_count):
+    """자동 행 제한 때문에 결과가 잘렸을 수 있는지 확인"""
+    return bool(sql_query) and row_count >= AUTO_ROW_LIMIT and bool(_AUTO_LIMIT_PATTERN.search(sql_query))
+
+
+def browse_base_sql(sql_query):
+    """페이지 조회용 기본 SQL (자동으로 붙인 행 제한만 제거, 사용자가 지정한 제한은 유지)"""
+    return _AUTO_LIMIT_PATTERN.sub("", sql_query.rstrip(';'))
+
+
+def page_sql(sql_query):
+    """한 페이지 조회 SQL (Oracle OFFSET/FETCH NEXT, 바인드 변수 :row_offset / :row_limit)"""
+    return f"SELECT * FROM ({browse_base_sql(sql_query)}) OFFSET :row_offset ROWS FETCH NEXT :row_limit ROWS ONLY"
+
+
+class SqlFetchStats:
+    """SQL 조회 지표 (행 수, 청크 수, 추정 왕복 횟수, 첫 청크까지 시간, 초당 행 수)"""
+
+    def __init__(self, sql_query, arraysize, prefetchrows):
+        self.sql_query = sql_query
+        self.arraysize = arraysize
+        self.prefetchrows = prefetchrows
+        self.rows = 0
+        self.chunks = 0
+        self.columns = 0
+        self.started_at = time.perf_counter()
+        self.execute_seconds = None
+        self.first_chunk_seconds = None
+        self.elapsed_seconds = None
+
+    @property
+    def round_trips(self):
+        """
+        추정 네트워크 왕복 횟수
+        - 실행 1회에 prefetchrows행을 함께 받고, 이후 arraysize행마다 1회
+        - 드라이버가 왕복 횟수를 노출하지 않으므로 설정값으로 계산한 추정치
+        """
+        remaining = max(0, self.rows - self.prefetchrows)
+        return 1 + math.ceil(remaining / max(1, self.arraysize))
+
+    @property
+    def rows_per_second(self):
+        if not self.elapsed_seconds:
+            return 0.0
+        return self.rows / self.elapsed_seconds
+
+    def to_dict(self):
+        return {
+            'sql_query': self.sql_query[:200],
+            'rows': self.rows,
+            'columns': self.columns,
+            'chunks': self.chunks,
+            'arraysize': self.arraysize,
+            'prefetchrows': self.prefetchrows,
+            'round_trips_est': self.round_trips,
+            'execute_ms': round((self.execute_seconds or 0.0) * 1000, 1),
+            'first_chunk_ms': round((self.first_chunk_seconds or 0.0) * 1000, 1),
+            'elapsed_ms': round((self.elapsed_seconds or 0.0) * 1000, 1),
+            'rows_per_second': round(self.rows_per_second, 1),
+        }
+
+
+# 최근 SQL 조회 지표 (프로세스 공용)
+_recent_fetch_stats = deque(maxlen=100)
+_recent_fetch_stats_lock = threading.Lock()
+
+
+def get_recent_fetch_stats():
+    """최근 SQL 조회 지표 목록 (최신순)"""
+    with _recent_fetch_stats_lock:
+        return [stats.to_dict() for stats in reversed(_recent_fetch_stats)]
+
 
 class DataManager:
+    # CSV/메타데이터는 데이터 카탈로그의 공유 객체 (사용자별 메모리에 포함하지 않음)
+    shares_catalog_data = True
+
     def __init__(self, csv_path, metadata_path, llm_manager=None):
         """
         데이터 관리자 초기화
@@ -27,8 +119,6 @@ class DataManager:
         self.csv_path = csv_path
         self.metadata_path = metadata_path
         self.llm_manager = llm_manager
-        self.df = None
-        self.metadata = None
         self.conn = None
         # 파일 이름을 기반으로 테이블 이름 설정
         file_name = os.path.basename(csv_path)
@@ -38,24 +128,38 @@ class DataManager:
         logger.info("데이터 관리자 초기화 완료")
 
     def load_data(self):
-        """CSV 데이터 및 메타데이터 로드"""
+        """CSV 데이터 및 메타데이터 로드 (프로세스 공용 카탈로그, 이미 로드된 파일은 다시 파싱하지 않음)"""
         logger.info(f"데이터 로드 중... {self.csv_path}")
         try:
-            self.df = pd.read_csv(self.csv_path)
-            logger.info(f"CSV 데이터 로드 완료: {len(self.df)} 행, {len(self.df.columns)} 열")
+            df = self.df
+            logger.info(f"CSV 데이터 준비 완료: {len(df)} 행, {len(df.columns)} 열")
         except Exception as e:
             logger.error(f"CSV 데이터 로드 실패: {e}")
             raise
 
         logger.info(f"메타데이터 로드 중... {self.metadata_path}")
         try:
-            with open(self.metadata_path, 'r', encoding='utf-8') as f:
-                self.metadata = json.load(f)
-            logger.info("메타데이터 로드 완료")
+            metadata = self.metadata
+            logger.info(f"메타데이터 준비 완료: 테이블 {len(metadata.get('tables', ()))}개")
         except Exception as e:
             logger.error(f"메타데이터 로드 실패: {e}")
             raise
 
+    @property
+    def df(self):
+        """CSV DataFrame (사용자 간 공유, 파일이 바뀌면 새 데이터)"""
+        return get_data_catalog().get_frame(self.csv_path)
+
+    @property
+    def metadata(self):
+        """메타데이터 (사용자 간 공유 읽기 전용, 파일이 바뀌면 새 데이터)"""
+        return get_data_catalog().get_metadata(self.metadata_path)
+
+    @property
+    def metadata_index(self):
+        """메타데이터 색인 (테이블/컬럼/한글명/코드 조회)"""
+        return get_metadata_index(self.metadata)
+
     # def setup_oracle(self):
     #     """Oracle 데이터베이스 설정"""
     #     logger.info("Oracle 데이터베이스 설정 중...")
@@ -76,35 +180,26 @@ class DataManager:
     #         raise
 
     def setup_oracle(self):
-        """Oracle 데이터베이스 설정"""
+        """Oracle 데이터베이스 설정 (프로세스 공용 엔진/커넥션 풀 사용)"""
         logger.info("Oracle 데이터베이스 설정 중...")
+        self.engine = None
         try:
-            oracledb.init_oracle_client(lib_dir="/home/humandeep/oracle/instantclient_21_8")
-            # Oracle 데이터베이스 연결 설정
-            user = "system"
-            password = "Test123"
-            dsn = "localhost:1521/XE"
-            # 변경: oracledb.connect -> SQLAlchemy create_engine
-            self.engine = create_engine(f'oracle+oracledb://{user}:{password}@{dsn}')
+            self.engine = get_engine()
             logger.info("Oracle 데이터베이스 연결 성공")
         except Exception as e:
             logger.error(f"Oracle 설정 실패: {e}")
-            if self.engine:
-                self.engine.dispose()
-                self.engine = None
             raise
         
     def get_data_sample(self, rows=5):
         """데이터 샘플 추출"""
-        if self.df is None:
-            return "데이터가 로드되지 않았습니다."
         return self.df.head(rows).to_string()
 
-    def generate_sql(self, query):
+    def generate_sql(self, query, regenerate=False):
         """
         사용자 쿼리로부터 SQL 생성
         Parameters:
         - query: 사용자 쿼리 문자열
+        - regenerate: True면 LLM 응답 캐시를 건너뛰고 새로 생성
         Returns:
         - sql_query: 생성된 SQL 쿼리
         """
@@ -117,7 +212,7 @@ class DataManager:
         data_sample = self.get_data_sample()
 
         # LLM으로 SQL 생성
-        sql_query = self.llm_manager.generate_sql(query, self.metadata, data_sample)
+        sql_query = self.llm_manager.generate_sql(query, self.metadata, data_sample, regenerate=regenerate)
 
         # SQL 쿼리 검증 및 수정
         sql_query = self._validate_sql_query(sql_query)
@@ -130,54 +225,44 @@ class DataManager:
         return self._sql_query
 
     def _validate_sql_query(self, sql_query):
-        """SQL 쿼리 유효성 검증 및 수정"""
+        """
+        SQL 쿼리 유효성 검증 및 수정 (sql_validator 토큰 기반 검증)
+        - 마크다운 코드 블록 추출, 첫 문장만 사용, 주석 제거/공백 압축 (문자열 리터럴은 그대로)
+        - 읽기 전용 SELECT 문만 허용, 메타데이터에 없는 테이블/컬럼은 실행 전에 거부
+        - 최상위 FETCH 절이 없으면 행 제한 추가
+
+        Raises:
+        - SqlValidationError: 쓰기 문장, 문법 오류, 메타데이터에 없는 테이블/컬럼
+        """
+        # 마크다운 코드 블록 제거
+        code_block_match = _CODE_BLOCK_PATTERN.search(sql_query or "")
+        if code_block_match:
+            sql_query = code_block_match.group(1).strip()
+            logger.info("SQL 코드 블록에서 쿼리 추출 완료")
+
+        # 기본 검증 - SELECT 문이 포함되어 있는지 확인 (LLM이 SQL이 아닌 응답을 한 경우)
+        if not sql_query or "SELECT" not in sql_query.upper():
+            logger.warning("유효하지 않은 SQL 쿼리입니다. 기본 쿼리로 대체합니다.")
+            return DEFAULT_SQL
+
+        metadata_index = self.metadata_index if Config.SQL_VALIDATE_IDENTIFIERS else None
         try:
-            # 마크다운 코드 블록 제거
-            import re
-            code_block_pattern = r"```(?:sql|SQL)?\s*([\s\S]*?)```"
-            code_block_match = re.search(code_block_pattern, sql_query)
-            if code_block_match:
-                sql_query = code_block_match.group(1).strip()
-                logger.info("SQL 코드 블록에서 쿼리 추출 완료")
-
-            # 기본 검증 - SELECT 문이 포함되어 있는지 확인
-            if not sql_query or "SELECT" not in sql_query.upper():
-                logger.warning("유효하지 않은 SQL 쿼리입니다. 기본 쿼리로 대체합니다.")
-                return f"SELECT * FROM {self.QMS_RAT_YMQT_N} FETCH FIRST 100 ROWS ONLY"
-
-            # SQL 주석 제거 (-- 주석 및 /* */ 주석)
-            sql_query = re.sub(r"--.*?$", "", sql_query, flags=re.MULTILINE)  # 한 줄 주석
-            sql_query = re.sub(r"/\*[\s\S]*?\*/", "", sql_query)  # 여러 줄 주석
-
-            # 여러 줄에 걸친 쿼리를 한 줄로 압축
-            sql_query = re.sub(r"\s+", " ", sql_query).strip()
-
-            # SQL 명령이 여러 개 있을 경우 첫 번째 명령만 사용
-            if ";" in sql_query:
-                first_statement = sql_query.split(";")[0].strip()
-                if first_statement:  # 빈 문자열이 아닌지 확인
-                    sql_query = first_statement
-                    logger.info("여러 SQL 문장에서 첫 번째 문장만 사용합니다.")
-
-            # 리미트 확인 (없으면 추가)
-            if "FETCH FIRST" not in sql_query.upper():
-                sql_query = sql_query.rstrip(';') + " FETCH FIRST 1000 ROWS ONLY"
-
-            # 마지막 세미콜론 제거 (Oracle에서 FETCH FIRST와 함께 사용 시 문제 발생 방지)
-            sql_query = sql_query.rstrip(';')
-
-            logger.info(f"검증 및 수정된 SQL 쿼리: {sql_query}")
-
-            return sql_query
-        except Exception as e:
-            logger.error(f"SQL 쿼리 검증 중 오류 발생: {e}")
-            return f"SELECT * FROM QMS_RAT_YMQT_N FETCH FIRST 100 ROWS ONLY"
+            validated = validate_sql(sql_query, metadata_index=metadata_index, row_limit=AUTO_ROW_LIMIT)
+        except SqlValidationError as e:
+            logger.warning(f"SQL 검증 실패 ({e.reason}): {e}")
+            raise
+        if validated.statements > 1:
+            logger.info("여러 SQL 문장에서 첫 번째 문장만 사용합니다.")
 
-    def execute_sql(self, sql_query):
+        logger.info(f"검증 및 수정된 SQL 쿼리: {validated.sql}")
+        return validated.sql
+
+    def execute_sql(self, sql_query, use_cache=True):
         """
         SQL 쿼리 실행
         Parameters:
         - sql_query: 실행할 SQL 쿼리
+        - use_cache: False면 SQL 결과 캐시를 건너뛰고 DB에서 조회
         Returns:
         - result_df: 쿼리 실행 결과 DataFrame
         """
@@ -187,17 +272,130 @@ class DataManager:
             return pd.DataFrame()
 
         try:
-            # 쿼리 실행
-            result_df = pd.read_sql_query(sql_query, self.engine)  # 변경: self.conn -> self.engine
+            # 같은 DB의 같은 SQL 결과는 사용자 간에 공유 (동시 요청은 한 번만 실행)
+            cache = get_query_cache() if use_cache else None
+            if cache is not None:
+                result_df = cache.get_or_execute(sql_query, self._fetch_sql,
+                                                 namespace=self.engine.url.render_as_string(hide_password=True))
+            else:
+                result_df = self._fetch_sql(sql_query)
             logger.info(f"SQL 실행 완료: {len(result_df)} 행, {len(result_df.columns)} 열")
             return result_df
+        except DatabaseBusyError:
+            # 풀 포화는 빈 결과로 숨기지 않고 호출자에게 전달
+            raise
         except Exception as e:
             logger.error(f"SQL 실행 오류: {e}")
             return pd.DataFrame()
 
+    def invalidate_cached_result(self, sql_query):
+        """이 SQL의 캐시된 결과 제거 (다음 실행은 DB에서 조회)"""
+        cache = get_query_cache()
+        if cache is not None and self.engine is not None:
+            cache.invalidate(sql_query=sql_query, namespace=self.engine.url.render_as_string(hide_password=True))
+
+    def _fetch_sql(self, sql_query):
+        """청크 단위로 가져온 뒤 합침 (arraysize/prefetchrows 조정으로 왕복 횟수 감소)"""
+        return pd.concat(list(self.iter_sql_chunks(sql_query)), ignore_index=True)
+
+    def iter_sql_chunks(self, sql_query, chunk_rows=None, first_rows=None, stats=None):
+        """
+        SQL 실행 결과를 DataFrame 청크 단위로 반환 (전체 결과를 모으기 전에 처리 가능)
+        Parameters:
+        - sql_query: 실행할 SQL 쿼리
+        - chunk_rows: 청크당 행 수 (기본 Config.SQL_FETCH_CHUNK_ROWS)
+        - first_rows: 지정하면 첫 청크를 이 행 수로 먼저 반환 (미리보기용, 실행 왕복에 함께 prefetch)
+        - stats: SqlFetchStats를 넘기면 지표를 채움 (없으면 내부에서 생성)
+        Yields:
+        - chunk_df: 결과 DataFrame 청크 (결과가 없어도 컬럼만 있는 청크 1개 반환)
+        """
+        if self.engine is None:
+            raise RuntimeError("Oracle 연결이 설정되지 않았습니다.")
+        chunk_rows = chunk_rows or Config.SQL_FETCH_CHUNK_ROWS
+        arraysize = Config.SQL_FETCH_ARRAYSIZE
+        prefetchrows = first_rows or Config.SQL_FETCH_PREFETCH_ROWS
+        if stats is None:
+            stats = SqlFetchStats(sql_query, arraysize, prefetchrows)
+        else:
+            stats.arraysize, stats.prefetchrows = arraysize, prefetchrows
+
+        with connect(self.engine) as connection:
+            cursor = connection.connection.cursor()
+            try:
+                # 실행 전에 설정해야 첫 왕복부터 적용됨
+                cursor.arraysize = arraysize
+                if hasattr(cursor, 'prefetchrows'):
+                    cursor.prefetchrows = prefetchrows
+                cursor.execute(sql_query)
+                stats.execute_seconds = time.perf_counter() - stats.started_at
+                columns = self._column_names(cursor.description)
+                stats.columns = len(columns)
+
+                size = first_rows or chunk_rows
+                while True:
+                    rows = cursor.fetchmany(size)
+                    if not rows and stats.chunks:
+                        break
+                    stats.rows += len(rows)
+                    stats.chunks += 1
+                    if stats.first_chunk_seconds is None:
+                        stats.first_chunk_seconds = time.perf_counter() - stats.started_at
+                    yield pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+                    if len(rows) < size:
+                        break
+                    size = chunk_rows
+            finally:
+                cursor.close()
+                stats.elapsed_seconds = time.perf_counter() - stats.started_at
+                with _recent_fetch_stats_lock:
+                    _recent_fetch_stats.append(stats)
+                logger.info(f"SQL 조회 지표: {stats.rows}행, 청크 {stats.chunks}개, 추정 왕복 {stats.round_trips}회, "
+                            f"첫 청크 {(stats.first_chunk_seconds or 0.0) * 1000:.0f}ms, "
+                            f"{stats.rows_per_second:,.0f}행/초")
+
+    def _column_names(self, description):
+        """
+        DBAPI 커서의 컬럼명을 SQLAlchemy 결과와 같게 정규화
+        (Oracle처럼 대문자로 반환하는 DB는 전부 대문자인 이름을 소문자로, pd.read_sql_query와 같은 컬럼명)
+        """
+        dialect = self.engine.dialect
+        if not dialect.requires_name_normalize:
+            return [column[0] for column in description]
+        return [str(dialect.normalize_name(column[0])) for column in description]
+
+    def execute_sql_page(self, sql_query, offset, limit):
+        """
+        SQL 결과의 한 페이지만 조회 (OFFSET/FETCH NEXT)
+        Parameters:
+        - sql_query: 검증된 SQL 쿼리 (자동 행 제한은 제거하고 조회)
+        - offset: 건너뛸 행 수
+        - limit: 가져올 최대 행 수
+        Returns:
+        - page_df: 페이지 DataFrame (실행 실패 시 예외 발생)
+        """
+        if self.engine is None:
+            raise RuntimeError("Oracle 연결이 설정되지 않았습니다.")
+        with connect(self.engine) as connection:
+            page_df = pd.read_sql_query(text(page_sql(sql_query)), connection,
+                                        params={'row_offset': int(offset), 'row_limit': int(limit)})
+        logger.info(f"SQL 페이지 조회 완료: offset {offset}, {len(page_df)} 행")
+        return page_df
+
+    def count_sql_rows(self, sql_query, max_rows):
+        """
+        SQL 결과 행 수 (max_rows까지만 세어 대용량 결과의 전체 집계 방지)
+        Returns:
+        - (행 수, 정확 여부) - max_rows를 넘으면 (max_rows, False)
+        """
+        if self.engine is None:
+            raise RuntimeError("Oracle 연결이 설정되지 않았습니다.")
+        count_sql = (f"SELECT COUNT(*) FROM (SELECT 1 FROM ({browse_base_sql(sql_query)}) "
+                     f"FETCH FIRST :row_cap ROWS ONLY)")
+        with connect(self.engine) as connection:
+            count = connection.execute(text(count_sql), {'row_cap': int(max_rows) + 1}).scalar()
+        return min(count, max_rows), count <= max_rows
+
     def close(self):
-        """리소스 정리"""
-        if self.engine:  # 변경: self.conn -> self.engine
-            self.engine.dispose()
-            self.engine = None
-        logger.info("Oracle 연결 종료")
\ No newline at end of file
+        """리소스 정리 (공용 커넥션 풀은 다른 사용자가 계속 사용하므로 종료하지 않음)"""
+        self.engine = None
+        logger.info("Oracle 연결 해제")
\ No newline at end of file
@@ -0,0 +1,148 @@
+"""
+db_engine.py - 프로세스 공용 Oracle 엔진/커넥션 풀
+- Oracle Client 초기화와 엔진 생성은 프로세스당 한 번 (사용자별 DataManager가 같은 풀 공유)
+- 풀 크기/초과 연결/연결 확인(pre-ping)/재사용 주기 설정
+- 연결 대기 시간을 넘기면 DatabaseBusyError로 포화 상태를 바로 알림
+- 연결 생성/대여/반납/대기 시간 지표
+"""
+
+import atexit
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+import oracledb
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class DatabaseBusyError(Exception):
+    """커넥션 풀의 연결을 제한 시간 안에 받지 못함 (DB 포화)"""
+
+
+_engine = None
+_engine_lock = threading.Lock()
+_client_initialized = False
+
+_stats_lock = threading.Lock()
+_stats = {
+    'connects': 0,
+    'checkouts': 0,
+    'checkins': 0,
+    'invalidated': 0,
+    'wait_timeouts': 0,
+    'wait_seconds': 0.0,
+    'max_wait_seconds': 0.0,
+}
+
+
+def _incr(name, amount=1):
+    with _stats_lock:
+        _stats[name] += amount
+
+
+def _init_oracle_client():
+    """Oracle Client(thick 모드) 초기화 - 프로세스당 한 번"""
+    global _client_initialized
+    if _client_initialized:
+        return
+    if Config.ORACLE_CLIENT_LIB_DIR:
+        oracledb.init_oracle_client(lib_dir=Config.ORACLE_CLIENT_LIB_DIR)
+    _client_initialized = True
+
+
+def _register_pool_events(engine):
+    """풀 이벤트로 연결 생성/대여/반납/무효화 횟수 기록"""
+    event.listen(engine, 'connect', lambda dbapi_connection, record: _incr('connects'))
+    event.listen(engine, 'checkout', lambda dbapi_connection, record, proxy: _incr('checkouts'))
+    event.listen(engine, 'checkin', lambda dbapi_connection, record: _incr('checkins'))
+    event.listen(engine, 'invalidate', lambda dbapi_connection, record, exception: _incr('invalidated'))
+
+
+def get_engine():
+    """
+    프로세스 공용 SQLAlchemy 엔진 반환 (처음 호출 시 생성)
+
+    Returns:
+    - engine: Config.DB_POOL_* 설정이 적용된 엔진
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _init_oracle_client()
+                engine = create_engine(
+                    f'oracle+oracledb://{Config.ORACLE_USER}:{Config.ORACLE_PASSWORD}@{Config.ORACLE_DSN}',
+                    pool_size=Config.DB_POOL_SIZE,
+                    max_overflow=Config.DB_POOL_MAX_OVERFLOW,
+                    pool_timeout=Config.DB_POOL_TIMEOUT,
+                    pool_recycle=Config.DB_POOL_RECYCLE,
+                    pool_pre_ping=Config.DB_POOL_PRE_PING
+                )
+                _register_pool_events(engine)
+                atexit.register(dispose_engine)
+                _engine = engine
+                logger.info(f"Oracle 커넥션 풀 생성 - 크기: {Config.DB_POOL_SIZE}, 초과 허용: {Config.DB_POOL_MAX_OVERFLOW}, "
+                            f"대기 제한: {Config.DB_POOL_TIMEOUT}초, 재사용 주기: {Config.DB_POOL_RECYCLE}초")
+    return _engine
+
+
+@contextmanager
+def connect(engine):
+    """
+    풀에서 연결을 빌려 사용 (대기 시간 기록)
+
+    Raises:
+    - DatabaseBusyError: Config.DB_POOL_TIMEOUT 안에 연결을 받지 못함
+    """
+    start = time.perf_counter()
+    try:
+        connection = engine.connect()
+    except PoolTimeoutError as e:
+        _incr('wait_timeouts')
+        pool = engine.pool
+        logger.warning(f"DB 연결 대기 시간 초과: {pool.status()}")
+        raise DatabaseBusyError(
+            "DB 연결이 모두 사용 중입니다. 잠시 후 다시 시도해주세요."
+        ) from e
+    waited = time.perf_counter() - start
+    with _stats_lock:
+        _stats['wait_seconds'] += waited
+        _stats['max_wait_seconds'] = max(_stats['max_wait_seconds'], waited)
+    try:
+        yield connection
+    finally:
+        connection.close()
+
+
+def get_pool_stats():
+    """커넥션 풀 지표 (현재 대여/유휴/초과 연결 수, 누적 생성/대여/대기 시간)"""
+    with _stats_lock:
+        stats = dict(_stats)
+    stats['avg_wait_ms'] = stats['wait_seconds'] * 1000 / stats['checkouts'] if stats['checkouts'] else 0.0
+    engine = _engine
+    if engine is not None:
+        pool = engine.pool
+        stats.update({
+            'pool_size': pool.size(),
+            'checked_out': pool.checkedout(),
+            'checked_in': pool.checkedin(),
+            'overflow': pool.overflow(),
+            'max_overflow': Config.DB_POOL_MAX_OVERFLOW,
+        })
+    return stats
+
+
+def dispose_engine():
+    """공용 엔진의 모든 연결 종료"""
+    global _engine
+    with _engine_lock:
+        if _engine is not None:
+            _engine.dispose()
+            _engine = None
+            logger.info("Oracle 커넥션 풀 종료")
@@ -0,0 +1,357 @@
+"""
+job_queue.py - 비동기 작업 큐
+- SQL → 차트 파이프라인을 요청 스레드 밖의 작업자 풀에서 실행
+- 작업 ID로 상태/단계/결과 조회 (폴링 또는 구독)
+- 대기열 길이 제한, 사용자별 동시 실행 제한, 취소 지원
+- 백엔드 교체 가능 (현재는 프로세스 내 구현만 제공)
+"""
+
+import logging
+import threading
+import time
+import uuid
+from collections import deque
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# 작업 상태
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+FINISHED_STATES = frozenset([JOB_SUCCEEDED, JOB_FAILED, JOB_CANCELLED])
+
+
+class JobQueueFullError(Exception):
+    """대기열이 가득 차 작업을 받을 수 없음"""
+
+
+class JobCancelledError(Exception):
+    """실행 중인 작업이 취소됨"""
+
+
+class Job:
+    """큐에 제출된 단일 작업"""
+
+    def __init__(self, username, kind, func, args=(), kwargs=None):
+        self.job_id = uuid.uuid4().hex
+        self.username = username
+        self.kind = kind
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs or {}
+
+        self.status = JOB_QUEUED
+        self.stage = None
+        self.stage_timings = {}
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+        self._cancel_event = threading.Event()
+        self._stage_started_at = None
+        # 상태가 바뀔 때마다 증가 (구독자가 변경을 기다리는 데 사용)
+        self.version = 0
+        self._condition = threading.Condition()
+
+    def set_stage(self, stage):
+        """
+        진행 단계 갱신 - 파이프라인 각 단계 시작 시 호출
+        취소 요청된 작업이면 JobCancelledError 발생
+        """
+        if self._cancel_event.is_set():
+            raise JobCancelledError(f"작업이 취소되었습니다: {self.job_id}")
+        now = time.time()
+        with self._condition:
+            if self.stage is not None and self._stage_started_at is not None:
+                self.stage_timings[self.stage] = round(now - self._stage_started_at, 3)
+            self.stage = stage
+            self._stage_started_at = now
+            self._notify()
+
+    def cancel_requested(self):
+        return self._cancel_event.is_set()
+
+    def request_cancel(self):
+        self._cancel_event.set()
+
+    def _transition(self, status, result=None, error=None):
+        now = time.time()
+        with self._condition:
+            if status == JOB_RUNNING:
+                self.started_at = now
+            if status in FINISHED_STATES:
+                self.finished_at = now
+                if self.stage is not None and self._stage_started_at is not None:
+                    self.stage_timings[self.stage] = round(now - self._stage_started_at, 3)
+            self.status = status
+            self.result = result
+            self.error = error
+            self._notify()
+
+    def _notify(self):
+        self.version += 1
+        self._condition.notify_all()
+
+    def wait_for_update(self, version, timeout=None):
+        """
+        상태 변경 대기
+
+        Parameters:
+        - version: 마지막으로 확인한 버전
+        - timeout: 최대 대기 시간(초)
+
+        Returns:
+        - 현재 버전 (변경이 없으면 입력과 같음)
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self.version != version, timeout=timeout)
+            return self.version
+
+    def is_finished(self):
+        return self.status in FINISHED_STATES
+
+    def to_dict(self, include_result=True):
+        """API 응답용 직렬화"""
+        with self._condition:
+            info = {
+                'job_id': self.job_id,
+                'username': self.username,
+                'kind': self.kind,
+                'status': self.status,
+                'stage': self.stage,
+                'stage_timings': dict(self.stage_timings),
+                'created_at': self.created_at,
+                'started_at': self.started_at,
+                'finished_at': self.finished_at,
+                'error': self.error,
+                'version': self.version,
+            }
+            if include_result and self.status == JOB_SUCCEEDED:
+                info['result'] = self.result
+        return info
+
+
+class JobBackend:
+    """
+    작업 큐 백엔드 인터페이스
+    - 외부 큐(Redis 등)로 교체할 때 이 인터페이스를 구현
+    """
+
+    def submit(self, username, kind, func, *args, **kwargs):
+        """작업 제출 후 Job 반환 (func는 첫 인자로 Job을 받음)"""
+        raise NotImplementedError
+
+    def get(self, job_id):
+        """작업 조회 (없으면 None)"""
+        raise NotImplementedError
+
+    def cancel(self, job_id):
+        """작업 취소 요청 (취소 요청이 받아들여지면 True)"""
+        raise NotImplementedError
+
+    def list_jobs(self, username=None):
+        """작업 목록"""
+        raise NotImplementedError
+
+    def get_stats(self):
+        """큐 통계"""
+        raise NotImplementedError
+
+    def shutdown(self, timeout=5.0):
+        """작업자 종료"""
+        raise NotImplementedError
+
+
+class InProcessJobBackend(JobBackend):
+    """프로세스 내 스레드 작업자 풀 기반 작업 큐"""
+
+    def __init__(self, max_workers=4, max_queue_depth=64, max_running_per_user=2, result_ttl_seconds=600):
+        """
+        Parameters:
+        - max_workers: 작업자 스레드 수
+        - max_queue_depth: 최대 대기 작업 수 (초과 시 JobQueueFullError)
+        - max_running_per_user: 사용자별 최대 동시 실행 작업 수
+        - result_ttl_seconds: 완료된 작업을 보관하는 시간(초)
+        """
+        self.max_workers = max_workers
+        self.max_queue_depth = max_queue_depth
+        self.max_running_per_user = max_running_per_user
+        self.result_ttl_seconds = result_ttl_seconds
+
+        self._lock = threading.Condition()
+        self._pending = deque()
+        self._jobs = {}
+        self._running_per_user = {}
+        self._stopped = False
+        self._stats = {
+            'submitted': 0,
+            'rejected': 0,
+            'succeeded': 0,
+            'failed': 0,
+            'cancelled': 0,
+        }
+
+        self._workers = [
+            threading.Thread(target=self._worker_loop, name=f"job-worker-{i}", daemon=True)
+            for i in range(max_workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+        logger.info(f"작업 큐 시작 - 작업자: {max_workers}, 최대 대기: {max_queue_depth}, "
+                    f"사용자별 동시 실행: {max_running_per_user}")
+
+    def submit(self, username, kind, func, *args, **kwargs):
+        job = Job(username, kind, func, args, kwargs)
+        with self._lock:
+            if self._stopped:
+                raise RuntimeError("작업 큐가 종료되었습니다.")
+            self._purge_expired()
+            if len(self._pending) >= self.max_queue_depth:
+                self._stats['rejected'] += 1
+                raise JobQueueFullError(f"대기 중인 작업이 너무 많습니다. ({len(self._pending)}/{self.max_queue_depth})")
+            self._jobs[job.job_id] = job
+            self._pending.append(job)
+            self._stats['submitted'] += 1
+            self._lock.notify()
+        logger.info(f"작업 제출: {job.job_id} ({kind}, 사용자: {username})")
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.is_finished():
+                return False
+            job.request_cancel()
+            if job.status == JOB_QUEUED:
+                # 아직 시작하지 않은 작업은 즉시 취소
+                self._pending.remove(job)
+                self._stats['cancelled'] += 1
+                job._transition(JOB_CANCELLED)
+        logger.info(f"작업 취소 요청: {job_id}")
+        return True
+
+    def list_jobs(self, username=None):
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [job for job in jobs if username is None or job.username == username]
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['queued'] = len(self._pending)
+            stats['running'] = sum(self._running_per_user.values())
+            stats['running_per_user'] = dict(self._running_per_user)
+            stats['retained'] = len(self._jobs)
+        stats['max_workers'] = self.max_workers
+        stats['max_queue_depth'] = self.max_queue_depth
+        return stats
+
+    def shutdown(self, timeout=5.0):
+        with self._lock:
+            self._stopped = True
+            pending = list(self._pending)
+            self._pending.clear()
+            self._lock.notify_all()
+        for job in pending:
+            job.request_cancel()
+            job._transition(JOB_CANCELLED)
+        for worker in self._workers:
+            worker.join(timeout=timeout)
+        logger.info("작업 큐 종료")
+
+    def _next_job(self):
+        """사용자별 동시 실행 제한을 넘지 않는 가장 오래된 대기 작업 (잠금 보유 상태에서 호출)"""
+        for job in self._pending:
+            if self._running_per_user.get(job.username, 0) < self.max_running_per_user:
+                self._pending.remove(job)
+                return job
+        return None
+
+    def _worker_loop(self):
+        while True:
+            with self._lock:
+                job = None
+                while not self._stopped:
+                    job = self._next_job()
+                    if job is not None:
+                        break
+                    self._lock.wait()
+                if job is None:
+                    return
+                self._running_per_user[job.username] = self._running_per_user.get(job.username, 0) + 1
+                job._transition(JOB_RUNNING)
+
+            self._run_job(job)
+
+            with self._lock:
+                self._running_per_user[job.username] -= 1
+                if self._running_per_user[job.username] <= 0:
+                    del self._running_per_user[job.username]
+                # 같은 사용자의 대기 작업이 실행 가능해졌을 수 있음
+                self._lock.notify_all()
+
+    def _run_job(self, job):
+        try:
+            result = job.func(job, *job.args, **job.kwargs)
+            if job.cancel_requested():
+                raise JobCancelledError(f"작업이 취소되었습니다: {job.job_id}")
+            job._transition(JOB_SUCCEEDED, result=result)
+            self._incr('succeeded')
+            logger.info(f"작업 완료: {job.job_id} ({job.kind}) - 단계별 시간: {job.stage_timings}")
+        except JobCancelledError:
+            job._transition(JOB_CANCELLED)
+            self._incr('cancelled')
+            logger.info(f"작업 취소됨: {job.job_id}")
+        except Exception as e:
+            job._transition(JOB_FAILED, error=str(e))
+            self._incr('failed')
+            logger.error(f"작업 실패: {job.job_id} ({job.kind}) - {e}")
+
+    def _incr(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def _purge_expired(self):
+        """보관 시간이 지난 완료 작업 제거 (잠금 보유 상태에서 호출)"""
+        now = time.time()
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.is_finished() and job.finished_at + self.result_ttl_seconds <= now
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+# 사용 가능한 백엔드 (Config.JOB_BACKEND 값으로 선택)
+JOB_BACKENDS = {
+    'inprocess': InProcessJobBackend,
+}
+
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+
+def get_job_queue():
+    """프로세스 공용 작업 큐 반환"""
+    global _job_queue
+    if _job_queue is None:
+        with _job_queue_lock:
+            if _job_queue is None:
+                backend_class = JOB_BACKENDS[Config.JOB_BACKEND]
+                _job_queue = backend_class(
+                    max_workers=Config.JOB_MAX_WORKERS,
+                    max_queue_depth=Config.JOB_MAX_QUEUE_DEPTH,
+                    max_running_per_user=Config.JOB_MAX_RUNNING_PER_USER,
+                    result_ttl_seconds=Config.JOB_RESULT_TTL_SECONDS
+                )
+    return _job_queue
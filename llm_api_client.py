@@ -0,0 +1,176 @@
+"""
+llm_api_client.py - API 모드 LLM HTTP 클라이언트
+- keep-alive 커넥션 풀을 사용자 앱 전체에서 공유
+- 연결/읽기 타임아웃
+- 429/5xx 및 연결 오류 시 지터가 적용된 지수 백오프 재시도
+- 풀 사용량 지표 제공
+- stream: true 응답(SSE)의 토큰 단위 수신 및 중단
+"""
+
+import json
+import logging
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# 재시도 대상 HTTP 상태 코드
+RETRY_STATUS_CODES = frozenset([429, 500, 502, 503, 504])
+
+
+class LLMApiClient:
+    """OpenAI 호환 chat/completions 엔드포인트용 풀링 HTTP 클라이언트"""
+
+    def __init__(self, endpoint, api_key="", pool_maxsize=16, connect_timeout=3.0, read_timeout=120.0,
+                 max_retries=3, backoff_base=0.5, backoff_max=8.0):
+        """
+        Parameters:
+        - endpoint: chat/completions 엔드포인트 URL
+        - api_key: Bearer 인증 키
+        - pool_maxsize: 호스트당 최대 커넥션 수 (초과 요청은 풀 반환을 대기)
+        - connect_timeout: 연결 타임아웃(초)
+        - read_timeout: 응답 읽기 타임아웃(초)
+        - max_retries: 최대 재시도 횟수
+        - backoff_base: 백오프 기본 대기 시간(초)
+        - backoff_max: 백오프 최대 대기 시간(초)
+        """
+        self.endpoint = endpoint
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        # 재시도는 직접 처리하므로 어댑터 재시도는 끔
+        self._adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize, pool_block=True, max_retries=0)
+        self.session = requests.Session()
+        self.session.mount("http://", self._adapter)
+        self.session.mount("https://", self._adapter)
+        self.session.headers.update({
+            'Authorization': f'Bearer {api_key}',
+            'Content-Type': 'application/json'
+        })
+
+        self._metrics_lock = threading.Lock()
+        self._metrics = {
+            'requests': 0,
+            'retries': 0,
+            'failures': 0,
+            'in_flight': 0,
+            'streams_cancelled': 0,
+        }
+
+    def post_chat(self, payload, stream=False):
+        """
+        chat/completions 요청 전송 (재시도 포함)
+
+        Parameters:
+        - payload: 요청 JSON 본문
+        - stream: True면 응답 본문을 미리 읽지 않음 (SSE 스트리밍용)
+
+        Returns:
+        - requests.Response (성공 응답)
+        """
+        attempt = 0
+        self._update_metric('requests', 1)
+        self._update_metric('in_flight', 1)
+        try:
+            while True:
+                try:
+                    response = self.session.post(self.endpoint, json=payload, timeout=self.timeout, stream=stream)
+                    if response.status_code not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                        response.raise_for_status()
+                        return response
+                    retry_after = self._parse_retry_after(response)
+                    reason = f"HTTP {response.status_code}"
+                    response.close()
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                    if attempt >= self.max_retries:
+                        raise
+                    retry_after = None
+                    reason = type(e).__name__
+
+                attempt += 1
+                delay = self._backoff_delay(attempt, retry_after)
+                self._update_metric('retries', 1)
+                logger.warning(f"API 요청 재시도 {attempt}/{self.max_retries} ({reason}) - {delay:.2f}초 후")
+                time.sleep(delay)
+        except requests.exceptions.RequestException:
+            self._update_metric('failures', 1)
+            raise
+        finally:
+            self._update_metric('in_flight', -1)
+
+    def stream_chat(self, payload):
+        """
+        stream: true로 요청하고 생성되는 텍스트 조각을 순서대로 반환하는 제너레이터
+        - 재시도는 응답 헤더 수신 전까지만 적용
+        - 소비 측이 중간에 제너레이터를 닫으면 연결을 끊어 서버 측 생성도 중단되도록 함
+        """
+        response = self.post_chat(dict(payload, stream=True), stream=True)
+        finished = False
+        try:
+            for line in response.iter_lines():
+                if not line or not line.startswith(b"data:"):
+                    continue
+                data = line[5:].strip()
+                if data == b"[DONE]":
+                    break
+                chunk = json.loads(data)
+                delta = (chunk.get('choices') or [{}])[0].get('delta', {}).get('content')
+                if delta:
+                    yield delta
+            finished = True
+        finally:
+            if not finished:
+                self._update_metric('streams_cancelled', 1)
+            # 끝까지 읽지 않은 연결은 풀에 반환하지 않고 닫힘
+            response.close()
+
+    def _backoff_delay(self, attempt, retry_after=None):
+        """Full jitter 지수 백오프 (Retry-After 헤더 우선)"""
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1))))
+
+    @staticmethod
+    def _parse_retry_after(response):
+        value = response.headers.get('Retry-After')
+        if value is None:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            return None
+
+    def _update_metric(self, name, delta):
+        with self._metrics_lock:
+            self._metrics[name] += delta
+
+    def get_metrics(self):
+        """요청/재시도 지표 및 커넥션 풀 상태 반환"""
+        with self._metrics_lock:
+            metrics = dict(self._metrics)
+
+        pools = []
+        for key in list(self._adapter.poolmanager.pools.keys()):
+            pool = self._adapter.poolmanager.pools.get(key)
+            if pool is None:
+                continue
+            idle = sum(1 for conn in list(pool.pool.queue) if conn is not None) if pool.pool else 0
+            pools.append({
+                'host': f"{pool.host}:{pool.port}",
+                'maxsize': self._adapter._pool_maxsize,
+                'connections_created': pool.num_connections,
+                'requests_sent': pool.num_requests,
+                'idle_connections': idle,
+            })
+        metrics['pools'] = pools
+        return metrics
+
+    def close(self):
+        """세션 및 커넥션 풀 정리"""
+        self.session.close()
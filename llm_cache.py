@@ -0,0 +1,233 @@
+"""
+llm_cache.py - LLM 응답 캐시
+- (모드, 모델, 프롬프트 템플릿 버전, 정규화된 프롬프트, temperature, max_tokens) 해시 기반 키
+- 메모리 LRU 1단계 + SQLite 디스크 2단계
+- TTL 및 디스크 크기 기반 제거
+- 적중/미스 통계
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+from config import Config
+from utils.lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_prompt(prompt):
+    """캐시 키용 프롬프트 정규화 (유니코드 NFC, 공백 압축)"""
+    prompt = unicodedata.normalize('NFC', prompt)
+    return re.sub(r"\s+", " ", prompt).strip()
+
+
+def make_cache_key(mode, model, template_version, prompt, temperature, max_tokens):
+    """LLM 응답 캐시 키 생성"""
+    key_source = json.dumps(
+        [mode, model, template_version, normalize_prompt(prompt), round(float(temperature), 4), int(max_tokens)],
+        ensure_ascii=False
+    )
+    return hashlib.sha256(key_source.encode('utf-8')).hexdigest()
+
+
+class LLMResponseCache:
+    def __init__(self, db_path, memory_entries=256, ttl_seconds=7 * 24 * 3600, max_disk_bytes=200 * 1024 * 1024):
+        """
+        LLM 응답 캐시 초기화
+
+        Parameters:
+        - db_path: SQLite 디스크 캐시 파일 경로 (None이면 메모리 캐시만 사용)
+        - memory_entries: 메모리 LRU 최대 항목 수
+        - ttl_seconds: 항목 만료 시간(초)
+        - max_disk_bytes: 디스크 캐시 최대 크기(바이트)
+        """
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_bytes = max_disk_bytes
+        self.memory = LRUCache(max_entries=memory_entries, ttl=ttl_seconds)
+
+        self._db_lock = threading.Lock()
+        self._conn = None
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'bypassed': 0,
+            'stores': 0,
+            'disk_evictions': 0,
+        }
+
+        if db_path:
+            self._init_db()
+
+    def _init_db(self):
+        """SQLite 디스크 캐시 초기화"""
+        try:
+            db_dir = os.path.dirname(self.db_path)
+            if db_dir:
+                os.makedirs(db_dir, exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_responses (
+                    cache_key TEXT PRIMARY KEY,
+                    response TEXT NOT NULL,
+                    size_bytes INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_responses_access ON llm_responses(last_access)")
+            self._conn.commit()
+            logger.info(f"LLM 응답 디스크 캐시 초기화 완료: {self.db_path}")
+        except Exception as e:
+            logger.error(f"LLM 응답 디스크 캐시 초기화 실패 (메모리 캐시만 사용): {e}")
+            self._conn = None
+
+    def get(self, key):
+        """캐시 조회 (메모리 → 디스크 순)"""
+        value = self.memory.get(key)
+        if value is not None:
+            self._incr('memory_hits')
+            return value
+
+        value = self._disk_get(key)
+        if value is not None:
+            self.memory.set(key, value)
+            self._incr('disk_hits')
+            return value
+
+        self._incr('misses')
+        return None
+
+    def set(self, key, value):
+        """캐시 저장 (메모리 + 디스크)"""
+        self.memory.set(key, value)
+        self._disk_set(key, value)
+        self._incr('stores')
+
+    def record_bypass(self):
+        """재생성 요청으로 캐시 조회를 건너뛴 횟수 기록"""
+        self._incr('bypassed')
+
+    def _disk_get(self, key):
+        if self._conn is None:
+            return None
+        now = time.time()
+        try:
+            with self._db_lock:
+                row = self._conn.execute(
+                    "SELECT response, created_at FROM llm_responses WHERE cache_key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                if row[1] + self.ttl_seconds <= now:
+                    self._conn.execute("DELETE FROM llm_responses WHERE cache_key = ?", (key,))
+                    self._conn.commit()
+                    return None
+                self._conn.execute("UPDATE llm_responses SET last_access = ? WHERE cache_key = ?", (now, key))
+                self._conn.commit()
+                return row[0]
+        except sqlite3.Error as e:
+            logger.warning(f"LLM 응답 디스크 캐시 조회 실패: {e}")
+            return None
+
+    def _disk_set(self, key, value):
+        if self._conn is None:
+            return
+        now = time.time()
+        size = len(value.encode('utf-8'))
+        try:
+            with self._db_lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO llm_responses (cache_key, response, size_bytes, created_at, last_access) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, value, size, now, now)
+                )
+                self._evict_disk(now)
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"LLM 응답 디스크 캐시 저장 실패: {e}")
+
+    def _evict_disk(self, now):
+        """만료 항목 및 크기 상한 초과분 제거 (오래 사용되지 않은 순)"""
+        cursor = self._conn.execute("DELETE FROM llm_responses WHERE created_at <= ?", (now - self.ttl_seconds,))
+        evicted = cursor.rowcount
+
+        total = self._conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM llm_responses").fetchone()[0]
+        if total > self.max_disk_bytes:
+            rows = self._conn.execute("SELECT cache_key, size_bytes FROM llm_responses ORDER BY last_access").fetchall()
+            doomed = []
+            for cache_key, size in rows:
+                if total <= self.max_disk_bytes:
+                    break
+                doomed.append((cache_key,))
+                total -= size
+            self._conn.executemany("DELETE FROM llm_responses WHERE cache_key = ?", doomed)
+            evicted += len(doomed)
+
+        if evicted:
+            self._incr('disk_evictions', evicted)
+
+    def _incr(self, name, amount=1):
+        with self._stats_lock:
+            self._stats[name] += amount
+
+    def get_stats(self):
+        """캐시 통계 반환"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        hits = stats['memory_hits'] + stats['disk_hits']
+        lookups = hits + stats['misses']
+        stats['hit_rate'] = hits / lookups if lookups else 0.0
+        stats['memory'] = self.memory.stats()
+        if self._conn is not None:
+            with self._db_lock:
+                count, size = self._conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM llm_responses"
+                ).fetchone()
+            stats['disk'] = {'entries': count, 'bytes': size}
+        return stats
+
+    def clear(self):
+        """캐시 전체 비우기"""
+        self.memory.clear()
+        if self._conn is not None:
+            with self._db_lock:
+                self._conn.execute("DELETE FROM llm_responses")
+                self._conn.commit()
+
+    def close(self):
+        if self._conn is not None:
+            with self._db_lock:
+                self._conn.close()
+                self._conn = None
+
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """프로세스 공용 LLM 응답 캐시 반환 (비활성화 시 None)"""
+    global _response_cache
+    if not Config.LLM_CACHE_ENABLED:
+        return None
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                _response_cache = LLMResponseCache(
+                    db_path=Config.LLM_CACHE_DB_PATH,
+                    memory_entries=Config.LLM_CACHE_MEMORY_ENTRIES,
+                    ttl_seconds=Config.LLM_CACHE_TTL_SECONDS,
+                    max_disk_bytes=Config.LLM_CACHE_MAX_DISK_MB * 1024 * 1024
+                )
+    return _response_cache
@@ -3,6 +3,7 @@ llm_manager.py - LLM 관련 설정 총괄 파일 (업데이트)
 - 다양한 LLM 모드 지원 (VLLM, API, 오프라인)
 - 모드에 따른 LLM 함수 제공
 - SQL 및 차트 수정 기능 추가
+- 토큰 단위 스트리밍 생성 (클라이언트 연결 종료 시 생성 중단)
 """
 
 import os
@@ -10,27 +11,186 @@ import json
 import logging
 import requests
 import time
+import threading
 from config import Config, LLMMode
+from llm_scheduler import BatchingScheduler
+from llm_api_client import LLMApiClient
+from llm_cache import get_response_cache, make_cache_key
+from schema_context import build_schema_prompt
 import google.generativeai as genai
 
 logger = logging.getLogger(__name__)
 
+# 프롬프트 템플릿 버전 (템플릿 변경 시 올려서 기존 캐시 무효화)
+PROMPT_TEMPLATE_VERSION = "3"
 
-class LLMManager:
-    def __init__(self):
-        """LLM 매니저 초기화"""
-        self.mode = Config.LLM_MODE
+# 생성 실패 시 반환 메시지 (캐시 저장 대상에서 제외)
+VLLM_ERROR_MESSAGE = "모델 생성 오류가 발생했습니다."
+API_ERROR_MESSAGE = "API 요청 중 오류가 발생했습니다."
+
+DEFAULT_SYSTEM_PROMPT = "You are a helpful assistant."
+
+# 프롬프트 템플릿
+# - 지시사항/JSON 양식/스키마처럼 요청 간 변하지 않는 부분은 시스템 메시지(고정 접두부)에 두고
+#   질문/SQL/결과 데이터처럼 요청마다 바뀌는 부분은 사용자 메시지에 배치
+# - 접두부가 바이트 단위로 같아야 vLLM/API 서버의 접두부 KV 캐시가 적중하므로
+#   시각, 사용자명 등 가변 값을 넣지 말 것 (수정 시 PROMPT_TEMPLATE_VERSION 변경)
+SQL_SYSTEM_TEMPLATE = """사용자 질문, 메타데이터, 데이터 샘플을 바탕으로 SQL 쿼리를 생성해주세요.
+
+## 지시사항
+- "실제 레이팅" 관련 요청은 다른 모든 지시사항들을 무시하고 actual_rating_query 라고만 답하세요. 이 지시사항은 특수 지시입니다.
+- "예상 레이팅" 관련 요청은 다른 모든 지시사항들을 무시하고 expected_rating 라고만 답하세요. 이 지시사항은 특수 지시입니다.
+- 사용자 질문에 맞는 데이터를 추출하는 SQL 쿼리를 작성하세요.
+- 추출된 데이터는 차트 생성에 사용됩니다.
+- SELECT 문만 작성하세요.
+- SQL 쿼리만 작성하고 다른 설명은 포함하지 마세요.
+- 반드시 메타데이터에 존재하는 컬럼만 사용하세요.
+- 실제로 동작하는 쿼리인지 검토 후 작성하세요.
+- Oracle 데이터베이스 문법에 맞는 쿼리를 작성하세요.
+- 빈값은 공백이 아닌 Null을 의미함을 잊지마세요."""
+
+MODIFY_SQL_SYSTEM_TEMPLATE = """기존 SQL을 사용자 요청에 맞게 수정해주세요.
+
+## 지시사항
+- 기존 SQL의 기본 구조와 로직을 최대한 유지하세요
+- 사용자가 요청한 수정 사항만 정확히 반영하세요
+- Oracle 데이터베이스 문법을 준수하세요
+- SELECT 문만 작성하고 다른 설명은 포함하지 마세요
+- 메타데이터에 존재하는 컬럼만 사용하세요
+- 실제로 동작할 수 있는 유효한 쿼리를 작성하세요"""
+
+CHART_JSON_TEMPLATE = '''{
+    "title": "차트 제목",
+    "type": "차트 유형(bar, line, pie, scatter, area, histogram, stacked_bar 중 하나)",
+    "description": "차트에 대한 설명",
+    "data": {
+        "labels": ["라벨1", "라벨2", ...],
+        "datasets": [
+        {
+            "label": "데이터셋 라벨",
+            "data": [값1, 값2, ...],
+            "backgroundColor": "색상코드 또는 색상배열"
+        }
+        ]
+    },
+    "options": {
+        "scales": {
+            "y": {
+            "min": "사용자가 지정한 최소값",
+            "max": "사용자가 지정한 최대값"
+            }
+        },
+        "trendLines": [
+        {
+            "type": "linear"
+            "label": "추세선",
+            "color": "#000000"
+        }
+        ],
+        "annotations": [
+        {
+            "x": "2025-Q2"
+            "y": 120000
+            "content": "주석 내용"
+        }
+    }
+}'''
+
+CHART_SYSTEM_TEMPLATE = f"""사용자 질문, 메타데이터, 결과 데이터를 바탕으로 차트 생성을 위한 JSON을 작성해주세요.
+
+## JSON 양식
+{CHART_JSON_TEMPLATE}
+
+## 지시사항
+- 사용자 질문과 결과 데이터에 맞는 최적의 차트 유형을 선택하세요.
+- 차트 JSON은 반드시 JSON 양식을 따라야 합니다.
+- options 항목은 사용자가 관련 요소를 요청한 경우에만 작성합니다.
+- 마크다운 코드 블록이나 다른 형식을 사용하지 말고, 순수한 JSON 형식만 반환하세요.
+- 설명이나 주석 없이 완전한 JSON 형식만 반환하세요.
+- JSON에 함수를 포함하지 마세요."""
+
+MODIFY_CHART_SYSTEM_TEMPLATE = """기존 차트 설정을 사용자 요청에 맞게 수정해주세요.
+
+## 지시사항
+- 기존 차트의 기본 구조와 데이터는 최대한 유지하세요
+- 사용자가 요청한 수정 사항만 정확히 반영하세요
+- 유효한 JSON 형식으로 반환하세요
+- 마크다운이나 설명 없이 순수한 JSON만 반환하세요
+- 색상, 제목, 차트 유형, 스타일 등을 수정할 수 있습니다
+- JSON에 함수나 주석을 포함하지 마세요"""
+
+
+class SharedLLMBackend:
+    """
+    프로세스 단위로 공유되는 LLM 백엔드
+    - vLLM 모델/토크나이저, API 세션 등 무거운 리소스를 모드별로 한 번만 생성
+    - 사용자별 LLMManager는 이 백엔드를 빌려 쓰기만 함
+    """
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, mode):
+        self.mode = mode
         self.llm = None
         self.tokenizer = None
+        self.api_client = None
+        self.scheduler = None
+        # 배칭 미사용 시 vLLM 엔진은 스레드 안전하지 않으므로 생성 호출을 직렬화
+        self.generate_lock = threading.Lock()
 
-        # 모드에 따른 초기화
         if self.mode == LLMMode.VLLM:
             self._init_vllm()
         elif self.mode == LLMMode.API:
             self._init_api()
         # 오프라인 모드는 초기화 필요 없음
 
-        logger.info(f"LLM 매니저 초기화 완료 - 모드: {self.mode.value}")
+    @classmethod
+    def get(cls, mode):
+        """
+        모드에 해당하는 공유 백엔드 반환 (최초 호출 시에만 생성)
+
+        Parameters:
+        - mode: LLMMode
+
+        Returns:
+        - SharedLLMBackend 인스턴스
+        """
+        key = cls._backend_key(mode)
+        backend = cls._instances.get(key)
+        if backend is not None:
+            return backend
+
+        # 모델 로드는 한 번만 수행되어야 하므로 생성 구간 전체를 잠금
+        with cls._instances_lock:
+            backend = cls._instances.get(key)
+            if backend is None:
+                logger.info(f"공유 LLM 백엔드 생성 중 - 모드: {mode.value}")
+                backend = cls(mode)
+                cls._instances[key] = backend
+        return backend
+
+    @staticmethod
+    def _backend_key(mode):
+        """모드/모델 조합별 백엔드 키"""
+        if mode == LLMMode.VLLM:
+            return (mode.value, Config.VLLM_MODEL_NAME)
+        if mode == LLMMode.API:
+            return (mode.value, Config.API_ENDPOINT, Config.API_MODEL)
+        return (mode.value,)
+
+    @classmethod
+    def get_all_metrics(cls):
+        """생성된 모든 공유 백엔드의 지표 반환"""
+        return [backend.get_metrics() for backend in list(cls._instances.values())]
+
+    @classmethod
+    def release_all(cls):
+        """모든 공유 백엔드 해제 (프로세스 종료 시 사용)"""
+        with cls._instances_lock:
+            for backend in cls._instances.values():
+                backend.close()
+            cls._instances.clear()
 
     def _init_vllm(self):
         """VLLM 모드 초기화"""
@@ -51,10 +211,19 @@ class LLMManager:
                 max_model_len=Config.VLLM_MAX_MODEL_LEN,
                 dtype="auto",
                 enforce_eager=False,
-                trust_remote_code=True
+                trust_remote_code=True,
+                enable_prefix_caching=Config.VLLM_ENABLE_PREFIX_CACHING
             )
             logger.info("VLLM 모델 초기화 완료")
 
+            # 여러 요청 스레드의 프롬프트를 한 배치로 묶는 스케줄러
+            if Config.VLLM_ENABLE_BATCHING:
+                self.scheduler = BatchingScheduler(
+                    self.llm.llm_engine,
+                    max_batch_size=Config.VLLM_MAX_BATCH_SIZE,
+                    max_wait_ms=Config.VLLM_BATCH_MAX_WAIT_MS
+                )
+
         except ImportError:
             logger.error("VLLM 모듈을 가져올 수 없습니다. 'pip install vllm transformers' 명령으로 설치하세요.")
             raise
@@ -69,82 +238,198 @@ class LLMManager:
             if not Config.API_KEY:
                 logger.warning("API 키가 설정되지 않았습니다. 환경 변수 'API_KEY'를 설정하거나 Config.API_KEY에 직접 값을 할당하세요.")
 
-            # API 클라이언트 초기화
-            try:
-                API_KEY = os.environ.get("API_KEY", "")
-                API_MODEL = "Qwen3-32B"  # 모델
-                API_ENDPOINT = f"http://dev.assistant.llm.skhynix.com/v1/chat/completions"
-
-                self.api_client = requests.Session()
-                self.api_client.headers.update({
-                    'Authorization': f'Bearer {API_KEY}',
-                    'Content-Type': 'application/json'
-                })
-                logger.info("API 클라이언트 초기화 완료")
-                
-            except Exception as e:
-                logger.error(f"API 클라이언트 설정 에러: {e}")
+            # API 클라이언트 초기화 (keep-alive 커넥션 풀)
+            self.api_client = LLMApiClient(
+                endpoint=Config.API_ENDPOINT,
+                api_key=Config.API_KEY,
+                pool_maxsize=Config.API_POOL_MAXSIZE,
+                connect_timeout=Config.API_CONNECT_TIMEOUT,
+                read_timeout=Config.API_READ_TIMEOUT,
+                max_retries=Config.API_MAX_RETRIES,
+                backoff_base=Config.API_RETRY_BACKOFF_BASE
+            )
+            logger.info(f"API 클라이언트 초기화 완료 - 풀 크기: {Config.API_POOL_MAXSIZE}")
 
-        except ImportError:
-            logger.error("Google Generative AI 모듈을 가져올 수 없습니다. 'pip install google-generativeai' 명령으로 설치하세요.")
-            raise
         except Exception as e:
             logger.error(f"API 초기화 오류: {e}")
             raise
 
-    def generate_text(self, prompt, temperature=0.2, max_tokens=1024):
+    def get_metrics(self):
+        """백엔드 지표 반환 (배칭 스케줄러, API 커넥션 풀)"""
+        metrics = {'mode': self.mode.value}
+        if self.scheduler is not None:
+            metrics['scheduler'] = self.scheduler.get_stats()
+        if self.api_client is not None:
+            metrics['api_client'] = self.api_client.get_metrics()
+        return metrics
+
+    def close(self):
+        """공유 리소스 해제"""
+        if self.scheduler is not None:
+            self.scheduler.shutdown()
+            self.scheduler = None
+        if self.mode == LLMMode.VLLM and self.llm is not None:
+            self.llm = None
+            self.tokenizer = None
+            logger.info("VLLM 리소스 해제 완료")
+        if self.api_client is not None:
+            self.api_client.close()
+            self.api_client = None
+
+
+class LLMManager:
+    def __init__(self):
+        """
+        LLM 매니저 초기화
+        - 모델 등 무거운 리소스는 SharedLLMBackend에서 빌려오고
+          사용자별 상태만 인스턴스에 보관
+        """
+        self.mode = Config.LLM_MODE
+        self.backend = SharedLLMBackend.get(self.mode)
+        self.llm = self.backend.llm
+        self.tokenizer = self.backend.tokenizer
+        self.api_client = self.backend.api_client
+
+        logger.info(f"LLM 매니저 초기화 완료 - 모드: {self.mode.value}")
+
+    def generate_text(self, prompt, temperature=0.2, max_tokens=1024, regenerate=False, system_prompt=None):
         """
         모드에 따라 텍스트 생성
 
         Parameters:
-        - prompt: 프롬프트 문자열
+        - prompt: 프롬프트 문자열 (사용자 메시지)
         - temperature: 생성 온도 (0.0-1.0)
         - max_tokens: 최대 생성 토큰 수
+        - regenerate: True면 캐시를 건너뛰고 새로 생성 (결과는 캐시에 갱신)
+        - system_prompt: 시스템 메시지 (요청 간 고정 접두부, None이면 기본값)
 
         Returns:
         - 생성된 텍스트
         """
+        if self.mode == LLMMode.OFFLINE:
+            return self._generate_offline(prompt)
+
+        system_prompt = system_prompt or DEFAULT_SYSTEM_PROMPT
+        cache, cache_key, cached = self._lookup_cache(prompt, system_prompt, temperature, max_tokens, regenerate)
+        if cached is not None:
+            return cached
+
         if self.mode == LLMMode.VLLM:
-            return self._generate_vllm(prompt, temperature, max_tokens)
+            output = self._generate_vllm(prompt, temperature, max_tokens, system_prompt)
         elif self.mode == LLMMode.API:
-            return self._generate_api(prompt, temperature, max_tokens)
-        elif self.mode == LLMMode.OFFLINE:
-            return self._generate_offline(prompt)
+            output = self._generate_api(prompt, temperature, max_tokens, system_prompt)
+        else:
+            return None
 
-    def _generate_vllm(self, prompt, temperature, max_tokens):
-        """VLLM로 텍스트 생성"""
-        try:
-            from vllm import SamplingParams
+        if cache_key is not None and output and output not in (VLLM_ERROR_MESSAGE, API_ERROR_MESSAGE):
+            cache.set(cache_key, output)
+        return output
 
-            # 메시지 형식으로 변환
-            messages = [
-                {"role": "system", "content": "You are a helpful assistant."},
-                {"role": "user", "content": prompt}
-            ]
+    def stream_text(self, prompt, temperature=0.2, max_tokens=1024, regenerate=False, system_prompt=None):
+        """
+        모드에 따라 텍스트를 생성하면서 조각 단위로 반환하는 제너레이터
 
-            text = self.tokenizer.apply_chat_template(
-                messages,
-                tokenize=False,
-                add_generation_prompt=True,
-                enable_thinking=False
-            )
+        Parameters:
+        - prompt: 프롬프트 문자열 (사용자 메시지)
+        - temperature: 생성 온도 (0.0-1.0)
+        - max_tokens: 최대 생성 토큰 수
+        - regenerate: True면 캐시를 건너뛰고 새로 생성 (결과는 캐시에 갱신)
+        - system_prompt: 시스템 메시지 (요청 간 고정 접두부, None이면 기본값)
 
-            # 샘플링 파라미터 설정
-            sampling_params = SamplingParams(
-                temperature=temperature,
-                top_p=0.95,
-                top_k=30,
-                max_tokens=max_tokens,
-                presence_penalty=0.0,
-                frequency_penalty=0.0
-            )
+        Yields:
+        - 새로 생성된 텍스트 조각
+
+        generate_text와 달리 생성 오류는 예외로 전달됩니다.
+        소비 측이 중간에 제너레이터를 닫으면 vLLM 요청은 취소되고 API 연결은 끊어집니다.
+        """
+        if self.mode == LLMMode.OFFLINE:
+            yield self._generate_offline(prompt)
+            return
+
+        system_prompt = system_prompt or DEFAULT_SYSTEM_PROMPT
+        cache, cache_key, cached = self._lookup_cache(prompt, system_prompt, temperature, max_tokens, regenerate)
+        if cached is not None:
+            yield cached
+            return
+
+        if self.mode == LLMMode.VLLM:
+            if self.backend.scheduler is None:
+                # 배칭 스케줄러 없이는 중간 결과를 받을 수 없으므로 한 번에 반환
+                chunks = iter([self._generate_vllm(prompt, temperature, max_tokens, system_prompt)])
+            else:
+                chunks = self.backend.scheduler.stream(
+                    self._chat_text(prompt, system_prompt), self._sampling_params(temperature, max_tokens)
+                )
+        elif self.mode == LLMMode.API:
+            chunks = self.api_client.stream_chat(self._api_payload(prompt, temperature, max_tokens, system_prompt))
+        else:
+            return
+
+        logger.info("스트리밍 생성 시작")
+        generation_start_time = time.time()
+        pieces = []
+        try:
+            for chunk in chunks:
+                pieces.append(chunk)
+                yield chunk
+        finally:
+            # 정상 종료가 아니면(연결 종료 등) 하위 스트림을 닫아 생성 중단
+            if hasattr(chunks, 'close'):
+                chunks.close()
+
+        output = "".join(pieces)
+        logger.info(f"스트리밍 생성 완료: {time.time() - generation_start_time:.2f}초 소요")
+        if cache_key is not None and output and output not in (VLLM_ERROR_MESSAGE, API_ERROR_MESSAGE):
+            cache.set(cache_key, output)
+
+    def _lookup_cache(self, prompt, system_prompt, temperature, max_tokens, regenerate):
+        """
+        응답 캐시 조회
+
+        Returns:
+        - (캐시, 캐시 키, 캐시된 응답) - 캐시 비활성화 시 (None, None, None)
+        """
+        cache = get_response_cache()
+        if cache is None:
+            return None, None, None
+
+        cache_key = make_cache_key(
+            self.mode.value, self._model_name(), PROMPT_TEMPLATE_VERSION,
+            f"{system_prompt}\n{prompt}", temperature, max_tokens
+        )
+        if regenerate:
+            cache.record_bypass()
+            return cache, cache_key, None
+
+        cached = cache.get(cache_key)
+        if cached is not None:
+            logger.info("LLM 응답 캐시 적중")
+        return cache, cache_key, cached
+
+    def _model_name(self):
+        """현재 모드의 모델 이름"""
+        if self.mode == LLMMode.VLLM:
+            return Config.VLLM_MODEL_NAME
+        if self.mode == LLMMode.API:
+            return Config.API_MODEL
+        return ""
+
+    def _generate_vllm(self, prompt, temperature, max_tokens, system_prompt=DEFAULT_SYSTEM_PROMPT):
+        """VLLM로 텍스트 생성"""
+        try:
+            text = self._chat_text(prompt, system_prompt)
+            sampling_params = self._sampling_params(temperature, max_tokens)
 
             # 생성 시작
             logger.info("텍스트 생성 중...")
             generation_start_time = time.time()
 
-            generations = self.llm.generate(text, sampling_params)
-            output = generations[0].outputs[0].text
+            if self.backend.scheduler is not None:
+                output = self.backend.scheduler.generate(text, sampling_params)
+            else:
+                with self.backend.generate_lock:
+                    generations = self.llm.generate(text, sampling_params)
+                output = generations[0].outputs[0].text
 
             generation_time = time.time() - generation_start_time
             logger.info(f"텍스트 생성 완료: {generation_time:.2f}초 소요")
@@ -153,32 +438,58 @@ class LLMManager:
 
         except Exception as e:
             logger.error(f"VLLM 생성 오류: {e}")
-            return "모델 생성 오류가 발생했습니다."
+            return VLLM_ERROR_MESSAGE
 
-    def _generate_api(self, prompt, temperature, max_tokens):
+    def _chat_text(self, prompt, system_prompt):
+        """vLLM용 채팅 템플릿 적용 (시스템 메시지가 앞에 와야 접두부 캐시 적중)"""
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt}
+        ]
+        return self.tokenizer.apply_chat_template(
+            messages,
+            tokenize=False,
+            add_generation_prompt=True,
+            enable_thinking=False
+        )
+
+    @staticmethod
+    def _sampling_params(temperature, max_tokens):
+        """vLLM 샘플링 파라미터"""
+        from vllm import SamplingParams
+
+        return SamplingParams(
+            temperature=temperature,
+            top_p=0.95,
+            top_k=30,
+            max_tokens=max_tokens,
+            presence_penalty=0.0,
+            frequency_penalty=0.0
+        )
+
+    @staticmethod
+    def _api_payload(prompt, temperature, max_tokens, system_prompt):
+        """chat/completions 요청 본문"""
+        return {
+            "model": Config.API_MODEL,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        }
+
+    def _generate_api(self, prompt, temperature, max_tokens, system_prompt=DEFAULT_SYSTEM_PROMPT):
         """API로 텍스트 생성"""
         try:
-            headers = {
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {Config.API_KEY}"
-            }
-
-            payload = {
-                "model": Config.API_MODEL,
-                "messages": [
-                    {"role": "system", "content": "You are a helpful assistant."},
-                    {"role": "user", "content": prompt}
-                ],
-                "temperature": temperature,
-                "max_tokens": max_tokens
-            }
+            payload = self._api_payload(prompt, temperature, max_tokens, system_prompt)
 
             # API 요청
             logger.info(f"API 요청 중... 엔드포인트: {Config.API_ENDPOINT}")
             generation_start_time = time.time()
 
-            response = requests.post(Config.API_ENDPOINT, headers=headers, json=payload)
-            response.raise_for_status()
+            response = self.api_client.post_chat(payload)
 
             result = response.json()
             output = result.get('choices', [{}])[0].get('message', {}).get('content', '')
@@ -190,7 +501,7 @@ class LLMManager:
 
         except requests.exceptions.RequestException as e:
             logger.error(f"API 요청 오류: {e}")
-            return "API 요청 중 오류가 발생했습니다."
+            return API_ERROR_MESSAGE
 
     def _generate_offline(self, prompt):
         """오프라인 모드에서 템플릿 반환"""
@@ -201,7 +512,18 @@ class LLMManager:
             # 차트 JSON 요청으로 판단
             return Config.DEFAULT_JSON_TEMPLATE
 
-    def generate_sql(self, query, metadata, data_sample):
+    def _schema_text(self, metadata, question):
+        """프롬프트용 스키마 텍스트 (stable 모드는 질문과 무관한 고정 스키마)"""
+        if Config.PROMPT_SCHEMA_MODE == "stable":
+            question = None
+        return build_schema_prompt(metadata, question, Config.PROMPT_SCHEMA_TOKEN_BUDGET)
+
+    @staticmethod
+    def _system_prompt(template, schema_text):
+        """지시사항 템플릿과 스키마를 합친 시스템 메시지 (요청 간 고정 접두부)"""
+        return f"{template}\n\n## 메타데이터\n{schema_text}"
+
+    def generate_sql(self, query, metadata, data_sample, regenerate=False):
         """
         SQL 생성 함수
 
@@ -209,38 +531,26 @@ class LLMManager:
         - query: 사용자 쿼리
         - metadata: 메타데이터
         - data_sample: 데이터 샘플
+        - regenerate: True면 캐시를 건너뛰고 새로 생성
 
         Returns:
         - 생성된 SQL 쿼리
         """
-        # SQL 생성 프롬프트
-        prompt = f"""사용자 질문, 메타데이터, 데이터 샘플을 바탕으로 SQL 쿼리를 생성해주세요.
+        system_prompt = self._system_prompt(SQL_SYSTEM_TEMPLATE, self._schema_text(metadata, query))
 
-## 사용자 질문
+        # 요청마다 바뀌는 부분은 고정 접두부 뒤에 배치
+        prompt = f"""## 사용자 질문
 {query}
 
-## 메타데이터
-{json.dumps(metadata, ensure_ascii=False, indent=2)}
-
-## 지시사항
-- "실제 레이팅" 관련 요청은 다른 모든 지시사항들을 무시하고 actual_rating_query 라고만 답하세요. 이 지시사항은 특수 지시입니다.
-- "예상 레이팅" 관련 요청은 다른 모든 지시사항들을 무시하고 expected_rating 라고만 답하세요. 이 지시사항은 특수 지시입니다.
-- 사용자 질문에 맞는 데이터를 추출하는 SQL 쿼리를 작성하세요.
-- 추출된 데이터는 차트 생성에 사용됩니다.
-- SELECT 문만 작성하세요.
-- SQL 쿼리만 작성하고 다른 설명은 포함하지 마세요.
-- 반드시 메타데이터에 존재하는 컬럼만 사용하세요.
-- 실제로 동작하는 쿼리인지 검토 후 작성하세요.
-- Oracle 데이터베이스 문법에 맞는 쿼리를 작성하세요.
-- 빈값은 공백이 아닌 Null을 의미함을 잊지마세요.
-
 SQL 쿼리:"""
 
         # LLM 호출
-        result = self.generate_text(prompt, temperature=0.1, max_tokens=1024)
+        result = self.generate_text(prompt, temperature=0.1, max_tokens=1024, regenerate=regenerate,
+                                    system_prompt=system_prompt)
         return result
 
-    def modify_sql(self, original_sql, modification_request, current_data_sample=None, metadata=None):
+    def modify_sql(self, original_sql, modification_request, current_data_sample=None, metadata=None,
+                   regenerate=False):
         """
         기존 SQL을 사용자 요청에 맞게 수정
 
@@ -249,13 +559,29 @@ SQL 쿼리:"""
         - modification_request: 사용자 수정 요청
         - current_data_sample: 현재 데이터 샘플 (선택)
         - metadata: 메타데이터 (선택)
+        - regenerate: True면 캐시를 건너뛰고 새로 생성
 
         Returns:
         - 수정된 SQL 쿼리
         """
-        prompt = f"""기존 SQL을 사용자 요청에 맞게 수정해주세요.
+        system_prompt, prompt = self.build_modify_sql_prompt(
+            original_sql, modification_request, current_data_sample, metadata
+        )
+        result = self.generate_text(prompt, temperature=0.1, max_tokens=1024, regenerate=regenerate,
+                                    system_prompt=system_prompt)
+        return result
+
+    def build_modify_sql_prompt(self, original_sql, modification_request, current_data_sample=None, metadata=None):
+        """
+        SQL 수정 프롬프트 생성
 
-## 기존 SQL
+        Returns:
+        - (시스템 메시지, 사용자 메시지)
+        """
+        schema_text = self._schema_text(metadata, f"{modification_request} {original_sql}")
+        system_prompt = self._system_prompt(MODIFY_SQL_SYSTEM_TEMPLATE, schema_text)
+
+        prompt = f"""## 기존 SQL
 {original_sql}
 
 ## 사용자 수정 요청
@@ -264,23 +590,10 @@ SQL 쿼리:"""
 ## 현재 결과 데이터 샘플
 {current_data_sample[:500] if current_data_sample else '데이터 없음'}
 
-## 메타데이터
-{json.dumps(metadata, ensure_ascii=False, indent=2) if metadata else '메타데이터 없음'}
-
-## 지시사항
-- 기존 SQL의 기본 구조와 로직을 최대한 유지하세요
-- 사용자가 요청한 수정 사항만 정확히 반영하세요
-- Oracle 데이터베이스 문법을 준수하세요
-- SELECT 문만 작성하고 다른 설명은 포함하지 마세요
-- 메타데이터에 존재하는 컬럼만 사용하세요
-- 실제로 동작할 수 있는 유효한 쿼리를 작성하세요
-
 수정된 SQL 쿼리:"""
+        return system_prompt, prompt
 
-        result = self.generate_text(prompt, temperature=0.1, max_tokens=1024)
-        return result
-
-    def generate_chart_json(self, query, metadata, result_data):
+    def generate_chart_json(self, query, metadata, result_data, regenerate=False):
         """
         차트 JSON 생성 함수
 
@@ -288,75 +601,50 @@ SQL 쿼리:"""
         - query: 사용자 쿼리
         - metadata: 메타데이터
         - result_data: SQL 실행 결과 데이터
+        - regenerate: True면 캐시를 건너뛰고 새로 생성
 
         Returns:
         - 생성된 차트 JSON
         """
-        json_template = '''{
-    "title": "차트 제목",
-    "type": "차트 유형(bar, line, pie, scatter, area, histogram, stacked_bar 중 하나)",
-    "description": "차트에 대한 설명",
-    "data": {
-        "labels": ["라벨1", "라벨2", ...],
-        "datasets": [
-        {
-            "label": "데이터셋 라벨",
-            "data": [값1, 값2, ...],
-            "backgroundColor": "색상코드 또는 색상배열"
-        }
-        ]
-    },
-    "options": {
-        "scales": {
-            "y": {
-            "min": "사용자가 지정한 최소값",
-            "max": "사용자가 지정한 최대값"
-            }
-        },
-        "trendLines": [
-        {
-            "type": "linear"
-            "label": "추세선",
-            "color": "#000000"
-        }
-        ],
-        "annotations": [
-        {
-            "x": "2025-Q2"
-            "y": 120000
-            "content": "주석 내용"
-        }
-    }
-}'''
+        system_prompt, prompt = self.build_chart_json_prompt(query, metadata, result_data)
 
-        # 차트 JSON 생성 프롬프트
-        prompt = f"""사용자 질문, 메타데이터, 결과 데이터를 바탕으로 차트 생성을 위한 JSON을 작성해주세요.
+        # LLM 호출
+        result = self.generate_text(prompt, temperature=0.2, max_tokens=2048, regenerate=regenerate,
+                                    system_prompt=system_prompt)
+        return self.parse_chart_json(result)
 
-## 사용자 질문
-{query}
+    def build_chart_json_prompt(self, query, metadata, result_data):
+        """
+        차트 JSON 생성 프롬프트 생성
 
-## 메타데이터
-{json.dumps(metadata, ensure_ascii=False, indent=2)}
+        Returns:
+        - (시스템 메시지, 사용자 메시지)
+        """
+        # 결과 컬럼명도 관련 스키마 판단에 사용 (relevant 모드)
+        result_header = str(result_data).split("\n", 1)[0] if result_data is not None else ""
+        schema_text = self._schema_text(metadata, f"{query} {result_header}")
+        system_prompt = self._system_prompt(CHART_SYSTEM_TEMPLATE, schema_text)
+
+        # 요청마다 바뀌는 부분은 고정 접두부 뒤에 배치
+        prompt = f"""## 사용자 질문
+{query}
 
 ## 결과 데이터
 {result_data}
 
-## JSON 양식
-{json_template}
-
-## 지시사항
-- 사용자 질문과 결과 데이터에 맞는 최적의 차트 유형을 선택하세요.
-- 차트 JSON은 반드시 JSON 양식을 따라야 합니다.
-- options 항목은 사용자가 관련 요소를 요청한 경우에만 작성합니다.
-- 마크다운 코드 블록이나 다른 형식을 사용하지 말고, 순수한 JSON 형식만 반환하세요.
-- 설명이나 주석 없이 완전한 JSON 형식만 반환하세요.
-- JSON에 함수를 포함하지 마세요.
-
 차트 JSON:"""
+        return system_prompt, prompt
 
-        # LLM 호출
-        result = self.generate_text(prompt, temperature=0.2, max_tokens=2048)
+    def parse_chart_json(self, result):
+        """
+        LLM 응답에서 차트 JSON 추출 (실패 시 기본 템플릿)
+
+        Parameters:
+        - result: LLM 생성 텍스트
 
+        Returns:
+        - 차트 JSON (dict)
+        """
         # JSON 추출 시도
         try:
             # 마크다운 코드 블록 제거
@@ -391,7 +679,7 @@ SQL 쿼리:"""
         # 오류 발생 시 기본 JSON 반환
         return json.loads(Config.DEFAULT_JSON_TEMPLATE)
 
-    def modify_chart_json(self, original_json, modification_request, result_data=None):
+    def modify_chart_json(self, original_json, modification_request, result_data=None, regenerate=False):
         """
         기존 차트 JSON을 사용자 요청에 맞게 수정
 
@@ -399,6 +687,7 @@ SQL 쿼리:"""
         - original_json: 원본 차트 JSON (dict 또는 str)
         - modification_request: 사용자 수정 요청
         - result_data: 결과 데이터 (선택)
+        - regenerate: True면 캐시를 건너뛰고 새로 생성
 
         Returns:
         - 수정된 차트 JSON (dict)
@@ -411,9 +700,7 @@ SQL 쿼리:"""
                 logger.error("원본 JSON 파싱 실패")
                 return json.loads(Config.DEFAULT_JSON_TEMPLATE)
 
-        prompt = f"""기존 차트 설정을 사용자 요청에 맞게 수정해주세요.
-
-## 기존 차트 JSON
+        prompt = f"""## 기존 차트 JSON
 {json.dumps(original_json, ensure_ascii=False, indent=2)}
 
 ## 사용자 수정 요청
@@ -422,17 +709,10 @@ SQL 쿼리:"""
 ## 결과 데이터 (참고용)
 {str(result_data)[:300] if result_data else '데이터 없음'}
 
-## 지시사항
-- 기존 차트의 기본 구조와 데이터는 최대한 유지하세요
-- 사용자가 요청한 수정 사항만 정확히 반영하세요
-- 유효한 JSON 형식으로 반환하세요
-- 마크다운이나 설명 없이 순수한 JSON만 반환하세요
-- 색상, 제목, 차트 유형, 스타일 등을 수정할 수 있습니다
-- JSON에 함수나 주석을 포함하지 마세요
-
 수정된 차트 JSON:"""
 
-        result = self.generate_text(prompt, temperature=0.2, max_tokens=2048)
+        result = self.generate_text(prompt, temperature=0.2, max_tokens=2048, regenerate=regenerate,
+                                    system_prompt=MODIFY_CHART_SYSTEM_TEMPLATE)
 
         # JSON 추출 및 파싱
         try:
@@ -461,11 +741,13 @@ SQL 쿼리:"""
             return original_json
 
     def close(self):
-        """리소스 정리"""
-        if self.mode == LLMMode.VLLM and self.llm is not None:
-            # vLLM 리소스 정리
-            self.llm = None
-            self.tokenizer = None
-            logger.info("VLLM 리소스 해제 완료")
+        """
+        리소스 정리
+        - 공유 백엔드는 다른 사용자도 사용 중이므로 참조만 해제
+        """
+        self.llm = None
+        self.tokenizer = None
+        self.api_client = None
+        self.backend = None
 
-        logger.info("LLM 매니저 리소스 정리 완료")
\ No newline at end of file
+        logger.info("LLM 매니저 리소스 정리 완료")
@@ -0,0 +1,284 @@
+"""
+llm_scheduler.py - vLLM 연속 배칭 스케줄러
+- 여러 요청 스레드의 프롬프트를 모아 하나의 엔진 배치로 처리
+- 엔진 스텝 루프를 전담 스레드에서 실행 (continuous batching)
+- 각 요청은 Future로 결과를 돌려받음
+- 스트리밍 요청은 스텝마다 새로 생성된 텍스트 조각을 큐로 전달
+"""
+
+import itertools
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError, TimeoutError as FutureTimeoutError
+
+logger = logging.getLogger(__name__)
+
+# 스트리밍 종료 표시
+_STREAM_END = object()
+
+
+class GenerationRequest:
+    """스케줄러에 제출된 단일 생성 요청"""
+
+    def __init__(self, request_id, prompt, sampling_params, stream=False):
+        self.request_id = request_id
+        self.prompt = prompt
+        self.sampling_params = sampling_params
+        self.future = Future()
+        self.submitted_at = time.time()
+        # 스트리밍 요청: 새로 생성된 텍스트 조각 큐 및 이미 전달한 길이
+        self.stream_queue = queue.Queue() if stream else None
+        self.streamed_chars = 0
+
+
+class BatchingScheduler:
+    """
+    vLLM LLMEngine 앞단의 연속 배칭 스케줄러
+
+    엔진은 add_request / step / abort_request
+    인터페이스를 제공해야 합니다. (vLLM의 ``LLM.llm_engine``)
+    """
+
+    def __init__(self, engine, max_batch_size=32, max_wait_ms=10):
+        """
+        Parameters:
+        - engine: vLLM LLMEngine 호환 엔진
+        - max_batch_size: 엔진에서 동시에 처리할 최대 요청 수
+        - max_wait_ms: 유휴 상태에서 첫 요청 도착 후 배치를 모으는 최대 대기 시간
+        """
+        self.engine = engine
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._pending = queue.Queue()
+        self._active = {}
+        self._ids = itertools.count()
+        self._stop_event = threading.Event()
+
+        # 통계
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'cancelled': 0,
+            'steps': 0,
+            'batched_sequences': 0,
+            'generated_tokens': 0,
+        }
+
+        self._thread = threading.Thread(target=self._run, name="llm-batching-scheduler", daemon=True)
+        self._thread.start()
+        logger.info(f"배칭 스케줄러 시작 - 최대 배치: {max_batch_size}, 최대 대기: {max_wait_ms}ms")
+
+    def submit(self, prompt, sampling_params, stream=False):
+        """
+        생성 요청 제출
+
+        Parameters:
+        - prompt: 채팅 템플릿이 적용된 프롬프트 문자열
+        - sampling_params: vLLM SamplingParams
+        - stream: True면 생성 중간 텍스트를 stream_queue로 전달
+
+        Returns:
+        - GenerationRequest (future 속성으로 결과 대기)
+        """
+        if self._stop_event.is_set():
+            raise RuntimeError("배칭 스케줄러가 종료되었습니다.")
+
+        request = GenerationRequest(f"req-{next(self._ids)}", prompt, sampling_params, stream=stream)
+        self._pending.put(request)
+        with self._stats_lock:
+            self._stats['submitted'] += 1
+        return request
+
+    def generate(self, prompt, sampling_params, timeout=None):
+        """
+        요청을 제출하고 생성 결과 텍스트를 기다려 반환
+        - 대기 시간을 넘기면 요청을 취소해 엔진 배치 자리를 반납한 뒤 TimeoutError 전달
+        """
+        request = self.submit(prompt, sampling_params)
+        try:
+            return request.future.result(timeout=timeout)
+        except FutureTimeoutError:
+            self.cancel(request)
+            raise
+
+    def stream(self, prompt, sampling_params, timeout=None):
+        """
+        요청을 제출하고 생성되는 텍스트 조각을 순서대로 반환하는 제너레이터
+
+        Parameters:
+        - prompt: 채팅 템플릿이 적용된 프롬프트 문자열
+        - sampling_params: vLLM SamplingParams
+        - timeout: 다음 조각을 기다리는 최대 시간(초)
+
+        소비 측이 끝까지 읽지 않고 제너레이터를 닫으면(클라이언트 연결 종료 등)
+        요청을 취소하고 엔진에서도 중단합니다.
+        """
+        request = self.submit(prompt, sampling_params, stream=True)
+        try:
+            while True:
+                try:
+                    chunk = request.stream_queue.get(timeout=timeout)
+                except queue.Empty:
+                    raise TimeoutError(f"생성 응답 대기 시간 초과 ({request.request_id})")
+                if chunk is _STREAM_END:
+                    break
+                yield chunk
+            # 실패로 끝난 경우 예외 전달
+            request.future.result()
+        finally:
+            if not request.future.done():
+                self.cancel(request)
+
+    def cancel(self, request):
+        """요청 취소 - 엔진에서 실행 중이면 다음 스텝에서 중단"""
+        if request.future.cancel():
+            with self._stats_lock:
+                self._stats['cancelled'] += 1
+            logger.info(f"생성 요청 취소: {request.request_id}")
+            return True
+        return False
+
+    def get_stats(self):
+        """스케줄러 통계 반환"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['pending'] = self._pending.qsize()
+        stats['active'] = len(self._active)
+        stats['avg_batch_size'] = (
+            stats['batched_sequences'] / stats['steps'] if stats['steps'] else 0.0
+        )
+        return stats
+
+    def shutdown(self, timeout=5.0):
+        """스케줄러 종료 - 처리되지 않은 요청은 실패 처리"""
+        self._stop_event.set()
+        self._thread.join(timeout=timeout)
+
+        error = RuntimeError("배칭 스케줄러가 종료되었습니다.")
+        for request in list(self._active.values()):
+            self._fail(request, error)
+        self._active.clear()
+        while True:
+            try:
+                self._fail(self._pending.get_nowait(), error)
+            except queue.Empty:
+                break
+        logger.info("배칭 스케줄러 종료")
+
+    def _run(self):
+        """엔진 스텝 루프"""
+        while not self._stop_event.is_set():
+            try:
+                self._admit_requests()
+                if not self._active:
+                    continue
+
+                outputs = self.engine.step()
+                with self._stats_lock:
+                    self._stats['steps'] += 1
+                    self._stats['batched_sequences'] += len(self._active)
+
+                for output in outputs:
+                    self._handle_output(output)
+
+            except Exception as e:
+                logger.error(f"배칭 스케줄러 엔진 오류: {e}")
+                for request_id, request in list(self._active.items()):
+                    self._abort_in_engine(request_id)
+                    self._fail(request, e)
+                self._active.clear()
+
+    def _admit_requests(self):
+        """대기 중인 요청을 엔진 여유 용량만큼 투입"""
+        capacity = self.max_batch_size - len(self._active)
+        if capacity <= 0:
+            return 0
+
+        batch = []
+        if not self._active:
+            # 유휴 상태: 첫 요청을 기다린 뒤 max_wait 동안 배치를 모음
+            try:
+                batch.append(self._pending.get(timeout=0.1))
+            except queue.Empty:
+                return 0
+            deadline = time.time() + self.max_wait
+            while len(batch) < capacity:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._pending.get(timeout=remaining))
+                except queue.Empty:
+                    break
+        else:
+            # 실행 중: 기다리지 않고 들어온 요청만 즉시 합류
+            while len(batch) < capacity:
+                try:
+                    batch.append(self._pending.get_nowait())
+                except queue.Empty:
+                    break
+
+        for request in batch:
+            if request.future.cancelled():
+                continue
+            try:
+                self.engine.add_request(request.request_id, request.prompt, request.sampling_params)
+                self._active[request.request_id] = request
+            except Exception as e:
+                logger.error(f"엔진 요청 등록 실패 ({request.request_id}): {e}")
+                self._fail(request, e)
+        return len(batch)
+
+    def _handle_output(self, output):
+        """엔진 스텝 결과 처리"""
+        request = self._active.get(output.request_id)
+        if request is None:
+            return
+
+        if request.future.cancelled():
+            self._abort_in_engine(output.request_id)
+            self._active.pop(output.request_id, None)
+            return
+
+        completion = output.outputs[0]
+        if request.stream_queue is not None:
+            # 엔진 출력은 누적 텍스트이므로 새로 생긴 부분만 전달
+            delta = completion.text[request.streamed_chars:]
+            if delta:
+                request.streamed_chars = len(completion.text)
+                request.stream_queue.put(delta)
+
+        if output.finished:
+            self._active.pop(output.request_id, None)
+            with self._stats_lock:
+                self._stats['completed'] += 1
+                self._stats['generated_tokens'] += len(getattr(completion, 'token_ids', None) or [])
+            try:
+                request.future.set_result(completion.text)
+            except InvalidStateError:
+                # 호출 측에서 이미 취소한 요청
+                pass
+            if request.stream_queue is not None:
+                request.stream_queue.put(_STREAM_END)
+
+    def _abort_in_engine(self, request_id):
+        try:
+            self.engine.abort_request(request_id)
+        except Exception as e:
+            logger.warning(f"엔진 요청 중단 실패 ({request_id}): {e}")
+
+    def _fail(self, request, error):
+        with self._stats_lock:
+            self._stats['failed'] += 1
+        if not request.future.done():
+            try:
+                request.future.set_exception(error)
+            except InvalidStateError:
+                pass
+        if request.stream_queue is not None:
+            request.stream_queue.put(_STREAM_END)
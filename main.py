@@ -31,6 +31,17 @@ from config import Config, LLMMode, set_llm_mode
 from llm_manager import LLMManager
 from data_manager import DataManager
 from chart_generator import ChartGenerator
+from result_store import get_result_store
+
+
+def _object_size(obj):
+    """dict/list/str 등으로 구성된 객체의 대략적인 메모리 크기(바이트)"""
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_object_size(key) + _object_size(value) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set)):
+        size += sum(_object_size(item) for item in obj)
+    return size
 
 
 class ChartGenerationApp:
@@ -191,26 +202,44 @@ class ChartGenerationApp:
         except Exception as e:
             logger.error(f"SQL 결과 저장 오류: {e}")
 
-    def chart_process_request(self, query, chart_request, result_df, sql_query, username):
+    def chart_process_request(self, query, chart_request, result_df, sql_query, username, regenerate=False,
+                              chart_json=None, on_stage=None, render_mode="server"):
         """
         차트 생성 처리
         Parameters:
         - chart_request: 사용자의 차트 생성 요청 (자연어)
         - result_df: SQL 실행 결과 데이터
         - sql_query: 생성된 SQL 쿼리
+        - regenerate: True면 LLM 응답 캐시를 건너뛰고 새로 생성
+        - chart_json: 이미 생성된 차트 JSON (스트리밍 생성 등, 주어지면 LLM 호출 생략)
+        - on_stage: 단계 시작 시 단계 이름으로 호출되는 콜백 (작업 큐 진행 상황/취소 확인용)
+        - render_mode: server(서버에서 PNG 렌더링) 또는 client(정규화된 차트 명세만 반환, PNG는 필요 시 생성)
         Returns:
         - result: 차트 처리 결과 딕셔너리
         """
         logger.info(f"차트 처리 시작: '{chart_request}'")
+        on_stage = on_stage or (lambda stage: None)
         try:
             # 3. 차트 JSON 생성 (2번 LLM)
             print(f"시작지점 유저이름: {username}")
-            chart_json = self.chart_generator.generate_chart_json(
-                chart_request, self.data_manager.metadata, result_df
-            )
+            on_stage('chart_json')
+            if chart_json is None:
+                chart_json = self.chart_generator.generate_chart_json(
+                    chart_request, self.data_manager.metadata, result_df, regenerate=regenerate
+                )
+            else:
+                chart_json = self.chart_generator._validate_chart_json(chart_json, result_df)
             
             # 4. 차트 생성
-            chart_path, chart_base64 = self.chart_generator.create_chart(chart_json, result_df)
+            on_stage('render')
+            render_timings = {}
+            chart_spec = None
+            if render_mode == "client":
+                # 브라우저에서 렌더링하므로 래스터화 생략
+                chart_path, chart_base64 = None, None
+                chart_spec = self.chart_generator.prepare_client_spec(chart_json, result_df)
+            else:
+                chart_path, chart_base64 = self.chart_generator.create_chart(chart_json, result_df, render_timings)
             
             # 5. 차트 설명 생성
             description = chart_json.get("description") or self.chart_generator.generate_description(
@@ -220,6 +249,7 @@ class ChartGenerationApp:
             sql_request = query
             
             # 6. 결과 저장
+            on_stage('save')
             results_path = self.save_results(sql_request, chart_request, sql_query, result_df, chart_json, chart_path, username)
             
             # 7. 결과 반환
@@ -230,7 +260,10 @@ class ChartGenerationApp:
                 'chart_path': chart_path,
                 'chart_base64': chart_base64,
                 'description': description,
-                'results_path': results_path
+                'results_path': results_path,
+                'render_timings': render_timings,
+                'render_mode': render_mode,
+                'chart_spec': chart_spec
             }
             logger.info("차트 처리 완료")
             return result
@@ -286,12 +319,17 @@ class ChartGenerationApp:
                 json.dump(chart_json, f, ensure_ascii=False, indent=2)
 
             # 4. 차트 이미지 복사 (기존 + 백업)
+            # 클라이언트 렌더링이면 이미지는 히스토리에서 처음 열 때 생성
             import shutil
-            chart_filename = os.path.basename(chart_path)
-            chart_copy_path = os.path.join(results_dir, chart_filename)
-            chart_backup_copy_path = os.path.join(backup_dir, chart_filename)
-            shutil.copy2(chart_path, chart_copy_path)
-            shutil.copy2(chart_path, chart_backup_copy_path)
+            chart_copy_path = None
+            if chart_path:
+                # 차트 파일은 백그라운드에서 기록될 수 있으므로 복사 전 완료 대기
+                self.chart_generator.wait_for_file(chart_path)
+                chart_filename = os.path.basename(chart_path)
+                chart_copy_path = os.path.join(results_dir, chart_filename)
+                chart_backup_copy_path = os.path.join(backup_dir, chart_filename)
+                shutil.copy2(chart_path, chart_copy_path)
+                shutil.copy2(chart_path, chart_backup_copy_path)
 
             # 5. 정보 파일 생성 (기존 + 백업)
             info = {
@@ -303,7 +341,8 @@ class ChartGenerationApp:
                 "result_data_path": result_data_path,
                 "chart_json_path": chart_json_path,
                 "chart_path": chart_copy_path,
-                "original_chart_path": chart_path
+                "original_chart_path": chart_path,
+                "chart_render": "server" if chart_path else "deferred"
             }
             info_path = os.path.join(results_dir, "info.json")
             info_backup_path = os.path.join(backup_dir, "info.json")
@@ -332,6 +371,24 @@ class ChartGenerationApp:
 
         logger.info("모든 리소스가 정리되었습니다.")
 
+    def estimate_memory(self):
+        """
+        사용자별 앱의 추정 메모리(바이트)
+        - 사용자가 보관 중인 SQL 결과(결과 보관소) 크기
+        - 앱이 따로 가진 CSV DataFrame/메타데이터 크기 (공유 LLM 백엔드/커넥션 풀은 제외)
+        - 데이터 카탈로그에서 공유하는 CSV/메타데이터는 제외 (/stats/apps의 data_catalog에 집계)
+        """
+        total = get_result_store().user_bytes(self.username) if self.username else 0
+        if getattr(self.data_manager, 'shares_catalog_data', False):
+            return total
+        df = getattr(self.data_manager, 'df', None)
+        if isinstance(df, pd.DataFrame):
+            total += int(df.memory_usage(index=True, deep=True).sum())
+        metadata = getattr(self.data_manager, 'metadata', None)
+        if metadata is not None:
+            total += _object_size(metadata)
+        return total
+
 
 def parse_arguments():
     """명령줄 인수 파싱"""
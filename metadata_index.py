@@ -0,0 +1,238 @@
+"""
+metadata_index.py - 메타데이터 색인
+- metadata.json의 tables[].columns[] 목록을 로드 시 한 번 색인 (이후 조회는 dict 조회)
+- 테이블명 → 테이블, (테이블, 컬럼명) → 컬럼, 컬럼명 → 포함 테이블, 한글명 → 테이블/컬럼 역색인
+- 테이블별 키(PK) 컬럼, 컬럼별 코드 사전(customer_mapping 등 *_mapping 필드)
+- 코드 사전으로 코드→이름 CASE 식 생성 (미리 정의된 쿼리 등)
+"""
+
+import logging
+import re
+import threading
+
+logger = logging.getLogger(__name__)
+
+_MAPPING_SUFFIX = '_mapping'
+
+
+def _normalize_korean(name):
+    """한글명 조회 키 (공백 제거, 영문 소문자)"""
+    return re.sub(r"\s+", "", str(name or "")).lower()
+
+
+def _normalize_identifier(name):
+    """식별자 조회 키 (따옴표/스키마 접두어 제거, 대문자)"""
+    name = str(name or "").strip().strip('"')
+    return name.split(".")[-1].strip('"').upper()
+
+
+def _sql_literal(value):
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+class ColumnInfo:
+    __slots__ = ('table', 'name', 'korean_name', 'data_type', 'length', 'key_type', 'is_key',
+                 'description', 'sample', 'codes', 'raw')
+
+    def __init__(self, table, column):
+        self.table = table
+        self.name = _normalize_identifier(column.get('column_name'))
+        self.korean_name = column.get('column_korean_name') or ''
+        self.data_type = column.get('data_type')
+        self.length = column.get('length')
+        self.key_type = column.get('key_type') or ''
+        self.is_key = str(self.key_type).startswith('PK')
+        self.description = column.get('description') or ''
+        self.sample = column.get('data_sample')
+        # 코드 사전 (예: customer_mapping - 고객 코드 → 고객명)
+        codes = {}
+        for key, value in column.items():
+            if key.endswith(_MAPPING_SUFFIX) and isinstance(value, dict):
+                codes.update(value)
+        self.codes = codes or None
+        self.raw = column
+
+    def to_dict(self):
+        return {
+            'table': self.table,
+            'column': self.name,
+            'korean_name': self.korean_name,
+            'data_type': self.data_type,
+            'length': self.length,
+            'is_key': self.is_key,
+            'description': self.description,
+            'has_codes': self.codes is not None,
+        }
+
+
+class TableInfo:
+    __slots__ = ('name', 'korean_name', 'database', 'description', 'columns', 'key_columns', 'raw')
+
+    def __init__(self, table):
+        self.name = _normalize_identifier(table.get('table_name'))
+        self.korean_name = table.get('table_korean_name') or ''
+        self.database = table.get('database_name')
+        self.description = table.get('description') or ''
+        self.columns = {}
+        for column in table.get('columns', []):
+            info = ColumnInfo(self.name, column)
+            if info.name:
+                self.columns[info.name] = info
+        self.key_columns = tuple(name for name, info in self.columns.items() if info.is_key)
+        self.raw = table
+
+    def to_dict(self):
+        return {
+            'table': self.name,
+            'korean_name': self.korean_name,
+            'database': self.database,
+            'description': self.description,
+            'key_columns': list(self.key_columns),
+            'columns': [column.to_dict() for column in self.columns.values()],
+        }
+
+
+class MetadataIndex:
+    """메타데이터 하나에 대한 테이블/컬럼/한글명/코드 색인"""
+
+    def __init__(self, metadata):
+        self.tables = {}
+        self.special_metrics = {}
+        self._column_tables = {}
+        self._korean = {}
+        self._codes = {}
+
+        for table in (metadata or {}).get('tables', []):
+            if 'ratings' in table:
+                self.special_metrics.update(table['ratings'])
+                continue
+            if 'table_name' not in table:
+                continue
+            info = TableInfo(table)
+            self.tables[info.name] = info
+            self._add_korean(info.korean_name, info)
+            for column in info.columns.values():
+                self._column_tables.setdefault(column.name, []).append(info.name)
+                self._add_korean(column.korean_name, column)
+                if column.codes:
+                    self._codes.setdefault(column.name, {}).update(column.codes)
+
+        self.column_count = sum(len(table.columns) for table in self.tables.values())
+        logger.info(f"메타데이터 색인 완료: 테이블 {len(self.tables)}개, 컬럼 {self.column_count}개, "
+                    f"코드 사전 {len(self._codes)}개")
+
+    def _add_korean(self, korean_name, target):
+        key = _normalize_korean(korean_name)
+        if key:
+            self._korean.setdefault(key, []).append(target)
+
+    def table(self, name):
+        """테이블 조회 (스키마 접두어/대소문자 무시, 없으면 None)"""
+        return self.tables.get(_normalize_identifier(name))
+
+    def column(self, table_name, column_name):
+        """(테이블, 컬럼) 조회 (없으면 None)"""
+        table = self.table(table_name)
+        if table is None:
+            return None
+        return table.columns.get(_normalize_identifier(column_name))
+
+    def has_column(self, table_name, column_name):
+        return self.column(table_name, column_name) is not None
+
+    def tables_with_column(self, column_name):
+        """컬럼을 가진 테이블명 목록"""
+        return list(self._column_tables.get(_normalize_identifier(column_name), ()))
+
+    def key_columns(self, table_name):
+        """테이블의 키(PK) 컬럼명 목록"""
+        table = self.table(table_name)
+        return list(table.key_columns) if table is not None else []
+
+    def find_korean(self, korean_name):
+        """한글명으로 테이블/컬럼 조회 (공백 무시, 정확히 일치)"""
+        return list(self._korean.get(_normalize_korean(korean_name), ()))
+
+    def search(self, text, limit=20):
+        """
+        이름/한글명 부분 일치 검색 (UI 메타데이터 검색용)
+
+        Returns:
+        - TableInfo/ColumnInfo 목록 (정확히 일치하는 항목 먼저)
+        """
+        key = _normalize_korean(text)
+        if not key:
+            return []
+        exact = self.find_korean(text)
+        identifier = _normalize_identifier(text)
+        if identifier in self.tables:
+            exact.append(self.tables[identifier])
+        for table_name in self._column_tables.get(identifier, ()):
+            exact.append(self.tables[table_name].columns[identifier])
+
+        results = list(dict.fromkeys(exact))
+        for table in self.tables.values():
+            candidates = [table] + list(table.columns.values())
+            for item in candidates:
+                if len(results) >= limit:
+                    return results
+                if item in results:
+                    continue
+                if key in _normalize_korean(item.korean_name) or key in item.name.lower():
+                    results.append(item)
+        return results[:limit]
+
+    def code_dictionary(self, column_name):
+        """컬럼의 코드 사전 {코드: 이름} (없으면 빈 dict)"""
+        return dict(self._codes.get(_normalize_identifier(column_name), {}))
+
+    def code_name(self, column_name, code):
+        """코드 이름 (사전에 없으면 코드 그대로)"""
+        return self._codes.get(_normalize_identifier(column_name), {}).get(code, code)
+
+    def case_expression(self, expression, column_name):
+        """
+        코드 사전으로 코드 → 이름 CASE 식 생성
+
+        Parameters:
+        - expression: SQL에서 코드 값을 나타내는 식 (예: r.HIQ1_CUST_CD)
+        - column_name: 코드 사전을 찾을 컬럼명
+
+        Returns:
+        - CASE 식 (사전이 없으면 expression 그대로)
+        """
+        codes = self._codes.get(_normalize_identifier(column_name))
+        if not codes:
+            return expression
+        whens = " ".join(f"WHEN {_sql_literal(code)} THEN {_sql_literal(name)}" for code, name in codes.items())
+        return f"CASE {expression} {whens} ELSE {expression} END"
+
+    def get_stats(self):
+        return {
+            'tables': len(self.tables),
+            'columns': self.column_count,
+            'korean_names': len(self._korean),
+            'code_dictionaries': {name: len(codes) for name, codes in self._codes.items()},
+            'special_metrics': list(self.special_metrics),
+        }
+
+
+_index_cache = {}
+_index_cache_lock = threading.Lock()
+
+
+def get_metadata_index(metadata):
+    """메타데이터별 MetadataIndex 반환 (같은 메타데이터 객체는 재사용)"""
+    key = id(metadata)
+    with _index_cache_lock:
+        cached = _index_cache.get(key)
+        if cached is not None and cached[0] is metadata:
+            return cached[1]
+
+    index = MetadataIndex(metadata)
+    with _index_cache_lock:
+        # 메타데이터 객체는 프로세스 내 소수이므로 단순 상한만 둠
+        if len(_index_cache) >= 32:
+            _index_cache.clear()
+        _index_cache[key] = (metadata, index)
+    return index
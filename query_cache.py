@@ -0,0 +1,279 @@
+"""
+query_cache.py - SQL 결과 캐시
+- 정규화된 SQL(주석/공백/키워드 대소문자 정리, 문자열 리터럴은 그대로) 해시 기반 키
+- 참조 테이블별 TTL (가장 짧은 값 적용), 테이블/SQL 단위 명시적 무효화
+- 같은 SQL이 동시에 요청되면 DB에는 한 번만 실행하고 나머지는 결과를 기다림 (single-flight)
+- DataFrame 메모리 크기 기준 LRU, 쿼리 형태(리터럴 제외)별 적중률/절약한 DB 시간 통계
+"""
+
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from config import Config
+from utils.lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# 문자열 리터럴 / 따옴표 식별자 (대소문자와 내용 보존)
+_QUOTED_PATTERN = re.compile(r"('(?:[^']|'')*'|\"[^\"]*\")")
+_COMMENT_PATTERN = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+_PUNCTUATION_SPACE_PATTERN = re.compile(r"\s*([(),=<>+\-*/|;])\s*")
+_NUMBER_PATTERN = re.compile(r"(?<![\w$#])\d+(?:\.\d+)?(?![\w$#])")
+_TABLE_LIST_PATTERN = re.compile(r"\b(?:FROM|JOIN)\s+([\w$#.]+(?:\s+[\w$#]+)?(?:\s*,\s*[\w$#.]+(?:\s+[\w$#]+)?)*)")
+_TABLE_STOPWORDS = {'WHERE', 'GROUP', 'ORDER', 'ON', 'LEFT', 'RIGHT', 'INNER', 'OUTER', 'FULL', 'CROSS', 'JOIN',
+                    'UNION', 'CONNECT', 'START', 'FETCH', 'OFFSET', 'HAVING'}
+
+# 쿼리 형태별 통계 최대 개수
+MAX_QUERY_STATS = 500
+
+
+def normalize_sql(sql_query):
+    """
+    캐시 키용 SQL 정규화
+    - 리터럴 밖의 주석 제거, 공백 압축, 대문자 변환, 구두점 주변 공백 제거, 끝 세미콜론 제거
+    - 문자열 리터럴/따옴표 식별자는 결과가 달라질 수 있으므로 그대로 유지
+    """
+    parts = _QUOTED_PATTERN.split(sql_query)
+    for i in range(0, len(parts), 2):
+        part = _COMMENT_PATTERN.sub(" ", parts[i])
+        part = re.sub(r"\s+", " ", part).upper()
+        parts[i] = _PUNCTUATION_SPACE_PATTERN.sub(r"\1", part)
+    return "".join(parts).strip().rstrip(";").strip()
+
+
+def query_shape(normalized_sql):
+    """통계용 쿼리 형태 (문자열/숫자 리터럴을 ?로 치환)"""
+    parts = _QUOTED_PATTERN.split(normalized_sql)
+    for i in range(len(parts)):
+        if i % 2:
+            parts[i] = "?" if parts[i].startswith("'") else parts[i]
+        else:
+            parts[i] = _NUMBER_PATTERN.sub("?", parts[i])
+    return "".join(parts)
+
+
+def referenced_tables(normalized_sql):
+    """FROM/JOIN 절에서 참조하는 테이블 이름 (스키마 접두어 제거, WITH 절 이름 포함)"""
+    outside = " ".join(_QUOTED_PATTERN.split(normalized_sql)[0::2])
+    tables = set()
+    for table_list in _TABLE_LIST_PATTERN.findall(outside):
+        for item in table_list.split(","):
+            name = item.strip().split(" ")[0]
+            if name and name not in _TABLE_STOPWORDS:
+                tables.add(name.split(".")[-1])
+    return tables
+
+
+def make_query_key(namespace, normalized_sql):
+    """SQL 결과 캐시 키 생성 (namespace: DB 접속 정보)"""
+    return hashlib.sha256(f"{namespace}\n{normalized_sql}".encode('utf-8')).hexdigest()
+
+
+def _dataframe_size(entry):
+    df = entry[0]
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+class _InFlight:
+    """실행 중인 쿼리 (대기자에게 결과/예외 전달)"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class QueryResultCache:
+    def __init__(self, max_bytes=256 * 1024 * 1024, default_ttl=300, table_ttl=None):
+        """
+        SQL 결과 캐시 초기화
+
+        Parameters:
+        - max_bytes: 최대 메모리(바이트, DataFrame deep 메모리 기준)
+        - default_ttl: 테이블별 TTL이 없을 때 만료 시간(초)
+        - table_ttl: {테이블명: 만료 시간(초)} - 여러 테이블을 참조하면 가장 짧은 값 사용
+        """
+        self.default_ttl = default_ttl
+        self.table_ttl = {name.upper(): ttl for name, ttl in (table_ttl or {}).items()}
+        self.memory = LRUCache(max_bytes=max_bytes, sizeof=_dataframe_size)
+
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._key_tables = {}
+        # 무효화 세대 (실행 중 무효화된 결과는 저장하지 않음)
+        self._generation = 0
+        self._query_stats = OrderedDict()
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'coalesced': 0,
+            'stores': 0,
+            'invalidations': 0,
+            'saved_seconds': 0.0,
+            'db_seconds': 0.0,
+        }
+
+    def ttl_for(self, tables):
+        """참조 테이블 기준 TTL"""
+        ttls = [self.table_ttl[table] for table in tables if table in self.table_ttl]
+        return min(ttls) if ttls else self.default_ttl
+
+    def get_or_execute(self, sql_query, execute, namespace=""):
+        """
+        캐시된 결과 반환, 없으면 execute(sql_query) 실행 후 저장
+
+        Parameters:
+        - sql_query: 실행할 SQL
+        - execute: SQL을 받아 DataFrame을 반환하는 함수 (예외는 대기자에게도 전달, 저장하지 않음)
+        - namespace: DB 접속 정보 등 키 구분값
+
+        Returns:
+        - 결과 DataFrame 사본
+        """
+        normalized = normalize_sql(sql_query)
+        key = make_query_key(namespace, normalized)
+        shape = query_shape(normalized)
+
+        entry = self.memory.get(key)
+        if entry is not None:
+            self._record(shape, 'hits', saved=entry[1])
+            return entry[0].copy()
+
+        with self._lock:
+            flight = self._in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = _InFlight()
+                self._in_flight[key] = flight
+                generation = self._generation
+
+        if not leader:
+            # 같은 SQL을 실행 중인 요청의 결과를 기다림
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            self._record(shape, 'coalesced', saved=flight.result[1])
+            return flight.result[0].copy()
+
+        try:
+            start = time.perf_counter()
+            result_df = execute(sql_query)
+            elapsed = time.perf_counter() - start
+            flight.result = (result_df, elapsed)
+            self._record(shape, 'misses', db_seconds=elapsed)
+
+            tables = referenced_tables(normalized)
+            with self._lock:
+                cacheable = generation == self._generation
+            if cacheable and self.memory.set(key, (result_df, elapsed), ttl=self.ttl_for(tables)):
+                with self._lock:
+                    self._key_tables[key] = tables
+                    self._stats['stores'] += 1
+                    self._prune_key_tables()
+            return result_df.copy()
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            flight.event.set()
+
+    def invalidate(self, table=None, sql_query=None, namespace=""):
+        """
+        캐시 무효화 (데이터 적재 후 등)
+
+        Parameters:
+        - table: 이 테이블을 참조하는 결과만 제거
+        - sql_query: 이 SQL 결과만 제거
+        - 둘 다 없으면 전체 제거
+
+        Returns:
+        - 제거한 항목 수
+        """
+        with self._lock:
+            self._generation += 1
+            self._stats['invalidations'] += 1
+            if sql_query is not None:
+                keys = [make_query_key(namespace, normalize_sql(sql_query))]
+            elif table is not None:
+                table = table.upper()
+                keys = [key for key, tables in self._key_tables.items() if table in tables]
+            else:
+                keys = list(self._key_tables)
+            for key in keys:
+                self._key_tables.pop(key, None)
+
+        if sql_query is None and table is None:
+            removed = len(self.memory)
+            self.memory.clear()
+        else:
+            removed = sum(1 for key in keys if self.memory.pop(key) is not None)
+        logger.info(f"SQL 결과 캐시 무효화: {table or ('SQL 1건' if sql_query else '전체')} - {removed}개 제거")
+        return removed
+
+    def _prune_key_tables(self):
+        """LRU에서 제거된 키의 테이블 정보 정리 (잠금 보유 상태에서 호출)"""
+        if len(self._key_tables) > 2 * len(self.memory) + 100:
+            alive = set(self.memory.keys())
+            self._key_tables = {key: tables for key, tables in self._key_tables.items() if key in alive}
+
+    def _record(self, shape, name, saved=0.0, db_seconds=0.0):
+        """전체/쿼리 형태별 통계 기록 (name: hits | misses | coalesced, coalesced는 적중에도 포함)"""
+        counters = ('hits', 'coalesced') if name == 'coalesced' else (name,)
+        with self._lock:
+            query = self._query_stats.get(shape)
+            if query is None:
+                query = {'query': shape[:200], 'hits': 0, 'misses': 0, 'coalesced': 0,
+                         'saved_seconds': 0.0, 'db_seconds': 0.0}
+                self._query_stats[shape] = query
+                while len(self._query_stats) > MAX_QUERY_STATS:
+                    self._query_stats.popitem(last=False)
+            else:
+                self._query_stats.move_to_end(shape)
+
+            for target in (self._stats, query):
+                for counter in counters:
+                    target[counter] += 1
+                target['saved_seconds'] += saved
+                target['db_seconds'] += db_seconds
+
+    def get_stats(self):
+        """캐시 통계 반환 (전체 + 쿼리 형태별 적중률/절약한 DB 시간)"""
+        with self._lock:
+            stats = dict(self._stats)
+            queries = [dict(query) for query in self._query_stats.values()]
+            stats['in_flight'] = len(self._in_flight)
+
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        stats['memory'] = self.memory.stats()
+        for query in queries:
+            query_lookups = query['hits'] + query['misses']
+            query['hit_rate'] = query['hits'] / query_lookups if query_lookups else 0.0
+        stats['queries'] = sorted(queries, key=lambda query: query['saved_seconds'], reverse=True)
+        return stats
+
+
+_query_cache = None
+_query_cache_lock = threading.Lock()
+
+
+def get_query_cache():
+    """프로세스 공용 SQL 결과 캐시 반환 (SQL_CACHE_ENABLED가 False면 None)"""
+    global _query_cache
+    if not Config.SQL_CACHE_ENABLED:
+        return None
+    if _query_cache is None:
+        with _query_cache_lock:
+            if _query_cache is None:
+                _query_cache = QueryResultCache(
+                    max_bytes=Config.SQL_CACHE_MAX_MB * 1024 * 1024,
+                    default_ttl=Config.SQL_CACHE_DEFAULT_TTL,
+                    table_ttl=Config.SQL_CACHE_TABLE_TTL
+                )
+    return _query_cache
@@ -0,0 +1,265 @@
+"""
+render_cache.py - 차트 렌더링 결과 캐시
+- 정규화된 차트 JSON(키 정렬, 숫자 정규화) + 결과 데이터 지문 해시 기반 키
+- 메모리 LRU 1단계(PNG + Base64) + 디스크 PNG 2단계
+- 메모리/디스크 크기 상한 및 LRU 제거
+- 적중률 및 적중 시 응답 시간 통계
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from config import Config
+from utils.lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# 렌더링 방식이 바뀌면 올려서 기존 캐시 무효화
+RENDER_CACHE_VERSION = "1"
+
+
+def _canonicalize(value):
+    """차트 JSON을 비교 가능한 형태로 정규화 (1 == 1.0, 튜플 == 리스트, numpy → 파이썬)"""
+    if isinstance(value, dict):
+        return {str(key): _canonicalize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonicalize(item) for item in value]
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, (float, np.floating)):
+        value = float(value)
+        if math.isnan(value):
+            return "NaN"
+        if math.isinf(value):
+            return "Infinity" if value > 0 else "-Infinity"
+        if value.is_integer():
+            return int(value)
+        return float(f"{value:.12g}")
+    return value
+
+
+def canonical_chart_json(chart_json):
+    """정규화된 차트 JSON 문자열"""
+    return json.dumps(_canonicalize(chart_json), sort_keys=True, separators=(',', ':'), ensure_ascii=False,
+                      default=str)
+
+
+def data_fingerprint(df):
+    """결과 데이터 지문 (컬럼, 타입, 값 해시)"""
+    digest = hashlib.sha256()
+    if df is None:
+        return "none"
+    digest.update(json.dumps([str(c) for c in df.columns], ensure_ascii=False).encode('utf-8'))
+    digest.update(json.dumps([str(t) for t in df.dtypes], ensure_ascii=False).encode('utf-8'))
+    try:
+        digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    except TypeError:
+        # 리스트 등 해시할 수 없는 값이 섞인 경우 문자열로 대체
+        digest.update(df.to_csv(index=False).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def make_render_key(chart_json, df, dpi):
+    """렌더링 캐시 키 생성"""
+    key_source = f"{RENDER_CACHE_VERSION}|{dpi}|{data_fingerprint(df)}|{canonical_chart_json(chart_json)}"
+    return hashlib.sha256(key_source.encode('utf-8')).hexdigest()
+
+
+class RenderCache:
+    def __init__(self, cache_dir=None, max_memory_bytes=64 * 1024 * 1024, max_disk_bytes=256 * 1024 * 1024):
+        """
+        렌더링 결과 캐시 초기화
+
+        Parameters:
+        - cache_dir: 디스크 캐시 디렉토리 (None이면 메모리 캐시만 사용)
+        - max_memory_bytes: 메모리 캐시 최대 크기(바이트, PNG + Base64 기준)
+        - max_disk_bytes: 디스크 캐시 최대 크기(바이트)
+        """
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.memory = LRUCache(max_bytes=max_memory_bytes, sizeof=lambda value: len(value[0]) + len(value[1]))
+
+        # 디스크 항목 (키 → 크기), 오래 사용되지 않은 순
+        self._disk_index = OrderedDict()
+        self._disk_bytes = 0
+        self._disk_lock = threading.Lock()
+
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'disk_evictions': 0,
+            'hit_seconds': 0.0,
+        }
+
+        if cache_dir:
+            self._load_disk_index()
+
+    def _load_disk_index(self):
+        """기존 디스크 캐시 파일을 최근 사용 순으로 색인"""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            entries = []
+            for name in os.listdir(self.cache_dir):
+                if not name.endswith('.png'):
+                    continue
+                stat = os.stat(os.path.join(self.cache_dir, name))
+                entries.append((stat.st_mtime, name[:-4], stat.st_size))
+            for _, key, size in sorted(entries):
+                self._disk_index[key] = size
+                self._disk_bytes += size
+            logger.info(f"차트 렌더링 디스크 캐시 초기화 완료: {self.cache_dir} ({len(entries)}개)")
+        except OSError as e:
+            logger.error(f"차트 렌더링 디스크 캐시 초기화 실패 (메모리 캐시만 사용): {e}")
+            self.cache_dir = None
+
+    def _disk_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.png")
+
+    def get(self, key):
+        """
+        캐시 조회 (메모리 → 디스크 순)
+
+        Returns:
+        - (PNG 바이트, Base64 문자열) 또는 None
+        """
+        start = time.perf_counter()
+        value = self.memory.get(key)
+        if value is not None:
+            self._record_hit('memory_hits', start)
+            return value
+
+        png_bytes = self._disk_get(key)
+        if png_bytes is not None:
+            value = (png_bytes, base64.b64encode(png_bytes).decode('utf-8'))
+            self.memory.set(key, value)
+            self._record_hit('disk_hits', start)
+            return value
+
+        with self._stats_lock:
+            self._stats['misses'] += 1
+        return None
+
+    def set(self, key, png_bytes, image_base64):
+        """캐시 저장 (메모리 + 디스크)"""
+        self.memory.set(key, (png_bytes, image_base64))
+        self._disk_set(key, png_bytes)
+        with self._stats_lock:
+            self._stats['stores'] += 1
+
+    def _disk_get(self, key):
+        if self.cache_dir is None:
+            return None
+        with self._disk_lock:
+            if key not in self._disk_index:
+                return None
+            self._disk_index.move_to_end(key)
+        path = self._disk_path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            # 재시작 후에도 최근 사용 순서를 유지하도록 수정 시각 갱신
+            os.utime(path)
+            return data
+        except OSError:
+            with self._disk_lock:
+                size = self._disk_index.pop(key, 0)
+                self._disk_bytes -= size
+            return None
+
+    def _disk_set(self, key, png_bytes):
+        if self.cache_dir is None:
+            return
+        path = self._disk_path(key)
+        try:
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(png_bytes)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"차트 렌더링 디스크 캐시 저장 실패: {e}")
+            return
+
+        doomed = []
+        with self._disk_lock:
+            self._disk_bytes -= self._disk_index.pop(key, 0)
+            self._disk_index[key] = len(png_bytes)
+            self._disk_bytes += len(png_bytes)
+            while self._disk_bytes > self.max_disk_bytes and len(self._disk_index) > 1:
+                old_key, size = self._disk_index.popitem(last=False)
+                self._disk_bytes -= size
+                doomed.append(old_key)
+
+        for old_key in doomed:
+            try:
+                os.remove(self._disk_path(old_key))
+            except OSError:
+                pass
+        if doomed:
+            with self._stats_lock:
+                self._stats['disk_evictions'] += len(doomed)
+
+    def _record_hit(self, name, start):
+        with self._stats_lock:
+            self._stats[name] += 1
+            self._stats['hit_seconds'] += time.perf_counter() - start
+
+    def get_stats(self):
+        """캐시 통계 반환"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        hits = stats['memory_hits'] + stats['disk_hits']
+        lookups = hits + stats['misses']
+        stats['hit_rate'] = hits / lookups if lookups else 0.0
+        stats['avg_hit_ms'] = stats.pop('hit_seconds') * 1000 / hits if hits else 0.0
+        stats['memory'] = self.memory.stats()
+        with self._disk_lock:
+            stats['disk'] = {'entries': len(self._disk_index), 'bytes': self._disk_bytes}
+        return stats
+
+    def clear(self):
+        """캐시 전체 비우기"""
+        self.memory.clear()
+        with self._disk_lock:
+            keys = list(self._disk_index)
+            self._disk_index.clear()
+            self._disk_bytes = 0
+        for key in keys:
+            try:
+                os.remove(self._disk_path(key))
+            except OSError:
+                pass
+
+
+_render_cache = None
+_render_cache_lock = threading.Lock()
+
+
+def get_render_cache():
+    """프로세스 공용 렌더링 캐시 반환 (비활성화 시 None)"""
+    global _render_cache
+    if not Config.CHART_CACHE_ENABLED:
+        return None
+    if _render_cache is None:
+        with _render_cache_lock:
+            if _render_cache is None:
+                _render_cache = RenderCache(
+                    cache_dir=Config.CHART_CACHE_DIR,
+                    max_memory_bytes=Config.CHART_CACHE_MEMORY_MB * 1024 * 1024,
+                    max_disk_bytes=Config.CHART_CACHE_MAX_DISK_MB * 1024 * 1024
+                )
+    return _render_cache
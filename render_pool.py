@@ -0,0 +1,294 @@
+"""
+render_pool.py - 프로세스 풀 차트 렌더러
+- matplotlib 래스터화는 CPU 작업이라 스레드로는 GIL 때문에 코어 하나를 넘기 어려움
+- 차트 JSON + 컬럼 단위 데이터를 작업자 프로세스로 보내고 PNG 바이트를 받음
+- 작업자는 matplotlib/한글 폰트를 미리 로드하고 워밍업 렌더링까지 마친 뒤 투입
+- 작업자당 렌더링 횟수 제한(메모리 증가 억제) 후 교체, 시간 초과 시 강제 종료
+"""
+
+import atexit
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# 작업자 준비 대기 최대 시간(초)
+WORKER_STARTUP_TIMEOUT = 60.0
+
+_WARMUP_CHART = {
+    "type": "bar",
+    "title": "warmup",
+    "figsize": (2, 2),
+    "data": {"labels": ["a", "b"], "datasets": [{"label": "a", "data": [1, 2]}]}
+}
+
+
+class RenderWorkerError(Exception):
+    """작업자 프로세스 렌더링 실패"""
+
+
+class RenderTimeoutError(RenderWorkerError):
+    """렌더링 시간 초과로 작업자를 종료함"""
+
+
+def _column_payload(df):
+    """DataFrame을 (컬럼명 목록, 컬럼별 numpy 배열) 형태로 변환 (인덱스/블록 구조 없이 전송)"""
+    if df is None:
+        return [], []
+    return [str(column) for column in df.columns], [df.iloc[:, i].to_numpy() for i in range(df.shape[1])]
+
+
+def _worker_main(conn, dpi):
+    """작업자 프로세스 진입점"""
+    import pandas as pd
+    import chart_generator
+
+    # 부모에서 바뀐 설정은 전달받은 값으로 맞춤
+    Config.CHART_DPI = dpi
+    generator = chart_generator.ChartGenerator(output_dir=None)
+    generator._render_png(dict(_WARMUP_CHART), pd.DataFrame(), {})
+    conn.send(('ready', multiprocessing.current_process().pid))
+
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            break
+        if message is None:
+            break
+
+        chart_json, columns, values = message
+        timings = {}
+        try:
+            df = pd.DataFrame({i: value for i, value in enumerate(values)})
+            df.columns = columns
+            png_bytes = generator._render_png(chart_json, df, timings)
+            conn.send(('ok', png_bytes, timings))
+        except Exception as e:
+            conn.send(('error', f"{type(e).__name__}: {e}", timings))
+    conn.close()
+
+
+class _Worker:
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+        self.renders = 0
+
+
+class RenderPool:
+    def __init__(self, processes=4, max_renders_per_worker=200, timeout=30.0, dpi=100,
+                 start_method="forkserver"):
+        """
+        프로세스 풀 렌더러 초기화
+
+        Parameters:
+        - processes: 작업자 프로세스 수
+        - max_renders_per_worker: 작업자 교체 전 최대 렌더링 횟수
+        - timeout: 차트 1개 렌더링 제한 시간(초), 초과 시 작업자 강제 종료
+        - dpi: 렌더링 DPI
+        - start_method: 프로세스 시작 방식 (forkserver 미지원 환경에서는 spawn)
+        """
+        if start_method not in multiprocessing.get_all_start_methods():
+            start_method = "spawn"
+        self._context = multiprocessing.get_context(start_method)
+        if start_method == "forkserver":
+            # 포크 서버가 matplotlib/한글 폰트를 한 번만 로드하고 작업자는 이를 복제
+            self._context.set_forkserver_preload(['chart_generator'])
+
+        self.processes = processes
+        self.max_renders_per_worker = max_renders_per_worker
+        self.timeout = timeout
+        self.dpi = dpi
+        self.start_method = start_method
+
+        self._idle = queue.Queue()
+        self._workers = set()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._stats = {
+            'renders': 0,
+            'errors': 0,
+            'timeouts': 0,
+            'crashes': 0,
+            'recycled': 0,
+            'started': 0,
+            'start_failures': 0,
+            'render_seconds': 0.0,
+        }
+
+        for _ in range(processes):
+            self._spawn()
+        logger.info(f"차트 렌더링 프로세스 풀 시작 - 작업자: {processes}, 교체 주기: {max_renders_per_worker}회, "
+                    f"제한 시간: {timeout}초, 시작 방식: {start_method}")
+
+    def _spawn(self):
+        """작업자를 새로 띄우고 준비가 끝나면 유휴 목록에 추가 (백그라운드)"""
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(target=_worker_main, args=(child_conn, self.dpi),
+                                        name="chart-render-worker", daemon=True)
+        process.start()
+        child_conn.close()
+        worker = _Worker(process, parent_conn)
+        with self._lock:
+            self._workers.add(worker)
+        threading.Thread(target=self._wait_ready, args=(worker,), daemon=True).start()
+
+    def _wait_ready(self, worker):
+        try:
+            if worker.conn.poll(WORKER_STARTUP_TIMEOUT):
+                status, pid = worker.conn.recv()
+                if status == 'ready' and not self._closed:
+                    self._incr('started')
+                    self._idle.put(worker)
+                    return
+        except (EOFError, OSError) as e:
+            logger.error(f"차트 렌더링 작업자 시작 실패: {e}")
+        self._incr('start_failures')
+        self._remove(worker, kill=True)
+
+    def wait_ready(self, timeout=WORKER_STARTUP_TIMEOUT):
+        """모든 작업자가 준비될 때까지 대기 (벤치마크/테스트용)"""
+        deadline = time.time() + timeout
+        while self._idle.qsize() < self.processes and time.time() < deadline:
+            time.sleep(0.05)
+        return self._idle.qsize() >= self.processes
+
+    def render(self, chart_json, df, timings=None):
+        """
+        작업자 프로세스에서 차트 렌더링
+
+        Parameters:
+        - chart_json: 차트 생성 JSON
+        - df: 쿼리 실행 결과 DataFrame
+        - timings: dict를 넘기면 단계별 소요 시간(초)을 기록 (queue_wait, layout, rasterize, encode, ipc)
+
+        Returns:
+        - PNG 바이트
+        """
+        timings = {} if timings is None else timings
+        start = time.perf_counter()
+        try:
+            worker = self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise RenderWorkerError("사용 가능한 차트 렌더링 작업자가 없습니다.")
+        timings['queue_wait'] = time.perf_counter() - start
+
+        columns, values = _column_payload(df)
+        start = time.perf_counter()
+        try:
+            worker.conn.send((chart_json, columns, values))
+            if not worker.conn.poll(self.timeout):
+                self._incr('timeouts')
+                self._replace(worker, kill=True)
+                raise RenderTimeoutError(f"차트 렌더링 시간 초과 ({self.timeout}초) - 작업자 종료: {worker.process.pid}")
+            status, payload, worker_timings = worker.conn.recv()
+        except (EOFError, OSError) as e:
+            self._incr('crashes')
+            self._replace(worker, kill=True)
+            raise RenderWorkerError(f"차트 렌더링 작업자 비정상 종료: {e}")
+        except RenderWorkerError:
+            raise
+        except Exception:
+            # 요청 직렬화 실패 등: 작업자는 정상이므로 반환
+            self._idle.put(worker)
+            raise
+        elapsed = time.perf_counter() - start
+
+        worker.renders += 1
+        if worker.renders >= self.max_renders_per_worker:
+            self._incr('recycled')
+            self._replace(worker, kill=False)
+        else:
+            self._idle.put(worker)
+
+        timings.update(worker_timings)
+        timings['ipc'] = max(0.0, elapsed - sum(worker_timings.values()))
+        if status != 'ok':
+            self._incr('errors')
+            raise RenderWorkerError(payload)
+
+        with self._lock:
+            self._stats['renders'] += 1
+            self._stats['render_seconds'] += elapsed
+        return payload
+
+    def _replace(self, worker, kill):
+        """작업자를 종료하고 새 작업자로 교체"""
+        self._remove(worker, kill=kill)
+        if not self._closed:
+            self._spawn()
+
+    def _remove(self, worker, kill):
+        with self._lock:
+            self._workers.discard(worker)
+        if kill:
+            worker.process.kill()
+        else:
+            try:
+                worker.conn.send(None)
+            except OSError:
+                worker.process.kill()
+        worker.conn.close()
+        # 종료 대기는 요청 스레드를 막지 않도록 백그라운드에서 처리
+        threading.Thread(target=worker.process.join, args=(5.0,), daemon=True).start()
+
+    def _incr(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def get_stats(self):
+        """풀 통계 반환"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['workers'] = len(self._workers)
+        stats['idle'] = self._idle.qsize()
+        render_seconds = stats.pop('render_seconds')
+        stats['avg_render_ms'] = render_seconds * 1000 / stats['renders'] if stats['renders'] else 0.0
+        return stats
+
+    def shutdown(self, timeout=5.0):
+        """모든 작업자 종료"""
+        self._closed = True
+        with self._lock:
+            workers = list(self._workers)
+            self._workers.clear()
+        for worker in workers:
+            try:
+                worker.conn.send(None)
+            except OSError:
+                pass
+        for worker in workers:
+            worker.process.join(timeout)
+            if worker.process.is_alive():
+                worker.process.kill()
+            worker.conn.close()
+        logger.info("차트 렌더링 프로세스 풀 종료")
+
+
+_render_pool = None
+_render_pool_lock = threading.Lock()
+
+
+def get_render_pool():
+    """프로세스 공용 렌더링 풀 반환 (CHART_RENDER_BACKEND가 process가 아니면 None)"""
+    global _render_pool
+    if Config.CHART_RENDER_BACKEND != "process":
+        return None
+    if _render_pool is None:
+        with _render_pool_lock:
+            if _render_pool is None:
+                _render_pool = RenderPool(
+                    processes=Config.CHART_RENDER_PROCESSES,
+                    max_renders_per_worker=Config.CHART_RENDER_MAX_PER_WORKER,
+                    timeout=Config.CHART_RENDER_TIMEOUT,
+                    dpi=Config.CHART_DPI,
+                    start_method=Config.CHART_RENDER_START_METHOD
+                )
+                atexit.register(_render_pool.shutdown)
+    return _render_pool
@@ -0,0 +1,159 @@
+"""
+result_format.py - 쿼리 결과 응답 형식
+- records: 행마다 컬럼명을 반복하는 기존 JSON 형식 (기본값, 기존 클라이언트 호환)
+- columnar: 컬럼명/타입은 한 번만, 값은 컬럼별 배열 (pandas C 인코더로 직렬화)
+- arrow: Apache Arrow IPC 스트림 (pyarrow 설치 시, 응답 필드는 스키마 메타데이터에 포함)
+- 요청 파라미터 result_format 또는 Accept 헤더로 형식 선택, 큰 응답은 gzip 압축
+"""
+
+import gzip
+import json
+import logging
+
+import numpy as np
+from flask import Response
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+RESULT_FORMATS = ('records', 'columnar', 'arrow')
+COLUMNAR_MIMETYPE = 'application/vnd.chartapp.columnar+json'
+ARROW_MIMETYPE = 'application/vnd.apache.arrow.stream'
+
+
+def negotiate_result_format(request):
+    """
+    요청의 결과 형식 결정
+
+    Parameters:
+    - request: Flask 요청 (result_format 파라미터 > Accept 헤더 > Config.RESULT_DEFAULT_FORMAT)
+
+    Returns:
+    - 'records' | 'columnar' | 'arrow', 지원하지 않는 형식이면 None
+    """
+    result_format = request.values.get('result_format')
+    if not result_format:
+        accept = request.accept_mimetypes
+        if pa is not None and accept.quality(ARROW_MIMETYPE) > accept.quality('application/json'):
+            result_format = 'arrow'
+        elif accept.quality(COLUMNAR_MIMETYPE) > accept.quality('application/json'):
+            result_format = 'columnar'
+        else:
+            result_format = Config.RESULT_DEFAULT_FORMAT
+    result_format = result_format.lower()
+    if result_format not in RESULT_FORMATS:
+        return None
+    if result_format == 'arrow' and pa is None:
+        logger.warning("pyarrow가 설치되지 않아 columnar 형식으로 응답합니다.")
+        return 'columnar'
+    return result_format
+
+
+def _column_type(series):
+    """컬럼 값 타입 (number/integer/boolean/datetime/string)"""
+    kind = series.dtype.kind
+    if kind in 'iu':
+        return 'integer'
+    if kind == 'f':
+        return 'number'
+    if kind == 'b':
+        return 'boolean'
+    if kind == 'M':
+        return 'datetime'
+    return 'string'
+
+
+def records_payload(df):
+    """기존 records 형식 (행 딕셔너리 목록)"""
+    return df.replace({np.nan: None}).to_dict(orient='records')
+
+
+def columnar_json(df):
+    """
+    columnar 형식 JSON 문자열
+    - {"format": "columnar", "row_count": n, "columns": [...], "types": [...], "data": [[컬럼1 값...], ...]}
+    - 결측값은 null, 날짜는 ISO 문자열, 실수는 15자리 정밀도
+    """
+    columns = [str(column) for column in df.columns]
+    values = [
+        df.iloc[:, i].to_json(orient='values', date_format='iso', double_precision=15,
+                              force_ascii=False, default_handler=str)
+        for i in range(df.shape[1])
+    ]
+    header = json.dumps({
+        'format': 'columnar',
+        'row_count': len(df),
+        'columns': columns,
+        'types': [_column_type(df.iloc[:, i]) for i in range(df.shape[1])],
+    }, ensure_ascii=False)
+    return f'{header[:-1]}, "data": [{",".join(values)}]}}'
+
+
+def columnar_payload(df):
+    """columnar 형식 딕셔너리 (작업 결과 등 JSON 객체로 보관할 때)"""
+    return json.loads(columnar_json(df))
+
+
+def arrow_bytes(df, fields):
+    """Arrow IPC 스트림 바이트 (응답 필드는 스키마 메타데이터 chartapp에 JSON으로 포함)"""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[b'chartapp'] = json.dumps(fields, ensure_ascii=False, default=str).encode('utf-8')
+    table = table.replace_schema_metadata(metadata)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def result_json(fields, df, result_format):
+    """
+    결과 응답 JSON 문자열 (SSE 이벤트 등 본문에 그대로 넣을 때)
+
+    Parameters:
+    - fields: 결과 외 응답 필드 (sql_query, result_handle 등)
+    - df: 결과 DataFrame
+    - result_format: 'records' 또는 'columnar' (arrow는 columnar로 대체)
+
+    Returns:
+    - result_data를 포함한 JSON 문자열
+    """
+    if result_format == 'records':
+        return json.dumps({**fields, 'result_data': records_payload(df)}, ensure_ascii=False, default=str)
+    body = json.dumps(fields, ensure_ascii=False, default=str)
+    separator = ', ' if fields else ''
+    return f'{body[:-1]}{separator}"result_data": {columnar_json(df)}}}'
+
+
+def result_response(request, fields, df, result_format):
+    """
+    결과 HTTP 응답 생성 (클라이언트가 gzip을 받으면 Config.RESULT_GZIP_MIN_BYTES 이상 본문 압축)
+
+    Parameters:
+    - request: Flask 요청 (Accept-Encoding 확인)
+    - fields: 결과 외 응답 필드
+    - df: 결과 DataFrame
+    - result_format: negotiate_result_format 반환값
+    """
+    if result_format == 'arrow':
+        body = arrow_bytes(df, fields)
+        mimetype = ARROW_MIMETYPE
+    else:
+        body = result_json(fields, df, result_format).encode('utf-8')
+        mimetype = 'application/json'
+
+    response = Response(body, mimetype=mimetype)
+    response.headers['X-Result-Format'] = result_format
+    response.vary.add('Accept')
+    min_bytes = Config.RESULT_GZIP_MIN_BYTES
+    if min_bytes and len(body) >= min_bytes and 'gzip' in request.accept_encodings:
+        response.set_data(gzip.compress(body, compresslevel=Config.RESULT_GZIP_LEVEL))
+        response.headers['Content-Encoding'] = 'gzip'
+        response.vary.add('Accept-Encoding')
+    return response
@@ -0,0 +1,195 @@
+"""
+result_store.py - 쿼리 결과 서버 보관소
+- 실행 결과 DataFrame을 서버에 보관하고 추측할 수 없는 핸들만 클라이언트에 전달
+- 차트 생성/수정 요청은 결과 데이터 대신 핸들을 보내 대용량 결과의 재전송/재파싱 방지
+- 마지막 사용 후 TTL 만료, 사용자별/전체 메모리 상한 (초과 시 오래된 결과부터 제거)
+"""
+
+import logging
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class ResultTooLargeError(Exception):
+    """결과 하나가 사용자별 메모리 상한보다 큼"""
+
+
+class ResultHandleExpiredError(Exception):
+    """핸들이 없거나 만료되었거나 다른 사용자의 핸들임"""
+
+
+class _StoredResult:
+    __slots__ = ('username', 'df', 'sql_query', 'size', 'created_at', 'last_access', 'total_rows')
+
+    def __init__(self, username, df, sql_query, size):
+        self.username = username
+        self.df = df
+        self.sql_query = sql_query
+        self.size = size
+        self.created_at = time.time()
+        self.last_access = self.created_at
+        # 페이지 조회 시 계산한 전체 행 수 (행 수, 정확 여부)
+        self.total_rows = None
+
+
+class ResultStore:
+    def __init__(self, ttl_seconds=1800, max_bytes_per_user=256 * 1024 * 1024, max_total_bytes=2048 * 1024 * 1024):
+        """
+        결과 보관소 초기화
+
+        Parameters:
+        - ttl_seconds: 마지막 사용 후 보관 시간(초)
+        - max_bytes_per_user: 사용자별 최대 메모리(바이트, DataFrame deep 메모리 기준)
+        - max_total_bytes: 전체 최대 메모리(바이트)
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes_per_user = max_bytes_per_user
+        self.max_total_bytes = max_total_bytes
+
+        # 핸들 → 결과, 오래 사용되지 않은 순
+        self._results = OrderedDict()
+        self._user_bytes = {}
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {
+            'stored': 0,
+            'hits': 0,
+            'misses': 0,
+            'expired': 0,
+            'evicted': 0,
+            'rejected': 0,
+        }
+
+    def put(self, username, df, sql_query=None):
+        """
+        결과 저장 후 핸들 반환
+
+        Parameters:
+        - username: 소유 사용자
+        - df: 결과 DataFrame (저장 후 읽기 전용으로 취급)
+        - sql_query: 결과를 만든 SQL (선택)
+
+        Returns:
+        - handle: 결과 핸들 문자열
+        """
+        size = int(df.memory_usage(index=True, deep=True).sum())
+        if size > self.max_bytes_per_user:
+            with self._lock:
+                self._stats['rejected'] += 1
+            raise ResultTooLargeError(
+                f"결과가 너무 커서 서버에 보관할 수 없습니다. ({size / 1024 / 1024:.1f}MB > "
+                f"{self.max_bytes_per_user / 1024 / 1024:.0f}MB)"
+            )
+
+        handle = secrets.token_urlsafe(18)
+        with self._lock:
+            self._purge_expired()
+            # 사용자 상한 → 전체 상한 순으로 오래된 결과 제거
+            for handle_id in [h for h, r in self._results.items() if r.username == username]:
+                if self._user_bytes.get(username, 0) + size <= self.max_bytes_per_user:
+                    break
+                self._remove(handle_id, 'evicted')
+            while self._results and self._total_bytes + size > self.max_total_bytes:
+                self._remove(next(iter(self._results)), 'evicted')
+
+            self._results[handle] = _StoredResult(username, df, sql_query, size)
+            self._user_bytes[username] = self._user_bytes.get(username, 0) + size
+            self._total_bytes += size
+            self._stats['stored'] += 1
+        logger.info(f"결과 보관: {username} - {len(df)}행, {size / 1024:.1f}KB")
+        return handle
+
+    def get(self, username, handle):
+        """
+        핸들로 결과 조회
+
+        Returns:
+        - 결과 DataFrame (읽기 전용)
+
+        Raises:
+        - ResultHandleExpiredError: 없거나 만료되었거나 다른 사용자의 핸들
+        """
+        return self.get_record(username, handle).df
+
+    def get_record(self, username, handle):
+        """핸들로 보관 기록 조회 (df, sql_query, total_rows) - 예외는 get과 동일"""
+        now = time.time()
+        with self._lock:
+            result = self._results.get(handle)
+            if result is not None and result.last_access + self.ttl_seconds <= now:
+                self._remove(handle, 'expired')
+                result = None
+            if result is None or result.username != username:
+                self._stats['misses'] += 1
+                raise ResultHandleExpiredError("결과가 만료되었습니다. 쿼리를 다시 실행해주세요.")
+            result.last_access = now
+            self._results.move_to_end(handle)
+            self._stats['hits'] += 1
+            return result
+
+    def release(self, username, handle):
+        """결과 삭제 (소유자만 가능)"""
+        with self._lock:
+            result = self._results.get(handle)
+            if result is None or result.username != username:
+                return False
+            self._remove(handle, None)
+            return True
+
+    def user_bytes(self, username):
+        """사용자가 보관 중인 결과의 추정 메모리(바이트)"""
+        with self._lock:
+            self._purge_expired()
+            return self._user_bytes.get(username, 0)
+
+    def _remove(self, handle, reason):
+        """결과 제거 (잠금 보유 상태에서 호출)"""
+        result = self._results.pop(handle)
+        self._user_bytes[result.username] -= result.size
+        if self._user_bytes[result.username] <= 0:
+            del self._user_bytes[result.username]
+        self._total_bytes -= result.size
+        if reason:
+            self._stats[reason] += 1
+
+    def _purge_expired(self):
+        """만료된 결과 제거 (잠금 보유 상태에서 호출)"""
+        deadline = time.time() - self.ttl_seconds
+        for handle in [h for h, r in self._results.items() if r.last_access <= deadline]:
+            self._remove(handle, 'expired')
+
+    def get_stats(self):
+        """보관소 통계 반환"""
+        with self._lock:
+            self._purge_expired()
+            stats = dict(self._stats)
+            stats['results'] = len(self._results)
+            stats['total_bytes'] = self._total_bytes
+            stats['user_bytes'] = dict(self._user_bytes)
+        stats['max_bytes_per_user'] = self.max_bytes_per_user
+        stats['max_total_bytes'] = self.max_total_bytes
+        return stats
+
+
+_result_store = None
+_result_store_lock = threading.Lock()
+
+
+def get_result_store():
+    """프로세스 공용 결과 보관소 반환"""
+    global _result_store
+    if _result_store is None:
+        with _result_store_lock:
+            if _result_store is None:
+                _result_store = ResultStore(
+                    ttl_seconds=Config.RESULT_STORE_TTL_SECONDS,
+                    max_bytes_per_user=Config.RESULT_STORE_MAX_MB_PER_USER * 1024 * 1024,
+                    max_total_bytes=Config.RESULT_STORE_MAX_TOTAL_MB * 1024 * 1024
+                )
+    return _result_store
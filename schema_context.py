@@ -0,0 +1,276 @@
+"""
+schema_context.py - 프롬프트용 스키마 컨텍스트 생성
+- metadata.json을 들여쓰기/중복 필드 없이 압축 직렬화
+- 사용자 질문과 관련된 테이블/컬럼만 골라 토큰 예산 내로 구성
+- 요청별 절감 토큰 수 기록
+- 접두부 캐시용으로 질문과 무관한 고정 스키마 제공
+"""
+
+import json
+import logging
+import re
+import threading
+
+from metadata_index import get_metadata_index
+
+logger = logging.getLogger(__name__)
+
+# 컬럼명/한글명 매칭 시 무시할 일반 단어
+STOPWORDS = frozenset([
+    '데이터', '조회', '보여줘', '보여주세요', '해줘', '해주세요', '차트', '그래프', '기준', '관련',
+    '대한', '전체', '목록', '값', '및', '별로', '으로', '에서', '하는', '있는', '그리고',
+    'the', 'and', 'for', 'show', 'select', 'from', 'where', 'by', 'of', 'to', 'in', 'chart',
+])
+
+# 스키마 컨텍스트 통계 (프로세스 공용)
+_stats_lock = threading.Lock()
+_stats = {
+    'requests': 0,
+    'full_tokens': 0,
+    'context_tokens': 0,
+}
+
+
+def estimate_tokens(text):
+    """
+    토크나이저 없이 토큰 수 추정
+    - ASCII는 약 4자당 1토큰, 한글 등 비ASCII는 글자당 약 1토큰으로 계산
+    """
+    if not text:
+        return 0
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return int(ascii_chars / 4 + (len(text) - ascii_chars)) + 1
+
+
+def tokenize_question(text):
+    """질문을 매칭용 키워드 집합으로 분리 (한글/영문/숫자 단위)"""
+    words = re.findall(r"[A-Za-z][A-Za-z0-9_]*|[가-힣]+|\d+", text or "")
+    keywords = set()
+    for word in words:
+        word = word.lower()
+        if word in STOPWORDS or len(word) < 2:
+            continue
+        keywords.add(word)
+        # 한글 조사 제거 (예: 고객별 → 고객, 매출액을 → 매출액)
+        stripped = re.sub(r"(별|을|를|은|는|이|가|의|에|와|과|로|으로|에서|까지|부터)$", "", word)
+        if stripped != word and len(stripped) >= 2:
+            keywords.add(stripped)
+    return keywords
+
+
+def _compact_column(column):
+    """컬럼 한 줄 압축 표현: 이름 타입(길이) 키 한글명 [설명] ex:샘플 {코드} (column: ColumnInfo)"""
+    parts = [column.name]
+
+    if column.data_type:
+        parts.append(f"{column.data_type}({column.length})" if column.length else column.data_type)
+
+    if column.is_key:
+        parts.append('PK')
+
+    korean_name = column.korean_name
+    if korean_name:
+        parts.append(korean_name)
+
+    description = column.description
+    if description and description != korean_name:
+        # 한글명과 중복되는 앞부분은 제거
+        if korean_name and description.startswith(korean_name):
+            description = description[len(korean_name):].strip(" :")
+        if description:
+            parts.append(f"[{description}]")
+
+    if column.sample not in (None, ''):
+        parts.append(f"ex:{column.sample}")
+
+    if column.codes:
+        parts.append("{" + ",".join(f"{code}={name}" for code, name in column.codes.items()) + "}")
+
+    return " ".join(str(part) for part in parts)
+
+
+def _compact_table_header(table):
+    """테이블 머리글: 이름 (한글명): 설명 (table: TableInfo)"""
+    header = table.name
+    if table.korean_name:
+        header += f" ({table.korean_name})"
+    if table.description and table.description != table.korean_name:
+        header += f": {table.description.strip()}"
+    return header
+
+
+class SchemaContext:
+    """메타데이터 하나에 대한 압축 스키마 및 관련도 검색"""
+
+    def __init__(self, metadata):
+        self.special_lines = []
+        self.tables = []
+
+        index = get_metadata_index(metadata)
+        for name, info in index.special_metrics.items():
+            self.special_lines.append(f"{name}: {info.get('description', '')}")
+
+        for table in index.tables.values():
+            self.tables.append({
+                'name': table.name,
+                'header': _compact_table_header(table),
+                'keywords': tokenize_question(f"{table.name} {table.korean_name} {table.description}"),
+                'columns': [
+                    {
+                        'name': column.name,
+                        'line': _compact_column(column),
+                        'is_key': column.is_key,
+                        'keywords': tokenize_question(f"{column.name} {column.korean_name} {column.description}"),
+                    }
+                    for column in table.columns.values()
+                ],
+            })
+
+        self.full_text = self._render(self.tables, None)
+        self.full_tokens = estimate_tokens(self.full_text)
+        self.original_tokens = estimate_tokens(json.dumps(metadata, ensure_ascii=False, indent=2))
+
+    def _render(self, tables, selected_columns):
+        """선택된 테이블/컬럼을 압축 텍스트로 직렬화"""
+        lines = []
+        if self.special_lines:
+            lines.append("[특수 지표]")
+            lines.extend(self.special_lines)
+        for table in tables:
+            lines.append(f"# {table['header']}")
+            for column in table['columns']:
+                if selected_columns is None or column['name'] in selected_columns.get(table['name'], ()):
+                    lines.append(column['line'])
+        return "\n".join(lines)
+
+    def _score(self, keywords, question_upper):
+        """테이블별/컬럼별 관련도 점수 계산"""
+        table_scores = {}
+        column_scores = {}
+        for table in self.tables:
+            score = 0.0
+            if table['name'] in question_upper:
+                score += 10
+            score += 2 * len(keywords & table['keywords'])
+            for column in table['columns']:
+                column_score = 0.0
+                if column['name'] and re.search(rf"\b{re.escape(column['name'])}\b", question_upper):
+                    column_score += 10
+                for keyword in keywords:
+                    for column_keyword in column['keywords']:
+                        if keyword == column_keyword:
+                            column_score += 3
+                        elif len(keyword) >= 2 and (keyword in column_keyword or column_keyword in keyword):
+                            column_score += 1
+                column_scores[(table['name'], column['name'])] = column_score
+                score += column_score
+            table_scores[table['name']] = score
+        return table_scores, column_scores
+
+    def build(self, question, budget_tokens):
+        """
+        질문과 관련된 스키마 부분집합 생성
+
+        Parameters:
+        - question: 사용자 질문 (및 참고 텍스트)
+        - budget_tokens: 스키마 컨텍스트 토큰 예산
+
+        Returns:
+        - (스키마 텍스트, 추정 토큰 수)
+        """
+        if self.full_tokens <= budget_tokens:
+            return self.full_text, self.full_tokens
+
+        keywords = tokenize_question(question)
+        table_scores, column_scores = self._score(keywords, (question or "").upper())
+        ranked = sorted(self.tables, key=lambda t: table_scores[t['name']], reverse=True)
+        has_match = bool(ranked) and table_scores[ranked[0]['name']] > 0
+        if not has_match:
+            # 관련 테이블을 찾지 못하면 원래 순서대로 예산 내 포함
+            ranked = list(self.tables)
+
+        selected_tables = []
+        selected_columns = {}
+        for table in ranked:
+            if has_match and table_scores[table['name']] <= 0:
+                break
+            # 매칭된 컬럼 + 조인용 키 컬럼, 매칭이 없으면 테이블 전체 컬럼
+            matched = {
+                column['name'] for column in table['columns']
+                if column_scores[(table['name'], column['name'])] > 0 or column['is_key']
+            }
+            if not any(column_scores[(table['name'], c['name'])] > 0 for c in table['columns']):
+                matched = {column['name'] for column in table['columns']}
+
+            candidate_columns = dict(selected_columns)
+            candidate_columns[table['name']] = matched
+            candidate_text = self._render(selected_tables + [table], candidate_columns)
+            if selected_tables and estimate_tokens(candidate_text) > budget_tokens:
+                continue
+            selected_tables.append(table)
+            selected_columns = candidate_columns
+
+        text = self._render(selected_tables, selected_columns)
+        return text, estimate_tokens(text)
+
+
+_context_cache = {}
+_context_cache_lock = threading.Lock()
+
+
+def get_schema_context(metadata):
+    """메타데이터별 SchemaContext 반환 (같은 메타데이터 객체는 재사용)"""
+    key = id(metadata)
+    with _context_cache_lock:
+        cached = _context_cache.get(key)
+        if cached is not None and cached[0] is metadata:
+            return cached[1]
+
+    context = SchemaContext(metadata)
+    with _context_cache_lock:
+        # 메타데이터 객체는 프로세스 내 소수이므로 단순 상한만 둠
+        if len(_context_cache) >= 32:
+            _context_cache.clear()
+        _context_cache[key] = (metadata, context)
+    return context
+
+
+def build_schema_prompt(metadata, question, budget_tokens):
+    """
+    프롬프트에 삽입할 스키마 텍스트 생성 및 절감 토큰 기록
+
+    Parameters:
+    - metadata: 메타데이터 dict
+    - question: 관련도 판단에 사용할 텍스트 (None이면 질문과 무관한 전체 압축 스키마)
+    - budget_tokens: 스키마 컨텍스트 토큰 예산 (question이 None이면 무시)
+
+    Returns:
+    - 스키마 텍스트
+    """
+    if not metadata:
+        return '메타데이터 없음'
+
+    context = get_schema_context(metadata)
+    if question is None:
+        # 요청마다 같은 바이트열이어야 접두부 캐시가 적중하므로 질문과 무관하게 고정
+        text, tokens = context.full_text, context.full_tokens
+    else:
+        text, tokens = context.build(question, budget_tokens)
+    saved = context.original_tokens - tokens
+
+    with _stats_lock:
+        _stats['requests'] += 1
+        _stats['full_tokens'] += context.original_tokens
+        _stats['context_tokens'] += tokens
+
+    logger.info(f"스키마 컨텍스트: {context.original_tokens} → {tokens} 토큰 (약 {saved} 토큰 절감)")
+    return text
+
+
+def get_schema_stats():
+    """스키마 컨텍스트 누적 통계 반환"""
+    with _stats_lock:
+        stats = dict(_stats)
+    stats['saved_tokens'] = stats['full_tokens'] - stats['context_tokens']
+    stats['avg_saved_per_request'] = stats['saved_tokens'] / stats['requests'] if stats['requests'] else 0.0
+    return stats
@@ -0,0 +1,426 @@
+"""
+sql_validator.py - 토큰 기반 SQL 검증
+- SQL을 한 번만 토큰화 (문자열 리터럴/따옴표 식별자/주석을 토큰 단위로 구분하므로 리터럴 안의 -- 나 ; 를 훼손하지 않음)
+- 첫 문장만 사용, 읽기 전용 SELECT/WITH 문만 허용 (DML/DDL/FOR UPDATE 등 거부)
+- FROM/JOIN 절의 테이블/별칭을 해석해 메타데이터 색인으로 테이블/컬럼 존재 확인 (DB 왕복 전에 거부)
+- 최상위 FETCH 절이 없을 때만 행 제한 추가 (서브쿼리/문자열 안의 FETCH는 무시)
+"""
+
+import re
+
+# 토큰 종류별 패턴 (앞에서부터 우선)
+_TOKEN_PATTERN = re.compile(r"""
+    (?P<comment>--[^\n]*|/\*.*?\*/)
+  | (?P<qstring>[nN]?[qQ]'(?:\[.*?\]|\{.*?\}|\(.*?\)|<.*?>|(?P<qdelim>[^\s\[{(<])(?:(?!(?P=qdelim)').)*(?P=qdelim))')
+  | (?P<string>[nN]?'(?:[^']|'')*')
+  | (?P<quoted>"[^"]*")
+  | (?P<number>(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?)
+  | (?P<bind>:(?:[^\W\d]\w*|\d+))
+  | (?P<ident>[^\W\d][\w$#]*)
+  | (?P<op><>|!=|\^=|<=|>=|\|\||=>|[-+*/%=<>(),.;])
+  | (?P<space>\s+)
+  | (?P<other>.)
+""", re.VERBOSE | re.DOTALL)
+
+# 읽기 전용 검사에서 거부할 키워드
+WRITE_KEYWORDS = frozenset([
+    'INSERT', 'UPDATE', 'DELETE', 'MERGE', 'UPSERT', 'DROP', 'CREATE', 'ALTER', 'TRUNCATE', 'RENAME',
+    'GRANT', 'REVOKE', 'EXECUTE', 'EXEC', 'BEGIN', 'DECLARE', 'CALL', 'LOCK', 'COMMIT', 'ROLLBACK',
+    'SAVEPOINT', 'PURGE', 'FLASHBACK',
+])
+
+# 컬럼으로 보지 않는 SQL 키워드 / Oracle 의사 컬럼
+SQL_KEYWORDS = frozenset([
+    'SELECT', 'FROM', 'WHERE', 'AND', 'OR', 'NOT', 'IN', 'IS', 'NULL', 'LIKE', 'BETWEEN', 'EXISTS', 'ESCAPE',
+    'AS', 'ON', 'USING', 'JOIN', 'INNER', 'LEFT', 'RIGHT', 'FULL', 'OUTER', 'CROSS', 'NATURAL', 'LATERAL',
+    'GROUP', 'BY', 'HAVING', 'ORDER', 'ASC', 'DESC', 'NULLS', 'FIRST', 'LAST', 'DISTINCT', 'UNIQUE', 'ALL',
+    'ANY', 'SOME', 'UNION', 'INTERSECT', 'MINUS', 'EXCEPT', 'CASE', 'WHEN', 'THEN', 'ELSE', 'END', 'WITH',
+    'FETCH', 'NEXT', 'ROWS', 'ROW', 'ONLY', 'OFFSET', 'PERCENT', 'TIES', 'OVER', 'PARTITION', 'RANGE',
+    'UNBOUNDED', 'PRECEDING', 'FOLLOWING', 'CURRENT', 'WITHIN', 'KEEP', 'PRIOR', 'CONNECT', 'START',
+    'NOCYCLE', 'SIBLINGS', 'LEVEL', 'ROWNUM', 'ROWID', 'SYSDATE', 'SYSTIMESTAMP', 'CURRENT_DATE',
+    'CURRENT_TIMESTAMP', 'LOCALTIMESTAMP', 'USER', 'TRUE', 'FALSE', 'DATE', 'TIMESTAMP', 'INTERVAL', 'YEAR',
+    'MONTH', 'DAY', 'HOUR', 'MINUTE', 'SECOND', 'TO', 'AT', 'TIME', 'ZONE', 'LOCAL', 'LEADING', 'TRAILING',
+    'BOTH', 'IGNORE', 'RESPECT', 'SETS', 'MEMBER', 'OF', 'SAMPLE', 'SEED', 'FOR', 'DUAL', 'PIVOT', 'UNPIVOT',
+    'INCLUDE', 'EXCLUDE',
+    # 집계 KEEP 절: MAX(x) KEEP (DENSE_RANK LAST ORDER BY y) - 괄호 없이 쓰는 DENSE_RANK
+    'DENSE_RANK',
+])
+
+# 이 키워드 다음에는 테이블 참조가 옴
+_TABLE_INTRODUCERS = frozenset(['FROM', 'JOIN'])
+# 인자 안에 FROM을 쓰는 함수 (EXTRACT(YEAR FROM ...), TRIM(LEADING 'x' FROM ...))
+_FROM_FUNCTIONS = frozenset(['EXTRACT', 'TRIM'])
+# 이 토큰 뒤의 식별자는 별칭 정의 (SELECT x total, FROM T t)
+_EXPRESSION_END_KINDS = frozenset(['ident', 'quoted', 'number', 'string'])
+# 별칭 자리에 올 수 없는 절 키워드
+_CLAUSE_KEYWORDS = SQL_KEYWORDS | WRITE_KEYWORDS
+
+PSEUDO_TABLES = frozenset(['DUAL'])
+
+
+class SqlValidationError(ValueError):
+    """실행 전에 거부된 SQL (reason: syntax | not_select | write | unknown_table | unknown_column)"""
+
+    def __init__(self, message, reason, identifiers=None):
+        super().__init__(message)
+        self.reason = reason
+        self.identifiers = list(identifiers or [])
+
+
+class Token:
+    __slots__ = ('kind', 'text', 'upper', 'depth')
+
+    def __init__(self, kind, text):
+        self.kind = kind
+        self.text = text
+        self.upper = text.upper() if kind == 'ident' else text
+        self.depth = 0
+
+    def __repr__(self):
+        return f"Token({self.kind}, {self.text!r})"
+
+
+_SPACE = Token('space', ' ')
+
+
+class ValidatedSql:
+    """검증 결과 (sql: 실행할 SQL, tables: 참조 테이블, limited: 행 제한을 추가했는지)"""
+    __slots__ = ('sql', 'tables', 'columns', 'limited', 'statements')
+
+    def __init__(self, sql, tables, columns, limited, statements):
+        self.sql = sql
+        self.tables = tables
+        self.columns = columns
+        self.limited = limited
+        self.statements = statements
+
+
+def tokenize(sql_query):
+    """
+    SQL 토큰화 (한 번의 정규식 스캔)
+
+    Raises:
+    - SqlValidationError: 닫히지 않은 문자열/주석/따옴표 식별자
+    """
+    tokens = []
+    append = tokens.append
+    for match in _TOKEN_PATTERN.finditer(sql_query):
+        kind = match.lastgroup
+        if kind == 'space' or kind == 'comment':
+            # 공백/주석은 위치만 의미가 있으므로 공용 토큰 사용
+            append(_SPACE)
+            continue
+        text = match.group()
+        if kind == 'qstring':
+            # Oracle 대체 인용 문자열 q'[...]' (안의 작은따옴표는 이스케이프하지 않음)
+            kind = 'string'
+        if (kind == 'other' and text in ("'", '"')
+                or kind == 'op' and text == '/' and sql_query.startswith('/*', match.start())):
+            raise SqlValidationError(f"닫히지 않은 문자열 또는 주석이 있습니다: {sql_query[match.start():][:30]}",
+                                     'syntax')
+        append(Token(kind, text))
+    return tokens
+
+
+def split_statements(tokens):
+    """; 토큰 기준으로 문장 분리 (공백/주석만 있는 문장 제외)"""
+    statements = []
+    current = []
+    for token in tokens:
+        if token.kind == 'op' and token.text == ';':
+            statements.append(current)
+            current = []
+        else:
+            current.append(token)
+    statements.append(current)
+    return [statement for statement in statements
+            if any(token is not _SPACE for token in statement)]
+
+
+def render(tokens):
+    """토큰을 한 줄 SQL로 직렬화 (공백/주석은 공백 하나로, 리터럴은 그대로)"""
+    parts = []
+    pending_space = False
+    for token in tokens:
+        if token is _SPACE:
+            pending_space = True
+            continue
+        if pending_space and parts:
+            parts.append(' ')
+        pending_space = False
+        parts.append(token.text)
+    return "".join(parts)
+
+
+def _significant(tokens):
+    """공백/주석을 뺀 토큰 (괄호 깊이 기록)"""
+    result = []
+    depth = 0
+    for token in tokens:
+        if token is _SPACE:
+            continue
+        if token.kind == 'op' and token.text == ')':
+            depth -= 1
+            if depth < 0:
+                raise SqlValidationError("괄호 짝이 맞지 않습니다.", 'syntax')
+        token.depth = depth
+        if token.kind == 'op' and token.text == '(':
+            depth += 1
+        result.append(token)
+    if depth != 0:
+        raise SqlValidationError("괄호 짝이 맞지 않습니다.", 'syntax')
+    return result
+
+
+def _is_op(token, text):
+    # 문자열/식별자 토큰의 text는 구두점 한 글자와 같을 수 없으므로 text만 비교
+    return token is not None and token.text == text
+
+
+def _is_word(token, *words):
+    return token is not None and token.kind == 'ident' and token.upper in words
+
+
+def _alias_candidate(token):
+    return token is not None and token.kind in ('ident', 'quoted') and token.upper not in _CLAUSE_KEYWORDS
+
+
+def _identifier_name(token):
+    return token.text.strip('"') if token.kind == 'quoted' else token.upper
+
+
+class _Scope:
+    """문장 하나의 테이블/별칭/CTE 해석 결과"""
+
+    def __init__(self):
+        self.aliases = {}          # 별칭/테이블명 → 메타데이터 테이블명 (CTE/파생 테이블은 None)
+        self.tables = []           # 참조한 실제 테이블명
+        self.unknown_sources = False
+        self.column_aliases = set()
+        self.consumed = set()      # 테이블 참조로 사용된 토큰 위치
+
+
+def _close_paren(sig, start):
+    """start 위치의 ( 와 짝이 맞는 ) 위치"""
+    depth = sig[start].depth
+    for i in range(start + 1, len(sig)):
+        if _is_op(sig[i], ')') and sig[i].depth == depth:
+            return i
+    return len(sig) - 1
+
+
+def _resolve_scope(sig):
+    """CTE 이름, FROM/JOIN 테이블 참조와 별칭, 컬럼 별칭 수집"""
+    scope = _Scope()
+    paren_openers = []
+
+    for i, token in enumerate(sig):
+        kind = token.kind
+        if kind == 'op':
+            if token.text == '(':
+                prev = sig[i - 1] if i > 0 else None
+                paren_openers.append(prev.upper if prev is not None and prev.kind == 'ident' else None)
+            elif token.text == ')' and paren_openers:
+                paren_openers.pop()
+            continue
+        if kind != 'ident' and kind != 'quoted':
+            continue
+        prev = sig[i - 1] if i > 0 else None
+        nxt = sig[i + 1] if i + 1 < len(sig) else None
+
+        # CTE: name AS ( ... ) / name (컬럼, ...) AS ( ... )
+        if token.kind == 'ident' and not _is_op(prev, '.'):
+            if _is_word(nxt, 'AS') and i + 2 < len(sig) and _is_op(sig[i + 2], '('):
+                scope.aliases[_identifier_name(token)] = None
+                scope.unknown_sources = True
+                continue
+            if (_is_op(nxt, '(') and token.depth == 0 and (_is_word(prev, 'WITH') or _is_op(prev, ','))
+                    and _cte_column_list(sig, i)):
+                scope.aliases[_identifier_name(token)] = None
+                scope.unknown_sources = True
+                for j in range(i + 2, _close_paren(sig, i + 1)):
+                    if sig[j].kind in ('ident', 'quoted'):
+                        scope.column_aliases.add(_identifier_name(sig[j]))
+                        scope.consumed.add(j)
+                continue
+
+        # 별칭 정의: AS 다음 식별자, 식 끝 토큰 다음 식별자 (SELECT SUM(x) total / FROM T t)
+        if token.upper in _CLAUSE_KEYWORDS and token.kind == 'ident':
+            if token.upper in _TABLE_INTRODUCERS and not (paren_openers and paren_openers[-1] in _FROM_FUNCTIONS):
+                _read_table_refs(sig, i + 1, scope)
+            if token.upper in ('PIVOT', 'UNPIVOT'):
+                scope.unknown_sources = True
+            continue
+        if i in scope.consumed or _is_op(prev, '.') or _is_op(nxt, '(') or _is_op(nxt, '.'):
+            continue
+        if _is_word(prev, 'AS') or (prev is not None and (prev.kind in _EXPRESSION_END_KINDS and
+                                                            prev.upper not in _CLAUSE_KEYWORDS or
+                                                            _is_op(prev, ')') or _is_word(prev, 'END'))):
+            scope.column_aliases.add(_identifier_name(token))
+    return scope
+
+
+def _cte_column_list(sig, i):
+    """WITH a AS (...), b (컬럼...) AS (...) 형태의 두 번째 이후 CTE인지"""
+    close = _close_paren(sig, i + 1)
+    return close + 2 < len(sig) and _is_word(sig[close + 1], 'AS') and _is_op(sig[close + 2], '(')
+
+
+def _read_table_refs(sig, start, scope):
+    """FROM/JOIN 다음의 테이블 참조 목록 (쉼표 조인 포함) 해석"""
+    i = start
+    depth = sig[start - 1].depth
+    while i < len(sig):
+        token = sig[i]
+        if _is_op(token, '('):
+            # 파생 테이블 (서브쿼리) - 컬럼을 알 수 없음
+            scope.unknown_sources = True
+            i = _close_paren(sig, i) + 1
+        elif token.kind == 'ident' and i + 1 < len(sig) and _is_op(sig[i + 1], '('):
+            # 테이블 함수 (TABLE(...) 등) - 컬럼을 알 수 없음
+            scope.unknown_sources = True
+            i = _close_paren(sig, i + 1) + 1
+        elif token.kind in ('ident', 'quoted') and token.upper not in _CLAUSE_KEYWORDS | PSEUDO_TABLES:
+            # 스키마.테이블
+            name_token = token
+            scope.consumed.add(i)
+            while i + 2 < len(sig) and _is_op(sig[i + 1], '.') and sig[i + 2].kind in ('ident', 'quoted'):
+                i += 2
+                name_token = sig[i]
+                scope.consumed.add(i)
+            table_name = _identifier_name(name_token)
+            if table_name not in scope.aliases:
+                scope.aliases[table_name] = table_name
+            if scope.aliases[table_name] is not None:
+                scope.tables.append(table_name)
+            i += 1
+            source = scope.aliases[table_name]
+            if i < len(sig) and _is_word(sig[i], 'AS'):
+                i += 1
+            if i < len(sig) and _alias_candidate(sig[i]):
+                scope.aliases[_identifier_name(sig[i])] = source
+                scope.consumed.add(i)
+                i += 1
+            if i < len(sig) and sig[i].text == '@':
+                # DB 링크 - 원격 테이블 컬럼은 알 수 없음
+                scope.unknown_sources = True
+        elif _is_word(token, 'DUAL'):
+            scope.consumed.add(i)
+            i += 1
+        else:
+            return
+        if i < len(sig) and sig[i].depth == depth and _is_op(sig[i], ')'):
+            return
+        # 파생 테이블 별칭
+        if i < len(sig) and _is_word(sig[i], 'AS'):
+            i += 1
+        if i < len(sig) and _alias_candidate(sig[i]) and _is_op(sig[i - 1], ')'):
+            scope.aliases[_identifier_name(sig[i])] = None
+            scope.consumed.add(i)
+            i += 1
+        if i < len(sig) and _is_op(sig[i], ','):
+            i += 1
+            continue
+        return
+
+
+def _check_identifiers(sig, scope, metadata_index):
+    """테이블/컬럼이 메타데이터에 있는지 확인 (없으면 SqlValidationError)"""
+    unknown_tables = [table for table in dict.fromkeys(scope.tables) if metadata_index.table(table) is None]
+    if unknown_tables:
+        raise SqlValidationError(f"메타데이터에 없는 테이블입니다: {', '.join(unknown_tables)}",
+                                 'unknown_table', unknown_tables)
+
+    tables = list(dict.fromkeys(scope.tables))
+    # 테이블명 → 컬럼 dict (식별자는 이미 대문자이므로 색인 dict를 직접 조회)
+    table_columns = {table: metadata_index.table(table).columns for table in tables}
+    columns = set()
+    unknown = []
+    for i, token in enumerate(sig):
+        kind = token.kind
+        if kind != 'ident' and kind != 'quoted' or i in scope.consumed:
+            continue
+        if kind == 'ident' and token.upper in _CLAUSE_KEYWORDS:
+            continue
+        prev = sig[i - 1] if i > 0 else None
+        nxt = sig[i + 1] if i + 1 < len(sig) else None
+        if _is_op(nxt, '('):
+            continue
+        name = _identifier_name(token)
+        lookup = name.upper()
+
+        # 별칭.컬럼
+        if _is_op(nxt, '.'):
+            continue
+        if _is_op(prev, '.'):
+            qualifier = sig[i - 2] if i >= 2 else None
+            if qualifier is None or qualifier.kind not in ('ident', 'quoted'):
+                continue
+            qualifier_name = _identifier_name(qualifier)
+            if qualifier_name not in scope.aliases:
+                unknown.append(f"{qualifier_name}.{name}")
+                continue
+            table = scope.aliases[qualifier_name]
+            if table is None:
+                continue
+            if lookup in table_columns[table]:
+                columns.add((table, lookup))
+            else:
+                unknown.append(f"{table}.{name}")
+            continue
+
+        # 컬럼 (별칭/CTE/테이블명이면 제외, 컬럼 출처를 모두 알 때만 확인)
+        if name in scope.column_aliases or name in scope.aliases:
+            continue
+        owners = [table for table in tables if lookup in table_columns[table]]
+        if owners:
+            columns.update((table, lookup) for table in owners)
+        elif not scope.unknown_sources and tables:
+            unknown.append(name)
+
+    if unknown:
+        unknown = list(dict.fromkeys(unknown))
+        raise SqlValidationError(
+            f"메타데이터에 없는 컬럼입니다: {', '.join(unknown)} (참조 테이블: {', '.join(tables) or '없음'})",
+            'unknown_column', unknown
+        )
+    return columns
+
+
+def validate_sql(sql_query, metadata_index=None, row_limit=None):
+    """
+    SQL 검증 및 정규화
+
+    Parameters:
+    - sql_query: 검증할 SQL (여러 문장이면 첫 문장만 사용)
+    - metadata_index: MetadataIndex (있으면 테이블/컬럼 존재 확인)
+    - row_limit: 최상위 FETCH 절이 없으면 FETCH FIRST n ROWS ONLY 추가 (None이면 추가하지 않음)
+
+    Returns:
+    - ValidatedSql
+
+    Raises:
+    - SqlValidationError: 문법 오류, SELECT가 아닌 문장, 쓰기 문장, 메타데이터에 없는 테이블/컬럼
+    """
+    statements = split_statements(tokenize(sql_query or ""))
+    if not statements:
+        raise SqlValidationError("SQL 문장이 없습니다.", 'not_select')
+    statement = statements[0]
+    sig = _significant(statement)
+
+    writes = sorted({token.upper for token in sig if token.kind == 'ident' and token.upper in WRITE_KEYWORDS})
+    if writes:
+        raise SqlValidationError(f"읽기 전용 SELECT 문만 실행할 수 있습니다. (사용된 명령: {', '.join(writes)})",
+                                 'write', writes)
+    if not _is_word(sig[0], 'SELECT', 'WITH'):
+        raise SqlValidationError(f"SELECT 문이 아닙니다: {sig[0].text}", 'not_select')
+
+    scope = _resolve_scope(sig)
+    columns = _check_identifiers(sig, scope, metadata_index) if metadata_index is not None else set()
+
+    sql = render(statement)
+    limited = False
+    if row_limit is not None and not any(_is_word(token, 'FETCH') and token.depth == 0 for token in sig):
+        sql = f"{sql} FETCH FIRST {int(row_limit)} ROWS ONLY"
+        limited = True
+    return ValidatedSql(sql, list(dict.fromkeys(scope.tables)), columns, limited, len(statements))
@@ -1,16 +1,23 @@
 /**
  * ChartManager - 차트 생성 및 관리
+ * - 서버가 검증/정규화한 차트 명세를 Chart.js로 브라우저에서 렌더링 (render_mode=client)
+ * - PNG는 다운로드할 때만 서버에 요청
  */
+const CHART_PALETTE = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b', '#e377c2', '#7f7f7f', '#bcbd22', '#17becf'];
+
 class ChartManager {
     constructor() {
         this.currentChartData = null;
         this.currentChartJson = null;
+        this.chartInstance = null;
+        this.renderMode = 'client';
     }
 
     /**
      * 차트 생성 요청 처리
+     * - regenerate: true면 서버의 LLM 응답 캐시를 사용하지 않고 새로 생성
      */
-    async createChart(chartRequest) {
+    async createChart(chartRequest, regenerate = false) {
         try {
             const currentData = dataManager.getCurrentData();
             if (!currentData.data || !currentData.sql) {
@@ -19,19 +26,12 @@ class ChartManager {
 
             uiController.showLoading('차트를 생성하는 중입니다...');
 
-            const response = await fetch(`/${username}/generate_chart`, {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/x-www-form-urlencoded',
-                },
-                body: `chart_request=${encodeURIComponent(chartRequest)}&result_data=${encodeURIComponent(JSON.stringify(currentData.data))}&sql_query=${encodeURIComponent(currentData.sql)}`
-            });
-
-            if (!response.ok) {
-                throw new Error('차트 생성에 실패했습니다.');
-            }
-
-            const result = await response.json();
+            // 생성 중인 차트 JSON을 로딩 영역에 표시
+            const result = await dataManager.sendWithResult(resultParams => uiController.postEventStream(
+                `/${username}/generate_chart/stream`,
+                `chart_request=${encodeURIComponent(chartRequest)}&${resultParams}&sql_query=${encodeURIComponent(currentData.sql)}&render_mode=${this.renderMode}&regenerate=${regenerate}`,
+                text => uiController.appendLoadingStream(text)
+            ));
 
             // 차트 데이터 저장
             this.currentChartData = result;
@@ -61,8 +61,9 @@ class ChartManager {
 
     /**
      * 차트 수정 요청 처리
+     * - regenerate: true면 서버의 LLM 응답 캐시를 사용하지 않고 새로 생성
      */
-    async modifyChart(modificationRequest) {
+    async modifyChart(modificationRequest, regenerate = false) {
         try {
             if (!this.currentChartJson) {
                 throw new Error('수정할 차트가 없습니다.');
@@ -70,22 +71,23 @@ class ChartManager {
 
             uiController.showLoading('차트를 수정하는 중입니다...');
 
-            const currentData = dataManager.getCurrentData();
-            
-            const response = await fetch(`/${username}/modify_chart_json`, {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/x-www-form-urlencoded',
-                },
-                body: `original_json=${encodeURIComponent(JSON.stringify(this.currentChartJson))}&modification_request=${encodeURIComponent(modificationRequest)}&result_data=${encodeURIComponent(JSON.stringify(currentData.data))}`
+            const result = await dataManager.sendWithResult(async resultParams => {
+                const response = await fetch(`/${username}/modify_chart_json`, {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/x-www-form-urlencoded',
+                    },
+                    body: `original_json=${encodeURIComponent(JSON.stringify(this.currentChartJson))}&modification_request=${encodeURIComponent(modificationRequest)}&${resultParams}&render_mode=${this.renderMode}&regenerate=${regenerate}`
+                });
+
+                if (!response.ok) {
+                    const error = new Error('차트 수정에 실패했습니다.');
+                    error.status = response.status;
+                    throw error;
+                }
+                return response.json();
             });
 
-            if (!response.ok) {
-                throw new Error('차트 수정에 실패했습니다.');
-            }
-
-            const result = await response.json();
-
             // 차트 데이터 업데이트
             this.currentChartData = result;
             this.currentChartJson = result.chart_json;
@@ -137,11 +139,20 @@ class ChartManager {
             titleElement.textContent = chartData.title || '생성된 차트';
         }
 
-        // 차트 이미지
+        // 차트 이미지 (서버 렌더링) 또는 캔버스 (브라우저 렌더링)
         const chartImg = document.getElementById('chartImage');
-        if (chartImg && chartData.chart_base64) {
-            chartImg.src = `data:image/png;base64,${chartData.chart_base64}`;
-            chartImg.style.display = 'block';
+        const canvasWrapper = document.getElementById('chartCanvasWrapper');
+        if (chartData.render_mode === 'client') {
+            if (chartImg) {
+                chartImg.src = '';
+            }
+            this.renderClientChart(chartData, chartImg, canvasWrapper);
+        } else {
+            this.destroyClientChart(canvasWrapper);
+            if (chartImg && chartData.chart_base64) {
+                chartImg.src = `data:image/png;base64,${chartData.chart_base64}`;
+                chartImg.style.display = 'block';
+            }
         }
 
         // 차트 설명
@@ -157,14 +168,214 @@ class ChartManager {
         this.setupDownloadLinks(chartData);
     }
 
+    /**
+     * 브라우저에서 차트 렌더링 (Chart.js를 불러오지 못했으면 서버 PNG로 대체)
+     */
+    async renderClientChart(chartData, chartImg, canvasWrapper) {
+        this.destroyClientChart(canvasWrapper);
+
+        if (typeof Chart === 'undefined') {
+            console.warn('Chart.js를 불러오지 못해 서버 렌더링 이미지로 표시합니다.');
+            try {
+                const blob = await this.exportChartPng(chartData.chart_json);
+                chartImg.src = URL.createObjectURL(blob);
+                chartImg.style.display = 'block';
+            } catch (error) {
+                uiController.showError(error.message);
+            }
+            return;
+        }
+
+        canvasWrapper.classList.remove('d-none');
+        const canvas = document.getElementById('chartCanvas');
+        this.chartInstance = new Chart(canvas, this.toChartJsConfig(chartData.chart_spec || chartData.chart_json));
+    }
+
+    destroyClientChart(canvasWrapper) {
+        if (this.chartInstance) {
+            this.chartInstance.destroy();
+            this.chartInstance = null;
+        }
+        if (canvasWrapper) {
+            canvasWrapper.classList.add('d-none');
+        }
+    }
+
+    /**
+     * 차트 명세를 Chart.js 설정으로 변환
+     * - area: fill 라인, stacked_bar: 누적 바, histogram: 10개 구간 바
+     * - data.positions가 있으면(다운샘플링) 원래 X 위치에 점을 배치
+     */
+    toChartJsConfig(spec) {
+        const data = spec.data || {};
+        const labels = data.labels || [];
+        const datasets = data.datasets || [];
+        const positions = data.positions || null;
+        const specType = spec.type || 'bar';
+
+        const typeMap = { bar: 'bar', stacked_bar: 'bar', histogram: 'bar', line: 'line', area: 'line', scatter: 'scatter', pie: 'pie' };
+        const type = typeMap[specType] || 'bar';
+
+        const styled = (dataset, i, values) => {
+            const { data: _data, ...rest } = dataset;
+            const color = CHART_PALETTE[i % CHART_PALETTE.length];
+            return {
+                label: dataset.label || `데이터 ${i + 1}`,
+                borderColor: color,
+                backgroundColor: specType === 'area' ? `${color}4D` : color,
+                fill: specType === 'area',
+                ...rest,
+                data: values
+            };
+        };
+
+        let chartLabels = labels;
+        let chartDatasets;
+        const scales = {};
+
+        if (specType === 'histogram') {
+            const values = ((datasets[0] || {}).data || []).filter(v => typeof v === 'number');
+            const bins = this.histogramBins(values, 10);
+            chartLabels = bins.labels;
+            chartDatasets = [styled(datasets[0] || {}, 0, bins.counts)];
+        } else if (specType === 'pie') {
+            const values = (datasets[0] || {}).data || [];
+            chartDatasets = [{
+                ...styled(datasets[0] || {}, 0, values.map(v => (typeof v === 'number' ? Math.abs(v) : v))),
+                backgroundColor: values.map((_, i) => CHART_PALETTE[i % CHART_PALETTE.length])
+            }];
+        } else if (positions || specType === 'scatter') {
+            // 숫자 X축에 {x, y} 점으로 배치하고 눈금은 가장 가까운 라벨로 표시
+            chartDatasets = datasets.map((dataset, i) => styled(dataset, i, (dataset.data || []).map((y, j) => ({
+                x: positions ? positions[j] : j,
+                y: y
+            }))));
+            const xs = positions || labels.map((_, j) => j);
+            scales.x = {
+                type: 'linear',
+                ticks: { callback: value => this.nearestLabel(xs, labels, value) }
+            };
+            chartLabels = undefined;
+        } else {
+            chartDatasets = datasets.map((dataset, i) => styled(dataset, i, dataset.data || []));
+        }
+
+        if (specType === 'stacked_bar') {
+            scales.x = { ...(scales.x || {}), stacked: true };
+            scales.y = { ...(scales.y || {}), stacked: true };
+        }
+
+        // LLM이 지정한 Y축 범위 반영 (options.scales.y.min/max)
+        const ySpec = ((spec.options || {}).scales || {}).y || {};
+        if (type !== 'pie' && (ySpec.min !== undefined || ySpec.max !== undefined)) {
+            scales.y = { ...(scales.y || {}), min: ySpec.min, max: ySpec.max };
+        }
+
+        const config = {
+            type: type,
+            data: { datasets: chartDatasets },
+            options: {
+                responsive: true,
+                maintainAspectRatio: false,
+                animation: false,
+                plugins: {
+                    title: { display: !!spec.title, text: spec.title || '', font: { size: 16 } },
+                    legend: { display: true }
+                },
+                scales: type === 'pie' ? undefined : scales
+            }
+        };
+        if (chartLabels !== undefined) {
+            config.data.labels = chartLabels;
+        }
+        if (type === 'line' && positions) {
+            config.options.elements = { point: { radius: 0 } };
+        }
+        return config;
+    }
+
+    histogramBins(values, binCount) {
+        if (!values.length) {
+            return { labels: [], counts: [] };
+        }
+        const min = Math.min(...values);
+        const max = Math.max(...values);
+        const width = (max - min) / binCount || 1;
+        const counts = new Array(binCount).fill(0);
+        values.forEach(v => {
+            counts[Math.min(binCount - 1, Math.floor((v - min) / width))] += 1;
+        });
+        const labels = counts.map((_, i) => `${(min + i * width).toFixed(1)}~${(min + (i + 1) * width).toFixed(1)}`);
+        return { labels, counts };
+    }
+
+    nearestLabel(xs, labels, value) {
+        if (!labels.length) {
+            return value;
+        }
+        // xs는 오름차순이므로 이진 탐색
+        let lo = 0;
+        let hi = xs.length - 1;
+        while (lo < hi) {
+            const mid = (lo + hi) >> 1;
+            if (xs[mid] < value) {
+                lo = mid + 1;
+            } else {
+                hi = mid;
+            }
+        }
+        if (lo > 0 && Math.abs(xs[lo - 1] - value) < Math.abs(xs[lo] - value)) {
+            lo -= 1;
+        }
+        return labels[lo];
+    }
+
+    /**
+     * 서버에서 차트 PNG 생성 (다운로드/Chart.js 미사용 시)
+     */
+    async exportChartPng(chartJson) {
+        return dataManager.sendWithResult(async resultParams => {
+            const response = await fetch(`/${username}/export_chart`, {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/x-www-form-urlencoded',
+                },
+                body: `chart_json=${encodeURIComponent(JSON.stringify(chartJson))}&${resultParams}`
+            });
+            if (!response.ok) {
+                const error = new Error('차트 이미지 생성에 실패했습니다.');
+                error.status = response.status;
+                throw error;
+            }
+            return response.blob();
+        });
+    }
+
     /**
      * 다운로드 링크 설정
      */
     setupDownloadLinks(chartData) {
         // 차트 다운로드
         const downloadChartBtn = document.getElementById('downloadChartBtn');
-        if (downloadChartBtn && chartData.chart_base64) {
+        if (downloadChartBtn && chartData.render_mode === 'client') {
+            // 브라우저 렌더링 차트는 다운로드할 때 서버에서 PNG 생성
+            downloadChartBtn.href = '#';
+            downloadChartBtn.onclick = async (e) => {
+                e.preventDefault();
+                try {
+                    const blob = await this.exportChartPng(chartData.chart_json);
+                    const link = document.createElement('a');
+                    link.href = URL.createObjectURL(blob);
+                    link.download = `${chartData.title || 'chart'}.png`;
+                    link.click();
+                    setTimeout(() => URL.revokeObjectURL(link.href), 1000);
+                } catch (error) {
+                    uiController.showError(error.message);
+                }
+            };
+        } else if (downloadChartBtn && chartData.chart_base64) {
             const dataUrl = `data:image/png;base64,${chartData.chart_base64}`;
+            downloadChartBtn.onclick = null;
             downloadChartBtn.href = dataUrl;
             downloadChartBtn.download = `${chartData.title || 'chart'}.png`;
         }
@@ -201,6 +412,11 @@ class ChartManager {
                     <span class="badge bg-light text-dark chart-example" data-request="파이차트로 각 항목의 비율을 표시해줘">파이차트로 비율 표시</span>
                 </div>
             </div>
+
+            <div class="form-check mb-3">
+                <input class="form-check-input" type="checkbox" id="chartRequestRegenerate">
+                <label class="form-check-label" for="chartRequestRegenerate">새로 생성 (저장된 응답을 사용하지 않음)</label>
+            </div>
         `, [
             { text: '취소', class: 'btn-secondary', action: 'close' },
             { text: '차트 생성', class: 'btn-success', action: 'submit' }
@@ -222,8 +438,9 @@ class ChartManager {
                 return;
             }
 
+            const regenerate = document.getElementById('chartRequestRegenerate').checked;
             modalManager.closeModal(modal);
-            this.createChart(chartRequest);
+            this.createChart(chartRequest, regenerate);
         };
 
         modalManager.showModal(modal);
@@ -252,6 +469,11 @@ class ChartManager {
                     <span class="badge bg-light text-dark modify-example" data-request="범례를 제거해줘">범례 제거</span>
                 </div>
             </div>
+
+            <div class="form-check mb-3">
+                <input class="form-check-input" type="checkbox" id="chartModificationRegenerate">
+                <label class="form-check-label" for="chartModificationRegenerate">새로 생성 (저장된 응답을 사용하지 않음)</label>
+            </div>
         `, [
             { text: '취소', class: 'btn-secondary', action: 'close' },
             { text: '수정 적용', class: 'btn-warning', action: 'submit' }
@@ -273,8 +495,9 @@ class ChartManager {
                 return;
             }
 
+            const regenerate = document.getElementById('chartModificationRegenerate').checked;
             modalManager.closeModal(modal);
-            this.modifyChart(modificationRequest);
+            this.modifyChart(modificationRequest, regenerate);
         };
 
         modalManager.showModal(modal);
@@ -1,11 +1,19 @@
 /**
  * DataManager - 데이터 관련 작업 관리
  */
+// 결과 테이블 페이지 크기 / 보이는 구간 위아래로 미리 그릴 행 수 / 브라우저에 유지할 최대 페이지 수
+const DATA_PAGE_SIZE = 200;
+const DATA_TABLE_OVERSCAN = 20;
+const DATA_TABLE_MAX_CACHED_PAGES = 20;
+const DATA_TABLE_ROW_HEIGHT = 37;
+
 class DataManager {
     constructor() {
         this.predefinedQueries = [];
         this.currentData = null;
         this.currentSql = null;
+        // 서버에 보관된 결과 핸들 (차트 요청 시 결과 데이터 대신 전송)
+        this.currentHandle = null;
     }
 
     /**
@@ -78,7 +86,7 @@ class DataManager {
                 headers: {
                     'Content-Type': 'application/x-www-form-urlencoded',
                 },
-                body: `query_id=${encodeURIComponent(query.id)}`
+                body: `query_id=${encodeURIComponent(query.id)}&result_format=columnar`
             });
 
             if (!response.ok) {
@@ -86,10 +94,12 @@ class DataManager {
             }
 
             const result = await response.json();
+            result.result_data = this.rowsFromResult(result.result_data);
             
             // 데이터 저장
             this.currentData = result.result_data;
             this.currentSql = result.sql_query;
+            this.currentHandle = result.result_handle || null;
 
             // 히스토리에 저장
             sessionHistory.saveStep(
@@ -97,7 +107,8 @@ class DataManager {
                 {
                     query: query,
                     sql: result.sql_query,
-                    data: result.result_data
+                    data: result.result_data,
+                    handle: this.currentHandle
                 },
                 `선택: ${query.name}`
             );
@@ -135,28 +146,31 @@ class DataManager {
 
     /**
      * 데이터 수정 요청 처리
+     * - regenerate: true면 서버의 LLM 응답 캐시를 사용하지 않고 새로 생성
      */
-    async modifyData(modificationRequest) {
+    async modifyData(modificationRequest, regenerate = false) {
         try {
             uiController.showLoading('데이터를 수정하는 중입니다...');
 
-            const response = await fetch(`/${username}/modify_sql`, {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/x-www-form-urlencoded',
-                },
-                body: `original_sql=${encodeURIComponent(this.currentSql)}&modification_request=${encodeURIComponent(modificationRequest)}&current_data=${encodeURIComponent(JSON.stringify(this.currentData))}`
-            });
-
-            if (!response.ok) {
-                throw new Error('데이터 수정에 실패했습니다.');
-            }
-
-            const result = await response.json();
+            // 생성 중인 SQL을 로딩 영역에 표시
+            const result = await uiController.postEventStream(
+                `/${username}/modify_sql/stream`,
+                `original_sql=${encodeURIComponent(this.currentSql)}&modification_request=${encodeURIComponent(modificationRequest)}&${this.currentDataParams()}&result_format=columnar&regenerate=${regenerate}`,
+                text => uiController.appendLoadingStream(text),
+                (eventName, payload) => {
+                    // 전체 결과를 받기 전에 첫 행들을 먼저 표시
+                    if (eventName === 'preview') {
+                        this.createDataTable(this.rowsFromResult(payload.result_data), null);
+                        document.getElementById('currentSqlQuery').textContent = payload.sql_query;
+                    }
+                }
+            );
 
             // 데이터 업데이트
+            result.result_data = this.rowsFromResult(result.result_data);
             this.currentData = result.result_data;
             this.currentSql = result.sql_query;
+            this.currentHandle = result.result_handle || null;
 
             // 히스토리에 저장
             sessionHistory.saveStep(
@@ -164,7 +178,8 @@ class DataManager {
                 {
                     modificationRequest: modificationRequest,
                     sql: result.sql_query,
-                    data: result.result_data
+                    data: result.result_data,
+                    handle: this.currentHandle
                 },
                 modificationRequest
             );
@@ -185,14 +200,21 @@ class DataManager {
 
     /**
      * 데이터 테이블 생성
+     * - 보이는 구간의 행만 그리는 가상 스크롤 테이블
+     * - 받은 결과 뒤의 행은 스크롤할 때 서버 보관 결과에서 페이지 단위로 조회
      */
-    createDataTable(data) {
+    createDataTable(data, handle = this.currentHandle) {
         const tableHead = document.getElementById('dataTableHead');
         const tableBody = document.getElementById('dataTableBody');
+        const viewport = document.getElementById('dataTableViewport');
 
         // 테이블 초기화
         tableHead.innerHTML = '';
         tableBody.innerHTML = '';
+        viewport.scrollTop = 0;
+        viewport.onscroll = null;
+        this.table = null;
+        this.updateTableStatus();
 
         // 데이터가 없는 경우
         if (!data || data.length === 0) {
@@ -201,8 +223,9 @@ class DataManager {
         }
 
         // 테이블 헤더 생성
+        const columns = Object.keys(data[0]);
         const headerRow = document.createElement('tr');
-        Object.keys(data[0]).forEach(key => {
+        columns.forEach(key => {
             const th = document.createElement('th');
             th.scope = 'col';
             th.textContent = key;
@@ -210,42 +233,219 @@ class DataManager {
         });
         tableHead.appendChild(headerRow);
 
-        // 테이블 본문 생성 (최대 50행)
-        const maxRows = Math.min(data.length, 50);
-        for (let i = 0; i < maxRows; i++) {
-            const row = data[i];
-            const tr = document.createElement('tr');
-            
-            Object.values(row).forEach(value => {
-                const td = document.createElement('td');
-                
-                // 값 처리
-                if (value === null || value === undefined) {
-                    td.textContent = '-';
-                    td.className = 'text-muted';
-                } else if (typeof value === 'number') {
-                    td.textContent = value.toLocaleString();
-                    td.style.textAlign = 'right';
-                } else {
-                    td.textContent = value;
-                }
-                
-                tr.appendChild(td);
-            });
-            
-            tableBody.appendChild(tr);
+        this.table = {
+            columns: columns,
+            rows: data,
+            handle: handle,
+            // 서버에서 전체 행 수를 받기 전까지는 받은 행 + 불러오기 행 1개
+            totalRows: data.length,
+            totalExact: true,
+            totalKnown: !handle,
+            pages: new Map(),
+            pending: new Set(),
+            rowHeight: DATA_TABLE_ROW_HEIGHT,
+            renderScheduled: false,
+            message: null
+        };
+        viewport.onscroll = () => this.scheduleTableRender();
+        this.renderTableWindow();
+    }
+
+    /**
+     * 스크롤 시 다음 프레임에 한 번만 다시 그리기
+     */
+    scheduleTableRender() {
+        const table = this.table;
+        if (!table || table.renderScheduled) {
+            return;
+        }
+        table.renderScheduled = true;
+        requestAnimationFrame(() => {
+            table.renderScheduled = false;
+            if (this.table === table) {
+                this.renderTableWindow();
+            }
+        });
+    }
+
+    /**
+     * 보이는 구간(+여유 행)만 그리고 위/아래는 빈 행으로 높이 유지
+     */
+    renderTableWindow() {
+        const table = this.table;
+        const tableBody = document.getElementById('dataTableBody');
+        const viewport = document.getElementById('dataTableViewport');
+        const displayed = table.totalKnown ? table.totalRows : table.rows.length + 1;
+
+        const first = Math.max(0, Math.floor(viewport.scrollTop / table.rowHeight) - DATA_TABLE_OVERSCAN);
+        const last = Math.min(displayed,
+            Math.ceil((viewport.scrollTop + viewport.clientHeight) / table.rowHeight) + DATA_TABLE_OVERSCAN);
+
+        const fragment = document.createDocumentFragment();
+        fragment.appendChild(this.createSpacerRow(first * table.rowHeight));
+        const missingPages = new Set();
+        for (let i = first; i < last; i++) {
+            const row = this.getTableRow(i);
+            if (row) {
+                fragment.appendChild(this.createTableRow(row));
+            } else {
+                missingPages.add(Math.floor(i / DATA_PAGE_SIZE));
+                fragment.appendChild(this.createPlaceholderRow());
+            }
+        }
+        fragment.appendChild(this.createSpacerRow((displayed - last) * table.rowHeight));
+
+        tableBody.innerHTML = '';
+        tableBody.appendChild(fragment);
+
+        // 실제 행 높이로 보정 (글꼴/테마에 따라 다름)
+        const sample = tableBody.querySelector('tr.data-row');
+        if (sample && sample.offsetHeight && Math.abs(sample.offsetHeight - table.rowHeight) > 1) {
+            table.rowHeight = sample.offsetHeight;
+            this.scheduleTableRender();
+        }
+
+        missingPages.forEach(page => this.fetchTablePage(table, page));
+        this.updateTableStatus();
+    }
+
+    /**
+     * 행 조회 (받은 결과 → 불러온 페이지 순)
+     */
+    getTableRow(index) {
+        const table = this.table;
+        if (index < table.rows.length) {
+            return table.rows[index];
+        }
+        const page = table.pages.get(Math.floor(index / DATA_PAGE_SIZE));
+        return page ? page[index % DATA_PAGE_SIZE] : undefined;
+    }
+
+    /**
+     * 서버 보관 결과에서 한 페이지 조회
+     */
+    async fetchTablePage(table, page) {
+        if (!table.handle || table.pending.has(page) || table.pages.has(page) || table.message) {
+            return;
+        }
+        table.pending.add(page);
+        try {
+            const response = await fetch(
+                `/${username}/results/${encodeURIComponent(table.handle)}/page?offset=${page * DATA_PAGE_SIZE}&limit=${DATA_PAGE_SIZE}&result_format=columnar`
+            );
+            if (!response.ok) {
+                throw new Error(response.status === 410
+                    ? '결과가 만료되어 추가 행을 불러올 수 없습니다. 쿼리를 다시 실행해주세요.'
+                    : '추가 행을 불러오지 못했습니다.');
+            }
+            const result = await response.json();
+
+            // 오래된 페이지부터 버려 브라우저 메모리 제한
+            table.pages.set(page, this.rowsFromResult(result.result_data));
+            while (table.pages.size > DATA_TABLE_MAX_CACHED_PAGES) {
+                table.pages.delete(table.pages.keys().next().value);
+            }
+            table.totalRows = Math.max(result.total_rows, table.rows.length);
+            table.totalExact = result.total_exact;
+            table.totalKnown = true;
+        } catch (error) {
+            console.error('Error fetching result page:', error);
+            table.message = error.message;
+            table.totalRows = table.rows.length;
+            table.totalKnown = true;
+        } finally {
+            table.pending.delete(page);
         }
+        if (this.table === table) {
+            this.renderTableWindow();
+        }
+    }
 
-        // 행 수 제한 메시지
-        if (data.length > 50) {
-            const tr = document.createElement('tr');
+    createTableRow(row) {
+        const tr = document.createElement('tr');
+        tr.className = 'data-row';
+        this.table.columns.forEach(column => {
+            const value = row[column];
             const td = document.createElement('td');
-            td.colSpan = Object.keys(data[0]).length;
-            td.className = 'text-center text-muted py-2';
-            td.textContent = `전체 ${data.length}행 중 50행만 표시합니다.`;
+
+            // 값 처리
+            if (value === null || value === undefined) {
+                td.textContent = '-';
+                td.className = 'text-muted';
+            } else if (typeof value === 'number') {
+                td.textContent = value.toLocaleString();
+                td.style.textAlign = 'right';
+            } else {
+                td.textContent = value;
+                td.title = value;
+            }
+
             tr.appendChild(td);
-            tableBody.appendChild(tr);
+        });
+        return tr;
+    }
+
+    createPlaceholderRow() {
+        const tr = document.createElement('tr');
+        tr.className = 'data-row';
+        const td = document.createElement('td');
+        td.colSpan = this.table.columns.length;
+        td.className = 'text-center text-muted';
+        td.textContent = '불러오는 중...';
+        tr.appendChild(td);
+        return tr;
+    }
+
+    createSpacerRow(height) {
+        const tr = document.createElement('tr');
+        tr.className = 'virtual-spacer';
+        const td = document.createElement('td');
+        td.colSpan = this.table.columns.length;
+        td.style.height = `${height}px`;
+        tr.appendChild(td);
+        return tr;
+    }
+
+    /**
+     * 테이블 아래 행 수 표시
+     */
+    updateTableStatus() {
+        const status = document.getElementById('dataTableStatus');
+        const table = this.table;
+        if (!status) {
+            return;
+        }
+        if (!table) {
+            status.textContent = '';
+            return;
+        }
+        const total = table.totalRows.toLocaleString();
+        let text = table.totalKnown
+            ? `전체 ${total}${table.totalExact ? '' : '+'}행`
+            : `${total}행 (스크롤하면 더 불러옵니다)`;
+        if (table.message) {
+            text += ` - ${table.message}`;
         }
+        status.textContent = text;
+    }
+
+    /**
+     * 결과 데이터를 행 객체 배열로 변환 (columnar 형식: 컬럼명 한 번 + 컬럼별 값 배열)
+     */
+    rowsFromResult(resultData) {
+        if (!resultData || resultData.format !== 'columnar') {
+            return resultData;
+        }
+        const { columns, data, row_count: rowCount } = resultData;
+        const rows = new Array(rowCount);
+        for (let r = 0; r < rowCount; r++) {
+            const row = {};
+            for (let c = 0; c < columns.length; c++) {
+                row[columns[c]] = data[c][r];
+            }
+            rows[r] = row;
+        }
+        return rows;
     }
 
     /**
@@ -254,10 +454,47 @@ class DataManager {
     getCurrentData() {
         return {
             data: this.currentData,
-            sql: this.currentSql
+            sql: this.currentSql,
+            handle: this.currentHandle
         };
     }
 
+    /**
+     * 결과 데이터 요청 파라미터 (서버 보관 핸들이 있으면 핸들만 전송)
+     */
+    resultParams() {
+        if (this.currentHandle) {
+            return `result_handle=${encodeURIComponent(this.currentHandle)}`;
+        }
+        return `result_data=${encodeURIComponent(JSON.stringify(this.currentData || []))}`;
+    }
+
+    /**
+     * SQL 수정용 현재 데이터 파라미터 (핸들이 있으면 서버가 샘플 생성)
+     */
+    currentDataParams() {
+        if (this.currentHandle) {
+            return `result_handle=${encodeURIComponent(this.currentHandle)}`;
+        }
+        return `current_data=${encodeURIComponent(JSON.stringify(this.currentData))}`;
+    }
+
+    /**
+     * 결과 데이터를 포함한 요청 전송
+     * - 서버 보관 결과가 만료되면(410) 핸들을 버리고 결과 데이터를 직접 보내 한 번 재시도
+     */
+    async sendWithResult(send) {
+        try {
+            return await send(this.resultParams());
+        } catch (error) {
+            if (error.status !== 410 || !this.currentHandle) {
+                throw error;
+            }
+            this.currentHandle = null;
+            return send(this.resultParams());
+        }
+    }
+
     /**
      * 데이터 다운로드
      */
@@ -297,6 +534,7 @@ class DataManager {
             
             this.currentData = step.data.data;
             this.currentSql = step.data.sql;
+            this.currentHandle = step.data.handle || null;
 
             // UI 업데이트
             if (step.type === sessionHistory.stepTypes.PREDEFINED) {
@@ -164,10 +164,22 @@ class ModalManager {
 
             const data = await response.json();
             const contentDiv = modal.querySelector('#metadataContent');
-            contentDiv.innerHTML = '<div id="jsonTree"></div>';
+            contentDiv.innerHTML = `
+                <input type="search" id="metadataSearch" class="form-control mb-2"
+                       placeholder="테이블/컬럼 이름 또는 한글명 검색">
+                <div id="metadataSearchResults" class="mb-2"></div>
+                <div id="jsonTree"></div>
+            `;
             
             this.buildJsonTree(data, modal.querySelector('#jsonTree'));
 
+            let searchTimer = null;
+            modal.querySelector('#metadataSearch').addEventListener('input', (event) => {
+                clearTimeout(searchTimer);
+                const text = event.target.value.trim();
+                searchTimer = setTimeout(() => this.searchMetadata(modal, text), 250);
+            });
+
         } catch (error) {
             console.error('Error loading metadata:', error);
             const contentDiv = modal.querySelector('#metadataContent');
@@ -180,6 +192,39 @@ class ModalManager {
         }
     }
 
+    /**
+     * 메타데이터 색인 검색 (테이블/컬럼 이름·한글명)
+     */
+    async searchMetadata(modal, text) {
+        const resultsDiv = modal.querySelector('#metadataSearchResults');
+        if (!text) {
+            resultsDiv.innerHTML = '';
+            return;
+        }
+        try {
+            const response = await fetch(`/${username}/metadata/search?q=${encodeURIComponent(text)}`);
+            if (!response.ok) {
+                throw new Error('메타데이터 검색에 실패했습니다.');
+            }
+            const data = await response.json();
+            const list = document.createElement('ul');
+            list.className = 'list-group';
+            for (const item of data.results) {
+                const li = document.createElement('li');
+                li.className = 'list-group-item py-1';
+                const name = item.type === 'column' ? `${item.table}.${item.column}` : item.table;
+                const key = item.is_key ? ' [PK]' : '';
+                li.textContent = `${name}${key} - ${item.korean_name || ''} ${item.description && item.description !== item.korean_name ? `(${item.description})` : ''}`;
+                list.appendChild(li);
+            }
+            resultsDiv.innerHTML = data.results.length ? '' : '<small class="text-muted">검색 결과가 없습니다.</small>';
+            resultsDiv.appendChild(list);
+        } catch (error) {
+            console.error('Error searching metadata:', error);
+            resultsDiv.innerHTML = `<small class="text-danger">${error.message}</small>`;
+        }
+    }
+
     /**
      * JSON 트리 빌드
      */
@@ -6,6 +6,7 @@ class UIController {
         this.currentStep = 1;
         this.loadingElement = null;
         this.errorElement = null;
+        this.activeStream = null;
         
         this.initializeElements();
         this.setupEventListeners();
@@ -119,7 +120,8 @@ class UIController {
             return;
         }
 
-        chartManager.createChart(chartRequest);
+        const regenerate = document.getElementById('chartRegenerate').checked;
+        chartManager.createChart(chartRequest, regenerate);
     }
 
     /**
@@ -145,6 +147,11 @@ class UIController {
                     <span class="badge bg-light text-dark modify-example" data-request="특정 고객 제외하고 보여줘">특정 데이터 제외</span>
                 </div>
             </div>
+
+            <div class="form-check mb-3">
+                <input class="form-check-input" type="checkbox" id="dataModificationRegenerate">
+                <label class="form-check-label" for="dataModificationRegenerate">새로 생성 (저장된 응답을 사용하지 않음)</label>
+            </div>
         `, [
             { text: '취소', class: 'btn-secondary', action: 'close' },
             { text: '수정 적용', class: 'btn-warning', action: 'submit' }
@@ -166,8 +173,9 @@ class UIController {
                 return;
             }
 
+            const regenerate = document.getElementById('dataModificationRegenerate').checked;
             modalManager.closeModal(modal);
-            dataManager.modifyData(modificationRequest);
+            dataManager.modifyData(modificationRequest, regenerate);
         };
 
         modalManager.showModal(modal);
@@ -254,10 +262,102 @@ class UIController {
             if (messageElement) {
                 messageElement.textContent = message;
             }
+            const streamElement = document.getElementById('loadingStream');
+            if (streamElement) {
+                streamElement.textContent = '';
+                streamElement.classList.add('d-none');
+            }
         }
         this.hideError();
     }
 
+    /**
+     * 로딩 영역에 생성 중인 텍스트 이어 붙이기
+     */
+    appendLoadingStream(text) {
+        const streamElement = document.getElementById('loadingStream');
+        if (streamElement) {
+            streamElement.classList.remove('d-none');
+            streamElement.textContent += text;
+            streamElement.scrollTop = streamElement.scrollHeight;
+        }
+    }
+
+    /**
+     * SSE 스트리밍 POST 요청
+     * - token 이벤트는 onToken으로 전달하고 result 이벤트의 데이터를 반환
+     * - 그 밖의 이벤트(preview 등)는 onEvent로 전달
+     * - 새 스트림을 시작하면 이전 스트림은 중단 (서버 측 생성도 취소됨)
+     */
+    async postEventStream(url, body, onToken, onEvent) {
+        if (this.activeStream) {
+            this.activeStream.abort();
+        }
+        const controller = new AbortController();
+        this.activeStream = controller;
+
+        try {
+            const response = await fetch(url, {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/x-www-form-urlencoded',
+                },
+                body: body,
+                signal: controller.signal
+            });
+
+            if (!response.ok || !response.body) {
+                const error = new Error('요청 처리에 실패했습니다.');
+                error.status = response.status;
+                throw error;
+            }
+
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = '';
+
+            while (true) {
+                const { done, value } = await reader.read();
+                if (done) {
+                    break;
+                }
+                buffer += decoder.decode(value, { stream: true });
+
+                let boundary;
+                while ((boundary = buffer.indexOf('\n\n')) >= 0) {
+                    const message = buffer.slice(0, boundary);
+                    buffer = buffer.slice(boundary + 2);
+
+                    let eventName = 'message';
+                    let data = '';
+                    message.split('\n').forEach(line => {
+                        if (line.startsWith('event:')) {
+                            eventName = line.slice(6).trim();
+                        } else if (line.startsWith('data:')) {
+                            data += line.slice(5).trim();
+                        }
+                    });
+                    const payload = data ? JSON.parse(data) : {};
+
+                    if (eventName === 'token') {
+                        onToken(payload.text);
+                    } else if (eventName === 'result') {
+                        return payload;
+                    } else if (eventName === 'error') {
+                        throw new Error(payload.error);
+                    } else if (onEvent) {
+                        onEvent(eventName, payload);
+                    }
+                }
+            }
+            throw new Error('응답이 완료되기 전에 연결이 종료되었습니다.');
+        } finally {
+            if (this.activeStream === controller) {
+                this.activeStream = null;
+            }
+        }
+    }
+
     /**
      * 로딩 상태 숨기기
      */
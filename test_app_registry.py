@@ -0,0 +1,198 @@
+"""
+test_app_registry.py - 사용자별 앱 레지스트리 단위 테스트
+느린 사용자 앱 생성이 다른 사용자를 막지 않는지, 같은 사용자 동시 요청은 한 번만 생성하는지,
+실패는 저장하지 않는지, 백그라운드 미리 생성, LRU/유휴 제거와 정리, 사용 중인 앱의 정리 지연 확인
+"""
+
+import threading
+import time
+
+import pytest
+
+from app_registry import AppRegistry
+
+
+class _SlowFactory:
+    """slow_users의 생성은 release 이벤트가 설정될 때까지 멈춤"""
+
+    def __init__(self, slow_users=()):
+        self.slow_users = set(slow_users)
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def __call__(self, username):
+        with self.lock:
+            self.calls.append(username)
+        if username in self.slow_users:
+            self.started.set()
+            assert self.release.wait(10)
+        return {'username': username}
+
+
+def test_slow_user_does_not_block_other_users():
+    """user A 생성 중에도 user B는 바로 생성/반환, A의 동시 요청은 생성 한 번을 기다림"""
+    factory = _SlowFactory(slow_users={'alice'})
+    registry = AppRegistry(factory)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get('alice'))) for _ in range(3)]
+    threads[0].start()
+    assert factory.started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+
+    start = time.perf_counter()
+    bob = registry.get('bob')
+    elapsed = time.perf_counter() - start
+    assert bob == {'username': 'bob'}
+    assert elapsed < 0.5
+    assert registry.peek('alice') is None
+
+    factory.release.set()
+    for thread in threads:
+        thread.join(5)
+    assert len(results) == 3
+    assert all(result is results[0] for result in results)
+    assert factory.calls.count('alice') == 1
+
+    stats = registry.get_stats()
+    assert stats['created'] == 2
+    assert stats['apps'] == 2
+    assert stats['pending'] == 0
+
+
+def test_failed_creation_is_retried():
+    """생성 실패는 저장하지 않고 다음 요청에서 다시 생성"""
+    attempts = []
+
+    def factory(username):
+        attempts.append(username)
+        if len(attempts) == 1:
+            raise RuntimeError("Oracle 연결 실패")
+        return {'username': username}
+
+    registry = AppRegistry(factory)
+    with pytest.raises(RuntimeError):
+        registry.get('alice')
+    assert registry.get('alice') == {'username': 'alice'}
+    assert registry.get_stats()['failed'] == 1
+
+
+def test_warm_up_creates_in_background():
+    """warm_up은 기다리지 않고 반환, 이후 get은 미리 생성된 앱 사용"""
+    factory = _SlowFactory(slow_users={'alice'})
+    registry = AppRegistry(factory)
+
+    assert registry.warm_up('alice')
+    assert factory.started.wait(5)
+    assert not registry.warm_up('alice')
+
+    factory.release.set()
+    app = registry.get('alice')
+    assert app == {'username': 'alice'}
+    assert factory.calls == ['alice']
+    assert registry.get_stats()['warmups'] == 1
+
+
+def test_lru_eviction_and_cleanup():
+    """최대 앱 수를 넘으면 가장 오래 사용되지 않은 앱을 정리 후 제거, 메모리 집계 반영"""
+    cleaned = []
+    registry = AppRegistry(lambda username: {'username': username}, max_apps=2,
+                           cleanup=cleaned.append, sizeof=lambda app: 100)
+
+    alice = registry.get('alice')
+    registry.get('bob')
+    registry.get('alice')
+    registry.get('carol')
+
+    assert cleaned == [{'username': 'bob'}]
+    assert registry.peek('bob') is None
+    assert registry.peek('alice') is alice
+
+    stats = registry.get_stats()
+    assert stats['apps'] == 2
+    assert stats['evicted'] == 1
+    assert stats['total_bytes'] == 200
+    assert stats['user_bytes'] == {'alice': 100, 'carol': 100}
+
+
+def test_idle_apps_expire(monkeypatch):
+    """마지막 사용 후 idle_ttl이 지난 앱은 정리 후 제거, 다시 요청하면 새로 생성"""
+    now = [1000.0]
+    monkeypatch.setattr('app_registry.time.time', lambda: now[0])
+    cleaned = []
+    registry = AppRegistry(lambda username: {'username': username}, idle_ttl=60, cleanup=cleaned.append)
+
+    first = registry.get('alice')
+    registry.get('bob')
+    now[0] += 50
+    registry.get('alice')
+    now[0] += 20
+    assert registry.evict_idle() == 1
+    assert cleaned == [{'username': 'bob'}]
+    assert registry.peek('alice') is first
+
+    now[0] += 61
+    second = registry.get('alice')
+    assert second is not first
+    assert cleaned[-1] is first
+    assert registry.get_stats()['expired'] == 2
+
+
+def test_leased_app_cleanup_deferred_until_release():
+    """사용 중(임대 중)인 앱은 제거되어도 마지막 임대 반납 후에만 정리, 유휴 제거 대상도 아님"""
+    cleaned = []
+    registry = AppRegistry(lambda username: {'username': username}, max_apps=1, cleanup=cleaned.append)
+
+    first = registry.acquire('alice')
+    second = registry.acquire('alice')
+    assert second.app is first.app
+    assert registry.get_stats()['leases'] == {'alice': 2}
+
+    registry.get('bob')
+    assert registry.peek('alice') is None
+    assert cleaned == []
+    assert registry.get_stats()['deferred_cleanups'] == 1
+
+    first.release()
+    first.release()
+    assert cleaned == []
+    with second as app:
+        assert app is first.app
+    assert cleaned == [{'username': 'alice'}]
+
+    # 반납된 임대는 새 앱에 영향 없음, 새로 생성된 앱은 임대 없이 바로 정리
+    registry.get('alice')
+    assert cleaned == [{'username': 'alice'}, {'username': 'bob'}]
+
+
+def test_leased_app_not_expired(monkeypatch):
+    """임대 중인 앱은 idle_ttl이 지나도 제거하지 않음"""
+    now = [1000.0]
+    monkeypatch.setattr('app_registry.time.time', lambda: now[0])
+    registry = AppRegistry(lambda username: {'username': username}, idle_ttl=60)
+
+    app_lease = registry.acquire('alice')
+    now[0] += 120
+    assert registry.evict_idle() == 0
+    app_lease.release()
+    assert registry.evict_idle() == 1
+
+
+def test_sizes_refreshed_on_stats():
+    """사용자별 추정 메모리는 생성 후에도 바뀌므로 통계 조회 시 다시 계산"""
+    usage = {'alice': 0, 'bob': 10}
+    registry = AppRegistry(lambda username: {'username': username},
+                           sizeof=lambda app: usage[app['username']])
+    registry.get('alice')
+    registry.get('bob')
+    assert registry.get_stats()['total_bytes'] == 10
+
+    usage['alice'] = 500
+    stats = registry.get_stats()
+    assert stats['user_bytes'] == {'alice': 500, 'bob': 10}
+    assert stats['total_bytes'] == 510
+    registry.remove('alice')
+    assert registry.get_stats()['total_bytes'] == 10
@@ -0,0 +1,207 @@
+"""
+test_chart_generator.py - 차트 생성기 단위 테스트
+여러 스레드에서 동시에 렌더링해도 차트끼리 섞이지 않는지 확인
+"""
+
+import base64
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from chart_generator import ChartGenerator
+from config import Config
+from render_cache import RenderCache, make_render_key
+from render_pool import RenderPool, RenderTimeoutError
+from chart_downsample import downsample_chart_json, lttb_indices, minmax_indices
+
+# 로깅 설정
+logging.basicConfig(level=logging.WARNING)
+
+CHART_TYPES = ['bar', 'line', 'pie', 'scatter', 'area', 'histogram', 'stacked_bar']
+
+
+@pytest.fixture
+def no_render_cache():
+    """렌더링 자체를 검증하는 테스트는 캐시를 끄고 실행"""
+    original = Config.CHART_CACHE_ENABLED
+    Config.CHART_CACHE_ENABLED = False
+    yield
+    Config.CHART_CACHE_ENABLED = original
+
+
+def _make_chart_json(i):
+    """차트마다 유형/제목/데이터가 달라 섞이면 이미지가 달라지도록 구성"""
+    labels = [f"L{i}-{n}" for n in range(4 + i % 3)]
+    return {
+        "type": CHART_TYPES[i % len(CHART_TYPES)],
+        "title": f"Chart {i}",
+        "figsize": (4, 3),
+        "data": {
+            "labels": labels,
+            "datasets": [
+                {"label": f"Series {i}-{k}", "data": [(i * 7 + n * (k + 1)) % 50 + 1 for n in range(len(labels))]}
+                for k in range(1 + i % 2)
+            ]
+        }
+    }
+
+
+def test_concurrent_rendering_has_no_cross_talk(tmp_path, no_render_cache):
+    """200개 차트를 16개 스레드에서 렌더링한 결과가 단독 렌더링 결과와 모두 같은지 확인"""
+    generator = ChartGenerator(output_dir=str(tmp_path))
+    charts = [_make_chart_json(i) for i in range(200)]
+    df = pd.DataFrame()
+
+    # 기준 이미지: 한 번에 하나씩 렌더링
+    expected = [generator.create_chart(dict(chart), df)[1] for chart in charts]
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        results = list(executor.map(lambda chart: generator.create_chart(dict(chart), df), charts))
+
+    mismatched = [i for i, (_, image) in enumerate(results) if image != expected[i]]
+    assert not mismatched, f"다른 차트와 섞인 이미지: {mismatched[:10]}"
+
+    # 같은 초에 생성되어도 파일명이 겹치지 않아야 함
+    paths = {path for path, _ in results}
+    assert len(paths) == len(charts)
+    for path, image in results[:5]:
+        generator.wait_for_file(path)
+        with open(path, 'rb') as f:
+            assert base64.b64encode(f.read()).decode('utf-8') == image
+    print(f"✅ 동시 렌더링 확인 - {len(charts)}개 차트, 16 스레드")
+
+
+def test_single_render_matches_tight_savefig(tmp_path, no_render_cache):
+    """한 번 렌더링한 PNG가 파일/Base64에 같이 쓰이고 savefig(bbox_inches="tight")와 같은 크기인지 확인"""
+    from PIL import Image
+    from matplotlib.figure import Figure
+
+    generator = ChartGenerator(output_dir=str(tmp_path))
+    timings = {}
+    path, image = generator.create_chart(_make_chart_json(0), pd.DataFrame(), timings)
+    generator.wait_for_file(path)
+
+    with open(path, 'rb') as f:
+        assert base64.b64encode(f.read()).decode('utf-8') == image
+    assert set(timings) == {'downsample', 'layout', 'rasterize', 'encode', 'write'}
+
+    # 같은 차트를 기존 방식(savefig tight)으로 저장한 크기와 비교 (반올림 오차 1px 허용)
+    fig = Figure(figsize=(4, 3), dpi=100)
+    ax = fig.add_subplot()
+    generator._create_bar_chart(ax, _make_chart_json(0), pd.DataFrame())
+    ax.set_title("Chart 0", fontsize=16, pad=20)
+    fig.tight_layout()
+    reference = io.BytesIO()
+    fig.savefig(reference, format="png", dpi=100, bbox_inches="tight")
+
+    rendered_size = Image.open(io.BytesIO(base64.b64decode(image))).size
+    reference_size = Image.open(reference).size
+    assert all(abs(a - b) <= 1 for a, b in zip(rendered_size, reference_size))
+
+
+def test_render_cache_canonical_key_and_tiers(tmp_path):
+    """정규화된 키, 메모리/디스크 적중, 적중 시간, 디스크 LRU 제거 확인"""
+    df = pd.DataFrame({'label': ['A', 'B'], 'value': [1, 2]})
+    chart = {"type": "bar", "title": "T", "data": {"labels": ["A", "B"], "datasets": [{"data": [1, 2.0]}]}}
+    same = {"data": {"datasets": [{"data": [1.0, 2]}], "labels": ("A", "B")}, "title": "T", "type": "bar"}
+    assert make_render_key(chart, df, 100) == make_render_key(same, df, 100)
+    assert make_render_key(chart, df, 100) != make_render_key(chart, df.assign(value=[1, 3]), 100)
+
+    cache = RenderCache(cache_dir=str(tmp_path / "charts"), max_disk_bytes=3000)
+    key = make_render_key(chart, df, 100)
+    cache.set(key, b"x" * 1000, "eA==")
+    assert cache.get(key) == (b"x" * 1000, "eA==")
+
+    # 새 프로세스를 가정: 디스크에서 적중
+    cache = RenderCache(cache_dir=str(tmp_path / "charts"), max_disk_bytes=3000)
+    png_bytes, _ = cache.get(key)
+    assert png_bytes == b"x" * 1000
+    for i in range(5):
+        cache.set(f"key-{i}", b"y" * 1000, "eQ==")
+    stats = cache.get_stats()
+    assert stats['disk']['bytes'] <= 3000 and stats['disk_evictions'] > 0
+    assert stats['disk_hits'] == 1 and stats['avg_hit_ms'] < 5
+
+
+def test_create_chart_cache_hit_is_fast(tmp_path):
+    """같은 차트를 다시 요청하면 렌더링 없이 5ms 이내에 같은 이미지를 반환하는지 확인"""
+    original = (Config.CHART_CACHE_ENABLED, Config.CHART_CACHE_DIR)
+    Config.CHART_CACHE_ENABLED, Config.CHART_CACHE_DIR = True, None
+    try:
+        generator = ChartGenerator(output_dir=str(tmp_path))
+        chart = _make_chart_json(3)
+        _, first = generator.create_chart(dict(chart), pd.DataFrame())
+
+        timings = {}
+        path, second = generator.create_chart(dict(chart), pd.DataFrame(), timings)
+        assert second == first
+        assert 'rasterize' not in timings
+        assert timings['cache_lookup'] + timings['write'] < 0.005
+        generator.wait_for_file(path)
+    finally:
+        Config.CHART_CACHE_ENABLED, Config.CHART_CACHE_DIR = original
+
+
+def test_process_pool_matches_inprocess_and_recycles(tmp_path, no_render_cache):
+    """프로세스 풀 렌더링 결과가 현재 프로세스 결과와 같고, 작업자 교체/시간 초과 종료가 동작하는지 확인"""
+    generator = ChartGenerator(output_dir=str(tmp_path))
+    charts = [_make_chart_json(i) for i in range(8)]
+    df = pd.DataFrame({'label': ['a', 'b'], 'value': [1.5, 2.5]})
+    expected = [generator._render_png(dict(chart), df, {}) for chart in charts]
+
+    pool = RenderPool(processes=2, max_renders_per_worker=3, timeout=30.0, dpi=Config.CHART_DPI)
+    try:
+        assert pool.wait_ready()
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(lambda chart: pool.render(dict(chart), df), charts))
+        assert results == expected
+        assert pool.get_stats()['recycled'] >= 2
+
+        # 제한 시간을 넘기면 작업자를 종료하고 새 작업자로 계속 처리
+        assert pool.wait_ready()
+        pool.timeout = 0.001
+        with pytest.raises(RenderTimeoutError):
+            pool.render(_make_chart_json(0), df)
+        pool.timeout = 30.0
+        assert pool.render(dict(charts[1]), df) == expected[1]
+        stats = pool.get_stats()
+        assert stats['timeouts'] == 1 and stats['renders'] == 9
+        print(f"✅ 프로세스 풀 렌더링 확인 - {stats}")
+    finally:
+        pool.shutdown()
+
+
+def test_downsampling_keeps_extremes_and_notes_description(tmp_path, no_render_cache):
+    """대용량 시리즈를 픽셀 수 기준으로 축소하면서 극값을 유지하고 설명에 안내를 남기는지 확인"""
+    n = 20000
+    values = [float(v) for v in np.sin(np.arange(n) / 300.0)]
+    values[7777] = 25.0
+    values[12345] = -25.0
+
+    for indices in (lttb_indices(values, 400), minmax_indices(values, 199)):
+        assert len(indices) <= 400 and indices[0] == 0 and indices[-1] == n - 1
+        assert 7777 in indices and 12345 in indices
+
+    chart = {
+        "type": "line", "title": "Big", "description": "Big series", "figsize": (4, 3),
+        "data": {"labels": [f"t{i}" for i in range(n)], "datasets": [{"label": "v", "data": values}]}
+    }
+    render_json, info = downsample_chart_json(chart, 400)
+    assert info == {'method': 'lttb', 'original_points': n, 'rendered_points': 400}
+    assert render_json["data"]["labels"][render_json["data"]["positions"].index(7777)] == "t7777"
+    assert len(chart["data"]["labels"]) == n
+
+    generator = ChartGenerator(output_dir=str(tmp_path))
+    timings = {}
+    path, _ = generator.create_chart(chart, pd.DataFrame(), timings)
+    generator.wait_for_file(path)
+    assert "20,000" in chart["description"] and "LTTB" in chart["description"]
+    assert len(chart["data"]["datasets"][0]["data"]) == n
+
+    # 임계값 이하 차트는 그대로 렌더링
+    small = _make_chart_json(1)
+    assert downsample_chart_json(small, 400) == (small, None)
@@ -0,0 +1,95 @@
+"""
+test_data_catalog.py - 공용 데이터 카탈로그 단위 테스트
+파일당 한 번만 로드, 읽기 전용 메타데이터, 공유 DataFrame 보호, 파일 변경 시 다시 로드 확인
+"""
+
+import copy
+import json
+import os
+
+import pytest
+
+from data_catalog import DataCatalog, FrozenDict
+
+
+def _write_metadata(path, tables, mtime=None):
+    path.write_text(json.dumps({'tables': tables}, ensure_ascii=False), encoding='utf-8')
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+def test_files_load_once_and_are_shared(tmp_path, monkeypatch):
+    """같은 파일은 한 번만 파싱, 메타데이터는 같은 읽기 전용 객체, DataFrame 수정은 공유 원본에 영향 없음"""
+    csv_path = tmp_path / 'data.csv'
+    csv_path.write_text("A,B\n1,x\n2,y\n", encoding='utf-8')
+    metadata_path = tmp_path / 'metadata.json'
+    _write_metadata(metadata_path, [{'name': 'QMS_RAT_YMQT_N', 'columns': ['A', 'B']}])
+
+    catalog = DataCatalog(check_interval=60)
+    reads = []
+    original_read_csv = __import__('pandas').read_csv
+    monkeypatch.setattr('data_catalog.pd.read_csv', lambda path: reads.append(path) or original_read_csv(path))
+
+    first = catalog.get_frame(str(csv_path))
+    first.loc[0, 'A'] = 100
+    first['C'] = 1
+    second = catalog.get_frame(str(csv_path))
+    assert len(reads) == 1
+    assert second['A'].tolist() == [1, 2]
+    assert 'C' not in second.columns
+
+    metadata = catalog.get_metadata(str(metadata_path))
+    assert catalog.get_metadata(str(metadata_path)) is metadata
+    assert isinstance(metadata, FrozenDict)
+    assert isinstance(metadata['tables'], tuple)
+    with pytest.raises(TypeError):
+        metadata['tables'] = []
+    with pytest.raises(TypeError):
+        metadata['tables'][0]['name'] = 'OTHER'
+    assert copy.deepcopy(metadata) is metadata
+    assert json.loads(catalog.get_metadata_json(str(metadata_path))) == json.loads(metadata_path.read_text())
+
+    stats = catalog.get_stats()
+    assert stats['loads'] == 2
+    assert len(stats['files']) == 2
+
+
+def test_frame_protected_without_copy_on_write(tmp_path, monkeypatch):
+    """Copy-on-Write가 꺼진 pandas(2.x 기본값)에서도 loc/iloc 제자리 수정이 공유 원본에 영향 없음"""
+    monkeypatch.setattr('data_catalog._copy_on_write_enabled', lambda: False)
+    csv_path = tmp_path / 'data.csv'
+    csv_path.write_text("A,B\n1,x\n2,y\n", encoding='utf-8')
+    catalog = DataCatalog(check_interval=60)
+
+    first = catalog.get_frame(str(csv_path))
+    first.loc[0, 'A'] = 100
+    first.iloc[1, 1] = 'z'
+    second = catalog.get_frame(str(csv_path))
+    assert second['A'].tolist() == [1, 2]
+    assert second['B'].tolist() == ['x', 'y']
+
+
+def test_reload_on_file_change(tmp_path):
+    """수정 시각/크기가 바뀌면 새 객체로 교체, 잘못된 파일이면 이전 값 유지"""
+    metadata_path = tmp_path / 'metadata.json'
+    _write_metadata(metadata_path, [{'name': 'A'}], mtime=1000)
+    catalog = DataCatalog(check_interval=0)
+
+    first = catalog.get_metadata(str(metadata_path))
+    first_json = catalog.get_metadata_json(str(metadata_path))
+    assert catalog.get_metadata(str(metadata_path)) is first
+
+    _write_metadata(metadata_path, [{'name': 'B'}, {'name': 'C'}], mtime=2000)
+    second = catalog.get_metadata(str(metadata_path))
+    assert second is not first
+    assert [table['name'] for table in second['tables']] == ['B', 'C']
+    assert first['tables'][0]['name'] == 'A'
+    assert catalog.get_metadata_json(str(metadata_path)) != first_json
+
+    metadata_path.write_text("{잘못된 JSON", encoding='utf-8')
+    os.utime(metadata_path, (3000, 3000))
+    assert catalog.get_metadata(str(metadata_path)) is second
+
+    stats = catalog.get_stats()
+    assert stats['reloads'] == 1
+    assert stats['reload_failures'] == 1
@@ -0,0 +1,96 @@
+"""
+test_data_manager.py - DataManager 단위 테스트
+Oracle 대신 SQLite 엔진으로 청크 조회(청크 크기, 미리보기 첫 청크, 조회 지표)와 공용 커넥션 풀 확인
+"""
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, text
+
+from config import Config
+from data_manager import DataManager, SqlFetchStats, get_recent_fetch_stats
+
+
+def _sqlite_data_manager(rows):
+    engine = create_engine('sqlite://')
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE QMS_RAT_YMQT_N (HIQ1_APP_CD TEXT, YM_QT TEXT, SCORE REAL)"))
+        if rows:
+            connection.execute(
+                text("INSERT INTO QMS_RAT_YMQT_N VALUES (:app, :quarter, :score)"),
+                [{'app': f"APP{i % 7}", 'quarter': f"2024{i % 4 + 1:02d}", 'score': i * 0.5} for i in range(rows)]
+            )
+    # Oracle 연결 없이 엔진만 사용
+    data_manager = DataManager.__new__(DataManager)
+    data_manager.engine = engine
+    return data_manager
+
+
+def test_iter_sql_chunks_first_rows_and_stats(monkeypatch):
+    """첫 청크는 미리보기 행 수, 이후 청크 크기 단위로 반환하고 합친 결과는 전체 조회와 동일"""
+    monkeypatch.setattr(Config, 'SQL_FETCH_ARRAYSIZE', 300)
+    monkeypatch.setattr(Config, 'SQL_FETCH_PREFETCH_ROWS', 300)
+    data_manager = _sqlite_data_manager(2500)
+    sql_query = "SELECT * FROM QMS_RAT_YMQT_N ORDER BY SCORE"
+
+    stats = SqlFetchStats(sql_query, 0, 0)
+    chunks = list(data_manager.iter_sql_chunks(sql_query, chunk_rows=1000, first_rows=10, stats=stats))
+    assert [len(chunk) for chunk in chunks] == [10, 1000, 1000, 490]
+    assert stats.rows == 2500 and stats.chunks == 4 and stats.columns == 3
+    assert stats.prefetchrows == 10 and stats.round_trips == 1 + 9
+    assert stats.elapsed_seconds >= stats.first_chunk_seconds
+
+    result_df = data_manager.execute_sql(sql_query)
+    expected_df = pd.read_sql_query(sql_query, data_manager.engine)
+    pd.testing.assert_frame_equal(result_df, expected_df)
+    assert get_recent_fetch_stats()[0]['rows'] == 2500
+
+
+def test_iter_sql_chunks_empty_result_keeps_columns():
+    """결과가 없어도 컬럼만 있는 청크 1개 반환"""
+    data_manager = _sqlite_data_manager(0)
+    chunks = list(data_manager.iter_sql_chunks("SELECT HIQ1_APP_CD, SCORE FROM QMS_RAT_YMQT_N"))
+    assert len(chunks) == 1
+    assert list(chunks[0].columns) == ['HIQ1_APP_CD', 'SCORE'] and chunks[0].empty
+
+
+def test_chunk_and_page_column_names_match(monkeypatch):
+    """Oracle처럼 컬럼명 정규화가 필요한 DB에서도 청크 조회와 페이지 조회의 컬럼명이 같음 (대문자 → 소문자)"""
+    data_manager = _sqlite_data_manager(30)
+    monkeypatch.setattr(data_manager.engine.dialect, 'requires_name_normalize', True)
+    # SQLite에는 OFFSET/FETCH NEXT가 없으므로 페이지 SQL만 LIMIT/OFFSET으로 대체
+    monkeypatch.setattr('data_manager.page_sql',
+                        lambda sql: f"SELECT * FROM ({sql}) LIMIT :row_limit OFFSET :row_offset")
+    sql_query = "SELECT HIQ1_APP_CD, YM_QT AS \"Quarter\", SCORE FROM QMS_RAT_YMQT_N ORDER BY SCORE"
+
+    chunk_df = next(data_manager.iter_sql_chunks(sql_query))
+    page_df = data_manager.execute_sql_page(sql_query, offset=20, limit=5)
+    assert list(chunk_df.columns) == list(page_df.columns) == ['hiq1_app_cd', 'Quarter', 'score']
+    assert len(page_df) == 5
+
+
+def test_shared_engine_and_pool_wait_timeout(monkeypatch):
+    """모든 DataManager가 하나의 엔진을 공유하고, 풀이 가득 차면 DatabaseBusyError 발생"""
+    import db_engine
+    from sqlalchemy.pool import QueuePool
+
+    # 실제 접속 없이 엔진만 생성 (thick 모드 초기화 생략)
+    monkeypatch.setattr(Config, 'ORACLE_CLIENT_LIB_DIR', None)
+    db_engine.dispose_engine()
+    try:
+        first = DataManager.__new__(DataManager)
+        second = DataManager.__new__(DataManager)
+        first.setup_oracle()
+        second.setup_oracle()
+        assert first.engine is second.engine is db_engine.get_engine()
+        assert first.engine.pool.size() == Config.DB_POOL_SIZE
+    finally:
+        db_engine.dispose_engine()
+
+    engine = create_engine('sqlite:///:memory:', poolclass=QueuePool, pool_size=1, max_overflow=0, pool_timeout=0.1)
+    before = db_engine.get_pool_stats()['wait_timeouts']
+    with db_engine.connect(engine):
+        with pytest.raises(db_engine.DatabaseBusyError):
+            with db_engine.connect(engine):
+                pass
+    assert db_engine.get_pool_stats()['wait_timeouts'] == before + 1
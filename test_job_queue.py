@@ -0,0 +1,95 @@
+"""
+test_job_queue.py - 비동기 작업 큐 단위 테스트
+실제 LLM/DB 없이 대기열 제한, 사용자별 동시 실행 제한, 취소 동작 확인
+"""
+
+import threading
+import time
+
+import pytest
+
+from job_queue import (InProcessJobBackend, JobQueueFullError, JOB_CANCELLED, JOB_FAILED, JOB_SUCCEEDED)
+
+
+def _wait_finished(job, timeout=5.0):
+    deadline = time.time() + timeout
+    version = job.version
+    while not job.is_finished() and time.time() < deadline:
+        version = job.wait_for_update(version, timeout=0.1)
+    assert job.is_finished()
+
+
+def _wait_until(predicate, timeout=5.0):
+    deadline = time.time() + timeout
+    while not predicate() and time.time() < deadline:
+        time.sleep(0.01)
+    assert predicate()
+
+
+def test_per_user_limit_queue_depth_and_cancel():
+    """사용자별 동시 실행 제한, 대기열 초과 거부, 대기/실행 중 작업 취소 확인"""
+    queue = InProcessJobBackend(max_workers=4, max_queue_depth=3, max_running_per_user=1)
+    release = threading.Event()
+    running = []
+
+    def blocking_job(job, name):
+        running.append(name)
+        job.set_stage('llm')
+        release.wait(5)
+        job.set_stage('render')
+        return name
+
+    try:
+        first = queue.submit('alice', 'test', blocking_job, 'a1')
+        second = queue.submit('alice', 'test', blocking_job, 'a2')
+        other = queue.submit('bob', 'test', blocking_job, 'b1')
+        _wait_until(lambda: len(running) == 2)
+        time.sleep(0.1)
+
+        # 작업자가 남아 있어도 alice는 한 번에 하나만 실행
+        assert sorted(running) == ['a1', 'b1']
+        assert queue.get_stats()['running_per_user'] == {'alice': 1, 'bob': 1}
+
+        # c1이 작업자에게 배정된 뒤 제출해야 대기열이 a2, c2, c3으로 정확히 찬다
+        queue.submit('carol', 'test', blocking_job, 'c1')
+        _wait_until(lambda: 'c1' in running)
+        queue.submit('carol', 'test', blocking_job, 'c2')
+        queue.submit('carol', 'test', blocking_job, 'c3')
+        with pytest.raises(JobQueueFullError):
+            queue.submit('carol', 'test', blocking_job, 'c4')
+
+        # 대기 중 작업은 즉시 취소, 실행 중 작업은 다음 단계에서 중단
+        assert queue.cancel(second.job_id)
+        assert second.status == JOB_CANCELLED
+        assert queue.cancel(first.job_id)
+        release.set()
+
+        _wait_finished(first)
+        _wait_finished(other)
+        assert first.status == JOB_CANCELLED
+        assert other.status == JOB_SUCCEEDED and other.result == 'b1'
+        assert 'llm' in other.stage_timings and 'render' in other.stage_timings
+        assert 'a2' not in running
+        print(f"✅ 작업 큐 확인 - {queue.get_stats()}")
+    finally:
+        release.set()
+        queue.shutdown()
+
+
+def test_failed_job_reports_error():
+    """작업 함수 예외가 실패 상태와 오류 메시지로 기록되는지 확인"""
+    queue = InProcessJobBackend(max_workers=1)
+
+    def failing_job(job):
+        job.set_stage('execute')
+        raise ValueError("SQL 실행 실패")
+
+    try:
+        job = queue.submit('alice', 'test', failing_job)
+        _wait_finished(job)
+        info = job.to_dict()
+        assert info['status'] == JOB_FAILED
+        assert info['error'] == "SQL 실행 실패"
+        assert 'result' not in info
+    finally:
+        queue.shutdown()
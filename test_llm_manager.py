@@ -0,0 +1,261 @@
+"""
+test_llm_manager.py - LLM 매니저 단위 테스트
+실제 모델이나 외부 API 없이 LLMManager 동작 확인
+"""
+
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+
+from config import Config, LLMMode
+from llm_manager import LLMManager, SharedLLMBackend
+from llm_scheduler import BatchingScheduler
+from llm_api_client import LLMApiClient
+from llm_cache import LLMResponseCache, make_cache_key
+from schema_context import SchemaContext, estimate_tokens
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def test_shared_backend_per_mode():
+    """여러 사용자의 LLMManager가 하나의 백엔드를 공유하는지 확인"""
+    original_mode = Config.LLM_MODE
+    Config.LLM_MODE = LLMMode.OFFLINE
+    try:
+        managers = [LLMManager() for _ in range(5)]
+        backends = {id(manager.backend) for manager in managers}
+        assert len(backends) == 1
+
+        # 한 사용자의 정리가 다른 사용자에게 영향을 주지 않아야 함
+        managers[0].close()
+        assert managers[1].backend is SharedLLMBackend.get(LLMMode.OFFLINE)
+        assert "SELECT" in managers[1].generate_text("SQL 쿼리를 작성해주세요")
+        print("✅ LLM 백엔드 공유 확인")
+    finally:
+        Config.LLM_MODE = original_mode
+
+
+class _FakeEngine:
+    """vLLM LLMEngine 대역 (스텝마다 활성 요청당 'x' 한 글자 생성, max_tokens에 도달하면 완료)"""
+
+    def __init__(self, step_ms=1.0):
+        self.step_seconds = step_ms / 1000.0
+        self._requests = {}
+        self._lock = threading.Lock()
+
+    def add_request(self, request_id, prompt, sampling_params):
+        with self._lock:
+            self._requests[request_id] = [sampling_params.max_tokens, 0]
+
+    def abort_request(self, request_id):
+        with self._lock:
+            self._requests.pop(request_id, None)
+
+    def has_unfinished_requests(self):
+        with self._lock:
+            return bool(self._requests)
+
+    def step(self):
+        time.sleep(self.step_seconds)
+        outputs = []
+        with self._lock:
+            for request_id, state in list(self._requests.items()):
+                state[1] += 1
+                finished = state[1] >= state[0]
+                if finished:
+                    del self._requests[request_id]
+                completion = SimpleNamespace(text="x" * state[1], token_ids=list(range(state[1])))
+                outputs.append(SimpleNamespace(request_id=request_id, finished=finished, outputs=[completion]))
+        return outputs
+
+
+def test_batching_scheduler_collects_concurrent_prompts():
+    """동시 요청이 하나의 엔진 배치로 묶이고 각자 결과를 돌려받는지 확인"""
+    engine = _FakeEngine(step_ms=2.0)
+    scheduler = BatchingScheduler(engine, max_batch_size=8, max_wait_ms=50)
+    try:
+        params = [SimpleNamespace(max_tokens=n) for n in range(1, 9)]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda p: scheduler.generate("프롬프트", p, timeout=10), params))
+
+        # 요청마다 자신의 max_tokens 길이 결과를 받아야 함
+        assert [len(text) for text in results] == list(range(1, 9))
+        stats = scheduler.get_stats()
+        assert stats['completed'] == 8
+        assert stats['avg_batch_size'] > 1
+        print(f"✅ 배칭 스케줄러 확인 - 평균 배치 크기: {stats['avg_batch_size']:.1f}")
+    finally:
+        scheduler.shutdown()
+
+
+def test_scheduler_stream_and_cancel():
+    """스트리밍 요청이 조각 단위로 전달되고, 중간에 닫으면 엔진에서 중단되는지 확인"""
+    engine = _FakeEngine(step_ms=1.0)
+    scheduler = BatchingScheduler(engine, max_batch_size=4, max_wait_ms=1)
+    try:
+        chunks = list(scheduler.stream("프롬프트", SimpleNamespace(max_tokens=5), timeout=10))
+        assert chunks == ["x"] * 5
+
+        stream = scheduler.stream("프롬프트", SimpleNamespace(max_tokens=10000), timeout=10)
+        assert next(stream) == "x"
+        stream.close()    # 클라이언트 연결 종료에 해당
+
+        deadline = time.time() + 5
+        while engine.has_unfinished_requests() and time.time() < deadline:
+            time.sleep(0.01)
+        assert not engine.has_unfinished_requests()
+        assert scheduler.get_stats()['cancelled'] == 1
+        print("✅ 스트리밍 생성 및 취소 확인")
+    finally:
+        scheduler.shutdown()
+
+
+def test_scheduler_generate_timeout_cancels_request():
+    """generate 대기 시간 초과 시 요청을 취소해 엔진에서도 중단되는지 확인"""
+    engine = _FakeEngine(step_ms=1.0)
+    scheduler = BatchingScheduler(engine, max_batch_size=4, max_wait_ms=1)
+    try:
+        with pytest.raises(TimeoutError):
+            scheduler.generate("프롬프트", SimpleNamespace(max_tokens=100000), timeout=0.05)
+
+        deadline = time.time() + 5
+        while engine.has_unfinished_requests() and time.time() < deadline:
+            time.sleep(0.01)
+        assert not engine.has_unfinished_requests()
+        assert scheduler.get_stats()['cancelled'] == 1
+    finally:
+        scheduler.shutdown()
+
+
+class _FlakyChatHandler(BaseHTTPRequestHandler):
+    """처음 몇 번은 429를 반환하는 chat/completions 스텁"""
+
+    protocol_version = "HTTP/1.1"
+    failures_left = 0
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        self.rfile.read(length)
+
+        if _FlakyChatHandler.failures_left > 0:
+            _FlakyChatHandler.failures_left -= 1
+            body = b'{"error": "rate limited"}'
+            self.send_response(429)
+            self.send_header('Retry-After', '0')
+        else:
+            body = json.dumps({'choices': [{'message': {'content': 'SELECT 1 FROM DUAL'}}]}).encode('utf-8')
+            self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_api_client_retries_and_reuses_connection():
+    """429 재시도 후 성공하고, 여러 요청이 하나의 keep-alive 커넥션을 재사용하는지 확인"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _FlakyChatHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    endpoint = f"http://127.0.0.1:{server.server_address[1]}/v1/chat/completions"
+    client = LLMApiClient(endpoint, pool_maxsize=2, max_retries=3, backoff_base=0.01)
+    try:
+        _FlakyChatHandler.failures_left = 2
+        response = client.post_chat({'messages': []})
+        assert response.json()['choices'][0]['message']['content'] == 'SELECT 1 FROM DUAL'
+
+        for _ in range(5):
+            client.post_chat({'messages': []})
+
+        metrics = client.get_metrics()
+        assert metrics['retries'] == 2
+        assert metrics['failures'] == 0
+        assert metrics['in_flight'] == 0
+        assert metrics['pools'][0]['connections_created'] == 1
+        print(f"✅ API 클라이언트 확인 - {metrics}")
+    finally:
+        client.close()
+        server.shutdown()
+        server.server_close()
+
+
+def test_response_cache_tiers_and_eviction(tmp_path):
+    """메모리/디스크 2단계 캐시 적중, 키 정규화, 크기 기반 제거 확인"""
+    db_path = str(tmp_path / "llm_cache.sqlite3")
+    key = make_cache_key("api", "Qwen3-32B", "1", "2024년   고객별\n실적", 0.1, 1024)
+    assert key == make_cache_key("api", "Qwen3-32B", "1", " 2024년 고객별 실적 ", 0.1, 1024)
+    assert key != make_cache_key("api", "Qwen3-32B", "1", "2024년 고객별 실적", 0.2, 1024)
+
+    cache = LLMResponseCache(db_path, memory_entries=2, max_disk_bytes=10 * 1024)
+    cache.set(key, "SELECT * FROM QMS_GBW_VIEW")
+    assert cache.get(key) == "SELECT * FROM QMS_GBW_VIEW"
+    cache.close()
+
+    # 새 프로세스를 가정: 메모리는 비어 있고 디스크에서 적중
+    cache = LLMResponseCache(db_path, memory_entries=2, max_disk_bytes=10 * 1024)
+    assert cache.get(key) == "SELECT * FROM QMS_GBW_VIEW"
+    assert cache.get("missing") is None
+    stats = cache.get_stats()
+    assert stats['disk_hits'] == 1 and stats['misses'] == 1
+
+    # 디스크 상한 초과 시 오래 사용되지 않은 항목부터 제거
+    for i in range(20):
+        cache.set(f"key-{i}", "x" * 1024)
+    stats = cache.get_stats()
+    assert stats['disk']['bytes'] <= 10 * 1024
+    assert stats['disk_evictions'] > 0
+    cache.close()
+    print(f"✅ LLM 응답 캐시 확인 - {stats}")
+
+
+def test_schema_context_selects_relevant_columns():
+    """질문과 관련된 테이블/컬럼만 예산 내로 선택되는지 확인"""
+    with open(Config.metadata_path, 'r', encoding='utf-8') as f:
+        metadata = json.load(f)
+
+    context = SchemaContext(metadata)
+    assert context.full_tokens < context.original_tokens
+
+    text, tokens = context.build("분기별 매출액 추이", budget_tokens=600)
+    assert tokens <= 600 and tokens == estimate_tokens(text)
+    assert "AMT NUMBER 매출액" in text
+    assert "actual_rating" in text          # 특수 지시용 지표는 항상 포함
+    assert "CAL_GRP1" not in text           # 관련 없는 컬럼 제외
+    print(f"✅ 스키마 컨텍스트 확인 - {context.original_tokens} → {tokens} 토큰")
+
+
+def test_prompt_prefix_is_stable_across_questions():
+    """서로 다른 질문의 SQL 프롬프트가 같은 시스템 메시지(고정 접두부)를 공유하는지 확인"""
+    with open(Config.metadata_path, 'r', encoding='utf-8') as f:
+        metadata = json.load(f)
+
+    original = (Config.LLM_MODE, Config.LLM_CACHE_ENABLED, Config.PROMPT_SCHEMA_MODE)
+    Config.LLM_MODE = LLMMode.OFFLINE
+    Config.LLM_CACHE_ENABLED = False
+    Config.PROMPT_SCHEMA_MODE = "stable"
+    try:
+        manager = LLMManager()
+        manager.mode = LLMMode.API
+        calls = []
+        manager._generate_api = lambda prompt, temperature, max_tokens, system_prompt: \
+            calls.append((system_prompt, prompt)) or "SELECT 1 FROM DUAL"
+
+        manager.generate_sql("분기별 매출액 추이", metadata, None)
+        manager.generate_sql("고객별 레이팅 변화", metadata, None)
+
+        assert calls[0][0] == calls[1][0]
+        assert "분기별 매출액" not in calls[0][0]      # 질문은 접두부에 포함되지 않음
+        assert calls[0][1].startswith("## 사용자 질문\n분기별 매출액 추이")
+        print(f"✅ 고정 접두부 확인 - 시스템 메시지 {estimate_tokens(calls[0][0])} 토큰")
+    finally:
+        Config.LLM_MODE, Config.LLM_CACHE_ENABLED, Config.PROMPT_SCHEMA_MODE = original
@@ -0,0 +1,78 @@
+"""
+test_metadata_index.py - 메타데이터 색인 단위 테스트
+테이블/컬럼/한글명/키 컬럼/코드 사전 조회와 코드 CASE 식 생성 확인
+"""
+
+import json
+from pathlib import Path
+
+from data_catalog import freeze
+from metadata_index import MetadataIndex, get_metadata_index
+
+METADATA_PATH = Path(__file__).parent / 'metadata.json'
+
+
+def _sample_metadata():
+    return freeze({
+        'tables': [
+            {'ratings': {'actual_rating': {'description': '실적 Rating'}}},
+            {
+                'database_name': 'HIQ1_C',
+                'table_name': 'QMS_RAT_YMQT_N',
+                'table_korean_name': 'Rating 분기별 데이터',
+                'columns': [
+                    {'column_name': 'HIQ1_CUST_CD', 'column_korean_name': 'HiQ1 고객 코드', 'key_type': 'PK2',
+                     'customer_mapping': {'G113': 'GOOGLE', 'GX01': "O'NEIL"}},
+                    {'column_name': 'YM_QT', 'column_korean_name': '분기', 'key_type': 'PK3'},
+                    {'column_name': 'REVENUE', 'column_korean_name': '매출 Rating', 'key_type': 'NX'},
+                ],
+            },
+            {
+                'table_name': 'QMS_RAT_CUST',
+                'table_korean_name': 'Rating 관리 고객',
+                'columns': [
+                    {'column_name': 'HIQ1_CUST_CD', 'column_korean_name': 'HiQ1 고객 코드', 'key_type': 'PK1'},
+                ],
+            },
+        ]
+    })
+
+
+def test_table_column_and_korean_lookups():
+    """스키마 접두어/대소문자 무시 조회, 컬럼 → 테이블, 한글명 역색인, 키 컬럼"""
+    index = MetadataIndex(_sample_metadata())
+
+    assert index.table('hiq1_c.qms_rat_ymqt_n').korean_name == 'Rating 분기별 데이터'
+    assert index.has_column('QMS_RAT_YMQT_N', 'revenue')
+    assert not index.has_column('QMS_RAT_CUST', 'REVENUE')
+    assert index.column('UNKNOWN_TABLE', 'REVENUE') is None
+    assert index.tables_with_column('HIQ1_CUST_CD') == ['QMS_RAT_YMQT_N', 'QMS_RAT_CUST']
+    assert index.key_columns('QMS_RAT_YMQT_N') == ['HIQ1_CUST_CD', 'YM_QT']
+    assert [column.table for column in index.find_korean('HiQ1고객 코드')] == ['QMS_RAT_YMQT_N', 'QMS_RAT_CUST']
+    assert index.find_korean('Rating 관리 고객')[0].name == 'QMS_RAT_CUST'
+    assert index.special_metrics == {'actual_rating': {'description': '실적 Rating'}}
+
+    names = [item.name for item in index.search('매출')]
+    assert names == ['REVENUE']
+
+
+def test_code_dictionary_and_case_expression():
+    """코드 사전 조회, 작은따옴표가 이스케이프된 CASE 식, 사전 없는 컬럼은 식 그대로"""
+    index = MetadataIndex(_sample_metadata())
+
+    assert index.code_name('HIQ1_CUST_CD', 'G113') == 'GOOGLE'
+    assert index.code_name('HIQ1_CUST_CD', 'G999') == 'G999'
+    assert index.code_dictionary('YM_QT') == {}
+    assert index.case_expression('r.HIQ1_CUST_CD', 'HIQ1_CUST_CD') == (
+        "CASE r.HIQ1_CUST_CD WHEN 'G113' THEN 'GOOGLE' WHEN 'GX01' THEN 'O''NEIL' ELSE r.HIQ1_CUST_CD END"
+    )
+    assert index.case_expression('r.YM_QT', 'YM_QT') == 'r.YM_QT'
+
+
+def test_index_is_shared_per_metadata_object():
+    """같은 메타데이터 객체는 같은 색인 재사용, 실제 metadata.json의 고객 코드 사전 포함"""
+    metadata = freeze(json.loads(METADATA_PATH.read_text(encoding='utf-8')))
+    index = get_metadata_index(metadata)
+    assert get_metadata_index(metadata) is index
+    assert index.code_name('HIQ1_CUST_CD', 'G113') == 'GOOGLE'
+    assert 'HCOB_COMM_CD_N' in index.tables
@@ -9,6 +9,7 @@ import pandas as pd
 from unittest.mock import Mock, patch
 import tempfile
 from web_app import create_app
+from config import Config
 import logging
 
 # 로깅 설정
@@ -21,7 +22,7 @@ class MockLLMManager:
     def __init__(self):
         self.mode = "mock"
         
-    def generate_text(self, prompt, temperature=0.2, max_tokens=1024):
+    def generate_text(self, prompt, temperature=0.2, max_tokens=1024, regenerate=False):
         """Mock 텍스트 생성"""
         if "SQL" in prompt or "sql" in prompt:
             return self._mock_sql_response(prompt)
@@ -57,19 +58,24 @@ class MockLLMManager:
     }
 }"""
     
-    def generate_sql(self, query, metadata, data_sample):
+    def generate_sql(self, query, metadata, data_sample, regenerate=False):
         """Mock SQL 생성"""
         return self._mock_sql_response(query)
     
-    def modify_sql(self, original_sql, modification_request, current_data_sample=None, metadata=None):
+    def modify_sql(self, original_sql, modification_request, current_data_sample=None, metadata=None,
+                   regenerate=False):
         """Mock SQL 수정"""
         return self._mock_sql_response(f"수정 요청: {modification_request}")
     
-    def generate_chart_json(self, query, metadata, result_data):
+    def generate_chart_json(self, query, metadata, result_data, regenerate=False):
         """Mock 차트 JSON 생성"""
         chart_json_str = self._mock_chart_response(query)
         return json.loads(chart_json_str)
     
+    def modify_chart_json(self, original_json, modification_request, result_data=None, regenerate=False):
+        """Mock 차트 JSON 수정"""
+        return json.loads(self._mock_chart_response(modification_request))
+    
     def close(self):
         """Mock 정리"""
         pass
@@ -112,7 +118,7 @@ class MockDataManager:
             }]
         }
     
-    def generate_sql(self, query):
+    def generate_sql(self, query, regenerate=False):
         """Mock SQL 생성"""
         sql = self.llm_manager.generate_sql(query, self.metadata, self.df.head().to_string())
         self._sql_query = sql
@@ -358,6 +364,227 @@ def test_full_process():
         import shutil
         shutil.rmtree(temp_dir, ignore_errors=True)
 
+def test_client_render_mode():
+    """클라이언트 렌더링 모드: PNG 없이 정규화된 차트 명세 반환, 내보내기/히스토리에서만 PNG 생성"""
+    csv_path, metadata_path, temp_dir = create_mock_files()
+    original_dirs = (Config.BASE_OUTPUT_DIR, Config.BASE_RESULTS_DIR)
+    try:
+        with patch('main.LLMManager', MockLLMManager), \
+             patch('main.DataManager', MockDataManager):
+            app = create_app(
+                csv_path=csv_path,
+                metadata_path=metadata_path,
+                output_dir=os.path.join(temp_dir, 'outputs'),
+                results_dir=os.path.join(temp_dir, 'results'),
+                llm_mode='offline'
+            )
+            app.config['TESTING'] = True
+            client = app.test_client()
+
+            result = client.post('/clientuser/execute_predefined_query', data={'query_id': 'actual_rating'}).get_json()
+            response = client.post('/clientuser/generate_chart', data={
+                'chart_request': '바차트로 Application별 점수를 보여줘',
+                'result_data': json.dumps(result['result_data']),
+                'sql_query': result['sql_query'],
+                'render_mode': 'client'
+            })
+            assert response.status_code == 200
+            chart_result = response.get_json()
+            assert chart_result['render_mode'] == 'client'
+            assert chart_result['chart_base64'] is None
+            assert chart_result['chart_json']['data']['datasets']
+            assert 'render' not in chart_result['render_timings']
+
+            response = client.post('/clientuser/generate_chart', data={
+                'chart_request': '바차트', 'result_data': '[]', 'render_mode': 'svg'
+            })
+            assert response.status_code == 400
+
+            # 내보내기 시에만 PNG 생성
+            response = client.post('/clientuser/export_chart', data={
+                'chart_json': json.dumps(chart_result['chart_json']),
+                'result_data': json.dumps(result['result_data'])
+            })
+            assert response.status_code == 200 and response.data[:8] == b'\x89PNG\r\n\x1a\n'
+
+            # 히스토리 이미지는 처음 열 때 생성
+            folder = next(f['folder'] for f in client.get('/clientuser/get_history').get_json()
+                          if f['folder'].startswith('results_'))
+            files = client.get(f'/clientuser/get_files?folder={folder}').get_json()
+            assert any(f['name'] == 'chart.png' for f in files)
+            info = client.get(f'/clientuser/get_files?folder={folder}&file=info.json').get_json()
+            assert info['chart_render'] == 'deferred'
+            response = client.get(f'/clientuser/get_files?folder={folder}&file=chart.png')
+            assert response.status_code == 200 and response.data[:4] == b'\x89PNG'
+
+            # 서버 렌더링 결과보다 응답이 훨씬 작아야 함
+            server_response = client.post('/clientuser/generate_chart', data={
+                'chart_request': '바차트로 Application별 점수를 보여줘',
+                'result_data': json.dumps(result['result_data']),
+                'sql_query': result['sql_query']
+            })
+            assert len(json.dumps(chart_result)) * 5 < len(server_response.data)
+    finally:
+        Config.BASE_OUTPUT_DIR, Config.BASE_RESULTS_DIR = original_dirs
+        import shutil
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def test_result_handle_roundtrip():
+    """쿼리 결과 핸들: 결과 데이터 없이 차트 생성, 다른 사용자/만료 핸들은 410"""
+    csv_path, metadata_path, temp_dir = create_mock_files()
+    original_dirs = (Config.BASE_OUTPUT_DIR, Config.BASE_RESULTS_DIR)
+    try:
+        with patch('main.LLMManager', MockLLMManager), \
+             patch('main.DataManager', MockDataManager):
+            app = create_app(
+                csv_path=csv_path,
+                metadata_path=metadata_path,
+                output_dir=os.path.join(temp_dir, 'outputs'),
+                results_dir=os.path.join(temp_dir, 'results'),
+                llm_mode='offline'
+            )
+            app.config['TESTING'] = True
+            client = app.test_client()
+
+            result = client.post('/handleuser/execute_predefined_query', data={'query_id': 'actual_rating'}).get_json()
+            handle = result['result_handle']
+            assert handle
+
+            response = client.post('/handleuser/generate_chart', data={
+                'chart_request': '바차트로 Application별 점수를 보여줘',
+                'result_handle': handle,
+                'sql_query': result['sql_query'],
+                'render_mode': 'client'
+            })
+            assert response.status_code == 200
+            assert response.get_json()['chart_json']['data']['datasets']
+
+            # 다른 사용자는 핸들을 사용할 수 없음
+            response = client.post('/otheruser/generate_chart', data={
+                'chart_request': '바차트', 'result_handle': handle, 'render_mode': 'client'
+            })
+            assert response.status_code == 410
+            assert response.get_json()['code'] == 'result_expired'
+
+            response = client.post('/handleuser/export_chart', data={
+                'chart_json': '{"type": "bar"}', 'result_handle': 'unknown'
+            })
+            assert response.status_code == 410
+    finally:
+        Config.BASE_OUTPUT_DIR, Config.BASE_RESULTS_DIR = original_dirs
+        import shutil
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def test_columnar_result_format():
+    """결과 형식 협상: 기본 records 유지, columnar는 컬럼명 한 번 + 컬럼별 값, 큰 응답은 gzip"""
+    import gzip
+    csv_path, metadata_path, temp_dir = create_mock_files()
+    original_dirs = (Config.BASE_OUTPUT_DIR, Config.BASE_RESULTS_DIR)
+    original_gzip = Config.RESULT_GZIP_MIN_BYTES
+    try:
+        with patch('main.LLMManager', MockLLMManager), \
+             patch('main.DataManager', MockDataManager):
+            app = create_app(
+                csv_path=csv_path,
+                metadata_path=metadata_path,
+                output_dir=os.path.join(temp_dir, 'outputs'),
+                results_dir=os.path.join(temp_dir, 'results'),
+                llm_mode='offline'
+            )
+            app.config['TESTING'] = True
+            client = app.test_client()
+
+            records = client.post('/formatuser/execute_predefined_query', data={'query_id': 'actual_rating'}).get_json()
+            assert isinstance(records['result_data'], list)
+
+            response = client.post('/formatuser/execute_predefined_query',
+                                   data={'query_id': 'actual_rating'},
+                                   headers={'Accept': 'application/vnd.chartapp.columnar+json'})
+            assert response.headers['X-Result-Format'] == 'columnar'
+            columnar = response.get_json()['result_data']
+            assert columnar['format'] == 'columnar'
+            assert columnar['row_count'] == len(records['result_data'])
+            rows = [dict(zip(columnar['columns'], values)) for values in zip(*columnar['data'])]
+            assert rows == records['result_data']
+
+            assert client.post('/formatuser/execute_predefined_query',
+                               data={'query_id': 'actual_rating', 'result_format': 'xml'}).status_code == 400
+
+            Config.RESULT_GZIP_MIN_BYTES = 1
+            response = client.post('/formatuser/execute_predefined_query',
+                                   data={'query_id': 'actual_rating', 'result_format': 'columnar'},
+                                   headers={'Accept-Encoding': 'gzip'})
+            assert response.headers['Content-Encoding'] == 'gzip'
+            assert json.loads(gzip.decompress(response.data))['result_data']['columns'] == columnar['columns']
+    finally:
+        Config.RESULT_GZIP_MIN_BYTES = original_gzip
+        Config.BASE_OUTPUT_DIR, Config.BASE_RESULTS_DIR = original_dirs
+        import shutil
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def test_result_paging():
+    """결과 페이지 조회: 완전한 결과는 메모리에서, 자동 행 제한으로 잘린 결과는 DB OFFSET/FETCH로 조회"""
+    from data_manager import AUTO_ROW_LIMIT, browse_base_sql
+    from result_store import ResultStore
+    from web_app import load_result_page
+
+    csv_path, metadata_path, temp_dir = create_mock_files()
+    original_dirs = (Config.BASE_OUTPUT_DIR, Config.BASE_RESULTS_DIR)
+    try:
+        with patch('main.LLMManager', MockLLMManager), \
+             patch('main.DataManager', MockDataManager):
+            app = create_app(
+                csv_path=csv_path,
+                metadata_path=metadata_path,
+                output_dir=os.path.join(temp_dir, 'outputs'),
+                results_dir=os.path.join(temp_dir, 'results'),
+                llm_mode='offline'
+            )
+            app.config['TESTING'] = True
+            client = app.test_client()
+
+            result = client.post('/pageuser/execute_predefined_query', data={'query_id': 'actual_rating'}).get_json()
+            rows = result['result_data']
+            page = client.get(f"/pageuser/results/{result['result_handle']}/page?offset=2&limit=3").get_json()
+            assert page['result_data'] == rows[2:5]
+            assert page['total_rows'] == len(rows) and page['total_exact']
+            assert page['has_more'] == (len(rows) > 5)
+            assert client.get('/pageuser/results/unknown/page').status_code == 410
+    finally:
+        Config.BASE_OUTPUT_DIR, Config.BASE_RESULTS_DIR = original_dirs
+        import shutil
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    # 자동 행 제한으로 잘린 결과: 보관된 행 범위는 메모리, 그 뒤는 DB 페이지 조회, 전체 행 수는 한 번만 집계
+    class PagingDataManager:
+        def __init__(self):
+            self.pages, self.counts = [], 0
+
+        def count_sql_rows(self, sql_query, max_rows):
+            self.counts += 1
+            return min(5000, max_rows), 5000 <= max_rows
+
+        def execute_sql_page(self, sql_query, offset, limit):
+            self.pages.append((offset, limit))
+            return pd.DataFrame({'N': range(offset, offset + limit)})
+
+    sql_query = f"SELECT N FROM T ORDER BY N FETCH FIRST {AUTO_ROW_LIMIT} ROWS ONLY"
+    assert browse_base_sql(sql_query) == "SELECT N FROM T ORDER BY N"
+    store = ResultStore()
+    handle = store.put('pager', pd.DataFrame({'N': range(AUTO_ROW_LIMIT)}), sql_query)
+    record = store.get_record('pager', handle)
+    data_manager = PagingDataManager()
+
+    page_df, total_rows, total_exact = load_result_page(data_manager, record, 800, 200)
+    assert list(page_df['N']) == list(range(800, 1000)) and data_manager.pages == []
+    page_df, total_rows, total_exact = load_result_page(data_manager, record, 4900, 200)
+    assert list(page_df['N']) == list(range(4900, 5000)) and data_manager.pages == [(4900, 100)]
+    assert (total_rows, total_exact, data_manager.counts) == (5000, True, 1)
+
+
 if __name__ == "__main__":
     success = test_full_process()
     if success:
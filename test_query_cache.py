@@ -0,0 +1,95 @@
+"""
+test_query_cache.py - SQL 결과 캐시 단위 테스트
+SQL 정규화, 테이블별 TTL, 무효화, 동시 요청 단일 실행, 쿼리 형태별 통계 확인
+"""
+
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from query_cache import QueryResultCache, normalize_sql, query_shape, referenced_tables
+
+
+def test_normalize_sql_keeps_literals_and_finds_tables():
+    """공백/대소문자/주석 차이는 같은 키, 문자열 리터럴 차이는 다른 키"""
+    a = normalize_sql("select g.HIQ1_APP_CD, sum(g.AMT)  from QMS_GBW_VIEW g, hiq1.QMS_RAT_CUST c\n"
+                      "-- 분기 조건\n where g.PLAN_QUARTER = '2024q1' group by g.HIQ1_APP_CD;")
+    b = normalize_sql("SELECT g.HIQ1_APP_CD , SUM( g.AMT ) FROM QMS_GBW_VIEW g , hiq1.QMS_RAT_CUST c "
+                      "WHERE g.PLAN_QUARTER='2024q1' /* 주석 */ GROUP BY g.HIQ1_APP_CD")
+    assert a == b
+    assert "'2024q1'" in a
+    assert normalize_sql(a.replace("'2024q1'", "'2024Q1'")) != a
+    assert query_shape(a) == query_shape(a.replace("'2024q1'", "'2025q1'"))
+    assert referenced_tables(a) == {'QMS_GBW_VIEW', 'QMS_RAT_CUST'}
+
+
+def test_cache_hits_ttl_and_invalidation(monkeypatch):
+    """적중 시 DB 미실행 및 사본 반환, 테이블별 TTL 만료, 테이블 단위 무효화"""
+    now = [1000.0]
+    monkeypatch.setattr('utils.lru_cache.time.time', lambda: now[0])
+    cache = QueryResultCache(default_ttl=60, table_ttl={'QMS_RAT_YMQT_N': 3600, 'HCOB_CAL': 10})
+    calls = []
+
+    def execute(sql_query):
+        calls.append(sql_query)
+        return pd.DataFrame({'SCORE': [1.0, 2.0]})
+
+    rating_sql = "SELECT * FROM QMS_RAT_YMQT_N"
+    joined_sql = "SELECT * FROM QMS_RAT_YMQT_N R JOIN HCOB_CAL C ON R.YM_QT = C.YM_QT"
+    first = cache.get_or_execute(rating_sql, execute)
+    first['SCORE'] = 0
+    assert list(cache.get_or_execute(" select *  from qms_rat_ymqt_n ", execute)['SCORE']) == [1.0, 2.0]
+    cache.get_or_execute(joined_sql, execute)
+    assert len(calls) == 2
+
+    # 여러 테이블을 참조하면 가장 짧은 TTL 적용
+    now[0] += 11
+    cache.get_or_execute(joined_sql, execute)
+    cache.get_or_execute(rating_sql, execute)
+    assert len(calls) == 3
+
+    assert cache.invalidate(table='qms_rat_ymqt_n') == 2
+    cache.get_or_execute(rating_sql, execute)
+    assert len(calls) == 4
+
+    stats = cache.get_stats()
+    assert stats['hits'] == 2 and stats['misses'] == 4
+    rating = next(q for q in stats['queries'] if q['query'] == 'SELECT*FROM QMS_RAT_YMQT_N')
+    assert rating['hits'] == 2 and rating['hit_rate'] == pytest.approx(0.5)
+
+
+def test_single_flight_and_errors_not_cached():
+    """동시 요청은 DB 1회 실행, 실패는 대기자에게 전달되고 저장되지 않음"""
+    cache = QueryResultCache()
+    release = threading.Event()
+    calls = []
+
+    def slow_execute(sql_query):
+        calls.append(sql_query)
+        release.wait(5)
+        time.sleep(0.01)
+        return pd.DataFrame({'N': range(3)})
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_execute("SELECT N FROM T", slow_execute)))
+               for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.2)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert len(calls) == 1 and len(results) == 5
+    stats = cache.get_stats()
+    assert stats['coalesced'] == 4 and stats['saved_seconds'] > 0
+
+    def failing_execute(sql_query):
+        calls.append(sql_query)
+        raise RuntimeError("ORA-00942")
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            cache.get_or_execute("SELECT * FROM MISSING", failing_execute)
+    assert len(calls) == 3
@@ -0,0 +1,76 @@
+"""
+test_result_store.py - 쿼리 결과 보관소 단위 테스트
+TTL 만료, 사용자별/전체 메모리 상한 제거, 소유자 확인, 대용량 결과 거부 확인
+"""
+
+import pandas as pd
+import pytest
+
+from result_store import ResultStore, ResultTooLargeError, ResultHandleExpiredError
+
+
+def _frame(rows):
+    return pd.DataFrame({'A': range(rows), 'B': [float(i) for i in range(rows)]})
+
+
+def _size(df):
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def test_handle_ownership_release_and_ttl(monkeypatch):
+    """핸들은 소유자만 조회/삭제 가능, 마지막 사용 후 TTL이 지나면 만료"""
+    store = ResultStore(ttl_seconds=10)
+    now = [1000.0]
+    monkeypatch.setattr('result_store.time.time', lambda: now[0])
+
+    df = _frame(5)
+    handle = store.put('alice', df, 'SELECT 1 FROM DUAL')
+    assert store.get('alice', handle) is df
+    with pytest.raises(ResultHandleExpiredError):
+        store.get('bob', handle)
+    assert not store.release('bob', handle)
+
+    # 조회할 때마다 만료 시간이 연장됨
+    now[0] += 8
+    store.get('alice', handle)
+    now[0] += 8
+    assert store.get('alice', handle) is df
+    now[0] += 10
+    with pytest.raises(ResultHandleExpiredError):
+        store.get('alice', handle)
+
+    other = store.put('alice', df)
+    assert store.release('alice', other)
+    stats = store.get_stats()
+    assert stats['results'] == 0 and stats['total_bytes'] == 0
+    assert stats['expired'] == 1 and stats['misses'] == 2
+
+
+def test_quota_eviction_and_rejection():
+    """사용자/전체 상한 초과 시 오래된 결과부터 제거, 상한보다 큰 결과는 거부"""
+    size = _size(_frame(100))
+    store = ResultStore(max_bytes_per_user=size * 2, max_total_bytes=size * 3)
+
+    first = store.put('alice', _frame(100))
+    second = store.put('alice', _frame(100))
+    third = store.put('alice', _frame(100))
+    with pytest.raises(ResultHandleExpiredError):
+        store.get('alice', first)
+    store.get('alice', second)
+    store.get('alice', third)
+
+    # 전체 상한: 가장 오래 사용되지 않은 결과(alice의 second) 제거
+    store.put('bob', _frame(100))
+    store.put('bob', _frame(100))
+    with pytest.raises(ResultHandleExpiredError):
+        store.get('alice', second)
+    store.get('alice', third)
+
+    with pytest.raises(ResultTooLargeError):
+        store.put('alice', _frame(1000))
+
+    stats = store.get_stats()
+    assert stats['evicted'] == 2 and stats['rejected'] == 1
+    assert stats['total_bytes'] == size * 3
+    assert stats['user_bytes'] == {'alice': size, 'bob': size * 2}
+    assert store.user_bytes('alice') == size and store.user_bytes('carol') == 0
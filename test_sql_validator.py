@@ -0,0 +1,124 @@
+"""
+test_sql_validator.py - 토큰 기반 SQL 검증 단위 테스트
+리터럴 보존, 첫 문장만 사용, 읽기 전용 검사, 메타데이터 테이블/컬럼 확인, 최상위 행 제한 추가 확인
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from data_catalog import freeze
+from data_manager import DataManager, DEFAULT_SQL, AUTO_ROW_LIMIT, is_auto_limited
+from metadata_index import MetadataIndex
+from sql_validator import validate_sql, tokenize, SqlValidationError
+
+METADATA_PATH = Path(__file__).parent / 'metadata.json'
+
+
+@pytest.fixture(scope='module')
+def metadata_index():
+    return MetadataIndex(freeze(json.loads(METADATA_PATH.read_text(encoding='utf-8'))))
+
+
+def test_literals_comments_and_statements():
+    """문자열 안의 -- / ; / FETCH FIRST는 그대로, 주석 제거, 첫 문장만 사용"""
+    sql = """
+        SELECT HIQ1_CUST_CD, 'a--b; FETCH FIRST 1 ROWS ONLY' AS note  -- 설명
+        /* 여러 줄
+           주석 */
+        FROM QMS_RAT_YMQT_N
+        WHERE HIQ1_APP_CD = 'it''s;';
+        SELECT 1 FROM DUAL;
+    """
+    validated = validate_sql(sql, row_limit=1000)
+    assert validated.sql == ("SELECT HIQ1_CUST_CD, 'a--b; FETCH FIRST 1 ROWS ONLY' AS note FROM QMS_RAT_YMQT_N "
+                             "WHERE HIQ1_APP_CD = 'it''s;' FETCH FIRST 1000 ROWS ONLY")
+    assert validated.statements == 2
+    assert validated.limited
+
+    with pytest.raises(SqlValidationError) as error:
+        tokenize("SELECT 'unterminated FROM DUAL")
+    assert error.value.reason == 'syntax'
+
+    # Oracle 대체 인용 문자열 (안의 ' / ; / -- 는 리터럴)
+    quoted = validate_sql("SELECT q'[it's; -- x]' AS a, nq'!b'c!' AS b FROM DUAL; SELECT 1 FROM DUAL")
+    assert quoted.sql == "SELECT q'[it's; -- x]' AS a, nq'!b'c!' AS b FROM DUAL"
+    with pytest.raises(SqlValidationError) as error:
+        tokenize("SELECT q'[unterminated FROM DUAL")
+    assert error.value.reason == 'syntax'
+
+
+def test_row_limit_is_structural():
+    """최상위 FETCH가 있으면 유지, 서브쿼리의 FETCH는 무시하고 최상위에 추가"""
+    kept = validate_sql("SELECT * FROM QMS_RAT_YMQT_N FETCH FIRST 10 ROWS ONLY;", row_limit=1000)
+    assert kept.sql == "SELECT * FROM QMS_RAT_YMQT_N FETCH FIRST 10 ROWS ONLY"
+    assert not kept.limited
+
+    nested = validate_sql("SELECT * FROM (SELECT * FROM QMS_RAT_YMQT_N FETCH FIRST 10 ROWS ONLY) t", row_limit=1000)
+    assert nested.sql.endswith(") t FETCH FIRST 1000 ROWS ONLY")
+    assert is_auto_limited(nested.sql, AUTO_ROW_LIMIT)
+
+
+@pytest.mark.parametrize('sql, reason', [
+    ("DELETE FROM QMS_RAT_YMQT_N", 'write'),
+    ("SELECT * FROM QMS_RAT_YMQT_N FOR UPDATE", 'write'),
+    ("WITH t AS (SELECT 1 x FROM DUAL) SELECT * FROM t; DROP TABLE QMS_RAT_YMQT_N", None),
+    ("EXPLAIN PLAN FOR SELECT 1 FROM DUAL", 'not_select'),
+    ("SELECT (1 FROM DUAL", 'syntax'),
+])
+def test_read_only_enforcement(sql, reason):
+    """쓰기/잠금 문장과 SELECT가 아닌 문장 거부 (뒤따르는 문장은 실행하지 않으므로 무시)"""
+    if reason is None:
+        assert validate_sql(sql).sql == "WITH t AS (SELECT 1 x FROM DUAL) SELECT * FROM t"
+        return
+    with pytest.raises(SqlValidationError) as error:
+        validate_sql(sql)
+    assert error.value.reason == reason
+
+
+def test_identifiers_checked_against_metadata(metadata_index):
+    """메타데이터에 없는 테이블/컬럼 거부, 별칭/CTE/서브쿼리/함수/의사 컬럼은 허용"""
+    valid = [
+        "SELECT r.HIQ1_CUST_CD, COUNT(*) cnt FROM QMS_RAT_YMQT_N r GROUP BY r.HIQ1_CUST_CD ORDER BY cnt DESC",
+        "SELECT g.PLAN_QUARTER, c.HIQ1_CUST_CD FROM QMS_GBW_VIEW g JOIN QMS_RAT_CUST c "
+        "ON g.HIQ1_CUST_CD = c.HIQ1_CUST_CD WHERE g.AMT > (SELECT AVG(AMT) FROM QMS_GBW_VIEW)",
+        "WITH t AS (SELECT HIQ1_CUST_CD, SUM(AMT) total FROM QMS_GBW_VIEW GROUP BY HIQ1_CUST_CD) "
+        "SELECT t.HIQ1_CUST_CD, total FROM t ORDER BY total DESC",
+        "SELECT EXTRACT(YEAR FROM SYSDATE) AS y, ROWNUM FROM DUAL",
+        "SELECT HIQ1_C.QMS_RAT_YMQT_N.YM_QT FROM HIQ1_C.QMS_RAT_YMQT_N WHERE YM_QT LIKE '2024%'",
+        "SELECT HIQ1_CUST_CD, MAX(YM_QT) KEEP (DENSE_RANK LAST ORDER BY YM_QT) AS latest "
+        "FROM QMS_RAT_YMQT_N GROUP BY HIQ1_CUST_CD",
+        "SELECT YM_QT FROM QMS_RAT_YMQT_N WHERE HIQ1_APP_CD = q'[it's]' OR HIQ1_APP_CD = Q'{a;b}'",
+    ]
+    for sql in valid:
+        validate_sql(sql, metadata_index)
+
+    validated = validate_sql(valid[0], metadata_index)
+    assert validated.tables == ['QMS_RAT_YMQT_N']
+    assert ('QMS_RAT_YMQT_N', 'HIQ1_CUST_CD') in validated.columns
+
+    with pytest.raises(SqlValidationError) as error:
+        validate_sql("SELECT r.CUSTOMER_NAME FROM QMS_RAT_YMQT_N r", metadata_index)
+    assert error.value.reason == 'unknown_column'
+    assert error.value.identifiers == ['QMS_RAT_YMQT_N.CUSTOMER_NAME']
+
+    with pytest.raises(SqlValidationError) as error:
+        validate_sql("SELECT SALES_AMT FROM QMS_RAT_YMQT_N WHERE YM_QT = '202401'", metadata_index)
+    assert error.value.identifiers == ['SALES_AMT']
+
+    with pytest.raises(SqlValidationError) as error:
+        validate_sql("SELECT * FROM QMS_SALES", metadata_index)
+    assert error.value.reason == 'unknown_table'
+
+
+def test_data_manager_validation(metadata_index):
+    """DataManager는 코드 블록을 추출해 검증, SQL이 아닌 응답은 기본 쿼리, 잘못된 컬럼은 예외"""
+    data_manager = DataManager.__new__(DataManager)
+    data_manager.metadata_path = str(METADATA_PATH)
+
+    sql = data_manager._validate_sql_query("```sql\nSELECT YM_QT FROM QMS_RAT_YMQT_N;\n```")
+    assert sql == f"SELECT YM_QT FROM QMS_RAT_YMQT_N FETCH FIRST {AUTO_ROW_LIMIT} ROWS ONLY"
+    assert data_manager._validate_sql_query("죄송합니다. 질문을 이해하지 못했습니다.") == DEFAULT_SQL
+    with pytest.raises(SqlValidationError):
+        data_manager._validate_sql_query("SELECT NO_SUCH_COLUMN FROM QMS_RAT_YMQT_N")
@@ -0,0 +1,130 @@
+"""
+lru_cache.py - 스레드 안전 LRU 캐시 유틸리티
+- 항목 수 / 바이트 크기 상한
+- 항목별 TTL
+- 적중/미스/제거 통계
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    def __init__(self, max_entries=None, max_bytes=None, ttl=None, sizeof=None):
+        """
+        LRU 캐시 초기화
+
+        Parameters:
+        - max_entries: 최대 항목 수 (None이면 제한 없음)
+        - max_bytes: 최대 총 크기(바이트) (None이면 제한 없음)
+        - ttl: 기본 만료 시간(초) (None이면 만료 없음)
+        - sizeof: 값의 크기를 계산하는 함수 (max_bytes 사용 시)
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.sizeof = sizeof or (lambda value: 0)
+
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._total_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key, default=None):
+        """값 조회 (만료된 항목은 제거 후 미스로 처리)"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self._misses += 1
+                return default
+
+            value, size, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                self._remove(key)
+                self._misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def set(self, key, value, ttl=None, size=None):
+        """
+        값 저장
+
+        Parameters:
+        - key: 캐시 키
+        - value: 저장할 값
+        - ttl: 항목별 만료 시간(초) (None이면 기본값 사용)
+        - size: 값 크기(바이트) (None이면 sizeof로 계산)
+        """
+        size = self.sizeof(value) if size is None else size
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.time() + ttl if ttl is not None else None
+
+        with self._lock:
+            # 단일 항목이 전체 상한보다 크면 저장하지 않음
+            if self.max_bytes is not None and size > self.max_bytes:
+                return False
+
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (value, size, expires_at)
+            self._total_bytes += size
+
+            while self._data and (
+                (self.max_entries is not None and len(self._data) > self.max_entries)
+                or (self.max_bytes is not None and self._total_bytes > self.max_bytes)
+            ):
+                oldest_key = next(iter(self._data))
+                self._remove(oldest_key)
+                self._evictions += 1
+            return True
+
+    def pop(self, key, default=None):
+        """항목 제거 후 값 반환"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            self._remove(key)
+            return entry[0]
+
+    def clear(self):
+        """전체 항목 제거"""
+        with self._lock:
+            self._data.clear()
+            self._total_bytes = 0
+
+    def keys(self):
+        """현재 키 목록 (오래된 순)"""
+        with self._lock:
+            return list(self._data.keys())
+
+    def _remove(self, key):
+        _, size, _ = self._data.pop(key)
+        self._total_bytes -= size
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+    def stats(self):
+        """캐시 통계 반환"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'entries': len(self._data),
+                'bytes': self._total_bytes,
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+                'hit_rate': self._hits / lookups if lookups else 0.0,
+            }
@@ -9,14 +9,13 @@ import os
 import sys
 import json
 import base64
+import io
 from pathlib import Path
 import logging
-from flask import Flask, render_template, request, jsonify, session, send_from_directory, send_file
+from flask import (Flask, render_template, request, jsonify, session, send_from_directory, send_file,
+                   Response, stream_with_context, g)
 from flask_session import Session
 import pandas as pd
-import numpy as np
-from threading import Lock
-from collections import defaultdict
 import shutil
 
 # 로깅 설정
@@ -34,6 +33,21 @@ if str(current_dir) not in sys.path:
 # 내부 모듈 가져오기
 from config import Config, LLMMode, set_llm_mode
 from main import ChartGenerationApp
+from app_registry import AppRegistry
+from data_manager import is_auto_limited, get_recent_fetch_stats
+from sql_validator import SqlValidationError
+from query_cache import get_query_cache
+from data_catalog import get_data_catalog
+from metadata_index import get_metadata_index
+from db_engine import get_pool_stats, DatabaseBusyError
+from llm_manager import SharedLLMBackend
+from llm_cache import get_response_cache
+from schema_context import get_schema_stats
+from job_queue import get_job_queue, JobQueueFullError
+from render_cache import get_render_cache
+from render_pool import get_render_pool
+from result_store import get_result_store, ResultTooLargeError, ResultHandleExpiredError
+from result_format import negotiate_result_format, result_json, result_response, records_payload, columnar_payload
 
 app = Flask(__name__)
 
@@ -42,23 +56,165 @@ app.config['SESSION_TYPE'] = 'filesystem'
 app.config['SECRET_KEY'] = 'your-secret-key-here'  # 실제 운영시 변경 필요
 Session(app)
 
-# 사용자별 chart_app 인스턴스 저장
-user_chart_apps = defaultdict(lambda: None)
-user_chart_apps_lock = Lock()
+def _create_chart_app(username):
+    return ChartGenerationApp(
+        csv_path=Config.csv_path,
+        metadata_path=Config.metadata_path,
+        output_dir=Config.get_output_dir(username),
+        results_dir=Config.get_results_dir(username),
+        llm_mode=Config.LLM_MODE.value,
+        username=username
+    )
+
+
+# 사용자별 chart_app 인스턴스 저장 (생성은 사용자별로 따로 진행, 다른 사용자 요청을 막지 않음)
+user_chart_apps = AppRegistry(
+    _create_chart_app,
+    max_apps=Config.USER_APP_MAX_APPS,
+    idle_ttl=Config.USER_APP_IDLE_TTL_SECONDS,
+    cleanup=lambda chart_app: chart_app.cleanup(),
+    sizeof=lambda chart_app: chart_app.estimate_memory()
+)
 
 
 def get_chart_app_for_user(username):
-    with user_chart_apps_lock:
-        if user_chart_apps[username] is None:
-            user_chart_apps[username] = ChartGenerationApp(
-                csv_path=Config.csv_path,
-                metadata_path=Config.metadata_path,
-                output_dir=Config.get_output_dir(username),
-                results_dir=Config.get_results_dir(username),
-                llm_mode=Config.LLM_MODE.value,
-                username=username
-            )
-        return user_chart_apps[username]
+    """
+    요청 처리용 사용자 앱
+    - 응답 전송(스트리밍 포함)이 끝날 때까지 임대, 그사이 레지스트리에서 제거되어도 정리하지 않음
+    """
+    app_lease = user_chart_apps.acquire(username)
+    g.setdefault('app_leases', []).append(app_lease)
+    return app_lease.app
+
+
+def with_app_lease(func):
+    """작업 실행 동안 사용자 앱을 임대해 func(job, chart_app, *args) 호출 (대기 중에는 임대하지 않음)"""
+    def run(job, *args):
+        with user_chart_apps.acquire(job.username) as chart_app:
+            return func(job, chart_app, *args)
+    return run
+
+
+def current_metadata_index():
+    """공유 메타데이터의 색인 (메타데이터 파일이 바뀌면 새 색인)"""
+    return get_metadata_index(get_data_catalog().get_metadata(Config.metadata_path))
+
+
+def sse_event(event, data):
+    """Server-Sent Events 메시지 한 건 직렬화"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def sse_json_event(event, data_json):
+    """이미 직렬화된 JSON 문자열로 SSE 메시지 생성 (대용량 결과 재직렬화 방지)"""
+    return f"event: {event}\ndata: {data_json}\n\n"
+
+
+def sse_response(events):
+    """
+    SSE 스트리밍 응답 생성
+    - 클라이언트 연결이 끊기면 WSGI 서버가 제너레이터를 닫고,
+      그 안의 LLM 스트림도 함께 닫혀 서버 측 생성이 중단됨
+    """
+    return Response(
+        stream_with_context(events),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+# 차트 렌더링 모드 (server: PNG 반환, client: 차트 명세만 반환하고 브라우저에서 렌더링)
+RENDER_MODES = ("server", "client")
+
+# 클라이언트 렌더링 결과의 히스토리 이미지 파일명 (처음 열 때 생성)
+DEFERRED_CHART_FILENAME = "chart.png"
+
+
+def get_render_mode():
+    """요청의 차트 렌더링 모드 (지원하지 않는 값이면 None)"""
+    render_mode = request.form.get('render_mode') or Config.CHART_DEFAULT_RENDER_MODE
+    return render_mode if render_mode in RENDER_MODES else None
+
+
+def chart_spec_payload(chart_json, chart_spec):
+    """렌더링용 명세가 원본 차트 JSON과 다를 때(다운샘플링 등)만 응답에 포함"""
+    if chart_spec is None or chart_spec is chart_json:
+        return {}
+    return {'chart_spec': chart_spec}
+
+
+def chart_result_payload(result):
+    """chart_process_request 결과 중 클라이언트에 보낼 항목"""
+    return {
+        'title': result['chart_json'].get('title', '차트'),
+        'chart_base64': result['chart_base64'],
+        'description': result['description'],
+        'chart_json': result['chart_json'],
+        'render_timings': result.get('render_timings', {}),
+        'render_mode': result.get('render_mode', 'server'),
+        **chart_spec_payload(result['chart_json'], result.get('chart_spec'))
+    }
+
+
+def store_result(username, result_df, sql_query=None):
+    """결과를 서버에 보관하고 핸들 반환 (보관 상한을 넘으면 None - 클라이언트가 결과 데이터를 직접 전송)"""
+    try:
+        return get_result_store().put(username, result_df, sql_query)
+    except ResultTooLargeError as e:
+        logger.warning(f"결과 보관 생략: {e}")
+        return None
+
+
+def has_result_data():
+    """요청에 결과 핸들 또는 결과 데이터가 있는지 확인"""
+    return bool(request.form.get('result_handle') or request.form.get('result_data'))
+
+
+def load_result_df(username):
+    """
+    요청의 결과 DataFrame
+    - result_handle이 있으면 서버 보관 결과 사용 (만료 시 ResultHandleExpiredError)
+    - 없으면 result_data JSON 파싱
+    """
+    handle = request.form.get('result_handle')
+    if handle:
+        return get_result_store().get(username, handle)
+    result_data = request.form.get('result_data')
+    return pd.DataFrame.from_records(json.loads(result_data) if result_data else [])
+
+
+def load_current_data_sample(username):
+    """SQL 수정 프롬프트용 현재 결과 샘플 (current_data가 없으면 결과 핸들에서 생성)"""
+    current_data = request.form.get('current_data')
+    handle = request.form.get('result_handle')
+    if current_data or not handle:
+        return current_data
+    try:
+        return get_result_store().get(username, handle).head(10).to_json(orient='records', force_ascii=False)
+    except ResultHandleExpiredError:
+        return None
+
+
+def result_expired_response(error):
+    """만료된 결과 핸들 응답 (클라이언트는 result_data를 직접 보내 재시도)"""
+    return jsonify({'error': str(error), 'code': 'result_expired'}), 410
+
+
+def sql_invalid_response(error):
+    """실행 전에 거부된 SQL 응답 (읽기 전용 위반, 메타데이터에 없는 테이블/컬럼 등)"""
+    return jsonify({'error': str(error), 'code': 'sql_invalid', 'reason': error.reason,
+                    'identifiers': error.identifiers}), 422
+
+
+def stream_llm_tokens(llm_manager, pieces, prompt, **kwargs):
+    """LLM 스트림을 token 이벤트로 중계하고 생성된 조각은 pieces에 모음"""
+    stream = llm_manager.stream_text(prompt, **kwargs)
+    try:
+        for chunk in stream:
+            pieces.append(chunk)
+            yield sse_event('token', {'text': chunk})
+    finally:
+        stream.close()
 
 
 @app.route('/')
@@ -72,6 +228,8 @@ def user_page(username):
     """사용자별 메인 페이지"""
     logger.info(f"사용자 '{username}'가 접속했습니다.")
     session['username'] = username
+    # 페이지를 보는 동안 앱을 백그라운드에서 미리 생성
+    user_chart_apps.warm_up(username)
     return render_template('index.html', llm_mode=Config.LLM_MODE.value, username=username)
 
 
@@ -79,26 +237,16 @@ def user_page(username):
 def get_predefined_queries(username):
     """미리 정의된 쿼리 목록 반환"""
     try:
-        with open(Config.metadata_path, 'r', encoding='utf-8') as f:
-            metadata = json.load(f)
-        
-        # metadata에서 ratings 정보 추출하여 미리 정의된 쿼리 생성
+        # metadata의 ratings(특수 지표) 정보로 미리 정의된 쿼리 생성
         predefined_queries = []
-        
-        # tables의 첫 번째 항목에서 ratings 정보 확인
-        if 'tables' in metadata and len(metadata['tables']) > 0:
-            first_table = metadata['tables'][0]
-            if 'ratings' in first_table:
-                ratings = first_table['ratings']
-                
-                for rating_type, rating_info in ratings.items():
-                    predefined_queries.append({
-                        'id': rating_type,
-                        'name': rating_type.replace('_', ' ').title(),
-                        'description': rating_info.get('description', ''),
-                        'estimated_rows': '100-1000',  # 예상 행 수
-                        'category': 'rating'
-                    })
+        for rating_type, rating_info in current_metadata_index().special_metrics.items():
+            predefined_queries.append({
+                'id': rating_type,
+                'name': rating_type.replace('_', ' ').title(),
+                'description': rating_info.get('description', ''),
+                'estimated_rows': '100-1000',  # 예상 행 수
+                'category': 'rating'
+            })
         
         # 추가 예시 쿼리들
         additional_queries = [
@@ -134,26 +282,21 @@ def execute_predefined_query(username):
         query_id = request.form.get('query_id')
         if not query_id:
             return jsonify({'error': '쿼리 ID가 필요합니다.'}), 400
+        result_format = negotiate_result_format(request)
+        if result_format is None:
+            return jsonify({'error': '지원하지 않는 결과 형식입니다.'}), 400
 
         chart_app = get_chart_app_for_user(username)
+        # 고객 코드 → 고객명 CASE 식 (메타데이터 HIQ1_CUST_CD 코드 사전)
+        metadata_index = current_metadata_index()
+        customer_name_r = metadata_index.case_expression('r.HIQ1_CUST_CD', 'HIQ1_CUST_CD')
+        customer_name_g = metadata_index.case_expression('g.HIQ1_CUST_CD', 'HIQ1_CUST_CD')
         
         # 미리 정의된 SQL 쿼리 매핑
         predefined_queries = {
-            'actual_rating': """
+            'actual_rating': f"""
                 SELECT r.HIQ1_CUST_CD as customer_code,
-                       CASE r.HIQ1_CUST_CD 
-                           WHEN 'G113' THEN 'GOOGLE'
-                           WHEN 'G150' THEN 'APPLE' 
-                           WHEN 'G669' THEN 'AMD'
-                           WHEN 'G932' THEN 'AMAZON'
-                           WHEN 'G118' THEN 'HUAWEI'
-                           WHEN 'G010' THEN 'HP INC'
-                           WHEN 'G021' THEN 'ACER'
-                           WHEN 'G163' THEN 'MICROSOFT'
-                           WHEN 'G020' THEN 'DELL'
-                           WHEN 'G959' THEN 'XIAOMI'
-                           ELSE r.HIQ1_CUST_CD
-                       END as customer_name,
+                       {customer_name_r} as customer_name,
                        r.HIQ1_APP_CD as app_type,
                        r.YM_QT as quarter,
                        r.ACTUAL as actual_rating,
@@ -163,21 +306,9 @@ def execute_predefined_query(username):
                 WHERE r.ACTUAL IS NOT NULL
                 ORDER BY r.YM_QT DESC, TO_NUMBER(r.SCORE) DESC
             """,
-            'expected_rating': """
+            'expected_rating': f"""
                 SELECT r.HIQ1_CUST_CD as customer_code,
-                       CASE r.HIQ1_CUST_CD 
-                           WHEN 'G113' THEN 'GOOGLE'
-                           WHEN 'G150' THEN 'APPLE' 
-                           WHEN 'G669' THEN 'AMD'
-                           WHEN 'G932' THEN 'AMAZON'
-                           WHEN 'G118' THEN 'HUAWEI'
-                           WHEN 'G010' THEN 'HP INC'
-                           WHEN 'G021' THEN 'ACER'
-                           WHEN 'G163' THEN 'MICROSOFT'
-                           WHEN 'G020' THEN 'DELL'
-                           WHEN 'G959' THEN 'XIAOMI'
-                           ELSE r.HIQ1_CUST_CD
-                       END as customer_name,
+                       {customer_name_r} as customer_name,
                        r.HIQ1_APP_CD as app_type,
                        r.YM_QT as quarter,
                        r.FORECAST as expected_rating,
@@ -187,21 +318,9 @@ def execute_predefined_query(username):
                 WHERE r.FORECAST IS NOT NULL
                 ORDER BY r.EXPECTED_DATE DESC, r.YM_QT DESC
             """,
-            'customer_performance_2024': """
+            'customer_performance_2024': f"""
                 SELECT g.HIQ1_CUST_CD as customer_code,
-                       CASE g.HIQ1_CUST_CD 
-                           WHEN 'G113' THEN 'GOOGLE'
-                           WHEN 'G150' THEN 'APPLE' 
-                           WHEN 'G669' THEN 'AMD'
-                           WHEN 'G932' THEN 'AMAZON'
-                           WHEN 'G118' THEN 'HUAWEI'
-                           WHEN 'G010' THEN 'HP INC'
-                           WHEN 'G021' THEN 'ACER'
-                           WHEN 'G163' THEN 'MICROSOFT'
-                           WHEN 'G020' THEN 'DELL'
-                           WHEN 'G959' THEN 'XIAOMI'
-                           ELSE g.HIQ1_CUST_CD
-                       END as customer_name,
+                       {customer_name_g} as customer_name,
                        g.HIQ1_APP_CD as app_type,
                        g.AMT as performance_amount,
                        g.ACTUAL as actual_rating,
@@ -234,18 +353,86 @@ def execute_predefined_query(username):
         # 고정된 SQL 쿼리 가져오기
         sql_query = predefined_queries[query_id]
         
+        # 새로고침 요청이면 캐시된 결과를 버리고 DB에서 다시 조회
+        if request.form.get('refresh', 'false').lower() == 'true':
+            chart_app.data_manager.invalidate_cached_result(sql_query)
+
         # SQL 직접 실행 (LLM 거치지 않음)
         result = chart_app.execute_predefined_sql(query_id, sql_query, username)
 
-        return jsonify({
+        return result_response(request, {
             'query_id': query_id,
             'sql_query': result['sql_query'],
-            'result_data': result['result_df'].replace({np.nan: None}).to_dict(orient='records')
-        })
+            'result_handle': store_result(username, result['result_df'], result['sql_query'])
+        }, result['result_df'], result_format)
 
+    except DatabaseBusyError as e:
+        return jsonify({'error': str(e)}), 503
     except Exception as e:
         logger.error(f"미리 정의된 쿼리 실행 오류: {e}")
         return jsonify({'error': str(e)}), 500
+
+
+def load_result_page(data_manager, record, offset, limit):
+    """
+    보관 결과의 한 페이지와 전체 행 수
+    - 보관 결과가 완전하면 메모리에서 잘라 반환
+    - 자동 행 제한으로 잘린 결과는 보관된 행을 넘는 구간을 DB에서 OFFSET/FETCH로 조회
+
+    Returns:
+    - (페이지 DataFrame, 전체 행 수, 정확 여부)
+    """
+    df = record.df
+    if not is_auto_limited(record.sql_query, len(df)):
+        return df.iloc[offset:offset + limit], len(df), True
+
+    # 전체 행 수는 처음 한 번만 (상한까지) 집계
+    if record.total_rows is None:
+        record.total_rows = data_manager.count_sql_rows(record.sql_query, Config.RESULT_BROWSE_MAX_ROWS)
+    total_rows, total_exact = record.total_rows
+    limit = max(0, min(limit, total_rows - offset))
+    if offset + limit <= len(df):
+        return df.iloc[offset:offset + limit], total_rows, total_exact
+    if limit == 0:
+        return df.iloc[0:0], total_rows, total_exact
+    return data_manager.execute_sql_page(record.sql_query, offset, limit), total_rows, total_exact
+
+
+@app.route('/<username>/results/<handle>/page')
+def result_page(username, handle):
+    """
+    보관 결과 페이지 조회 (offset/limit)
+    - 응답: offset, row_count, total_rows(정확하지 않으면 total_exact=false), has_more, result_data
+    """
+    try:
+        offset = max(0, request.args.get('offset', 0, type=int))
+        limit = request.args.get('limit', Config.RESULT_PAGE_SIZE, type=int)
+        limit = max(1, min(limit, Config.RESULT_PAGE_MAX_LIMIT))
+        result_format = negotiate_result_format(request)
+        if result_format is None:
+            return jsonify({'error': '지원하지 않는 결과 형식입니다.'}), 400
+        if offset >= Config.RESULT_BROWSE_MAX_ROWS:
+            return jsonify({'error': f'최대 {Config.RESULT_BROWSE_MAX_ROWS:,}행까지만 조회할 수 있습니다.'}), 400
+
+        record = get_result_store().get_record(username, handle)
+        chart_app = get_chart_app_for_user(username)
+        page_df, total_rows, total_exact = load_result_page(chart_app.data_manager, record, offset, limit)
+
+        return result_response(request, {
+            'offset': offset,
+            'row_count': len(page_df),
+            'total_rows': total_rows,
+            'total_exact': total_exact,
+            'has_more': offset + len(page_df) < total_rows
+        }, page_df.reset_index(drop=True), result_format)
+
+    except ResultHandleExpiredError as e:
+        return result_expired_response(e)
+    except DatabaseBusyError as e:
+        return jsonify({'error': str(e)}), 503
+    except Exception as e:
+        logger.error(f"결과 페이지 조회 오류: {e}")
+        return jsonify({'error': str(e)}), 500
     
 @app.route('/<username>/modify_sql', methods=['POST'])
 def modify_sql(username):
@@ -253,38 +440,23 @@ def modify_sql(username):
     try:
         original_sql = request.form.get('original_sql')
         modification_request = request.form.get('modification_request')
-        current_data = request.form.get('current_data')
+        current_data = load_current_data_sample(username)
+        regenerate = request.form.get('regenerate', 'false').lower() == 'true'
 
         if not all([original_sql, modification_request]):
             return jsonify({'error': '필수 파라미터가 누락되었습니다.'}), 400
+        result_format = negotiate_result_format(request)
+        if result_format is None:
+            return jsonify({'error': '지원하지 않는 결과 형식입니다.'}), 400
 
         chart_app = get_chart_app_for_user(username)
         
-        # LLM을 통한 SQL 수정
+        # LLM을 통한 SQL 수정 (스트리밍/작업 큐 경로와 같은 프롬프트 사용)
         if chart_app.llm_manager:
-            # 수정 프롬프트 생성
-            modify_prompt = f"""
-기존 SQL을 사용자 요청에 맞게 수정해주세요.
-
-## 기존 SQL
-{original_sql}
-
-## 사용자 수정 요청
-{modification_request}
-
-## 현재 데이터 샘플
-{current_data[:500] if current_data else 'N/A'}
-
-## 지시사항
-- 기존 SQL의 구조를 최대한 유지하면서 수정하세요
-- 사용자 요청사항만 반영하세요
-- Oracle 문법을 준수하세요
-- SELECT 문만 작성하고 다른 설명은 포함하지 마세요
-
-수정된 SQL:
-"""
-            
-            modified_sql = chart_app.llm_manager.generate_text(modify_prompt, temperature=0.1, max_tokens=1024)
+            modified_sql = chart_app.llm_manager.modify_sql(
+                original_sql, modification_request, current_data, chart_app.data_manager.metadata,
+                regenerate=regenerate
+            )
             
             # SQL 검증 및 정제
             modified_sql = chart_app.data_manager._validate_sql_query(modified_sql)
@@ -292,35 +464,97 @@ def modify_sql(username):
             # 수정된 SQL 실행
             result_df = chart_app.data_manager.execute_sql(modified_sql)
             
-            return jsonify({
+            return result_response(request, {
                 'sql_query': modified_sql,
-                'result_data': result_df.replace({np.nan: None}).to_dict(orient='records'),
+                'result_handle': store_result(username, result_df, modified_sql),
                 'modification_applied': modification_request
-            })
+            }, result_df, result_format)
         else:
             return jsonify({'error': 'LLM 매니저가 설정되지 않았습니다.'}), 500
 
+    except SqlValidationError as e:
+        return sql_invalid_response(e)
+    except DatabaseBusyError as e:
+        return jsonify({'error': str(e)}), 503
     except Exception as e:
         logger.error(f"SQL 수정 오류: {e}")
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/<username>/modify_sql/stream', methods=['POST'])
+def modify_sql_stream(username):
+    """SQL 수정 요청 처리 (SSE로 생성 중인 SQL 전송 후 실행 결과 전송)"""
+    original_sql = request.form.get('original_sql')
+    modification_request = request.form.get('modification_request')
+    current_data = load_current_data_sample(username)
+    regenerate = request.form.get('regenerate', 'false').lower() == 'true'
+
+    if not all([original_sql, modification_request]):
+        return jsonify({'error': '필수 파라미터가 누락되었습니다.'}), 400
+    # SSE 이벤트는 JSON만 가능하므로 arrow 요청은 columnar로 전송
+    result_format = negotiate_result_format(request)
+    if result_format is None:
+        return jsonify({'error': '지원하지 않는 결과 형식입니다.'}), 400
+    if result_format == 'arrow':
+        result_format = 'columnar'
+
+    chart_app = get_chart_app_for_user(username)
+    if not chart_app.llm_manager:
+        return jsonify({'error': 'LLM 매니저가 설정되지 않았습니다.'}), 500
+
+    system_prompt, prompt = chart_app.llm_manager.build_modify_sql_prompt(
+        original_sql, modification_request, current_data, chart_app.data_manager.metadata
+    )
+
+    def events():
+        pieces = []
+        try:
+            yield from stream_llm_tokens(
+                chart_app.llm_manager, pieces, prompt,
+                temperature=0.1, max_tokens=1024, regenerate=regenerate, system_prompt=system_prompt
+            )
+
+            # SQL 검증 및 정제 후 실행 (첫 행들을 먼저 미리보기로 전송)
+            modified_sql = chart_app.data_manager._validate_sql_query("".join(pieces))
+            chunks = []
+            for chunk_df in chart_app.data_manager.iter_sql_chunks(modified_sql, first_rows=Config.SQL_PREVIEW_ROWS):
+                if not chunks:
+                    yield sse_json_event('preview', result_json({'sql_query': modified_sql}, chunk_df, result_format))
+                chunks.append(chunk_df)
+            result_df = pd.concat(chunks, ignore_index=True)
+
+            yield sse_json_event('result', result_json({
+                'sql_query': modified_sql,
+                'result_handle': store_result(username, result_df, modified_sql),
+                'modification_applied': modification_request
+            }, result_df, result_format))
+        except SqlValidationError as e:
+            yield sse_event('error', {'error': str(e), 'code': 'sql_invalid', 'reason': e.reason})
+        except Exception as e:
+            logger.error(f"SQL 수정 스트리밍 오류: {e}")
+            yield sse_event('error', {'error': str(e)})
+
+    return sse_response(events())
+
+
 @app.route('/<username>/generate_chart', methods=['POST'])
 def generate_chart(username):
     """차트 생성 요청 처리"""
     try:
         chart_request = request.form.get('chart_request')
-        result_data = request.form.get('result_data')
         sql_query = request.form.get('sql_query')
+        regenerate = request.form.get('regenerate', 'false').lower() == 'true'
+        render_mode = get_render_mode()
 
-        if not all([chart_request, result_data]):
+        if not chart_request or not has_result_data():
             return jsonify({'error': '필수 파라미터가 누락되었습니다.'}), 400
+        if render_mode is None:
+            return jsonify({'error': '지원하지 않는 렌더링 모드입니다.'}), 400
 
         chart_app = get_chart_app_for_user(username)
         
-        # JSON 파싱
-        result_data_dict = json.loads(result_data)
-        result_df = pd.DataFrame.from_records(result_data_dict)
+        # 서버 보관 결과 또는 전송된 JSON
+        result_df = load_result_df(username)
 
         # 차트 생성
         result = chart_app.chart_process_request(
@@ -328,104 +562,344 @@ def generate_chart(username):
             chart_request=chart_request,
             result_df=result_df,
             sql_query=sql_query,
-            username=username
+            username=username,
+            regenerate=regenerate,
+            render_mode=render_mode
         )
 
-        return jsonify({
-            'title': result['chart_json'].get('title', '차트'),
-            'chart_base64': result['chart_base64'],
-            'description': result['description'],
-            'chart_json': result['chart_json']
-        })
+        return jsonify(chart_result_payload(result))
 
+    except ResultHandleExpiredError as e:
+        return result_expired_response(e)
     except Exception as e:
         logger.error(f"차트 생성 오류: {e}")
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/<username>/generate_chart/stream', methods=['POST'])
+def generate_chart_stream(username):
+    """차트 생성 요청 처리 (SSE로 생성 중인 차트 JSON 전송 후 차트 전송)"""
+    chart_request = request.form.get('chart_request')
+    sql_query = request.form.get('sql_query')
+    regenerate = request.form.get('regenerate', 'false').lower() == 'true'
+    render_mode = get_render_mode()
+
+    if not chart_request or not has_result_data():
+        return jsonify({'error': '필수 파라미터가 누락되었습니다.'}), 400
+    if render_mode is None:
+        return jsonify({'error': '지원하지 않는 렌더링 모드입니다.'}), 400
+
+    chart_app = get_chart_app_for_user(username)
+    if not chart_app.llm_manager:
+        return jsonify({'error': 'LLM 매니저가 설정되지 않았습니다.'}), 500
+
+    try:
+        result_df = load_result_df(username)
+    except ResultHandleExpiredError as e:
+        return result_expired_response(e)
+    system_prompt, prompt = chart_app.llm_manager.build_chart_json_prompt(
+        chart_request, chart_app.data_manager.metadata, result_df.to_string()
+    )
+
+    def events():
+        pieces = []
+        try:
+            yield from stream_llm_tokens(
+                chart_app.llm_manager, pieces, prompt,
+                temperature=0.2, max_tokens=2048, regenerate=regenerate, system_prompt=system_prompt
+            )
+
+            # 생성된 JSON으로 차트 렌더링 및 저장
+            result = chart_app.chart_process_request(
+                query=chart_request,
+                chart_request=chart_request,
+                result_df=result_df,
+                sql_query=sql_query,
+                username=username,
+                chart_json=chart_app.llm_manager.parse_chart_json("".join(pieces)),
+                render_mode=render_mode
+            )
+
+            yield sse_event('result', chart_result_payload(result))
+        except Exception as e:
+            logger.error(f"차트 생성 스트리밍 오류: {e}")
+            yield sse_event('error', {'error': str(e)})
+
+    return sse_response(events())
+
+
 @app.route('/<username>/modify_chart_json', methods=['POST'])
 def modify_chart_json(username):
     """차트 JSON 수정 요청 처리"""
     try:
         original_json = request.form.get('original_json')
         modification_request = request.form.get('modification_request')
-        result_data = request.form.get('result_data')
+        regenerate = request.form.get('regenerate', 'false').lower() == 'true'
+        render_mode = get_render_mode()
 
         if not all([original_json, modification_request]):
             return jsonify({'error': '필수 파라미터가 누락되었습니다.'}), 400
+        if render_mode is None:
+            return jsonify({'error': '지원하지 않는 렌더링 모드입니다.'}), 400
 
         chart_app = get_chart_app_for_user(username)
         
         if chart_app.llm_manager:
-            # 수정 프롬프트 생성
-            modify_prompt = f"""
-기존 차트 설정을 사용자 요청에 맞게 수정해주세요.
-
-## 기존 차트 JSON
-{original_json}
-
-## 사용자 수정 요청
-{modification_request}
-
-## 지시사항
-- 기존 차트의 기본 구조는 유지하세요
-- 요청된 부분만 정확히 수정하세요
-- 유효한 JSON 형식으로 반환하세요
-- 마크다운이나 설명 없이 순수한 JSON만 반환하세요
+            # 스트리밍/작업 큐 경로와 같은 고정 시스템 프롬프트 사용 (파싱 실패 시 원본 JSON 유지)
+            result_df = load_result_df(username)
+            modified_chart_json = chart_app.llm_manager.modify_chart_json(
+                original_json, modification_request, result_df.head(5).to_string(), regenerate=regenerate
+            )
 
-수정된 차트 JSON:
-"""
-            
-            modified_json_str = chart_app.llm_manager.generate_text(modify_prompt, temperature=0.2, max_tokens=2048)
-            
-            # JSON 파싱 및 검증
-            try:
-                # 마크다운 코드 블록 제거
-                import re
-                json_pattern = r'```(?:json)?\s*([\s\S]*?)```'
-                matches = re.findall(json_pattern, modified_json_str)
-                
-                if matches:
-                    json_str = matches[0]
-                else:
-                    start_idx = modified_json_str.find('{')
-                    end_idx = modified_json_str.rfind('}') + 1
-                    if start_idx >= 0 and end_idx > start_idx:
-                        json_str = modified_json_str[start_idx:end_idx]
-                    else:
-                        raise ValueError("JSON 형식을 찾을 수 없습니다.")
-                
-                modified_chart_json = json.loads(json_str)
-                
-                # 수정된 JSON으로 차트 재생성
-                result_data_dict = json.loads(result_data) if result_data else []
-                result_df = pd.DataFrame.from_records(result_data_dict)
-                
+            chart_spec = None
+            if render_mode == "client":
+                # 브라우저에서 렌더링하므로 검증/정규화만 수행
+                chart_base64 = None
+                modified_chart_json = chart_app.chart_generator._validate_chart_json(modified_chart_json, result_df)
+                chart_spec = chart_app.chart_generator.prepare_client_spec(modified_chart_json, result_df)
+            else:
                 chart_path, chart_base64 = chart_app.chart_generator.create_chart(modified_chart_json, result_df)
-                
-                return jsonify({
-                    'title': modified_chart_json.get('title', '수정된 차트'),
-                    'chart_base64': chart_base64,
-                    'description': modified_chart_json.get('description', ''),
-                    'chart_json': modified_chart_json
-                })
-                
-            except json.JSONDecodeError as e:
-                logger.error(f"JSON 파싱 오류: {e}")
-                return jsonify({'error': 'LLM이 유효한 JSON을 생성하지 못했습니다.'}), 500
+
+            return jsonify({
+                'title': modified_chart_json.get('title', '수정된 차트'),
+                'chart_base64': chart_base64,
+                'description': modified_chart_json.get('description', ''),
+                'chart_json': modified_chart_json,
+                'render_mode': render_mode,
+                **chart_spec_payload(modified_chart_json, chart_spec)
+            })
         else:
             return jsonify({'error': 'LLM 매니저가 설정되지 않았습니다.'}), 500
 
+    except ResultHandleExpiredError as e:
+        return result_expired_response(e)
     except Exception as e:
         logger.error(f"차트 JSON 수정 오류: {e}")
         return jsonify({'error': str(e)}), 500
 
 
+def run_chart_job(job, chart_app, chart_request, result_df, sql_query, username, regenerate, render_mode="server"):
+    """차트 생성 작업 (작업 큐 작업자 스레드에서 실행)"""
+    result = chart_app.chart_process_request(
+        query=chart_request,
+        chart_request=chart_request,
+        result_df=result_df,
+        sql_query=sql_query,
+        username=username,
+        regenerate=regenerate,
+        on_stage=job.set_stage,
+        render_mode=render_mode
+    )
+    return chart_result_payload(result)
+
+
+def run_modify_sql_job(job, chart_app, original_sql, modification_request, current_data, regenerate,
+                       result_format='records'):
+    """SQL 수정 작업 (작업 큐 작업자 스레드에서 실행)"""
+    job.set_stage('sql')
+    modified_sql = chart_app.llm_manager.modify_sql(
+        original_sql, modification_request, current_data, chart_app.data_manager.metadata, regenerate=regenerate
+    )
+    modified_sql = chart_app.data_manager._validate_sql_query(modified_sql)
+
+    job.set_stage('execute')
+    result_df = chart_app.data_manager.execute_sql(modified_sql)
+    return {
+        'sql_query': modified_sql,
+        'result_data': records_payload(result_df) if result_format == 'records' else columnar_payload(result_df),
+        'result_handle': store_result(job.username, result_df, modified_sql),
+        'modification_applied': modification_request
+    }
+
+
+def submit_job(username, kind, func, *args):
+    """작업 제출 후 202 응답 (대기열이 가득 차면 429)"""
+    try:
+        job = get_job_queue().submit(username, kind, func, *args)
+    except JobQueueFullError as e:
+        logger.warning(f"작업 제출 거부: {e}")
+        return jsonify({'error': str(e)}), 429
+
+    return jsonify({
+        'job_id': job.job_id,
+        'status': job.status,
+        'status_url': f"/{username}/jobs/{job.job_id}",
+        'events_url': f"/{username}/jobs/{job.job_id}/events"
+    }), 202
+
+
+def get_user_job(username, job_id):
+    """사용자 소유 작업 조회 (없거나 다른 사용자의 작업이면 None)"""
+    job = get_job_queue().get(job_id)
+    if job is None or job.username != username:
+        return None
+    return job
+
+
+@app.route('/<username>/jobs/generate_chart', methods=['POST'])
+def submit_generate_chart_job(username):
+    """차트 생성 작업 제출"""
+    try:
+        chart_request = request.form.get('chart_request')
+        sql_query = request.form.get('sql_query')
+        regenerate = request.form.get('regenerate', 'false').lower() == 'true'
+        render_mode = get_render_mode()
+
+        if not chart_request or not has_result_data():
+            return jsonify({'error': '필수 파라미터가 누락되었습니다.'}), 400
+        if render_mode is None:
+            return jsonify({'error': '지원하지 않는 렌더링 모드입니다.'}), 400
+
+        result_df = load_result_df(username)
+        return submit_job(username, 'generate_chart', with_app_lease(run_chart_job),
+                          chart_request, result_df, sql_query, username, regenerate, render_mode)
+
+    except ResultHandleExpiredError as e:
+        return result_expired_response(e)
+    except Exception as e:
+        logger.error(f"차트 생성 작업 제출 오류: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/<username>/jobs/modify_sql', methods=['POST'])
+def submit_modify_sql_job(username):
+    """SQL 수정 작업 제출"""
+    try:
+        original_sql = request.form.get('original_sql')
+        modification_request = request.form.get('modification_request')
+        current_data = load_current_data_sample(username)
+        regenerate = request.form.get('regenerate', 'false').lower() == 'true'
+
+        if not all([original_sql, modification_request]):
+            return jsonify({'error': '필수 파라미터가 누락되었습니다.'}), 400
+
+        # 작업 결과는 JSON으로 조회하므로 arrow 요청은 columnar로 보관
+        result_format = negotiate_result_format(request)
+        if result_format is None:
+            return jsonify({'error': '지원하지 않는 결과 형식입니다.'}), 400
+        if result_format == 'arrow':
+            result_format = 'columnar'
+
+        chart_app = get_chart_app_for_user(username)
+        if not chart_app.llm_manager:
+            return jsonify({'error': 'LLM 매니저가 설정되지 않았습니다.'}), 500
+
+        return submit_job(username, 'modify_sql', with_app_lease(run_modify_sql_job),
+                          original_sql, modification_request, current_data, regenerate, result_format)
+
+    except Exception as e:
+        logger.error(f"SQL 수정 작업 제출 오류: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/<username>/jobs/<job_id>', methods=['GET'])
+def get_job_status(username, job_id):
+    """작업 상태 조회 (완료 시 결과 포함)"""
+    job = get_user_job(username, job_id)
+    if job is None:
+        return jsonify({'error': '작업을 찾을 수 없습니다.'}), 404
+    return jsonify(job.to_dict())
+
+
+@app.route('/<username>/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(username, job_id):
+    """작업 취소"""
+    job = get_user_job(username, job_id)
+    if job is None:
+        return jsonify({'error': '작업을 찾을 수 없습니다.'}), 404
+    cancelled = get_job_queue().cancel(job_id)
+    return jsonify({'cancelled': cancelled, 'status': job.status})
+
+
+@app.route('/<username>/jobs/<job_id>/events')
+def job_events(username, job_id):
+    """작업 상태 변경 구독 (SSE, 완료되면 종료)"""
+    job = get_user_job(username, job_id)
+    if job is None:
+        return jsonify({'error': '작업을 찾을 수 없습니다.'}), 404
+
+    def events():
+        version = None
+        while True:
+            info = job.to_dict()
+            if info['version'] != version:
+                version = info['version']
+                yield sse_event('status', info)
+            if job.is_finished():
+                break
+            if job.wait_for_update(version, timeout=15) == version:
+                # 프록시 유휴 타임아웃 방지용 주석 메시지
+                yield ": keep-alive\n\n"
+
+    return sse_response(events())
+
+
 # 기존 라우트들 (유지)
+@app.route('/<username>/export_chart', methods=['POST'])
+def export_chart(username):
+    """차트 PNG 내보내기 (클라이언트 렌더링 차트를 다운로드할 때 서버에서 렌더링)"""
+    try:
+        chart_json = request.form.get('chart_json')
+
+        if not chart_json:
+            return jsonify({'error': '필수 파라미터가 누락되었습니다.'}), 400
+
+        chart_app = get_chart_app_for_user(username)
+        result_df = load_result_df(username)
+        chart_json = chart_app.chart_generator._validate_chart_json(json.loads(chart_json), result_df)
+        _, chart_base64 = chart_app.chart_generator.create_chart(chart_json, result_df)
+
+        return send_file(
+            io.BytesIO(base64.b64decode(chart_base64)),
+            mimetype='image/png',
+            as_attachment=True,
+            download_name=f"{chart_json.get('title') or 'chart'}.png"
+        )
+
+    except ResultHandleExpiredError as e:
+        return result_expired_response(e)
+    except Exception as e:
+        logger.error(f"차트 내보내기 오류: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+def render_deferred_chart(username, folder_path):
+    """
+    클라이언트 렌더링으로 저장된 히스토리의 차트 이미지를 처음 요청될 때 생성
+
+    Returns:
+    - 생성한 이미지 경로 (지연 렌더링 대상이 아니면 None)
+    """
+    info_path = os.path.join(folder_path, "info.json")
+    if not os.path.exists(info_path):
+        return None
+    with open(info_path, 'r', encoding='utf-8') as f:
+        info = json.load(f)
+    if info.get('chart_render') != 'deferred':
+        return None
+
+    with open(os.path.join(folder_path, "chart_json.json"), 'r', encoding='utf-8') as f:
+        chart_json = json.load(f)
+    result_data_path = os.path.join(folder_path, "result_data.csv")
+    try:
+        result_df = pd.read_csv(result_data_path)
+    except (FileNotFoundError, pd.errors.EmptyDataError):
+        result_df = pd.DataFrame()
+
+    chart_app = get_chart_app_for_user(username)
+    _, chart_base64 = chart_app.chart_generator.create_chart(chart_json, result_df)
+    chart_path = os.path.join(folder_path, DEFERRED_CHART_FILENAME)
+    with open(chart_path, 'wb') as f:
+        f.write(base64.b64decode(chart_base64))
+    logger.info(f"히스토리 차트 이미지 생성: {chart_path}")
+    return chart_path
+
+
 @app.route('/charts/<path:filename>')
 def serve_chart(filename):
     """차트 이미지 제공"""
     chart_app = get_chart_app_for_user(session.get('username', 'default'))
+    chart_app.chart_generator.wait_for_file(os.path.join(chart_app.output_dir, filename))
     return send_from_directory(chart_app.output_dir, filename)
 
 
@@ -440,14 +914,36 @@ def serve_result(filename):
 def get_json_data(username):
     """메타데이터 반환"""
     try:
-        with open(Config.metadata_path, 'r', encoding='utf-8') as f:
-            json_data = json.load(f)
-        return jsonify(json_data)
+        return Response(get_data_catalog().get_metadata_json(Config.metadata_path), mimetype='application/json')
     except Exception as e:
         logger.error(f"메타데이터 로드 오류: {e}")
         return jsonify({"error": "JSON 데이터를 가져오지 못했습니다."}), 500
 
 
+@app.route('/<username>/metadata/search')
+def search_metadata(username):
+    """테이블/컬럼 이름·한글명 검색 (메타데이터 색인 조회)"""
+    try:
+        text = request.args.get('q', '').strip()
+        if not text:
+            return jsonify({'error': '검색어가 필요합니다.'}), 400
+        limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+        metadata_index = current_metadata_index()
+        results = []
+        for item in metadata_index.search(text, limit=limit):
+            entry = item.to_dict()
+            if 'column' in entry:
+                entry['type'] = 'column'
+                entry['key_columns'] = metadata_index.key_columns(item.table)
+            else:
+                entry['type'] = 'table'
+            results.append(entry)
+        return jsonify({'query': text, 'results': results})
+    except Exception as e:
+        logger.error(f"메타데이터 검색 오류: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
 @app.route('/<username>/get_history')
 def get_history(username):
     """사용자 히스토리 반환"""
@@ -514,11 +1010,18 @@ def get_files(username):
                 if os.path.isfile(os.path.join(folder_path, f)):
                     file_type = f.split('.')[-1] if '.' in f else 'unknown'
                     files.append({"name": f, "type": file_type})
+            # 클라이언트 렌더링 결과는 이미지를 열 때 생성
+            if not any(f["type"] == "png" for f in files) and os.path.exists(os.path.join(folder_path, "info.json")):
+                with open(os.path.join(folder_path, "info.json"), 'r', encoding='utf-8') as info_file:
+                    if json.load(info_file).get('chart_render') == 'deferred':
+                        files.append({"name": DEFERRED_CHART_FILENAME, "type": "png"})
             return jsonify(files)
         
         # file 매개변수가 있으면 특정 파일 내용 반환
         file_path = os.path.join(folder_path, file_name)
         
+        if not os.path.exists(file_path) and file_name == DEFERRED_CHART_FILENAME:
+            render_deferred_chart(username, folder_path)
         if not os.path.exists(file_path):
             return jsonify({"error": "파일이 존재하지 않습니다."}), 404
 
@@ -553,6 +1056,97 @@ def set_mode():
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/stats/llm')
+def llm_stats():
+    """공유 LLM 백엔드 지표 반환 (배칭, 커넥션 풀, 응답 캐시)"""
+    try:
+        cache = get_response_cache()
+        return jsonify({
+            'backends': SharedLLMBackend.get_all_metrics(),
+            'response_cache': cache.get_stats() if cache is not None else None,
+            'schema_context': get_schema_stats()
+        })
+    except Exception as e:
+        logger.error(f"LLM 지표 조회 오류: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/stats/charts')
+def chart_stats():
+    """차트 렌더링 지표 반환 (캐시 적중률/사용량, 프로세스 풀 작업자 상태)"""
+    try:
+        cache = get_render_cache()
+        pool = get_render_pool()
+        return jsonify({
+            'render_cache': cache.get_stats() if cache is not None else None,
+            'render_pool': pool.get_stats() if pool is not None else None
+        })
+    except Exception as e:
+        logger.error(f"차트 지표 조회 오류: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/stats/results')
+def result_stats():
+    """서버 보관 결과 지표 반환 (보관 수, 사용자별 메모리, 만료/제거 횟수)"""
+    try:
+        return jsonify(get_result_store().get_stats())
+    except Exception as e:
+        logger.error(f"결과 보관소 지표 조회 오류: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/stats/sql')
+def sql_stats():
+    """SQL 지표 반환 (최근 조회 지표, 결과 캐시 적중률/절약한 DB 시간, 커넥션 풀 대여/대기 지표)"""
+    try:
+        cache = get_query_cache()
+        return jsonify({
+            'recent': get_recent_fetch_stats(),
+            'cache': cache.get_stats() if cache else None,
+            'pool': get_pool_stats()
+        })
+    except Exception as e:
+        logger.error(f"SQL 조회 지표 오류: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/sql_cache/invalidate', methods=['POST'])
+def invalidate_sql_cache():
+    """SQL 결과 캐시 무효화 (table 지정 시 해당 테이블을 참조하는 결과만, 없으면 전체)"""
+    try:
+        cache = get_query_cache()
+        if cache is None:
+            return jsonify({'removed': 0})
+        removed = cache.invalidate(table=request.form.get('table') or None)
+        return jsonify({'removed': removed})
+    except Exception as e:
+        logger.error(f"SQL 결과 캐시 무효화 오류: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/stats/apps')
+def app_stats():
+    """사용자 앱 레지스트리 지표 반환 (앱 수/상한, 사용자별 추정 메모리, 생성/제거 횟수, 공유 데이터 카탈로그)"""
+    try:
+        stats = user_chart_apps.get_stats()
+        stats['data_catalog'] = get_data_catalog().get_stats()
+        return jsonify(stats)
+    except Exception as e:
+        logger.error(f"사용자 앱 지표 조회 오류: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/stats/jobs')
+def job_stats():
+    """작업 큐 지표 반환 (대기/실행 중 작업 수, 사용자별 실행 수)"""
+    try:
+        return jsonify(get_job_queue().get_stats())
+    except Exception as e:
+        logger.error(f"작업 큐 지표 조회 오류: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
 @app.route('/favicon.ico')
 def favicon():
     """파비콘 제공"""
@@ -605,9 +1199,19 @@ def after_request(response):
     response.headers['X-Content-Type-Options'] = 'nosniff'
     response.headers['X-Frame-Options'] = 'DENY'
     response.headers['X-XSS-Protection'] = '1; mode=block'
+    # 요청에서 임대한 사용자 앱은 응답 전송(스트리밍 포함)이 끝난 뒤 반납
+    for app_lease in g.pop('app_leases', []):
+        response.call_on_close(app_lease.release)
     return response
 
 
+@app.teardown_request
+def release_app_leases(error):
+    """after_request를 거치지 못한 요청의 사용자 앱 임대 반납"""
+    for app_lease in g.pop('app_leases', []):
+        app_lease.release()
+
+
 def create_app(csv_path, metadata_path, output_dir=None, results_dir=None, llm_mode=None, username=None):
     """Flask 애플리케이션 생성 및 초기화"""
     # Config 업데이트